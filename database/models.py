@@ -9,6 +9,8 @@ from datetime import datetime
 from .schema import get_connection, get_reference_connection, get_images_dir, get_calibrations_dir
 
 _UNSET = object()
+# Auto-detected measurements awaiting accept/reject are kept out of statistics and exports.
+_NOT_PENDING_CLAUSE = "COALESCE({alias}review_status, '') != 'pending'"
 
 # Images directory
 def _images_dir() -> Path:
@@ -555,70 +557,86 @@ class ImageDB:
         'other'
     ]
 
+    # Pixel/file facts stored per image (see utils.image_info)
+    FILE_INFO_COLUMNS = (
+        'pixel_width',
+        'pixel_height',
+        'megapixels',
+        'file_size',
+        'file_mtime_ns',
+        'content_hash',
+    )
+
+    # Identity of the file an image was imported from (see utils.image_info)
+    SOURCE_COLUMNS = (
+        'source_size',
+        'source_prefix_hash',
+        'source_hash',
+    )
+
     @staticmethod
-    def add_image(observation_id: int, filepath: str, image_type: str,
-                  scale: float = None, notes: str = None,
-                  micro_category: str = None, objective_name: str = None,
-                  measure_color: str = None, mount_medium: str = None,
-                  sample_type: str = None, contrast: str = None,
-                  calibration_id: int = None,
-                  ai_crop_box: tuple[float, float, float, float] | None = None,
-                  ai_crop_source_size: tuple[int, int] | None = None,
-                  gps_source: bool | None = None,
-                  resample_scale_factor: float | None = None,
-                  original_filepath: str | None = None,
-                  copy_to_folder: bool = True) -> int:
-        """Add an image and return its ID.
+    def _read_file_info(filepath: str | None, content_hash: str | None = None) -> dict:
+        if not filepath:
+            return {}
+        from utils.image_info import read_image_file_info
 
-        Args:
-            observation_id: ID of the observation
-            filepath: Source filepath of the image
-            image_type: 'field' or 'microscope'
-            scale: Scale in microns per pixel
-            notes: Optional notes
-            micro_category: Category for microscope images
-            objective_name: Name of the objective used
-            copy_to_folder: If True, copy image to observation folder
+        return read_image_file_info(filepath, content_hash=content_hash) or {}
+
+    @staticmethod
+    def _read_source_identity(filepath: str | None, source_hash: str | None = None) -> dict:
+        if not filepath:
+            return {}
+        from utils.image_info import read_source_identity
+
+        return read_source_identity(filepath, source_hash=source_hash) or {}
+
+    @staticmethod
+    def store_image_files(observation_id: int, filepath: str,
+                          original_filepath: str | None = None,
+                          copy_to_folder: bool = True) -> dict:
+        """Copy an image (and its original) into the observation's storage.
+
+        Only touches files, so it can run ahead of (or in parallel with) the
+        database writes. Files identical to an already stored image or
+        original are hardlinked instead of copied. Returns the filepath and
+        original_filepath to store, with content_hash and original_hash of
+        the files that were placed (None when a file was left where it is).
         """
-        conn = get_connection()
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+        from utils.image_info import store_file
 
         final_filepath = filepath
         final_original_filepath = original_filepath
-        artsobs_web_unpublished = 0
-
+        content_hash = None
+        original_hash = None
+        folder_path = None
         if observation_id:
-            cursor.execute('SELECT artsdata_id FROM observations WHERE id = ?', (observation_id,))
-            obs_row = cursor.fetchone()
-            try:
-                if obs_row and int(obs_row["artsdata_id"] or 0) > 0:
-                    artsobs_web_unpublished = 1
-            except (TypeError, ValueError):
-                artsobs_web_unpublished = 0
-
-        # Copy image to observation folder if requested
-        if copy_to_folder and observation_id:
+            conn = get_connection()
+            conn.row_factory = sqlite3.Row
+            cursor = conn.cursor()
             cursor.execute('SELECT folder_path FROM observations WHERE id = ?', (observation_id,))
             row = cursor.fetchone()
+            conn.close()
             if row and row['folder_path']:
                 folder_path = Path(row['folder_path'])
-                folder_path.mkdir(parents=True, exist_ok=True)
 
-                source_path = Path(filepath)
-                if source_path.exists():
-                    # Generate unique filename if needed
-                    dest_path = folder_path / source_path.name
-                    counter = 1
-                    while dest_path.exists():
-                        dest_path = folder_path / f"{source_path.stem}_{counter}{source_path.suffix}"
-                        counter += 1
+        # Copy image to observation folder if requested
+        if copy_to_folder and folder_path:
+            folder_path.mkdir(parents=True, exist_ok=True)
 
-                    try:
-                        shutil.copy2(filepath, dest_path)
-                        final_filepath = str(dest_path)
-                    except Exception as e:
-                        print(f"Warning: Could not copy image: {e}")
+            source_path = Path(filepath)
+            if source_path.exists():
+                # Generate unique filename if needed
+                dest_path = folder_path / source_path.name
+                counter = 1
+                while dest_path.exists():
+                    dest_path = folder_path / f"{source_path.stem}_{counter}{source_path.suffix}"
+                    counter += 1
+
+                try:
+                    content_hash = store_file(filepath, dest_path)
+                    final_filepath = str(dest_path)
+                except Exception as e:
+                    print(f"Warning: Could not copy image: {e}")
 
         storage_mode = SettingsDB.get_setting("original_storage_mode", "observation")
         if not storage_mode:
@@ -634,23 +652,17 @@ class ImageDB:
                     global_dir = SettingsDB.get_setting("originals_dir") or str(get_database_path().parent / "originals")
                     target_dir = Path(global_dir)
                     if observation_id:
-                        cursor.execute('SELECT folder_path FROM observations WHERE id = ?', (observation_id,))
-                        row = cursor.fetchone()
-                        if row and row['folder_path']:
-                            obs_folder = Path(row['folder_path'])
+                        if folder_path:
                             try:
-                                rel = obs_folder.resolve().relative_to(_images_dir().resolve())
+                                rel = folder_path.resolve().relative_to(_images_dir().resolve())
                                 target_dir = target_dir / rel
                             except Exception:
-                                target_dir = target_dir / obs_folder.name
+                                target_dir = target_dir / folder_path.name
                         else:
                             target_dir = target_dir / f"observation_{observation_id}"
                 else:
-                    if copy_to_folder and observation_id:
-                        cursor.execute('SELECT folder_path FROM observations WHERE id = ?', (observation_id,))
-                        row = cursor.fetchone()
-                        if row and row['folder_path']:
-                            target_dir = Path(row['folder_path']) / "originals"
+                    if copy_to_folder and folder_path:
+                        target_dir = folder_path / "originals"
                 if target_dir:
                     target_dir.mkdir(parents=True, exist_ok=True)
                     dest_original = target_dir / original_path.name
@@ -659,11 +671,90 @@ class ImageDB:
                         dest_original = target_dir / f"{original_path.stem}_{counter}{original_path.suffix}"
                         counter += 1
                     try:
-                        shutil.copy2(original_filepath, dest_original)
+                        original_hash = store_file(original_filepath, dest_original)
                         final_original_filepath = str(dest_original)
                     except Exception as e:
                         print(f"Warning: Could not copy original image: {e}")
 
+        return {
+            "filepath": final_filepath,
+            "original_filepath": final_original_filepath,
+            "content_hash": content_hash,
+            "original_hash": original_hash,
+        }
+
+    @staticmethod
+    def add_image(observation_id: int, filepath: str, image_type: str,
+                  scale: float = None, notes: str = None,
+                  micro_category: str = None, objective_name: str = None,
+                  measure_color: str = None, mount_medium: str = None,
+                  sample_type: str = None, contrast: str = None,
+                  calibration_id: int = None,
+                  ai_crop_box: tuple[float, float, float, float] | None = None,
+                  ai_crop_source_size: tuple[int, int] | None = None,
+                  gps_source: bool | None = None,
+                  resample_scale_factor: float | None = None,
+                  original_filepath: str | None = None,
+                  copy_to_folder: bool = True,
+                  files_stored: bool = False,
+                  file_info: dict | None = None,
+                  original_hash: str | None = None,
+                  source_identity: dict | None = None,
+                  conn: sqlite3.Connection | None = None) -> int:
+        """Add an image and return its ID.
+
+        Args:
+            observation_id: ID of the observation
+            filepath: Source filepath of the image
+            image_type: 'field' or 'microscope'
+            scale: Scale in microns per pixel
+            notes: Optional notes
+            micro_category: Category for microscope images
+            objective_name: Name of the objective used
+            copy_to_folder: If True, copy image to observation folder
+            files_stored: If True, filepath and original_filepath were already
+                placed by store_image_files and are recorded as given
+            file_info: Stored file info of filepath, if already read
+            original_hash: Content hash of a stored original_filepath
+            source_identity: Size and hashes of the file the image was
+                imported from; defaults to those of filepath
+            conn: Open connection to write with; the caller commits
+        """
+        if files_stored:
+            final_filepath, final_original_filepath = filepath, original_filepath
+        else:
+            stored = ImageDB.store_image_files(
+                observation_id, filepath, original_filepath, copy_to_folder
+            )
+            final_filepath = stored["filepath"]
+            final_original_filepath = stored["original_filepath"]
+            original_hash = stored["original_hash"]
+            if file_info is None:
+                file_info = ImageDB._read_file_info(final_filepath, content_hash=stored["content_hash"])
+        if source_identity is None:
+            # The stored copy has the same bytes as filepath unless it was
+            # placed by the caller.
+            source_identity = ImageDB._read_source_identity(
+                filepath,
+                source_hash=None if files_stored else (file_info or {}).get("content_hash"),
+            )
+
+        own_conn = conn is None
+        if own_conn:
+            conn = get_connection()
+        cursor = conn.cursor()
+        cursor.row_factory = sqlite3.Row
+
+        artsobs_web_unpublished = 0
+        if observation_id:
+            cursor.execute('SELECT artsdata_id FROM observations WHERE id = ?', (observation_id,))
+            obs_row = cursor.fetchone()
+            try:
+                if obs_row and int(obs_row["artsdata_id"] or 0) > 0:
+                    artsobs_web_unpublished = 1
+            except (TypeError, ValueError):
+                artsobs_web_unpublished = 0
+
         crop_x1 = crop_y1 = crop_x2 = crop_y2 = None
         if ai_crop_box and len(ai_crop_box) == 4:
             crop_x1, crop_y1, crop_x2, crop_y2 = ai_crop_box
@@ -671,6 +762,8 @@ class ImageDB:
         if ai_crop_source_size and len(ai_crop_source_size) == 2:
             crop_w, crop_h = ai_crop_source_size
         gps_source_value = None if gps_source is None else (1 if gps_source else 0)
+        if file_info is None:
+            file_info = ImageDB._read_file_info(final_filepath)
 
         cursor.execute('''
             INSERT INTO images (observation_id, filepath, image_type, micro_category,
@@ -678,16 +771,22 @@ class ImageDB:
                               mount_medium, sample_type, contrast, measure_color, notes, calibration_id,
                               ai_crop_x1, ai_crop_y1, ai_crop_x2, ai_crop_y2,
                               ai_crop_source_w, ai_crop_source_h, gps_source, original_filepath,
-                              artsobs_web_unpublished)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                              artsobs_web_unpublished, pixel_width, pixel_height, megapixels,
+                              file_size, file_mtime_ns, content_hash, original_hash,
+                              source_size, source_prefix_hash, source_hash)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         ''', (observation_id, final_filepath, image_type, micro_category,
               objective_name, scale, resample_scale_factor, mount_medium, sample_type, contrast, measure_color, notes,
               calibration_id, crop_x1, crop_y1, crop_x2, crop_y2, crop_w, crop_h, gps_source_value,
-              final_original_filepath, artsobs_web_unpublished))
+              final_original_filepath, artsobs_web_unpublished,
+              *(file_info.get(column) for column in ImageDB.FILE_INFO_COLUMNS),
+              original_hash if final_original_filepath else None,
+              *(source_identity.get(column) for column in ImageDB.SOURCE_COLUMNS)))
 
         img_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+        if own_conn:
+            conn.commit()
+            conn.close()
         return img_id
 
     @staticmethod
@@ -809,9 +908,19 @@ class ImageDB:
                      ai_crop_source_size: tuple[int, int] | None | object = _UNSET,
                      gps_source: bool | None | object = _UNSET,
                      resample_scale_factor: float | None | object = _UNSET,
-                     original_filepath: str | None | object = _UNSET):
-        """Update image metadata"""
-        conn = get_connection()
+                     original_filepath: str | None | object = _UNSET,
+                     file_info: dict | None = None,
+                     original_hash: str | None = None,
+                     conn: sqlite3.Connection | None = None):
+        """Update image metadata.
+
+        file_info is the stored file info of a new filepath, if already read,
+        and original_hash the content hash of a newly stored original.
+        Pass conn to write as part of the caller's transaction.
+        """
+        own_conn = conn is None
+        if own_conn:
+            conn = get_connection()
         cursor = conn.cursor()
 
         updates = []
@@ -841,12 +950,19 @@ class ImageDB:
         if filepath is not None:
             updates.append('filepath = ?')
             values.append(filepath)
+            if file_info is None:
+                file_info = ImageDB._read_file_info(filepath)
+            for column in ImageDB.FILE_INFO_COLUMNS:
+                updates.append(f'{column} = ?')
+                values.append(file_info.get(column))
         if resample_scale_factor is not _UNSET:
             updates.append('resample_scale_factor = ?')
             values.append(resample_scale_factor)
         if original_filepath is not _UNSET:
             updates.append('original_filepath = ?')
             values.append(original_filepath)
+            updates.append('original_hash = ?')
+            values.append(original_hash if original_filepath else None)
         if notes is not None:
             updates.append('notes = ?')
             values.append(notes)
@@ -884,9 +1000,175 @@ class ImageDB:
                 UPDATE images SET {', '.join(updates)} WHERE id = ?
             ''', values)
 
+        if own_conn:
+            conn.commit()
+            conn.close()
+
+    @staticmethod
+    def get_file_info_by_path(filepath: str) -> Optional[dict]:
+        """Return id, filepath and stored file info of the image stored at filepath."""
+        if not filepath:
+            return None
+        conn = get_connection()
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        cursor.execute(
+            f"SELECT id, filepath, {', '.join(ImageDB.FILE_INFO_COLUMNS)} "
+            "FROM images WHERE filepath = ? ORDER BY id LIMIT 1",
+            (str(filepath),),
+        )
+        row = cursor.fetchone()
+        conn.close()
+        return dict(row) if row else None
+
+    @staticmethod
+    def set_file_info(image_id: int, file_info: dict | None) -> None:
+        """Store pixel size, file size/mtime and content hash for an image."""
+        if not image_id or not file_info:
+            return
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute(
+            f"UPDATE images SET {', '.join(f'{column} = ?' for column in ImageDB.FILE_INFO_COLUMNS)} "
+            "WHERE id = ?",
+            (*(file_info.get(column) for column in ImageDB.FILE_INFO_COLUMNS), image_id),
+        )
         conn.commit()
         conn.close()
 
+    @staticmethod
+    def find_import_candidates(source_size: int, source_prefix_hash: str) -> List[dict]:
+        """Get images that may have been imported from a file of this size and prefix hash.
+
+        Images without a recorded source are matched on stored file size.
+        """
+        conn = get_connection()
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        cursor.execute(
+            '''
+            SELECT id, observation_id, filepath, source_hash, content_hash FROM images
+            WHERE (source_size = ? AND source_prefix_hash = ?)
+               OR (file_size = ? AND source_hash IS NULL)
+            ORDER BY id
+            ''',
+            (int(source_size), source_prefix_hash, int(source_size)),
+        )
+        rows = cursor.fetchall()
+        conn.close()
+        return [dict(row) for row in rows]
+
+    @staticmethod
+    def find_stored_files_by_hash(content_hash: str) -> List[str]:
+        """Get stored image and original files whose content hash is content_hash.
+
+        Image files changed since their hash was recorded are left out.
+        """
+        if not content_hash:
+            return []
+        from utils.image_info import stored_info_is_current
+
+        conn = get_connection()
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        cursor.execute(
+            f"SELECT filepath, {', '.join(ImageDB.FILE_INFO_COLUMNS)} FROM images WHERE content_hash = ?",
+            (content_hash,),
+        )
+        paths = [row["filepath"] for row in cursor.fetchall() if stored_info_is_current(dict(row))]
+        cursor.execute(
+            'SELECT original_filepath FROM images WHERE original_hash = ? AND original_filepath IS NOT NULL',
+            (content_hash,),
+        )
+        paths.extend(row["original_filepath"] for row in cursor.fetchall())
+        conn.close()
+        return list(dict.fromkeys(paths))
+
+    @staticmethod
+    def dhash_to_db(value: int) -> int:
+        """Map an unsigned 64-bit perceptual hash onto SQLite's signed INTEGER."""
+        return value - (1 << 64) if value >= (1 << 63) else value
+
+    @staticmethod
+    def dhash_from_db(value: int) -> int:
+        return int(value) & ((1 << 64) - 1)
+
+    @staticmethod
+    def set_dhash(image_id: int, value: int | None, conn: sqlite3.Connection | None = None) -> None:
+        """Store the perceptual hash of an image."""
+        if not image_id or value is None:
+            return
+        own_conn = conn is None
+        if own_conn:
+            conn = get_connection()
+        conn.execute('UPDATE images SET dhash = ? WHERE id = ?', (ImageDB.dhash_to_db(value), image_id))
+        if own_conn:
+            conn.commit()
+            conn.close()
+
+    @staticmethod
+    def get_dhashes() -> List[Tuple[int, int]]:
+        """Get (image_id, perceptual hash) of every hashed image."""
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute('SELECT id, dhash FROM images WHERE dhash IS NOT NULL')
+        rows = [(image_id, ImageDB.dhash_from_db(value)) for image_id, value in cursor.fetchall()]
+        conn.close()
+        return rows
+
+    @staticmethod
+    def get_images_missing_dhash(limit: int = 100) -> List[dict]:
+        """Get images whose perceptual hash has not been recorded yet."""
+        conn = get_connection()
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        cursor.execute(
+            'SELECT id, filepath FROM images WHERE dhash IS NULL ORDER BY id LIMIT ?',
+            (int(limit),),
+        )
+        rows = cursor.fetchall()
+        conn.close()
+        return [dict(row) for row in rows]
+
+    @staticmethod
+    def get_images_by_ids(image_ids: list[int]) -> List[dict]:
+        """Get images by ID, in no particular order; missing IDs are skipped."""
+        ids = [int(image_id) for image_id in image_ids if image_id]
+        if not ids:
+            return []
+        conn = get_connection()
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        rows = []
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            cursor.execute(
+                f"SELECT * FROM images WHERE id IN ({', '.join('?' for _ in chunk)})",
+                chunk,
+            )
+            rows.extend(dict(row) for row in cursor.fetchall())
+        conn.close()
+        return rows
+
+    @staticmethod
+    def get_images_missing_file_info(limit: int = 50) -> List[dict]:
+        """Get images whose stored size or content hash has not been recorded yet."""
+        conn = get_connection()
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        cursor.execute(
+            '''
+            SELECT id, filepath FROM images
+            WHERE pixel_width IS NULL OR content_hash IS NULL
+            ORDER BY id
+            LIMIT ?
+            ''',
+            (int(limit),),
+        )
+        rows = cursor.fetchall()
+        conn.close()
+        return [dict(row) for row in rows]
+
     @staticmethod
     def delete_image(image_id: int):
         """Delete an image and its measurements"""
@@ -911,7 +1193,8 @@ class MeasurementDB:
     @staticmethod
     def add_measurement(image_id: int, length: float, width: float = None,
                        measurement_type: str = 'manual', notes: str = None,
-                       points: list = None) -> int:
+                       points: list = None, review_status: str = None,
+                       conn: sqlite3.Connection | None = None) -> int:
         """Add a measurement and return its ID
 
         Args:
@@ -921,17 +1204,21 @@ class MeasurementDB:
             measurement_type: Type of measurement
             notes: Optional notes
             points: List of 4 QPointF objects [p1, p2, p3, p4]
+            review_status: 'pending' for detected spores awaiting review
+            conn: Open connection to write with; the caller commits
         """
-        conn = get_connection()
+        own_conn = conn is None
+        if own_conn:
+            conn = get_connection()
         cursor = conn.cursor()
 
         if points and len(points) == 4:
             cursor.execute('''
                 INSERT INTO spore_measurements
-                (image_id, length_um, width_um, measurement_type, notes,
+                (image_id, length_um, width_um, measurement_type, notes, review_status,
                  p1_x, p1_y, p2_x, p2_y, p3_x, p3_y, p4_x, p4_y)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (image_id, length, width, measurement_type, notes,
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (image_id, length, width, measurement_type, notes, review_status,
                   points[0].x(), points[0].y(),
                   points[1].x(), points[1].y(),
                   points[2].x(), points[2].y(),
@@ -939,33 +1226,51 @@ class MeasurementDB:
         elif points and len(points) == 2:
             cursor.execute('''
                 INSERT INTO spore_measurements
-                (image_id, length_um, width_um, measurement_type, notes,
+                (image_id, length_um, width_um, measurement_type, notes, review_status,
                  p1_x, p1_y, p2_x, p2_y)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (image_id, length, width, measurement_type, notes,
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (image_id, length, width, measurement_type, notes, review_status,
                   points[0].x(), points[0].y(),
                   points[1].x(), points[1].y()))
         else:
             cursor.execute('''
-                INSERT INTO spore_measurements (image_id, length_um, width_um, measurement_type, notes)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (image_id, length, width, measurement_type, notes))
+                INSERT INTO spore_measurements
+                (image_id, length_um, width_um, measurement_type, notes, review_status)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (image_id, length, width, measurement_type, notes, review_status))
 
         meas_id = cursor.lastrowid
+        if own_conn:
+            conn.commit()
+            conn.close()
+        return meas_id
+
+    @staticmethod
+    def set_review_status(measurement_id: int, review_status: str = None):
+        """Set the review status of a measurement; None marks it reviewed."""
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute(
+            'UPDATE spore_measurements SET review_status = ? WHERE id = ?',
+            (review_status, measurement_id)
+        )
         conn.commit()
         conn.close()
-        return meas_id
     
     @staticmethod
-    def get_measurements_for_image(image_id: int) -> List[dict]:
-        """Get all measurements for an image"""
+    def get_measurements_for_image(image_id: int, include_pending: bool = True) -> List[dict]:
+        """Get all measurements for an image.
+
+        With include_pending=False, detections still awaiting review are left out.
+        """
         conn = get_connection()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT * FROM spore_measurements 
-            WHERE image_id = ?
+
+        pending_clause = "" if include_pending else f" AND {_NOT_PENDING_CLAUSE.format(alias='')}"
+        cursor.execute(f'''
+            SELECT * FROM spore_measurements
+            WHERE image_id = ?{pending_clause}
             ORDER BY measured_at
         ''', (image_id,))
         
@@ -974,17 +1279,53 @@ class MeasurementDB:
         return [dict(row) for row in rows]
 
     @staticmethod
-    def get_measurements_for_observation(observation_id: int) -> List[dict]:
-        """Get all measurements for all images in an observation"""
+    def get_image_ids_with_measurements(image_ids: List[int], spores_only: bool = False) -> set:
+        """Return the subset of image_ids that have measurements, in one query per 500 ids.
+
+        With spores_only, only manual/spore measurements (or untyped ones) count.
+        """
+        clean_ids: list[int] = []
+        for value in image_ids or []:
+            try:
+                clean_ids.append(int(value))
+            except (TypeError, ValueError):
+                continue
+        if not clean_ids:
+            return set()
+        type_clause = ""
+        if spores_only:
+            type_clause = " AND LOWER(COALESCE(measurement_type, '')) IN ('', 'manual', 'spore')"
+        found: set[int] = set()
+        conn = get_connection()
+        cursor = conn.cursor()
+        for start in range(0, len(clean_ids), 500):
+            chunk = clean_ids[start:start + 500]
+            placeholders = ",".join("?" for _ in chunk)
+            cursor.execute(
+                f"SELECT DISTINCT image_id FROM spore_measurements "
+                f"WHERE image_id IN ({placeholders}){type_clause}",
+                chunk,
+            )
+            found.update(int(row[0]) for row in cursor.fetchall())
+        conn.close()
+        return found
+
+    @staticmethod
+    def get_measurements_for_observation(observation_id: int, include_pending: bool = True) -> List[dict]:
+        """Get all measurements for all images in an observation.
+
+        With include_pending=False, detections still awaiting review are left out.
+        """
         conn = get_connection()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
-        cursor.execute('''
+        pending_clause = "" if include_pending else f" AND {_NOT_PENDING_CLAUSE.format(alias='m.')}"
+        cursor.execute(f'''
             SELECT m.*, i.filepath AS image_filepath
             FROM spore_measurements m
             JOIN images i ON m.image_id = i.id
-            WHERE i.observation_id = ?
+            WHERE i.observation_id = ?{pending_clause}
             ORDER BY m.measured_at
         ''', (observation_id,))
 
@@ -1009,6 +1350,7 @@ class MeasurementDB:
             "o.species = ?",
             "m.length_um IS NOT NULL",
             "m.width_um IS NOT NULL",
+            _NOT_PENDING_CLAUSE.format(alias="m."),
         ]
         params = [genus, species]
         if source_type:
@@ -1044,8 +1386,8 @@ class MeasurementDB:
 
     @staticmethod
     def get_statistics_for_observation(observation_id: int, measurement_category: str = 'spores') -> dict:
-        """Calculate statistics for measurements of an observation."""
-        measurements = MeasurementDB.get_measurements_for_observation(observation_id)
+        """Calculate statistics for reviewed measurements of an observation."""
+        measurements = MeasurementDB.get_measurements_for_observation(observation_id, include_pending=False)
 
         if measurement_category:
             category = measurement_category.lower()
@@ -1116,8 +1458,8 @@ class MeasurementDB:
     
     @staticmethod
     def get_statistics_for_image(image_id: int, measurement_category: str = 'spores') -> dict:
-        """Calculate statistics for measurements of an image"""
-        measurements = MeasurementDB.get_measurements_for_image(image_id)
+        """Calculate statistics for reviewed measurements of an image"""
+        measurements = MeasurementDB.get_measurements_for_image(image_id, include_pending=False)
 
         if measurement_category:
             category = measurement_category.lower()
@@ -1618,16 +1960,11 @@ class CalibrationDB:
         def _add_from_path(path: str | None) -> None:
             if not path:
                 return
-            try:
-                from PIL import Image
-            except Exception:
-                return
-            try:
-                with Image.open(path) as img:
-                    if img.width > 0 and img.height > 0:
-                        values.append((img.width * img.height) / 1_000_000.0)
-            except Exception:
-                return
+            from utils.image_info import get_image_megapixels
+
+            megapixels = get_image_megapixels(path)
+            if megapixels:
+                values.append(megapixels)
 
         measurements_json = cal.get("measurements_json")
         if measurements_json:
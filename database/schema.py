@@ -198,6 +198,11 @@ def get_app_dir() -> Path:
     return _app_dir
 
 
+def get_cache_dir() -> Path:
+    """Get the directory for regenerable caches (pyramids, crops)."""
+    return _app_dir / "cache"
+
+
 def get_objectives_path() -> Path:
     return _app_dir / "objectives.json"
 
@@ -607,6 +612,17 @@ def init_database():
             ai_crop_source_h INTEGER,
             gps_source INTEGER DEFAULT 0,
             artsobs_web_unpublished INTEGER DEFAULT 0,
+            pixel_width INTEGER,
+            pixel_height INTEGER,
+            megapixels REAL,
+            file_size INTEGER,
+            file_mtime_ns INTEGER,
+            content_hash TEXT,
+            original_hash TEXT,
+            source_size INTEGER,
+            source_prefix_hash TEXT,
+            source_hash TEXT,
+            dhash INTEGER,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             FOREIGN KEY (observation_id) REFERENCES observations(id)
         )
@@ -704,6 +720,39 @@ def init_database():
     except sqlite3.OperationalError:
         pass
 
+    # Add stored pixel/file metadata (filled at import, backfilled lazily)
+    for column, column_type in (
+        ('pixel_width', 'INTEGER'),
+        ('pixel_height', 'INTEGER'),
+        ('megapixels', 'REAL'),
+        ('file_size', 'INTEGER'),
+        ('file_mtime_ns', 'INTEGER'),
+        ('content_hash', 'TEXT'),
+    ):
+        try:
+            cursor.execute(f'ALTER TABLE images ADD COLUMN {column} {column_type}')
+        except sqlite3.OperationalError:
+            pass
+
+    # Content hashes of stored originals and of the file each image was
+    # imported from (duplicate detection and deduplicated storage)
+    for column, column_type in (
+        ('original_hash', 'TEXT'),
+        ('source_size', 'INTEGER'),
+        ('source_prefix_hash', 'TEXT'),
+        ('source_hash', 'TEXT'),
+    ):
+        try:
+            cursor.execute(f'ALTER TABLE images ADD COLUMN {column} {column_type}')
+        except sqlite3.OperationalError:
+            pass
+
+    # Perceptual hash for near-duplicate search (see utils.perceptual_hash)
+    try:
+        cursor.execute('ALTER TABLE images ADD COLUMN dhash INTEGER')
+    except sqlite3.OperationalError:
+        pass
+
     # Spore measurements table
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS spore_measurements (
@@ -713,6 +762,7 @@ def init_database():
             width_um REAL,
             measurement_type TEXT DEFAULT 'manual',
             gallery_rotation INTEGER DEFAULT 0,
+            review_status TEXT,
             p1_x REAL,
             p1_y REAL,
             p2_x REAL,
@@ -733,6 +783,12 @@ def init_database():
     except sqlite3.OperationalError:
         pass
 
+    # Detected spores awaiting review are 'pending'; NULL once accepted or measured by hand
+    try:
+        cursor.execute('ALTER TABLE spore_measurements ADD COLUMN review_status TEXT')
+    except sqlite3.OperationalError:
+        pass
+
     # Thumbnails for efficient loading and ML training
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS thumbnails (
@@ -826,6 +882,11 @@ def init_database():
 
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_observations_species ON observations(genus, species)')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_observations_source ON observations(source_type)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_images_filepath ON images(filepath)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_images_content_hash ON images(content_hash)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_images_original_hash ON images(original_hash)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_images_source ON images(source_size, source_prefix_hash)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_images_file_size ON images(file_size)')
 
     conn.commit()
     conn.close()
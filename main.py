@@ -1,4 +1,5 @@
 """Main entry point for Mushroom Spore Analyzer"""
+import multiprocessing
 import os
 import signal
 import sys
@@ -17,7 +18,6 @@ from PySide6.QtGui import QFont, QPixmap, QPainter, QColor
 from PySide6.QtCore import QTranslator, QLocale, Qt, QTimer
 from database.schema import init_database, get_app_settings, update_app_settings
 from database.models import SettingsDB
-from ui.main_window import MainWindow
 
 APP_VERSION = "0.5.6"
 
@@ -99,11 +99,15 @@ def main():
             app.installTranslator(translator)
             app._translator = translator
 
+    # Imported here so worker processes (which re-import this module) stay light.
+    from ui.main_window import MainWindow
+
     window = MainWindow(app_version=APP_VERSION)
     window.show()
     if splash:
         splash.finish(window)
     window.start_update_check()
+    window.start_image_info_backfill()
 
     # Keep Python signal handling responsive while Qt runs its event loop.
     signal_pump = QTimer()
@@ -125,4 +129,5 @@ def main():
 
 
 if __name__ == '__main__':
+    multiprocessing.freeze_support()
     main()
@@ -0,0 +1,301 @@
+"""Benchmark automatic slide calibration on synthetic stage micrometers.
+
+Renders a suite of synthetic slides (tools/synthetic_micrometer.py) from
+1 to 45 MP under varied tilt, blur, noise, vignetting and line width,
+runs calibrate_from_image() and calibrate_image() on each and writes wall
+time, peak memory and the nm/px error of the parabola and edge methods
+to a JSON file. Pass an earlier file as --compare to see how a change
+moved each number.
+
+Every run happens in a fresh process, so peak memory is that of one
+calibration (plus the interpreter) rather than of the whole suite.
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import json
+import multiprocessing
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from tools.synthetic_micrometer import SlideSpec, write_slide
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+BASELINE_VERSION = 1
+FUNCTIONS = ("calibrate_from_image", "calibrate_image")
+
+# name -> SlideSpec arguments
+DEFAULT_CASES: dict[str, dict] = {
+    "res-1mp": {"megapixels": 1.0, "tilt_deg": 0.8},
+    "res-3mp": {"megapixels": 3.0, "tilt_deg": 0.8},
+    "res-12mp": {"megapixels": 12.0, "tilt_deg": 0.8},
+    "res-20mp": {"megapixels": 20.0, "tilt_deg": 0.8},
+    "res-45mp": {"megapixels": 45.0, "tilt_deg": 0.8},
+    "horizontal": {"megapixels": 12.0, "axis": "horizontal", "tilt_deg": -1.2},
+    "tilt-4deg": {"megapixels": 12.0, "tilt_deg": 4.0},
+    "blur": {"megapixels": 12.0, "tilt_deg": 0.8, "blur_sigma_px": 3.5},
+    "noise": {"megapixels": 12.0, "tilt_deg": 0.8, "noise_sigma": 18.0},
+    "vignetting": {"megapixels": 12.0, "tilt_deg": 0.8, "vignetting": 0.5},
+    "thin-lines": {"megapixels": 12.0, "tilt_deg": 0.8, "line_width_px": 1.2},
+    "thick-lines": {"megapixels": 12.0, "tilt_deg": 0.8, "line_width_px": 9.0},
+    "fine-spacing": {"megapixels": 12.0, "tilt_deg": 0.8, "spacing_px": 22.5},
+}
+QUICK_MAX_MEGAPIXELS = 12.0
+
+
+def _peak_rss_mb() -> float | None:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS.
+    return peak / (1024.0 * 1024.0) if sys.platform == "darwin" else peak / 1024.0
+
+
+def _calibrate(function: str, path: str, division_um: float):
+    from utils import slide_calibration
+
+    if function == "calibrate_from_image":
+        return slide_calibration.calibrate_from_image(path, division_um=division_um)
+    return slide_calibration.calibrate_image(path, spacing_um=division_um, use_large_angles=True)
+
+
+def _run_case(function: str, path: str, division_um: float, repeat: int) -> dict:
+    """Time one function on one image; runs in a fresh worker process."""
+    # Imports are not part of the timing.
+    importlib.import_module("utils.slide_calibration")
+    baseline_rss = _peak_rss_mb()
+    times = []
+    result = None
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        result = _calibrate(function, path, division_um)
+        times.append(time.perf_counter() - start)
+    peak_rss = _peak_rss_mb()
+
+    # A separate run under tracemalloc: numpy and Python heap, on every platform.
+    tracemalloc.start()
+    _calibrate(function, path, division_um)
+    _current, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "wall_s": min(times),
+        "wall_s_median": statistics.median(times),
+        "wall_s_all": times,
+        "baseline_rss_mb": baseline_rss,
+        "peak_rss_mb": peak_rss,
+        "peak_traced_mb": traced_peak / (1024.0 * 1024.0),
+        "axis": result.axis,
+        "angle_deg": float(result.angle_deg),
+        "n_lines": int(result.n_lines),
+        "warning": result.warning,
+        "nm_per_px": {
+            "parabola": float(result.nm_per_px),
+            "edges": float(result.nm_per_px_edges),
+        },
+    }
+
+
+def _measure(function: str, path: Path, spec: SlideSpec, repeat: int) -> dict:
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+        try:
+            run = executor.submit(_run_case, function, str(path), spec.division_um, repeat).result()
+        except Exception as exc:
+            return {"function": function, "error": str(exc)}
+    true_nm = spec.true_nm_per_px
+    run["error_pct"] = {
+        method: 100.0 * (value - true_nm) / true_nm for method, value in run["nm_per_px"].items()
+    }
+    return {"function": function, "error": None, **run}
+
+
+def _environment() -> dict:
+    import numpy
+    import PIL
+
+    return {
+        "python": platform.python_version(),
+        "numpy": numpy.__version__,
+        "pillow": PIL.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": multiprocessing.cpu_count(),
+    }
+
+
+def run_benchmark(
+    cases: dict[str, dict],
+    work_dir: Path,
+    functions: tuple[str, ...] = FUNCTIONS,
+    repeat: int = 3,
+    keep_images: bool = False,
+) -> dict:
+    """Render and calibrate every case; returns the baseline document."""
+    report = {
+        "version": BASELINE_VERSION,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "environment": _environment(),
+        "cases": [],
+    }
+    for name, spec_args in cases.items():
+        spec = SlideSpec(**spec_args)
+        path = work_dir / f"{name}.jpg"
+        start = time.perf_counter()
+        write_slide(spec, path)
+        print(f"{name}: rendered {spec.size[0]}x{spec.size[1]} in {time.perf_counter() - start:.1f} s")
+        entry = {"name": name, "spec": spec.to_dict(), "runs": []}
+        for function in functions:
+            run = _measure(function, path, spec, repeat)
+            entry["runs"].append(run)
+            print(f"  {_format_run(run)}")
+        report["cases"].append(entry)
+        if not keep_images:
+            path.unlink(missing_ok=True)
+    return report
+
+
+def _format_run(run: dict) -> str:
+    if run.get("error"):
+        return f"{run['function']:<22} FAILED: {run['error']}"
+    rss = run["peak_rss_mb"]
+    rss_text = f"{rss:7.0f} MB" if rss is not None else "      --"
+    return (
+        f"{run['function']:<22} {run['wall_s']:7.3f} s {rss_text}"
+        f"  parabola {run['error_pct']['parabola']:+.4f}%  edges {run['error_pct']['edges']:+.4f}%"
+    )
+
+
+def compare_reports(baseline: dict, current: dict) -> list[str]:
+    """Return one line per case and function comparing current to baseline."""
+    before = {
+        (case["name"], run["function"]): run
+        for case in baseline.get("cases", [])
+        for run in case.get("runs", [])
+    }
+    lines = [f"{'case':<14} {'function':<22} {'time':>16} {'peak RSS':>18} {'|err| edges':>22}"]
+    for case in current.get("cases", []):
+        for run in case.get("runs", []):
+            old = before.get((case["name"], run["function"]))
+            if run.get("error"):
+                status = f"FAILED: {run['error']}"
+            elif old is None:
+                status = "no baseline"
+            elif old.get("error"):
+                status = f"baseline failed: {old['error']}"
+            else:
+                status = None
+            if status:
+                lines.append(f"{case['name']:<14} {run['function']:<22} {status}")
+                continue
+            time_text = f"{old['wall_s']:.3f}->{run['wall_s']:.3f}s"
+            if old.get("peak_rss_mb") is not None and run.get("peak_rss_mb") is not None:
+                rss_text = f"{old['peak_rss_mb']:.0f}->{run['peak_rss_mb']:.0f} MB"
+            else:
+                rss_text = "--"
+            err_text = f"{abs(old['error_pct']['edges']):.4f}->{abs(run['error_pct']['edges']):.4f}%"
+            lines.append(
+                f"{case['name']:<14} {run['function']:<22} {time_text:>16} {rss_text:>18} {err_text:>22}"
+            )
+    return lines
+
+
+def _parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Benchmark automatic slide calibration on synthetic stage micrometer images."
+    )
+    parser.add_argument(
+        "--output",
+        default="calibration_benchmark.json",
+        help="JSON file to write results to. Default: calibration_benchmark.json",
+    )
+    parser.add_argument("--compare", default=None, help="Earlier results to compare against.")
+    parser.add_argument(
+        "--case",
+        dest="cases",
+        action="append",
+        default=[],
+        help="Only run cases whose name contains this text. Repeat for several.",
+    )
+    parser.add_argument(
+        "--quick",
+        action="store_true",
+        help=f"Skip cases above {QUICK_MAX_MEGAPIXELS:g} MP.",
+    )
+    parser.add_argument(
+        "--function",
+        dest="functions",
+        action="append",
+        choices=FUNCTIONS,
+        default=[],
+        help="Only benchmark this function. Repeat for both (default).",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per case. Default: 3")
+    parser.add_argument("--work-dir", default=None, help="Where to render images. Default: a temp dir.")
+    parser.add_argument("--keep-images", action="store_true", help="Keep rendered images in --work-dir.")
+    parser.add_argument("--list", action="store_true", help="List the cases and exit.")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str]) -> int:
+    args = _parse_args(argv)
+    cases = {
+        name: spec_args
+        for name, spec_args in DEFAULT_CASES.items()
+        if (not args.cases or any(text in name for text in args.cases))
+        and (not args.quick or spec_args.get("megapixels", SlideSpec.megapixels) <= QUICK_MAX_MEGAPIXELS)
+    }
+    if args.list:
+        for name, spec_args in cases.items():
+            print(f"{name:<14} {json.dumps(spec_args)}")
+        return 0
+    if not cases:
+        print("ERROR: No benchmark cases selected.", file=sys.stderr)
+        return 1
+
+    baseline = None
+    if args.compare:
+        try:
+            baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        except (OSError, ValueError) as exc:
+            print(f"ERROR: Could not read {args.compare}: {exc}", file=sys.stderr)
+            return 1
+
+    functions = tuple(args.functions) or FUNCTIONS
+    if args.work_dir:
+        work_dir = Path(args.work_dir)
+        work_dir.mkdir(parents=True, exist_ok=True)
+        report = run_benchmark(cases, work_dir, functions, args.repeat, args.keep_images)
+    else:
+        with tempfile.TemporaryDirectory(prefix="mycolog_calibration_") as tmp:
+            report = run_benchmark(cases, Path(tmp), functions, args.repeat)
+
+    output = Path(args.output)
+    output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"\nWrote {output}")
+    if baseline is not None:
+        print(f"\nCompared with {args.compare} ({baseline.get('created', '?')}):")
+        for line in compare_reports(baseline, report):
+            print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
@@ -0,0 +1,355 @@
+"""Check the vectorized calibration primitives against plain reference loops.
+
+utils/calibration_primitives.py computes peaks, prominences, half-max
+edge crossings and parabola vertices with whole-array numpy operations.
+This script keeps the straightforward per-element loops those functions
+replaced, runs both on thousands of random profiles (ties, plateaus,
+smoothed noise, quantized sines, very short and empty profiles) and
+reports every mismatch. It then times both on 4000-px scanline profiles
+like the ones measure() sees.
+
+Peaks and edge crossings must match bit for bit. Parabola vertices are
+solved in closed form instead of with np.polyfit, so they must agree
+within PARABOLA_TOLERANCE_PX on the troughs measure() refines, scaled up
+for nearly flat fits whose vertex lands far from the trough.
+
+Exits with status 1 if any check fails.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from utils.calibration_primitives import (
+    find_peaks, gauss_smooth, half_max_edges, half_max_edges_batch, parabola_refine_rows,
+)
+
+BENCHMARK_LENGTH = 4000
+PARABOLA_TOLERANCE_PX = 1e-6
+
+
+# ─── Reference implementations ───────────────────────────────────────────────
+
+def reference_prominence(data: np.ndarray, peak_idx: int) -> float:
+    """Prominence of a single peak — same definition as scipy."""
+    left_min = data[peak_idx]
+    for i in range(peak_idx - 1, -1, -1):
+        if data[i] < left_min:
+            left_min = data[i]
+        if data[i] > data[peak_idx]:
+            break
+    right_min = data[peak_idx]
+    for i in range(peak_idx + 1, len(data)):
+        if data[i] < right_min:
+            right_min = data[i]
+        if data[i] > data[peak_idx]:
+            break
+    return data[peak_idx] - max(left_min, right_min)
+
+
+def reference_find_peaks(data: np.ndarray,
+                         min_height: float | None = None,
+                         min_distance: int = 1,
+                         min_prominence: float | None = None) -> np.ndarray:
+    """find_peaks() as a loop over candidates, greedy by descending height."""
+    candidates = [i for i in range(1, len(data) - 1)
+                  if data[i] > data[i - 1] and data[i] >= data[i + 1]]
+    if min_height is not None:
+        candidates = [i for i in candidates if data[i] >= min_height]
+    candidates.sort(key=lambda i: -data[i])
+    kept: list[int] = []
+    for c in candidates:
+        if all(abs(c - k) >= min_distance for k in kept):
+            kept.append(c)
+    kept.sort()
+    if min_prominence is not None:
+        kept = [i for i in kept if reference_prominence(data, i) >= min_prominence]
+    return np.array(kept, dtype=np.intp)
+
+
+def reference_half_max_edges(profile: np.ndarray, peak_y: float,
+                             search: int = 30) -> tuple[float | None, float | None]:
+    """half_max_edges() as loops over the profile; peak_y must round into it."""
+    p = int(round(peak_y))
+    lo = max(0, p - search)
+    hi = min(len(profile), p + search)
+    center = float(profile[p])
+    left = profile[lo:p]
+    right = profile[p + 1:hi]
+    bg_left = float(np.percentile(left, 95)) if len(left) else float(profile[lo])
+    bg_right = float(np.percentile(right, 95)) if len(right) else float(profile[hi - 1])
+    half_left = (bg_left + center) / 2.0
+    half_right = (bg_right + center) / 2.0
+
+    top = bot = None
+    for i in range(lo, p):
+        if profile[i] >= half_left and profile[i + 1] < half_left:
+            top = i + (half_left - profile[i]) / (profile[i + 1] - profile[i])
+    for i in range(p, hi - 1):
+        if profile[i] < half_right and profile[i + 1] >= half_right:
+            bot = i + (half_right - profile[i]) / (profile[i + 1] - profile[i])
+            break
+    return top, bot
+
+
+def reference_parabola_refine(profile: np.ndarray, peak: int, half_width: int = 3) -> float:
+    """Sub-pixel minimum via np.polyfit around *peak*."""
+    lo = max(0, peak - half_width)
+    hi = min(len(profile), peak + half_width + 1)
+    xs = np.arange(lo, hi, dtype=np.float64)
+    c = np.polyfit(xs, profile[lo:hi], 2)
+    return -c[1] / (2 * c[0]) if c[0] > 0 else float(peak)
+
+
+# ─── Random profiles ─────────────────────────────────────────────────────────
+
+def random_profile(rng: np.random.Generator, trial: int, max_length: int = 200) -> np.ndarray:
+    """One random profile; the kind cycles with trial so every kind is covered."""
+    n = int(rng.integers(0, max_length))
+    kind = trial % 4
+    if kind == 0:
+        return rng.normal(size=n)
+    if kind == 1:
+        # Small integers: plenty of ties and plateaus.
+        return rng.integers(0, 5, size=n).astype(np.float64)
+    if kind == 2:
+        if n < 3:
+            return rng.normal(size=n)
+        return gauss_smooth(rng.normal(size=n), rng.uniform(0.5, 4))
+    wave = np.sin(np.arange(n) * rng.uniform(0.05, 1)) * rng.uniform(1, 50)
+    return np.round(wave + rng.normal(size=n), 1)
+
+
+def random_peak_options(rng: np.random.Generator, data: np.ndarray) -> dict:
+    options = {}
+    if rng.random() < 0.7:
+        options["min_height"] = float(np.quantile(data, rng.random())) if len(data) else 0.0
+    if rng.random() < 0.8:
+        if rng.random() < 0.8:
+            options["min_distance"] = int(rng.integers(1, 25))
+        else:
+            options["min_distance"] = float(rng.uniform(0.5, 20))
+    if rng.random() < 0.8:
+        options["min_prominence"] = float(rng.uniform(0, 3))
+    return options
+
+
+def line_profile(rng: np.random.Generator, length: int, spacing: float = 40.0,
+                 line_sigma: float = 3.0, noise: float = 8.0) -> np.ndarray:
+    """Grey levels across evenly spaced dark lines, as measure() averages them."""
+    x = np.arange(length)
+    phase = np.mod(x - rng.uniform(0, spacing), spacing) - spacing / 2
+    return 200 - 120 * np.exp(-0.5 * (phase / line_sigma) ** 2) + rng.normal(0, noise, length)
+
+
+def scanline_profiles(rng: np.random.Generator, count: int, length: int = BENCHMARK_LENGTH) -> list:
+    """Inverted, smoothed profiles across evenly spaced dark lines."""
+    profiles = []
+    for _ in range(count):
+        raw = line_profile(rng, length)
+        profiles.append(gauss_smooth(raw.max() - raw, 2.5))
+    return profiles
+
+
+def edge_profile(rng: np.random.Generator, trial: int) -> np.ndarray:
+    """A random profile for the edge check: random walk, lines or plateaus."""
+    n = int(rng.integers(5, 400))
+    kind = trial % 3
+    if kind == 0:
+        return rng.normal(0, 1, n).cumsum()
+    if kind == 1:
+        return line_profile(rng, n, rng.uniform(8, 60), rng.uniform(1, 5), rng.uniform(0, 10))
+    return np.round(rng.uniform(0, 255, n))
+
+
+def measured_troughs(profile: np.ndarray) -> np.ndarray:
+    """Trough positions as measure() detects them."""
+    inv_sm = gauss_smooth(profile.max() - profile, 2.5)
+    return find_peaks(inv_sm, min_height=inv_sm.max() * 0.25,
+                      min_distance=15, min_prominence=inv_sm.max() * 0.15)
+
+
+# ─── Checks ──────────────────────────────────────────────────────────────────
+
+def check_find_peaks(rng: np.random.Generator, trials: int) -> int:
+    """Compare find_peaks() with the reference; returns the number of mismatches."""
+    mismatches = 0
+    for trial in range(trials):
+        data = random_profile(rng, trial)
+        options = random_peak_options(rng, data)
+        expected = reference_find_peaks(data, **options)
+        actual = find_peaks(data, **options)
+        if actual.dtype != expected.dtype or not np.array_equal(actual, expected):
+            mismatches += 1
+            if mismatches <= 5:
+                print(f"  find_peaks mismatch: {options} {data.tolist()}")
+                print(f"    expected {expected.tolist()}, got {actual.tolist()}")
+    print(f"find_peaks: {trials - mismatches}/{trials} random profiles match the reference")
+    return mismatches
+
+
+def check_half_max_edges(rng: np.random.Generator, trials: int) -> int:
+    """Compare half_max_edges_batch() with the reference loop, bit for bit."""
+    mismatches = checks = 0
+    for trial in range(trials):
+        profile = edge_profile(rng, trial)
+        n = len(profile)
+        search = int(rng.integers(1, 60))
+        centers = rng.uniform(0, n - 1, int(rng.integers(1, 30)))
+        if trial % 7 == 0:
+            # Troughs right at the ends of the profile.
+            centers = np.concatenate([centers, [0.0, n - 1.0, 0.5, n - 1.5]])
+        tops, bots = half_max_edges_batch(profile, centers, search)
+        for center, top, bot in zip(centers, tops, bots):
+            checks += 1
+            expected = [np.nan if v is None else float(v)
+                        for v in reference_half_max_edges(profile, center, search)]
+            single = [np.nan if v is None else v for v in half_max_edges(profile, center, search)]
+            if not (np.array_equal(expected, [top, bot], equal_nan=True)
+                    and np.array_equal(expected, single, equal_nan=True)):
+                mismatches += 1
+                if mismatches <= 5:
+                    print(f"  half_max_edges mismatch at {center} (search {search}): "
+                          f"expected {expected}, got {[top, bot]}")
+        # Troughs outside the profile have no edges.
+        outside = np.array([-5.0, -0.6, n - 0.4, n + 10.0, np.nan])
+        tops, bots = half_max_edges_batch(profile, outside, search)
+        checks += len(outside)
+        bad = int((~np.isnan(tops) | ~np.isnan(bots)).sum())
+        if bad:
+            mismatches += bad
+            print(f"  half_max_edges found edges for troughs outside the profile: {tops} {bots}")
+    print(f"half_max_edges: {checks - mismatches}/{checks} troughs match the reference")
+    return mismatches
+
+
+def check_parabola_refine(rng: np.random.Generator, trials: int) -> int:
+    """Compare parabola_refine_rows() with np.polyfit on the troughs measure() refines."""
+    mismatches = checks = 0
+    worst = 0.0
+    for _ in range(trials):
+        rows = [line_profile(rng, int(rng.integers(200, 1200)), rng.uniform(16, 80),
+                             rng.uniform(1, 6), rng.uniform(0, 20)) for _ in range(4)]
+        length = min(len(row) for row in rows)
+        stack = np.stack([row[:length] for row in rows])
+        row_idx, peaks = [], []
+        for r, profile in enumerate(stack):
+            troughs = measured_troughs(profile)
+            row_idx.extend([r] * len(troughs))
+            peaks.extend(troughs.tolist())
+        row_idx = np.array(row_idx, dtype=np.intp)
+        peaks = np.array(peaks, dtype=np.intp)
+        vertices = parabola_refine_rows(stack, row_idx, peaks)
+        for r, peak, vertex in zip(row_idx, peaks, vertices):
+            checks += 1
+            expected = reference_parabola_refine(stack[r], int(peak))
+            error = abs(expected - vertex) / max(1.0, abs(expected - peak))
+            if (expected == float(peak)) != (vertex == float(peak)) or error > PARABOLA_TOLERANCE_PX:
+                mismatches += 1
+                if mismatches <= 5:
+                    print(f"  parabola_refine mismatch at {peak}: expected {expected}, got {vertex}")
+            else:
+                worst = max(worst, error)
+    print(f"parabola_refine: {checks - mismatches}/{checks} troughs agree with np.polyfit "
+          f"(largest scaled difference {worst:.1e} px)")
+    return mismatches
+
+
+def _scanline_options(data: np.ndarray) -> dict:
+    # Thresholds as in _scan_peaks(): relative to each profile's maximum.
+    top = float(data.max())
+    return {"min_height": top * 0.25, "min_distance": 15, "min_prominence": top * 0.15}
+
+
+def _noise_options(data: np.ndarray) -> dict:
+    return {"min_height": 0.0, "min_distance": 15, "min_prominence": 0.1}
+
+
+def _ms_per_call(function, profiles: list, options_for) -> float:
+    options = [options_for(data) for data in profiles]
+    start = time.perf_counter()
+    for data, kwargs in zip(profiles, options):
+        function(data, **kwargs)
+    return (time.perf_counter() - start) / len(profiles) * 1000.0
+
+
+def benchmark_find_peaks(rng: np.random.Generator, count: int) -> None:
+    cases = (
+        ("scanlines", scanline_profiles(rng, count), _scanline_options),
+        ("smoothed noise", [gauss_smooth(rng.normal(size=BENCHMARK_LENGTH), 1.0) for _ in range(count)],
+         _noise_options),
+    )
+    print(f"find_peaks on {BENCHMARK_LENGTH}-px profiles (ms per call):")
+    for name, profiles, options_for in cases:
+        reference = _ms_per_call(reference_find_peaks, profiles, options_for)
+        vectorized = _ms_per_call(find_peaks, profiles, options_for)
+        print(f"  {name:<16} reference {reference:8.3f}   vectorized {vectorized:8.3f}"
+              f"   ({reference / max(vectorized, 1e-9):.0f}x)")
+
+
+def benchmark_line_refinement(rng: np.random.Generator, count: int) -> None:
+    """Time parabola and edge refinement of every line of measure()-like profiles."""
+    profiles = [line_profile(rng, BENCHMARK_LENGTH) for _ in range(count)]
+    troughs = [measured_troughs(profile) for profile in profiles]
+    lines = sum(len(t) for t in troughs)
+
+    start = time.perf_counter()
+    for profile, peaks in zip(profiles, troughs):
+        for peak in peaks:
+            center = reference_parabola_refine(profile, int(peak))
+            reference_half_max_edges(profile, center, 25)
+    reference = (time.perf_counter() - start) / len(profiles) * 1000.0
+
+    start = time.perf_counter()
+    for profile, peaks in zip(profiles, troughs):
+        centers = parabola_refine_rows(profile[None, :], np.zeros(len(peaks), dtype=np.intp), peaks)
+        half_max_edges_batch(profile, centers, 25)
+    vectorized = (time.perf_counter() - start) / len(profiles) * 1000.0
+    print(f"line refinement on {BENCHMARK_LENGTH}-px profiles, {lines / len(profiles):.0f} lines each "
+          f"(ms per profile):")
+    print(f"  {'parabola + edges':<16} reference {reference:8.3f}   vectorized {vectorized:8.3f}"
+          f"   ({reference / max(vectorized, 1e-9):.0f}x)")
+
+
+def _parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Check calibration primitives against reference loops and time them."
+    )
+    parser.add_argument("--trials", type=int, default=20000, help="Random profiles to check. Default: 20000")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed. Default: 0")
+    parser.add_argument(
+        "--benchmark-profiles",
+        type=int,
+        default=50,
+        help=f"{BENCHMARK_LENGTH}-px profiles to time. 0 skips the benchmark. Default: 50",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str]) -> int:
+    args = _parse_args(argv)
+    rng = np.random.default_rng(args.seed)
+    failures = check_find_peaks(rng, args.trials)
+    failures += check_half_max_edges(rng, max(1, args.trials // 7))
+    failures += check_parabola_refine(rng, max(1, args.trials // 40))
+    if args.benchmark_profiles > 0:
+        print()
+        benchmark_find_peaks(rng, args.benchmark_profiles)
+        benchmark_line_refinement(rng, args.benchmark_profiles)
+    if failures:
+        print(f"\nFAILED: {failures} mismatch(es)", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
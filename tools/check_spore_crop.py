@@ -0,0 +1,163 @@
+"""Check ROI-rotated spore thumbnails against full-image rotation.
+
+utils/spore_crop.render_spore_thumbnail rotates only a padded region
+around each measurement. This script renders random measurements on a
+synthetic micrograph both that way and by rotating the whole source
+image first (how thumbnails used to be cut), and compares the results.
+
+Quarter turns must match bit for bit. Other angles may differ by a few
+grey levels because Qt's smooth sampling rounds depending on where each
+scanline starts: the mean difference of a thumbnail must stay below
+MEAN_TOLERANCE and at most OUTLIER_SHARE of its pixels may differ by
+more than PIXEL_TOLERANCE (the worst ones sit on the image's own
+anti-aliased border). Both paths are timed.
+
+Exits with status 1 if any check fails.
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import QPointF, Qt
+from PySide6.QtGui import QGuiApplication, QImage
+
+from utils import spore_crop
+
+MEAN_TOLERANCE = 1.0
+PIXEL_TOLERANCE = 3
+OUTLIER_SHARE = 0.01
+
+
+def _full_rotation_region(image, transform, rect):
+    return image.transformed(transform, Qt.SmoothTransformation).copy(rect)
+
+
+def render_reference(*args, **kwargs) -> QImage | None:
+    """render_spore_thumbnail with the whole source rotated first."""
+    roi_region = spore_crop._rotated_region
+    spore_crop._rotated_region = _full_rotation_region
+    try:
+        return spore_crop.render_spore_thumbnail(*args, **kwargs)
+    finally:
+        spore_crop._rotated_region = roi_region
+
+
+def synthetic_image(rng: np.random.Generator, width: int, height: int) -> QImage:
+    """Smooth random texture, like out-of-focus debris on a slide."""
+    coarse = rng.integers(0, 256, (height // 8 + 1, width // 8 + 1, 4), dtype=np.uint8)
+    coarse[..., 3] = 255
+    small = QImage(coarse.data, coarse.shape[1], coarse.shape[0], coarse.shape[1] * 4, QImage.Format_RGB32)
+    return small.scaled(width, height, Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+
+
+def random_measurement(rng: np.random.Generator, width: int, height: int) -> dict:
+    cx = rng.uniform(-20, width + 20)
+    cy = rng.uniform(-20, height + 20)
+    length = rng.uniform(10, 120)
+    breadth = length * rng.uniform(0.4, 1.0)
+    angle = rng.uniform(0, 2 * math.pi)
+    ux, uy = math.cos(angle), math.sin(angle)
+    points = [
+        QPointF(cx - ux * length / 2, cy - uy * length / 2),
+        QPointF(cx + ux * length / 2, cy + uy * length / 2),
+        QPointF(cx + uy * breadth / 2, cy - ux * breadth / 2),
+        QPointF(cx - uy * breadth / 2, cy + ux * breadth / 2),
+    ]
+    return {
+        "points": points,
+        "length_um": 5.1,
+        "width_um": 3.2,
+        "size": int(rng.choice([80, 150, 220])),
+        "orient": bool(rng.random() < 0.7),
+        "extra_rotation": float(rng.choice([0, 90, 180, 270, rng.uniform(-180, 180)])),
+        "uniform_length_px": float(rng.uniform(50, 200)) if rng.random() < 0.3 else None,
+    }
+
+
+def _pixels(image: QImage) -> np.ndarray:
+    image = image.convertToFormat(QImage.Format_RGB32)
+    data = np.frombuffer(image.constBits(), np.uint8).reshape(image.height(), image.bytesPerLine())
+    return data[:, : image.width() * 4].reshape(image.height(), image.width(), 4)[..., :3].astype(np.int16)
+
+
+def _is_quarter_turn(job: dict) -> bool:
+    angle = job["extra_rotation"]
+    return not job["orient"] and abs(angle / 90.0 - round(angle / 90.0)) < 1e-9
+
+
+def check_thumbnails(rng: np.random.Generator, image: QImage, trials: int) -> int:
+    failures = 0
+    worst_mean = 0.0
+    worst_share = 0.0
+    roi_s = full_s = 0.0
+    for _ in range(trials):
+        job = random_measurement(rng, image.width(), image.height())
+        args = (image, job.pop("points"), job.pop("length_um"), job.pop("width_um"), job.pop("size"))
+        start = time.perf_counter()
+        expected = render_reference(*args, **job)
+        full_s += time.perf_counter() - start
+        start = time.perf_counter()
+        actual = spore_crop.render_spore_thumbnail(*args, **job)
+        roi_s += time.perf_counter() - start
+        if expected is None or actual is None:
+            if (expected is None) != (actual is None):
+                failures += 1
+                print(f"MISMATCH: one renderer returned None for {job}")
+            continue
+        diff = np.abs(_pixels(actual) - _pixels(expected)).max(axis=2)
+        mean = float(diff.mean())
+        share = float((diff > PIXEL_TOLERANCE).mean())
+        worst_mean = max(worst_mean, mean)
+        worst_share = max(worst_share, share)
+        exact = _is_quarter_turn(job)
+        if (exact and diff.any()) or mean > MEAN_TOLERANCE or share > OUTLIER_SHARE:
+            failures += 1
+            print(f"MISMATCH: max {diff.max()} mean {mean:.3f} outliers {share:.2%} for {job}")
+    print(
+        f"thumbnails: {trials - failures}/{trials} ok; worst mean {worst_mean:.3f} grey levels, "
+        f"worst share above {PIXEL_TOLERANCE} {worst_share:.2%}"
+    )
+    print(f"  full-image rotation {full_s / trials * 1000:.1f} ms, ROI {roi_s / trials * 1000:.2f} ms per thumbnail")
+    return failures
+
+
+def _parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Check ROI-rotated spore thumbnails against full-image rotation and time both."
+    )
+    parser.add_argument("--trials", type=int, default=300, help="Random measurements to check. Default: 300")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed. Default: 0")
+    parser.add_argument("--width", type=int, default=6000, help="Synthetic image width. Default: 6000")
+    parser.add_argument("--height", type=int, default=4000, help="Synthetic image height. Default: 4000")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str]) -> int:
+    args = _parse_args(argv)
+    app = QGuiApplication.instance() or QGuiApplication([])
+    rng = np.random.default_rng(args.seed)
+    image = synthetic_image(rng, args.width, args.height)
+    failures = check_thumbnails(rng, image, args.trials)
+    del app
+    if failures:
+        print(f"\nFAILED: {failures} mismatch(es)", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
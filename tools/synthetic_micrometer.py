@@ -0,0 +1,193 @@
+"""Synthetic stage micrometer images with a known scale.
+
+Renders a graticule of dark lines on a bright field, like a calibration
+slide seen through the microscope, with a known line spacing and
+optional tilt, blur, noise, vignetting and line width at any resolution.
+The true scale is division_um * 1000 / spacing_px nm/px, so calibration
+results can be scored against it.
+
+Images are rendered in strips, so 45 MP slides need little more memory
+than the finished 8-bit image. Run as a script to write images to disk.
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import sys
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+from PIL import Image
+
+STRIP_ROWS = 256
+PROFILE_STEP_PX = 1.0 / 32.0
+
+
+@dataclass
+class SlideSpec:
+    """Geometry and imaging conditions of one synthetic slide image."""
+
+    megapixels: float = 20.0
+    aspect: float = 1.5
+    axis: str = "vertical"  # direction of the lines
+    spacing_px: Optional[float] = None  # perpendicular to the lines; default width / 66
+    division_um: float = 10.0
+    tilt_deg: float = 0.0
+    line_width_px: float = 3.0
+    blur_sigma_px: float = 1.2
+    noise_sigma: float = 4.0  # grey levels
+    vignetting: float = 0.0  # relative darkening in the corners
+    background: float = 200.0
+    contrast: float = 130.0
+    band: tuple[float, float] = (0.3, 0.7)  # extent of the lines along their length
+    seed: int = 0
+
+    @property
+    def size(self) -> tuple[int, int]:
+        width = int(round(math.sqrt(self.megapixels * 1_000_000 * self.aspect)))
+        height = int(round(width / self.aspect))
+        return width, height
+
+    @property
+    def line_spacing_px(self) -> float:
+        if self.spacing_px:
+            return float(self.spacing_px)
+        return self.size[0] / 66.0
+
+    @property
+    def true_nm_per_px(self) -> float:
+        return self.division_um * 1000.0 / self.line_spacing_px
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        data["band"] = list(self.band)
+        data["size"] = list(self.size)
+        data["spacing_px"] = self.line_spacing_px
+        data["true_nm_per_px"] = self.true_nm_per_px
+        return data
+
+
+def _edge_profile(width_px: float, sigma_px: float, half_range: float) -> tuple[np.ndarray, np.ndarray]:
+    """Tabulate the darkening of one line against distance from its centre.
+
+    The line is a box of width_px, integrated over one pixel and blurred
+    with a Gaussian of sigma_px.
+    """
+    radius = half_range + width_px + 4.0 * sigma_px + 1.0
+    x = np.arange(-radius, radius + PROFILE_STEP_PX, PROFILE_STEP_PX)
+    profile = (np.abs(x) <= width_px / 2.0).astype(np.float64)
+    kernel = (np.abs(x) <= 0.5).astype(np.float64)
+    if sigma_px > 0:
+        kernel = np.convolve(kernel, np.exp(-0.5 * (x / sigma_px) ** 2), mode="same")
+    kernel /= kernel.sum()
+    return x, np.convolve(profile, kernel, mode="same")
+
+
+def _end_profile(sigma_px: float) -> tuple[np.ndarray, np.ndarray]:
+    """Tabulate how a line fades at its end: 0 outside, 1 inside."""
+    sigma_px = max(sigma_px, 1e-3)
+    radius = 4.0 * sigma_px + 1.0
+    x = np.arange(-radius, radius + PROFILE_STEP_PX, PROFILE_STEP_PX)
+    cdf = np.cumsum(np.exp(-0.5 * (x / sigma_px) ** 2))
+    return x, cdf / cdf[-1]
+
+
+def render_slide(spec: SlideSpec) -> Image.Image:
+    """Render spec as an 8-bit greyscale image."""
+    width, height = spec.size
+    spacing = spec.line_spacing_px
+    theta = math.radians(spec.tilt_deg)
+    cos_t, sin_t = math.cos(theta), math.sin(theta)
+    cx, cy = width / 2.0, height / 2.0
+    # Lines are tilted by tilt_deg; u runs across them, v along them.
+    length = height if spec.axis == "vertical" else width
+    band_lo = (spec.band[0] - 0.5) * length
+    band_hi = (spec.band[1] - 0.5) * length
+    phase = 0.1 * spacing  # keep a line off the exact image centre
+    prof_x, prof = _edge_profile(spec.line_width_px, spec.blur_sigma_px, spacing / 2.0)
+    end_x, end_cdf = _end_profile(spec.blur_sigma_px)
+    r_max2 = cx * cx + cy * cy
+
+    rng = np.random.default_rng(spec.seed)
+    out = np.empty((height, width), dtype=np.uint8)
+    xs = np.arange(width, dtype=np.float64) - cx + 0.5
+    for top in range(0, height, STRIP_ROWS):
+        rows = min(STRIP_ROWS, height - top)
+        ys = (np.arange(top, top + rows, dtype=np.float64) - cy + 0.5)[:, None]
+        if spec.axis == "vertical":
+            u = xs[None, :] * cos_t - ys * sin_t
+            v = xs[None, :] * sin_t + ys * cos_t
+        else:
+            u = ys * cos_t + xs[None, :] * sin_t
+            v = -ys * sin_t + xs[None, :] * cos_t
+        d = np.mod(u - phase + spacing / 2.0, spacing) - spacing / 2.0
+        dark = np.interp(d, prof_x, prof)
+        along = np.minimum(v - band_lo, band_hi - v)
+        dark *= np.interp(along, end_x, end_cdf)
+        strip = spec.background - spec.contrast * dark
+        if spec.vignetting:
+            r2 = (xs[None, :] ** 2 + ys ** 2) / r_max2
+            strip *= 1.0 - spec.vignetting * r2
+        if spec.noise_sigma:
+            strip += rng.normal(0.0, spec.noise_sigma, strip.shape)
+        np.clip(strip, 0, 255, out=strip)
+        out[top:top + rows] = np.rint(strip).astype(np.uint8)
+    return Image.fromarray(out)
+
+
+def write_slide(spec: SlideSpec, path: str | Path, quality: int = 92) -> Path:
+    """Render spec and save it; JPEGs are written with quality."""
+    path = Path(path)
+    img = render_slide(spec)
+    if path.suffix.lower() in {".jpg", ".jpeg"}:
+        img.save(path, "JPEG", quality=quality)
+    else:
+        img.save(path)
+    return path
+
+
+def _parse_args(argv: list[str]) -> argparse.Namespace:
+    defaults = SlideSpec()
+    parser = argparse.ArgumentParser(description="Write a synthetic stage micrometer image.")
+    parser.add_argument("output", help="Output image path (.jpg, .png, .tif).")
+    parser.add_argument("--megapixels", type=float, default=defaults.megapixels)
+    parser.add_argument("--aspect", type=float, default=defaults.aspect)
+    parser.add_argument("--axis", choices=["vertical", "horizontal"], default=defaults.axis)
+    parser.add_argument("--spacing-px", type=float, default=None, help="Default: image width / 66.")
+    parser.add_argument("--division-um", type=float, default=defaults.division_um)
+    parser.add_argument("--tilt-deg", type=float, default=defaults.tilt_deg)
+    parser.add_argument("--line-width-px", type=float, default=defaults.line_width_px)
+    parser.add_argument("--blur-sigma-px", type=float, default=defaults.blur_sigma_px)
+    parser.add_argument("--noise-sigma", type=float, default=defaults.noise_sigma)
+    parser.add_argument("--vignetting", type=float, default=defaults.vignetting)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--quality", type=int, default=92, help="JPEG quality.")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str]) -> int:
+    args = _parse_args(argv)
+    spec = SlideSpec(
+        megapixels=args.megapixels,
+        aspect=args.aspect,
+        axis=args.axis,
+        spacing_px=args.spacing_px,
+        division_um=args.division_um,
+        tilt_deg=args.tilt_deg,
+        line_width_px=args.line_width_px,
+        blur_sigma_px=args.blur_sigma_px,
+        noise_sigma=args.noise_sigma,
+        vignetting=args.vignetting,
+        seed=args.seed,
+    )
+    path = write_slide(spec, args.output, quality=args.quality)
+    width, height = spec.size
+    print(f"{path}: {width}x{height}, {spec.line_spacing_px:.3f} px spacing, {spec.true_nm_per_px:.4f} nm/px")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
@@ -4,6 +4,7 @@ from __future__ import annotations
 import json
 import re
 import shutil
+from concurrent.futures import FIRST_COMPLETED, CancelledError, wait
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
@@ -11,7 +12,7 @@ from uuid import uuid4
 
 import numpy as np
 from PIL import Image, ImageDraw
-from PySide6.QtCore import Qt, Signal, QPointF, QStandardPaths
+from PySide6.QtCore import Qt, Signal, QPointF, QStandardPaths, QThread
 from PySide6.QtGui import QPixmap, QKeySequence, QShortcut, QIntValidator, QDoubleValidator
 from PySide6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton,
@@ -28,7 +29,9 @@ from database.schema import (
 )
 from database.models import CalibrationDB, ObservationDB, SettingsDB
 import utils.slide_calibration as slide_calibration
-from utils.exif_reader import get_exif_data
+from utils.calibration_cache import calibration_cache_key, get_cached_result, remember_result
+from utils.calibration_jobs import CalibrationBatch
+from utils.exif_reader import get_exif_summary
 from .zoomable_image_widget import ZoomableImageLabel
 from .image_gallery_widget import ImageGalleryWidget
 
@@ -439,6 +442,91 @@ class ObservationSelectionDialog(QDialog):
         self.accept()
 
 
+class AutoCalibrationWorker(QThread):
+    """Calibrate a batch of images in worker processes, reporting per image.
+
+    Images calibrated before with the same content and parameters are
+    answered from the result memo without running again.
+    """
+
+    progressChanged = Signal(str, str, float)  # job key, step, fraction
+    resultReady = Signal(dict)  # run_calibration_job() outcome
+
+    POLL_SECONDS = 0.1
+
+    def __init__(self, jobs: list[dict], parent=None) -> None:
+        super().__init__(parent)
+        self.jobs = list(jobs)
+        self._batch: CalibrationBatch | None = None
+        self._cancelled = False
+
+    def cancel(self) -> None:
+        """Stop the batch; no more results are emitted."""
+        self._cancelled = True
+        if self._batch is not None:
+            self._batch.cancel()
+
+    def _emit_progress(self, batch: CalibrationBatch) -> None:
+        for key, step, frac in batch.drain_progress():
+            if self._cancelled:
+                return
+            self.progressChanged.emit(key, step, float(frac))
+
+    def run(self) -> None:
+        batch = CalibrationBatch(len(self.jobs))
+        self._batch = batch
+        if self._cancelled:
+            batch.cancel()
+        try:
+            pending = {}
+            cache_keys = {}
+            for job in self.jobs:
+                if self._cancelled:
+                    break
+                cache_key = calibration_cache_key(
+                    job["path"],
+                    job["spacing_um"],
+                    crop_box=job.get("crop_box"),
+                    axis_override=job.get("axis_hint"),
+                    use_large_angles=job.get("use_large_angles", False),
+                )
+                cached = get_cached_result(cache_key)
+                if cached is not None:
+                    self.resultReady.emit({"key": job["key"], "cache_key": cache_key, **cached})
+                    continue
+                cache_keys[job["key"]] = cache_key
+                try:
+                    pending[batch.submit(job)] = job["key"]
+                except RuntimeError:
+                    # Cancelled while submitting.
+                    break
+            while pending and not self._cancelled:
+                done, _ = wait(pending, timeout=self.POLL_SECONDS, return_when=FIRST_COMPLETED)
+                self._emit_progress(batch)
+                for future in done:
+                    key = pending.pop(future)
+                    try:
+                        outcome = future.result()
+                    except CancelledError:
+                        continue
+                    except Exception as exc:
+                        # A worker process died.
+                        outcome = {"key": key, "error": str(exc)}
+                    if outcome.get("result") is not None:
+                        outcome["cache_key"] = cache_keys.get(key)
+                        remember_result(
+                            outcome["cache_key"],
+                            outcome["result"],
+                            outcome.get("crop_offset") or (0.0, 0.0),
+                            outcome.get("crop_size"),
+                        )
+                    if self._cancelled:
+                        break
+                    self.resultReady.emit(outcome)
+        finally:
+            batch.shutdown()
+
+
 class CalibrationDialog(QDialog):
     """Dialog for managing microscope objectives and calibration."""
 
@@ -467,6 +555,9 @@ class CalibrationDialog(QDialog):
         self._auto_crop_active = False
         self._show_auto_debug_overlays = True
         self._auto_manual_notice_shown = False
+        self._auto_worker: AutoCalibrationWorker | None = None
+        self._auto_workers: set[AutoCalibrationWorker] = set()  # Including cancelled ones still stopping
+        self._auto_jobs: dict[str, dict] = {}  # job key -> {img_data, crop_box, spacing_um, step, frac, error}
 
         self._init_ui()
         self._load_objectives_combo()
@@ -1090,6 +1181,8 @@ class CalibrationDialog(QDialog):
             if hasattr(result, "spacing_median_edges_px") and result.spacing_median_edges_px and result.spacing_median_edges_px > 0:
                 result.nm_per_px_edges = (spacing_um * 1000.0) / float(result.spacing_median_edges_px)
             auto_data["spacing_um"] = spacing_um
+            # The memo key names the division the result was computed for.
+            auto_data.pop("cache_key", None)
             updated = True
 
         if not updated:
@@ -1278,22 +1371,7 @@ class CalibrationDialog(QDialog):
         return "color: #c0392b;"
 
     def _result_from_dict(self, data: dict) -> slide_calibration.CalibrationResult:
-        return slide_calibration.CalibrationResult(
-            axis=data.get("axis", "horizontal"),
-            angle_deg=float(data.get("angle_deg", 0.0)),
-            centers_px=np.array(data.get("centers_px", []), dtype=np.float64),
-            centers_edges_px=np.array(data.get("centers_edges_px", []), dtype=np.float64),
-            edges_px=np.array(data.get("edges_px", []), dtype=np.float64),
-            spacing_median_px=float(data.get("spacing_median_px", float("nan"))),
-            spacing_median_edges_px=float(data.get("spacing_median_edges_px", float("nan"))),
-            nm_per_px=float(data.get("nm_per_px", float("nan"))),
-            nm_per_px_edges=float(data.get("nm_per_px_edges", float("nan"))),
-            agreement_pct=float(data.get("agreement_pct", float("nan"))),
-            rel_scatter_mad_pct=float(data.get("rel_scatter_mad_pct", float("nan"))),
-            rel_scatter_iqr_pct=float(data.get("rel_scatter_iqr_pct", float("nan"))),
-            drift_slope=float(data.get("drift_slope", float("nan"))),
-            residual_slope_deg=float(data.get("residual_slope_deg", float("nan"))),
-        )
+        return slide_calibration.CalibrationResult.from_dict(data)
 
     def _render_auto_results(self, auto_data: Optional[dict]):
         if not hasattr(self, "auto_scale_label"):
@@ -1444,9 +1522,18 @@ class CalibrationDialog(QDialog):
         spacing_um: float,
         crop_offset: tuple[float, float] = (0.0, 0.0),
         crop_size: Optional[tuple[int, int]] = None,
+        img_data: Optional[dict] = None,
+        cache_key: Optional[str] = None,
     ):
-        """Populate automatic calibration UI and overlays."""
-        img_data = self.calibration_images[self.current_image_index]
+        """Store automatic calibration results of an image (default: the current one).
+
+        The results and overlays are shown when it is the current image.
+        """
+        current = None
+        if 0 <= self.current_image_index < len(self.calibration_images):
+            current = self.calibration_images[self.current_image_index]
+        if img_data is None:
+            img_data = current
         pixmap = img_data["pixmap"]
         if crop_size is None:
             image_size = (pixmap.width(), pixmap.height())
@@ -1465,9 +1552,16 @@ class CalibrationDialog(QDialog):
             "overlay_edges_50": slide_calibration.build_overlay_edge_lines(
                 result, image_size, origin_offset=crop_offset
             ),
+            "cache_key": cache_key,
+            "crop_offset": tuple(crop_offset),
+            "crop_size": tuple(crop_size) if crop_size else None,
         }
         img_data["auto"] = auto_data
         self._modified = True
+        if img_data is not current:
+            self._update_auto_summary()
+            self._update_resize_info()
+            return
         self._render_auto_results(auto_data)
 
         self.auto_status_label.setText(self.tr("Calibration complete."))
@@ -1489,7 +1583,11 @@ class CalibrationDialog(QDialog):
         self._refresh_image_gallery()
         self._reset_auto_results(status_text=self.tr("Auto calibration cleared."))
     def _on_run_auto_calibration(self):
-        """Run automatic calibration on the current image."""
+        """Run automatic calibration on every loaded image.
+
+        Images are calibrated in parallel; each result is shown as soon as
+        it arrives. A run still in progress is cancelled first.
+        """
         if not self.calibration_images or self.current_image_index < 0:
             QMessageBox.information(
                 self,
@@ -1517,50 +1615,149 @@ class CalibrationDialog(QDialog):
             )
             return
 
-        self._reset_auto_results(status_text=self.tr("Running..."), status_color="#2980b9")
+        self._cancel_auto_calibration()
         spacing_um = float(spacing_mm) * 1000.0
-        axis_hint = None
+        jobs = []
+        for img_data in self.calibration_images:
+            image_path = img_data.get("path")
+            if not image_path or not Path(image_path).exists():
+                continue
+            if "auto" in img_data:
+                img_data.pop("auto", None)
+                self._modified = True
+            key = uuid4().hex
+            crop_box = img_data.get("crop_box")
+            self._auto_jobs[key] = {
+                "img_data": img_data,
+                "crop_box": crop_box,
+                "spacing_um": spacing_um,
+                "step": "",
+                "frac": 0.0,
+                "error": None,
+            }
+            jobs.append({
+                "key": key,
+                "path": str(image_path),
+                "crop_box": tuple(crop_box) if crop_box else None,
+                "spacing_um": spacing_um,
+                "axis_hint": None,
+                "use_edges": self._auto_use_edges(),
+                "use_large_angles": True,
+            })
+        self._reset_auto_results(status_text=self.tr("Running..."), status_color="#2980b9")
 
-        crop_offset = (0.0, 0.0)
-        crop_size = None
-        crop_box = img_data.get("crop_box")
-        if crop_box:
-            try:
-                pil_img = Image.open(image_path).convert("RGB")
-                w, h = pil_img.size
-                x1 = max(0, min(w, int(crop_box[0] * w)))
-                y1 = max(0, min(h, int(crop_box[1] * h)))
-                x2 = max(0, min(w, int(crop_box[2] * w)))
-                y2 = max(0, min(h, int(crop_box[3] * h)))
-                if x2 - x1 >= 2 and y2 - y1 >= 2:
-                    pil_img = pil_img.crop((x1, y1, x2, y2))
-                    crop_offset = (float(x1), float(y1))
-                    crop_size = (int(x2 - x1), int(y2 - y1))
-                else:
-                    crop_offset = (0.0, 0.0)
-            except Exception:
-                pil_img = None
-                crop_offset = (0.0, 0.0)
-        else:
-            pil_img = None
+        worker = AutoCalibrationWorker(jobs, self)
+        worker.progressChanged.connect(self._on_auto_job_progress)
+        worker.resultReady.connect(self._on_auto_job_result)
+        worker.finished.connect(self._on_auto_worker_finished)
+        self._auto_worker = worker
+        self._auto_workers.add(worker)
+        worker.start()
+
+    def _cancel_auto_calibration(self, wait: bool = False) -> None:
+        """Abandon the running auto calibration, e.g. when the image list changes."""
+        worker = self._auto_worker
+        self._auto_worker = None
+        self._auto_jobs = {}
+        if worker is not None:
+            worker.cancel()
+        if wait:
+            for running in list(self._auto_workers):
+                running.cancel()
+                running.wait()
+
+    def _auto_job_entry(self, key: str) -> Optional[dict]:
+        """Return the job entry of the current run if its image is still loaded."""
+        if self.sender() is not self._auto_worker:
+            return None
+        entry = self._auto_jobs.get(key)
+        if entry is None:
+            return None
+        if not any(img is entry["img_data"] for img in self.calibration_images):
+            return None
+        return entry
 
-        try:
-            result = slide_calibration.calibrate_image(
-                pil_img if pil_img is not None else image_path,
-                spacing_um=spacing_um,
-                axis_hint=axis_hint,
-                use_edges=self._auto_use_edges(),
-                use_large_angles=True,
-                progress_cb=self._update_auto_progress,
+    def _on_auto_job_progress(self, key: str, step: str, frac: float) -> None:
+        entry = self._auto_job_entry(key)
+        if entry is None:
+            return
+        entry["step"] = step
+        entry["frac"] = max(entry["frac"], max(0.0, min(1.0, frac)))
+        if len(self._auto_jobs) == 1:
+            self._update_auto_progress(step, frac)
+            return
+        self._update_auto_batch_progress()
+
+    def _update_auto_batch_progress(self) -> None:
+        entries = list(self._auto_jobs.values())
+        if not entries:
+            return
+        finished = sum(1 for entry in entries if entry["frac"] >= 1.0)
+        overall = sum(entry["frac"] for entry in entries) / len(entries)
+        self._update_auto_progress(
+            self.tr("Calibrating images ({done}/{total})...").format(done=finished, total=len(entries)),
+            overall,
+        )
+
+    def _on_auto_job_result(self, outcome: dict) -> None:
+        entry = self._auto_job_entry(outcome.get("key", ""))
+        if entry is None or outcome.get("cancelled"):
+            return
+        img_data = entry["img_data"]
+        entry["frac"] = 1.0
+        if img_data.get("crop_box") != entry["crop_box"]:
+            # Cropped again while running; that reset the results already.
+            entry["error"] = self.tr("crop changed")
+        elif outcome.get("error"):
+            entry["error"] = outcome["error"]
+        else:
+            self._set_auto_results(
+                outcome["result"],
+                entry["spacing_um"],
+                crop_offset=tuple(outcome.get("crop_offset") or (0.0, 0.0)),
+                crop_size=tuple(outcome["crop_size"]) if outcome.get("crop_size") else None,
+                img_data=img_data,
+                cache_key=outcome.get("cache_key"),
             )
-        except Exception as exc:
-            self._reset_auto_results(
-                status_text=self.tr("Auto calibration failed: {err}").format(err=str(exc)),
-                status_color="#c0392b",
+        if len(self._auto_jobs) > 1:
+            self._update_auto_batch_progress()
+
+    def _on_auto_worker_finished(self) -> None:
+        worker = self.sender()
+        self._auto_workers.discard(worker)
+        if worker is not None:
+            worker.deleteLater()
+        if worker is not self._auto_worker:
+            return
+        self._auto_worker = None
+        entries = list(self._auto_jobs.values())
+        self._auto_jobs = {}
+        failed = [entry for entry in entries if entry["error"]]
+        if not failed:
+            if len(entries) > 1:
+                self.auto_status_label.setText(
+                    self.tr("Calibrated {count} images.").format(count=len(entries))
+                )
+                self.auto_status_label.setStyleSheet("color: #27ae60;")
+                self.auto_progress.setValue(100)
+            return
+        if len(entries) == 1:
+            self.auto_status_label.setText(
+                self.tr("Auto calibration failed: {err}").format(err=failed[0]["error"])
             )
+            self.auto_status_label.setStyleSheet("color: #c0392b;")
+            self.auto_progress.setValue(0)
             return
-
-        self._set_auto_results(result, spacing_um, crop_offset=crop_offset, crop_size=crop_size)
+        names = ", ".join(
+            f"{Path(entry['img_data'].get('path', '')).name}: {entry['error']}" for entry in failed
+        )
+        self.auto_status_label.setText(
+            self.tr("Calibrated {done} of {total} images. Failed: {names}").format(
+                done=len(entries) - len(failed), total=len(entries), names=names
+            )
+        )
+        self.auto_status_label.setStyleSheet("color: #c0392b;")
+        self.auto_progress.setValue(100)
 
     def _build_history_section(self) -> QGroupBox:
         """Build the calibration history table section."""
@@ -1967,6 +2164,7 @@ class CalibrationDialog(QDialog):
             )
             return
 
+        self._cancel_auto_calibration()
         camera_text = self._extract_camera_text(path)
         self.calibration_images.append({
             "path": path,
@@ -2002,7 +2200,7 @@ class CalibrationDialog(QDialog):
     def _extract_camera_text(self, path: str) -> str | None:
         if not path:
             return None
-        exif = get_exif_data(path)
+        exif = get_exif_summary(path)
         make = exif.get("Make") or ""
         model = exif.get("Model") or ""
         camera = " ".join(str(part).strip() for part in (make, model) if part).strip()
@@ -2168,6 +2366,7 @@ class CalibrationDialog(QDialog):
             except (ValueError, IndexError):
                 return
             if 0 <= idx < len(self.calibration_images):
+                self._cancel_auto_calibration()
                 del self.calibration_images[idx]
                 self._modified = True  # User deleted an image
                 if self.current_image_index > idx:
@@ -2814,6 +3013,7 @@ class CalibrationDialog(QDialog):
         self._reset_auto_results(status_text=self.tr("Crop updated. Run auto calibration."), status_color="#2980b9")
     def _clear_all(self):
         """Clear all images and measurements."""
+        self._cancel_auto_calibration()
         self.calibration_images = []
         self.current_image_index = -1
         self.measurement_points = []
@@ -3095,6 +3295,10 @@ class CalibrationDialog(QDialog):
         """Check if user made changes that haven't been saved."""
         return self._modified
 
+    def done(self, result: int) -> None:
+        self._cancel_auto_calibration(wait=True)
+        super().done(result)
+
     def closeEvent(self, event):
         """Handle dialog close, checking for unsaved changes."""
         if self._has_unsaved_changes():
@@ -3192,12 +3396,22 @@ class CalibrationDialog(QDialog):
                     if not target:
                         continue
                     result_dict = auto_info.get("result", {}) or {}
+                    result = self._result_from_dict(result_dict)
+                    cache_key = auto_info.get("cache_key")
+                    crop_offset = tuple(auto_info.get("crop_offset") or (0.0, 0.0))
+                    crop_size = tuple(auto_info["crop_size"]) if auto_info.get("crop_size") else None
+                    if cache_key and result_dict.get("centers_px"):
+                        # Saved with every line position; calibrating again can reuse it.
+                        remember_result(cache_key, result, crop_offset, crop_size)
                     target["auto"] = {
-                        "result": self._result_from_dict(result_dict),
+                        "result": result,
                         "spacing_um": auto_info.get("spacing_um"),
                         "overlay_parabola": auto_info.get("overlay_parabola", []),
                         "overlay_edges": auto_info.get("overlay_edges", []),
                         "overlay_edges_50": auto_info.get("overlay_edges_50", []),
+                        "cache_key": cache_key,
+                        "crop_offset": crop_offset,
+                        "crop_size": crop_size,
                     }
             elif "auto" in loaded_data and self.calibration_images:
                 auto_info = loaded_data.get("auto") or {}
@@ -3279,20 +3493,10 @@ class CalibrationDialog(QDialog):
                     "crop_box": img_data.get("crop_box"),
                     "crop_source_size": img_data.get("crop_source_size"),
                     "spacing_um": auto_data.get("spacing_um"),
-                    "result": {
-                        "axis": result.axis,
-                        "angle_deg": result.angle_deg,
-                        "spacing_median_px": result.spacing_median_px,
-                        "spacing_median_edges_px": result.spacing_median_edges_px,
-                        "nm_per_px": result.nm_per_px,
-                        "nm_per_px_edges": result.nm_per_px_edges,
-                        "agreement_pct": result.agreement_pct,
-                        "rel_scatter_mad_pct": result.rel_scatter_mad_pct,
-                        "rel_scatter_iqr_pct": result.rel_scatter_iqr_pct,
-                        "drift_slope": result.drift_slope,
-                        "residual_slope_deg": result.residual_slope_deg,
-                        "edges_px": result.edges_px.tolist() if hasattr(result, "edges_px") else [],
-                    },
+                    "result": result.to_dict(),
+                    "cache_key": auto_data.get("cache_key"),
+                    "crop_offset": auto_data.get("crop_offset"),
+                    "crop_size": auto_data.get("crop_size"),
                     "overlay_parabola": auto_data.get("overlay_parabola", []),
                     "overlay_edges": auto_data.get("overlay_edges", []),
                     "overlay_edges_50": auto_data.get("overlay_edges_50", []),
@@ -0,0 +1,117 @@
+"""Background computation of per-image analysis maps for auto measure."""
+from __future__ import annotations
+
+import threading
+from typing import Callable, Hashable
+
+import numpy as np
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+from PySide6.QtGui import QImage
+
+from utils.image_analysis import ImageAnalysis, ImageAnalysisCache, analyze_image
+
+
+def qimage_to_gray(image: QImage) -> np.ndarray:
+    """Return image as a uint8 greyscale numpy array."""
+    image = image.convertToFormat(QImage.Format.Format_Grayscale8)
+    width = image.width()
+    height = image.height()
+    buf = image.constBits() if hasattr(image, "constBits") else image.bits()
+    arr = np.frombuffer(buf, dtype=np.uint8)
+    bytes_per_line = image.bytesPerLine()
+    return arr.reshape((height, bytes_per_line))[:, :width].copy()
+
+
+class _AnalysisTask(QRunnable):
+    """Analyze one image on a worker thread."""
+
+    def __init__(self, loader: "ImageAnalysisLoader", key: Hashable, image: QImage) -> None:
+        super().__init__()
+        self.setAutoDelete(False)
+        self.loader = loader
+        self.key = key
+        self.image = image
+        self.cancelled = False
+        self.analysis: ImageAnalysis | None = None
+        self.done = threading.Event()
+
+    def run(self) -> None:
+        try:
+            if not self.cancelled and not self.image.isNull():
+                self.analysis = analyze_image(qimage_to_gray(self.image))
+        except Exception as exc:
+            print(f"Warning: Could not analyze image: {exc}")
+        self.image = None
+        if self.analysis is not None and not self.cancelled:
+            self.loader.cache.put(self.key, self.analysis)
+        self.done.set()
+        if not self.cancelled:
+            self.loader._analyzed.emit(self.key)
+
+
+class ImageAnalysisLoader(QObject):
+    """Compute ImageAnalysis maps in a QThreadPool and keep them in an LRU cache.
+
+    Keys are chosen by the caller and must change whenever the pixels do.
+    QImages are taken on the GUI thread; the greyscale conversion and
+    every map are computed on the worker.
+    """
+
+    analysisReady = Signal(object)  # key
+
+    _analyzed = Signal(object)
+
+    def __init__(
+        self,
+        parent: QObject | None = None,
+        cache: ImageAnalysisCache | None = None,
+        pool: QThreadPool | None = None,
+    ) -> None:
+        super().__init__(parent)
+        self.cache = cache or ImageAnalysisCache()
+        self._pool = pool or QThreadPool.globalInstance()
+        self._tasks: dict[Hashable, _AnalysisTask] = {}
+        self._analyzed.connect(self._on_analyzed)
+
+    def request(self, key: Hashable, image: QImage) -> None:
+        """Queue analysis of image unless key is cached or already pending."""
+        if key is None or key in self._tasks or key in self.cache:
+            return
+        task = _AnalysisTask(self, key, image)
+        self._tasks[key] = task
+        self._pool.start(task)
+
+    def cancel_all(self, keep: set | None = None) -> None:
+        """Cancel pending analyses whose key is not in keep; running ones are discarded."""
+        keep = keep or set()
+        for key in list(self._tasks):
+            if key not in keep:
+                task = self._tasks.pop(key)
+                task.cancelled = True
+                self._pool.tryTake(task)
+
+    def get_now(self, key: Hashable, image_provider: Callable[[], QImage | None]) -> ImageAnalysis | None:
+        """Return the analysis for key, joining a pending task or computing it here."""
+        if key is None:
+            return None
+        analysis = self.cache.get(key)
+        if analysis is not None:
+            return analysis
+        task = self._tasks.pop(key, None)
+        if task is not None:
+            if not self._pool.tryTake(task):
+                task.done.wait()
+                if task.analysis is not None:
+                    return task.analysis
+            task.cancelled = True
+        image = image_provider()
+        if image is None or image.isNull():
+            return None
+        analysis = analyze_image(qimage_to_gray(image))
+        self.cache.put(key, analysis)
+        return analysis
+
+    def _on_analyzed(self, key: Hashable) -> None:
+        if self._tasks.pop(key, None) is None:
+            return
+        self.analysisReady.emit(key)
@@ -5,25 +5,284 @@ import re
 from pathlib import Path
 from typing import Iterable
 
-from PySide6.QtCore import Qt, Signal, QEvent, QSize, QRectF
-from PySide6.QtGui import QPixmap, QPainter, QPen, QColor
+from PySide6.QtCore import (
+    QAbstractListModel,
+    QEvent,
+    QModelIndex,
+    QPoint,
+    QRect,
+    QRectF,
+    QSize,
+    Qt,
+    Signal,
+)
+from PySide6.QtGui import QColor, QFont, QFontMetrics, QPainter, QPen, QPixmap
 from PySide6.QtWidgets import (
+    QAbstractItemView,
     QGroupBox,
-    QHBoxLayout,
-    QLabel,
-    QScrollArea,
-    QToolButton,
+    QListView,
+    QSizePolicy,
+    QStyle,
+    QStyledItemDelegate,
     QVBoxLayout,
     QWidget,
-    QFrame,
-    QGridLayout,
-    QSizePolicy,
 )
 
 from database.models import ImageDB, MeasurementDB
 from database.schema import load_objectives, objective_display_name, resolve_objective_key
 from database.database_tags import DatabaseTerms
 from utils.thumbnail_generator import get_thumbnail_path
+from .image_loader import ImageLoader
+
+ItemRole = Qt.UserRole + 1
+ThumbnailRole = Qt.UserRole + 2
+
+
+def _item_key(item: dict):
+    return item.get("id") if item.get("id") is not None else item.get("filepath")
+
+
+class ImageGalleryModel(QAbstractListModel):
+    """Gallery items as plain dicts; thumbnails are fetched when painted.
+
+    thumbnail_provider(item) returns a pixmap at the current cell size, a
+    null pixmap if the image cannot be read, or None while it is loading.
+    """
+
+    def __init__(self, thumbnail_provider=None, parent=None):
+        super().__init__(parent)
+        self._items: list[dict] = []
+        self._thumbnail_provider = thumbnail_provider
+        self.selected_keys: set = set()
+        self.show_badges = True
+        self.show_delete = True
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._items)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._items):
+            return None
+        item = self._items[index.row()]
+        if role == ItemRole:
+            return item
+        if role == ThumbnailRole:
+            if self._thumbnail_provider is None:
+                return None
+            return self._thumbnail_provider(item)
+        return None
+
+    def set_items(self, items: list[dict]) -> None:
+        self.beginResetModel()
+        self._items = list(items or [])
+        self.endResetModel()
+
+    def item_at(self, row: int) -> dict | None:
+        if 0 <= row < len(self._items):
+            return self._items[row]
+        return None
+
+
+class ImageGalleryDelegate(QStyledItemDelegate):
+    """Paint a thumbnail cell with its number, GPS tag, badges and buttons."""
+
+    BUTTON_SIZE = 16
+
+    def __init__(self, thumbnail_size: int, parent=None):
+        super().__init__(parent)
+        self.thumbnail_size = int(thumbnail_size)
+        self.hover_row = -1
+
+    def sizeHint(self, option, index):
+        return QSize(self.thumbnail_size, self.thumbnail_size)
+
+    def button_rects(self, cell: QRect, item: dict, model) -> dict[str, QRect]:
+        """Top-right round buttons, laid out right to left like the old overlay row."""
+        size = self.BUTTON_SIZE
+        rects: dict[str, QRect] = {}
+        right = cell.right() - 3
+        top = cell.top() + 4
+        if model.show_delete and _item_key(item):
+            rects["delete"] = QRect(right - size + 1, top, size, size)
+            right -= size + 4
+        if model.show_badges and item.get("has_measurements"):
+            rects["measured"] = QRect(right - size + 1, top, size, size)
+        return rects
+
+    @staticmethod
+    def _font(base: QFont, point_size: float, bold: bool = False) -> QFont:
+        font = QFont(base)
+        font.setPointSizeF(point_size)
+        font.setBold(bold)
+        return font
+
+    @staticmethod
+    def _tag_rect(font: QFont, text: str) -> QRect:
+        metrics = QFontMetrics(font)
+        return QRect(0, 0, metrics.horizontalAdvance(text) + 8, metrics.height() + 2)
+
+    @staticmethod
+    def _draw_tag(painter: QPainter, rect: QRect, text: str, font: QFont, color: QColor, background: QColor) -> None:
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(background)
+        painter.drawRoundedRect(QRectF(rect), 3, 3)
+        painter.setFont(font)
+        painter.setPen(color)
+        painter.drawText(rect, Qt.AlignCenter, text)
+
+    def paint(self, painter, option, index):
+        item = index.data(ItemRole) or {}
+        model = index.model()
+        cell = QRect(option.rect.topLeft(), QSize(self.thumbnail_size, self.thumbnail_size))
+        inner = cell.adjusted(2, 2, -2, -2)
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing, True)
+        painter.setClipRect(cell)
+        painter.fillRect(cell, QColor("white"))
+
+        thumbnail = index.data(ThumbnailRole)
+        if thumbnail is not None and not thumbnail.isNull():
+            painter.drawPixmap(cell.topLeft(), thumbnail)
+            crop_rect = ImageGalleryWidget._crop_overlay_rect(
+                thumbnail.width(),
+                thumbnail.height(),
+                item.get("crop_box"),
+                item.get("crop_source_size"),
+            )
+            if crop_rect is not None:
+                painter.setPen(QPen(QColor(243, 156, 18), 2))
+                painter.setBrush(Qt.NoBrush)
+                painter.drawRect(crop_rect.translated(cell.x(), cell.y()))
+        elif thumbnail is not None:
+            painter.setFont(option.font)
+            painter.setPen(QColor("#7f8c8d"))
+            painter.drawText(cell, Qt.AlignCenter, "No preview")
+
+        image_num = item.get("image_number")
+        if image_num is not None:
+            font = self._font(option.font, 8)
+            rect = self._tag_rect(font, str(image_num))
+            rect.moveTopLeft(inner.topLeft())
+            self._draw_tag(painter, rect, str(image_num), font, QColor("#000000"), QColor(255, 255, 255, 77))
+
+        gps_tag_text = item.get("gps_tag_text")
+        if gps_tag_text:
+            highlight = bool(item.get("gps_tag_highlight"))
+            font = self._font(option.font, 8, bold=highlight)
+            rect = self._tag_rect(font, str(gps_tag_text))
+            rect.moveTopLeft(QPoint(inner.center().x() - rect.width() // 2, inner.top()))
+            self._draw_tag(
+                painter,
+                rect,
+                str(gps_tag_text),
+                font,
+                QColor("#ffffff") if highlight else QColor("#000000"),
+                QColor("#c0392b") if highlight else QColor(255, 255, 255, 77),
+            )
+
+        badges = [str(text) for text in (item.get("badges") or []) if text]
+        if badges:
+            font = self._font(option.font, 7)
+            bottom = inner.bottom() - 2
+            for badge_text in reversed(badges):
+                rect = self._tag_rect(font, badge_text)
+                rect.moveBottomLeft(QPoint(inner.left() + 2, bottom))
+                self._draw_tag(painter, rect, badge_text, font, QColor("#000000"), QColor(255, 255, 255, 180))
+                bottom = rect.top() - 2
+
+        button_font = self._font(option.font, 8)
+        for name, rect in self.button_rects(cell, item, model).items():
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(QColor("#e74c3c") if name == "delete" else QColor("#27ae60"))
+            painter.drawEllipse(QRectF(rect))
+            painter.setFont(button_font)
+            painter.setPen(QColor("white"))
+            painter.drawText(rect, Qt.AlignCenter, "X" if name == "delete" else "M")
+
+        if _item_key(item) in model.selected_keys:
+            border = QColor("#2980b9")
+        elif index.row() == self.hover_row or option.state & QStyle.State_MouseOver:
+            border = QColor("#3498db")
+        else:
+            border = QColor("#bdc3c7")
+        painter.setPen(QPen(border, 2))
+        painter.setBrush(Qt.NoBrush)
+        painter.drawRoundedRect(QRectF(cell).adjusted(1, 1, -1, -1), 5, 5)
+        painter.restore()
+
+
+class ImageGalleryView(QListView):
+    """Single-row icon view that only paints the visible thumbnails."""
+
+    itemPressed = Signal(int, object)  # row, QMouseEvent
+    deletePressed = Signal(int)  # row
+    contextMenuRequested = Signal(int, QPoint)  # row, global position
+
+    def __init__(self, thumbnail_size: int, parent=None):
+        super().__init__(parent)
+        self.gallery_delegate = ImageGalleryDelegate(thumbnail_size, self)
+        self.setItemDelegate(self.gallery_delegate)
+        self.setViewMode(QListView.IconMode)
+        self.setFlow(QListView.LeftToRight)
+        self.setWrapping(False)
+        self.setMovement(QListView.Static)
+        self.setResizeMode(QListView.Adjust)
+        self.setUniformItemSizes(True)
+        self.setSpacing(10)
+        self.setSelectionMode(QAbstractItemView.NoSelection)
+        self.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.setHorizontalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAsNeeded)
+        self.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.setFrameShape(QListView.NoFrame)
+        self.setFocusPolicy(Qt.NoFocus)
+        self.setMouseTracking(True)
+        self.viewport().setCursor(Qt.PointingHandCursor)
+
+    def set_thumbnail_size(self, size: int) -> None:
+        self.gallery_delegate.thumbnail_size = int(size)
+        self.doItemsLayout()
+        self.viewport().update()
+
+    def _set_hover(self, row: int) -> None:
+        if self.gallery_delegate.hover_row == row:
+            return
+        self.gallery_delegate.hover_row = row
+        self.viewport().update()
+
+    def mouseMoveEvent(self, event):
+        self._set_hover(self.indexAt(event.position().toPoint()).row())
+        super().mouseMoveEvent(event)
+
+    def leaveEvent(self, event):
+        self._set_hover(-1)
+        super().leaveEvent(event)
+
+    def mousePressEvent(self, event):
+        if event.button() != Qt.LeftButton:
+            super().mousePressEvent(event)
+            return
+        pos = event.position().toPoint()
+        index = self.indexAt(pos)
+        if not index.isValid():
+            super().mousePressEvent(event)
+            return
+        item = index.data(ItemRole) or {}
+        rects = self.gallery_delegate.button_rects(self.visualRect(index), item, self.model())
+        delete_rect = rects.get("delete")
+        if delete_rect is not None and delete_rect.contains(pos):
+            self.deletePressed.emit(index.row())
+        else:
+            self.itemPressed.emit(index.row(), event)
+        event.accept()
+
+    def contextMenuEvent(self, event):
+        index = self.indexAt(event.pos())
+        if not index.isValid():
+            super().contextMenuEvent(event)
+            return
+        self.contextMenuRequested.emit(index.row(), event.globalPos())
+        event.accept()
 
 
 class ImageGalleryWidget(QGroupBox):
@@ -33,6 +292,7 @@ class ImageGalleryWidget(QGroupBox):
     imageSelected = Signal(object, str)
     deleteRequested = Signal(object)  # Can be int (db ID) or str (custom ID like "cal_0")
     selectionChanged = Signal(list)
+    contextMenuRequested = Signal(object, str, QPoint)  # db ID, path, global position
 
     def __init__(
         self,
@@ -58,26 +318,30 @@ class ImageGalleryWidget(QGroupBox):
         self._min_thumb_size = 80
         self._thumb_size = self._base_thumb_size
         self._items: list[dict] = []
-        self._frames: list[QFrame] = []
         self._selected_id = None
         self._selected_keys: set[str | int] = set()
         self._last_clicked_index: int | None = None
+        # Source thumbnails keyed by the path they were loaded from, already
+        # cover-cropped to the base size; rescaled copies per cell size.
+        self._thumb_sources: dict[str, QPixmap] = {}
+        self._thumb_scaled: dict[tuple[str, int], QPixmap] = {}
+        self._thumb_loader = ImageLoader(self)
+        self._thumb_loader.pixmapReady.connect(self._on_thumbnail_loaded)
         self._content = QWidget(self)
         content_layout = QVBoxLayout(self._content)
         content_layout.setContentsMargins(0, 0, 0, 0)
 
-        self._scroll = QScrollArea()
-        self._scroll.setWidgetResizable(True)
-        self._scroll.setHorizontalScrollBarPolicy(Qt.ScrollBarAsNeeded)
-        self._scroll.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-        self._scroll.viewport().installEventFilter(self)
-
-        self._container = QWidget()
-        self._grid = QHBoxLayout(self._container)
-        self._grid.setAlignment(Qt.AlignLeft)
-        self._grid.setSpacing(10)
-        self._scroll.setWidget(self._container)
-        content_layout.addWidget(self._scroll)
+        self._model = ImageGalleryModel(self._thumbnail_for, self)
+        self._model.show_badges = show_badges
+        self._model.show_delete = show_delete
+        self._model.selected_keys = self._selected_keys
+        self._view = ImageGalleryView(self._thumb_size, self)
+        self._view.setModel(self._model)
+        self._view.itemPressed.connect(self._on_item_pressed)
+        self._view.deletePressed.connect(self._on_delete_pressed)
+        self._view.contextMenuRequested.connect(self._on_context_menu_requested)
+        self._view.viewport().installEventFilter(self)
+        content_layout.addWidget(self._view)
 
         outer = QVBoxLayout(self)
         outer.setContentsMargins(0, 0, 0, 0)
@@ -87,14 +351,7 @@ class ImageGalleryWidget(QGroupBox):
         self._items = []
         self._selected_id = None
         self._selected_keys = set()
-        self._clear_widgets()
-
-    def _clear_widgets(self) -> None:
-        while self._grid.count():
-            item = self._grid.takeAt(0)
-            if item.widget():
-                item.widget().deleteLater()
-        self._frames = []
+        self._render()
 
     def set_images(self, image_paths: Iterable[str]) -> None:
         items = []
@@ -128,6 +385,8 @@ class ImageGalleryWidget(QGroupBox):
                     "badges": item.get("badges", []),
                     "gps_tag_text": item.get("gps_tag_text"),
                     "gps_tag_highlight": item.get("gps_tag_highlight", False),
+                    "crop_box": item.get("crop_box"),
+                    "crop_source_size": item.get("crop_source_size"),
                 }
             )
         self._render()
@@ -138,6 +397,10 @@ class ImageGalleryWidget(QGroupBox):
             return
         images = ImageDB.get_images_for_observation(observation_id)
         objectives = load_objectives()
+        measured_ids = MeasurementDB.get_image_ids_with_measurements(
+            [img.get("id") for img in images if img.get("id")],
+            spores_only=True,
+        )
         items = []
         for idx, img in enumerate(images):
             img_id = img.get("id")
@@ -172,7 +435,7 @@ class ImageGalleryWidget(QGroupBox):
                 {
                     "id": img_id,
                     "filepath": img.get("filepath"),
-                    "has_measurements": self._has_spore_measurements(img_id) if img_id else False,
+                    "has_measurements": img_id in measured_ids if img_id else False,
                     "image_number": idx + 1,
                     "badges": badges,
                 }
@@ -243,25 +506,30 @@ class ImageGalleryWidget(QGroupBox):
         if image_id is not None:
             self._selected_keys.add(image_id)
         self._last_clicked_index = self._index_for_key(image_id)
-        for frame in self._frames:
-            is_selected = getattr(frame, "image_id", None) == image_id and image_id is not None
-            frame.setProperty("selected", is_selected)
-            frame.setStyleSheet(self._frame_style(selected=is_selected))
+        self._apply_selection_styles()
+        if self._last_clicked_index is not None:
+            self._view.scrollTo(self._model.index(self._last_clicked_index, 0))
 
     def _render(self) -> None:
-        self._clear_widgets()
         self._thumb_size = self._target_thumb_size()
+        self._view.set_thumbnail_size(self._thumb_size)
         for item in self._items:
-            frame = self._create_thumbnail_widget(item)
-            self._frames.append(frame)
-            self._grid.addWidget(frame)
+            item["thumbnail_source"] = self._resolve_thumbnail_source(item)
+        wanted = {item["thumbnail_source"] for item in self._items if item["thumbnail_source"]}
+        self._thumb_loader.cancel_all(keep=wanted)
+        for path in [path for path in self._thumb_sources if path not in wanted]:
+            del self._thumb_sources[path]
+        self._thumb_scaled = {
+            key: pixmap for key, pixmap in self._thumb_scaled.items() if key[0] in wanted
+        }
+        self._model.set_items(self._items)
         if self._selected_id is not None:
             self.select_image(self._selected_id)
-        elif self._selected_keys:
+        else:
             self._apply_selection_styles()
 
     def eventFilter(self, obj, event):
-        if obj == self._scroll.viewport() and event.type() == QEvent.Resize:
+        if obj == self._view.viewport() and event.type() == QEvent.Resize:
             self._update_thumbnail_sizes()
         return super().eventFilter(obj, event)
 
@@ -275,126 +543,6 @@ class ImageGalleryWidget(QGroupBox):
     def minimumSizeHint(self) -> QSize:
         return QSize(120, self._min_height)
 
-    def _frame_style(self, selected: bool = False) -> str:
-        border = "#2980b9" if selected else "#bdc3c7"
-        return (
-            "QFrame { border: 2px solid %s; border-radius: 5px; background: white; }"
-            "QFrame:hover { border-color: #3498db; }"
-        ) % border
-
-    def _create_thumbnail_widget(self, item: dict) -> QFrame:
-        frame = QFrame()
-        frame.setStyleSheet(self._frame_style())
-        frame.setFixedSize(self._thumb_size, self._thumb_size)
-        frame.setCursor(Qt.PointingHandCursor)
-
-        layout = QVBoxLayout(frame)
-        layout.setContentsMargins(0, 0, 0, 0)
-        layout.setSpacing(0)
-
-        thumb_label = QLabel()
-        thumb_label.setAlignment(Qt.AlignCenter)
-        thumb_label.setFixedSize(self._thumb_size, self._thumb_size)
-
-        pixmap = self._load_pixmap(item)
-        if pixmap and not pixmap.isNull():
-            thumb_label._orig_pixmap = pixmap
-            scaled_thumb = self._scaled_thumb(pixmap, self._thumb_size)
-            crop_box = item.get("crop_box")
-            if crop_box and isinstance(crop_box, (list, tuple)) and len(crop_box) == 4:
-                crop_source_size = item.get("crop_source_size")
-                scaled_thumb = self._apply_crop_overlay(scaled_thumb, crop_box, crop_source_size)
-            thumb_label.setPixmap(scaled_thumb)
-        else:
-            thumb_label.setText("No preview")
-            thumb_label.setStyleSheet("color: #7f8c8d;")
-
-        image_container = QWidget()
-        image_layout = QGridLayout(image_container)
-        image_layout.setContentsMargins(0, 0, 0, 0)
-        image_layout.setSpacing(0)
-        image_layout.addWidget(thumb_label, 0, 0, alignment=Qt.AlignCenter)
-
-        image_num = item.get("image_number")
-        if image_num is not None:
-            number_label = QLabel(str(image_num))
-            number_label.setStyleSheet(
-                "color: #000000; background-color: rgba(255, 255, 255, 77);"
-                "font-size: 8pt; padding: 1px 4px; border-radius: 3px; border: none;"
-            )
-            number_label.setAttribute(Qt.WA_TransparentForMouseEvents, True)
-            image_layout.addWidget(number_label, 0, 0, alignment=Qt.AlignTop | Qt.AlignLeft)
-
-        gps_tag_text = item.get("gps_tag_text")
-        if gps_tag_text:
-            gps_label = QLabel(str(gps_tag_text))
-            gps_highlight = bool(item.get("gps_tag_highlight"))
-            color = "#ffffff" if gps_highlight else "#000000"
-            background = "#c0392b" if gps_highlight else "rgba(255, 255, 255, 77)"
-            weight = "bold" if gps_highlight else "normal"
-            gps_label.setStyleSheet(
-                "color: %s; background-color: %s;"
-                "font-size: 8pt; font-weight: %s; padding: 1px 4px; border-radius: 3px; border: none;"
-                % (color, background, weight)
-            )
-            gps_label.setAttribute(Qt.WA_TransparentForMouseEvents, True)
-            image_layout.addWidget(gps_label, 0, 0, alignment=Qt.AlignTop | Qt.AlignHCenter)
-
-        badges = item.get("badges") or []
-        if badges:
-            badge_container = QWidget()
-            badge_layout = QVBoxLayout(badge_container)
-            badge_layout.setContentsMargins(2, 2, 2, 2)
-            badge_layout.setSpacing(2)
-            for badge_text in badges:
-                if not badge_text:
-                    continue
-                badge = QLabel(str(badge_text))
-                badge.setStyleSheet(
-                    "color: #000000; background-color: rgba(255, 255, 255, 180);"
-                    "font-size: 7pt; padding: 1px 4px; border-radius: 3px; border: none;"
-                )
-                badge.setAttribute(Qt.WA_TransparentForMouseEvents, True)
-                badge_layout.addWidget(badge)
-            image_layout.addWidget(badge_container, 0, 0, alignment=Qt.AlignBottom | Qt.AlignLeft)
-
-        overlay = QWidget()
-        overlay_layout = QHBoxLayout(overlay)
-        overlay_layout.setContentsMargins(2, 2, 2, 2)
-        overlay_layout.setSpacing(4)
-        overlay_layout.addStretch()
-
-        if self._show_badges and item.get("has_measurements"):
-            badge = QLabel("M")
-            badge.setFixedSize(16, 16)
-            badge.setAlignment(Qt.AlignCenter)
-            badge.setStyleSheet(
-                "background-color: #27ae60; color: white; border-radius: 8px; font-size: 8pt;"
-            )
-            overlay_layout.addWidget(badge)
-
-        delete_key = item.get("id") if item.get("id") is not None else item.get("filepath")
-        if self._show_delete and delete_key:
-            delete_btn = QToolButton()
-            delete_btn.setText("X")
-            delete_btn.setFixedSize(16, 16)
-            delete_btn.setStyleSheet(
-                "QToolButton { background-color: #e74c3c; color: white; border-radius: 8px; font-size: 8pt; }"
-            )
-            delete_btn.clicked.connect(lambda _, key=delete_key: self.deleteRequested.emit(key))
-            overlay_layout.addWidget(delete_btn)
-
-        image_layout.addWidget(overlay, 0, 0, alignment=Qt.AlignTop | Qt.AlignRight)
-        layout.addWidget(image_container)
-
-        frame.image_id = item.get("id")
-        frame.image_path = item.get("filepath")
-        frame.image_key = item.get("id") if item.get("id") is not None else item.get("filepath")
-        frame.thumb_label = thumb_label
-        frame.mousePressEvent = lambda e, img_id=frame.image_id, path=frame.image_path: self._on_click(e, img_id, path)
-
-        return frame
-
     def set_multi_select(self, enabled: bool) -> None:
         self._multi_select = bool(enabled)
         if not self._multi_select:
@@ -406,24 +554,21 @@ class ImageGalleryWidget(QGroupBox):
     def selected_paths(self) -> list[str]:
         selected = []
         for item in self._items:
-            key = item.get("id") if item.get("id") is not None else item.get("filepath")
-            if key in self._selected_keys:
+            if _item_key(item) in self._selected_keys:
                 selected.append(item.get("filepath"))
         return selected
 
     def select_paths(self, paths: list[str]) -> None:
         keys: set[str | int] = set()
         for item in self._items:
-            filepath = item.get("filepath")
-            if filepath in paths:
-                key = item.get("id") if item.get("id") is not None else filepath
-                keys.add(key)
+            if item.get("filepath") in paths:
+                keys.add(_item_key(item))
         self._selected_keys = keys
         self._selected_id = None
         self._last_clicked_index = None
         if keys:
             for item in self._items:
-                key = item.get("id") if item.get("id") is not None else item.get("filepath")
+                key = _item_key(item)
                 if key in keys:
                     self._selected_id = item.get("id")
                     self._last_clicked_index = self._index_for_key(key)
@@ -434,17 +579,27 @@ class ImageGalleryWidget(QGroupBox):
         if key is None:
             return None
         for idx, item in enumerate(self._items):
-            item_key = item.get("id") if item.get("id") is not None else item.get("filepath")
-            if item_key == key:
+            if _item_key(item) == key:
                 return idx
         return None
 
     def _apply_selection_styles(self) -> None:
-        for frame in self._frames:
-            key = getattr(frame, "image_key", None)
-            is_selected = key in self._selected_keys if key is not None else False
-            frame.setProperty("selected", is_selected)
-            frame.setStyleSheet(self._frame_style(selected=is_selected))
+        self._model.selected_keys = self._selected_keys
+        self._view.viewport().update()
+
+    def _on_item_pressed(self, row: int, event) -> None:
+        if 0 <= row < len(self._items):
+            item = self._items[row]
+            self._on_click(event, item.get("id"), item.get("filepath"))
+
+    def _on_delete_pressed(self, row: int) -> None:
+        if 0 <= row < len(self._items):
+            self.deleteRequested.emit(_item_key(self._items[row]))
+
+    def _on_context_menu_requested(self, row: int, global_pos: QPoint) -> None:
+        if 0 <= row < len(self._items):
+            item = self._items[row]
+            self.contextMenuRequested.emit(item.get("id"), item.get("filepath"), global_pos)
 
     def _on_click(self, event, img_id, path):
         key = img_id if img_id is not None else path
@@ -453,11 +608,7 @@ class ImageGalleryWidget(QGroupBox):
             if event.modifiers() & Qt.ShiftModifier and index is not None and self._last_clicked_index is not None:
                 start = min(self._last_clicked_index, index)
                 end = max(self._last_clicked_index, index)
-                range_keys = set()
-                for idx in range(start, end + 1):
-                    item = self._items[idx]
-                    item_key = item.get("id") if item.get("id") is not None else item.get("filepath")
-                    range_keys.add(item_key)
+                range_keys = {_item_key(self._items[idx]) for idx in range(start, end + 1)}
                 if event.modifiers() & Qt.ControlModifier:
                     self._selected_keys |= range_keys
                 else:
@@ -484,38 +635,53 @@ class ImageGalleryWidget(QGroupBox):
         self.imageClicked.emit(img_id, path)
 
     def _target_thumb_size(self) -> int:
-        viewport_h = self._scroll.viewport().height() if self._scroll else self._base_thumb_size
+        viewport_h = self._view.viewport().height() if self._view else self._base_thumb_size
         target = max(self._min_thumb_size, min(self._base_thumb_size, viewport_h - 16))
         return target
 
     def _update_thumbnail_sizes(self) -> None:
-        if not self._frames:
-            return
         new_size = self._target_thumb_size()
         if new_size == self._thumb_size:
             return
         self._thumb_size = new_size
-        for frame in self._frames:
-            if not hasattr(frame, "thumb_label"):
-                continue
-            frame.setFixedSize(self._thumb_size, self._thumb_size)
-            frame.thumb_label.setFixedSize(self._thumb_size, self._thumb_size)
-            pixmap = getattr(frame.thumb_label, "_orig_pixmap", None)
-            if isinstance(pixmap, QPixmap) and not pixmap.isNull():
-                frame.thumb_label.setPixmap(self._scaled_thumb(pixmap, self._thumb_size))
+        self._thumb_scaled = {}
+        self._view.set_thumbnail_size(new_size)
 
-    def _load_pixmap(self, item: dict) -> QPixmap | None:
+    @staticmethod
+    def _resolve_thumbnail_source(item: dict) -> str | None:
         img_id = item.get("id")
-        filepath = item.get("preview_path") or item.get("filepath")
         if img_id:
             thumb_path = get_thumbnail_path(img_id, "224x224")
             if thumb_path and Path(thumb_path).exists():
-                pixmap = QPixmap(thumb_path)
-                return pixmap
-        if filepath:
-            pixmap = QPixmap(filepath)
-            return pixmap
-        return None
+                return str(thumb_path)
+        filepath = item.get("preview_path") or item.get("filepath")
+        return str(filepath) if filepath else None
+
+    def _thumbnail_for(self, item: dict) -> QPixmap | None:
+        """Return the cell pixmap for item, queueing a background load if needed."""
+        path = item.get("thumbnail_source")
+        if not path:
+            return QPixmap()
+        key = (path, self._thumb_size)
+        scaled = self._thumb_scaled.get(key)
+        if scaled is not None:
+            return scaled
+        source = self._thumb_sources.get(path)
+        if source is None:
+            self._thumb_loader.request(path)
+            return None
+        if source.isNull():
+            return source
+        scaled = self._scaled_thumb(source, self._thumb_size)
+        self._thumb_scaled[key] = scaled
+        return scaled
+
+    def _on_thumbnail_loaded(self, path: str, pixmap: QPixmap) -> None:
+        if pixmap.isNull():
+            self._thumb_sources[path] = QPixmap()
+        else:
+            self._thumb_sources[path] = self._scaled_thumb(pixmap, self._base_thumb_size)
+        self._view.viewport().update()
 
     @staticmethod
     def _scaled_thumb(pixmap: QPixmap, size: int) -> QPixmap:
@@ -526,21 +692,25 @@ class ImageGalleryWidget(QGroupBox):
         y = max(0, (scaled.height() - size) // 2)
         return scaled.copy(x, y, size, size)
 
-    def _apply_crop_overlay(
-        self,
-        thumb: QPixmap,
-        crop_box: tuple[float, float, float, float],
+    @staticmethod
+    def _crop_overlay_rect(
+        thumb_w: int,
+        thumb_h: int,
+        crop_box: tuple[float, float, float, float] | None,
         crop_source_size: tuple[int, int] | None,
-    ) -> QPixmap:
-        size = thumb.width()
+    ) -> QRectF | None:
+        """Map a normalized crop box onto a cover-cropped square thumbnail."""
+        if not crop_box or not isinstance(crop_box, (list, tuple)) or len(crop_box) != 4:
+            return None
+        size = thumb_w
         orig_w = orig_h = None
         if crop_source_size and len(crop_source_size) == 2:
             orig_w, orig_h = crop_source_size
         if not orig_w or not orig_h:
-            orig_w = thumb.width()
-            orig_h = thumb.height()
+            orig_w = thumb_w
+            orig_h = thumb_h
         if orig_w <= 0 or orig_h <= 0 or size <= 0:
-            return thumb
+            return None
 
         scale = max(size / orig_w, size / orig_h)
         scaled_w = orig_w * scale
@@ -558,21 +728,5 @@ class ImageGalleryWidget(QGroupBox):
         right = min(size, max(x1, x2))
         bottom = min(size, max(y1, y2))
         if right <= left or bottom <= top:
-            return thumb
-
-        annotated = QPixmap(thumb)
-        painter = QPainter(annotated)
-        pen = QPen(QColor(243, 156, 18), 2)
-        painter.setPen(pen)
-        painter.setBrush(Qt.NoBrush)
-        painter.drawRect(QRectF(left, top, right - left, bottom - top))
-        painter.end()
-        return annotated
-
-    def _has_spore_measurements(self, image_id: int) -> bool:
-        measurements = MeasurementDB.get_measurements_for_image(image_id)
-        for measurement in measurements:
-            measurement_type = (measurement.get("measurement_type") or "").lower()
-            if measurement_type in ("", "manual", "spore"):
-                return True
-        return False
+            return None
+        return QRectF(left, top, right - left, bottom - top)
@@ -15,13 +15,12 @@ from PySide6.QtCore import (
     QTime,
     Signal,
     QPointF,
-    QCoreApplication,
     QThread,
     QTimer,
     QEvent,
     QSize,
 )
-from PySide6.QtGui import QPixmap, QKeySequence, QShortcut, QImageReader, QColor, QIcon, QFont
+from PySide6.QtGui import QPixmap, QKeySequence, QShortcut, QColor, QIcon, QFont
 from PySide6.QtWidgets import (
     QButtonGroup,
     QComboBox,
@@ -65,9 +64,12 @@ from database.schema import (
 from database.models import SettingsDB, ImageDB, MeasurementDB, CalibrationDB
 from database.database_tags import DatabaseTerms
 from utils.vernacular_utils import normalize_vernacular_language
-from utils.exif_reader import get_image_metadata, get_exif_data, get_gps_coordinates
+from utils.exif_reader import get_image_metadata, get_exif_summary
+from utils.image_info import get_image_megapixels, get_image_size
+from utils.perceptual_hash import NEAR_DUPLICATE_DISTANCE, hamming_distance
 from utils.heic_converter import maybe_convert_heic
 from .image_gallery_widget import ImageGalleryWidget
+from .image_import_pipeline import ImageImportPipeline, PreparedImport
 from .zoomable_image_widget import ZoomableImageLabel
 from .spore_preview_widget import SporePreviewWidget
 from .calibration_dialog import get_resolution_status
@@ -98,6 +100,7 @@ class ImageImportResult:
     resize_to_optimal: bool = False
     store_original: bool = False
     original_filepath: Optional[str] = None
+    source_path: Optional[str] = None
 
 
 class AIGuessWorker(QThread):
@@ -450,6 +453,17 @@ class ImageImportDialog(QDialog):
         self._last_objective_key: str | None = None
         self._hint_controller: HintStatusController | None = None
         self._pending_hint_widgets: list[tuple[QWidget, str, str]] = []
+        self._import_pipeline = ImageImportPipeline(self, preview_max_dim=self._max_preview_dim)
+        self._import_pipeline.itemReady.connect(self._on_import_item_ready)
+        self._import_pipeline.progressChanged.connect(self._on_import_progress)
+        self._import_pipeline.finished.connect(self._on_import_finished)
+        self._import_refresh_timer = QTimer(self)
+        self._import_refresh_timer.setSingleShot(True)
+        self._import_refresh_timer.setInterval(100)
+        self._import_refresh_timer.timeout.connect(self._refresh_after_import)
+        self._duplicate_import_names: list[str] = []
+        self._similar_import_names: list[str] = []
+        self._import_dhashes: list[int] = []
 
         self._build_ui()
         if hasattr(self, "objective_combo"):
@@ -646,11 +660,18 @@ class ImageImportDialog(QDialog):
         add_btn = QPushButton(self.tr("Add Images..."))
         add_btn.clicked.connect(self._on_add_images_clicked)
         outer.addWidget(add_btn)
+        progress_row = QHBoxLayout()
         self.import_progress = QProgressBar()
         self.import_progress.setVisible(False)
         self.import_progress.setRange(0, 1)
         self.import_progress.setFormat(self.tr("Loading images... %p%"))
-        outer.addWidget(self.import_progress)
+        progress_row.addWidget(self.import_progress, 1)
+        self.import_cancel_btn = QPushButton(self.tr("Stop"))
+        self.import_cancel_btn.setToolTip(self.tr("Stop loading the remaining images"))
+        self.import_cancel_btn.setVisible(False)
+        self.import_cancel_btn.clicked.connect(self._import_pipeline.cancel)
+        progress_row.addWidget(self.import_cancel_btn)
+        outer.addLayout(progress_row)
 
         panel = QGroupBox(self.tr("Image settings"))
         layout = QVBoxLayout(panel)
@@ -1803,56 +1824,112 @@ class ImageImportDialog(QDialog):
             self.add_images(paths)
 
     def add_images(self, paths: list[str]) -> None:
+        """Queue files for background preparation; they join the gallery as they finish."""
+        paths = [path for path in paths if path]
+        if not paths:
+            return
         import_dir = get_images_dir() / "imports"
         import_dir.mkdir(parents=True, exist_ok=True)
-        if getattr(self, "import_progress", None) and len(paths) > 1:
-            self.import_progress.setRange(0, len(paths))
-            self.import_progress.setValue(0)
-            self.import_progress.setVisible(True)
-            QCoreApplication.processEvents()
-        for path in paths:
-            if not path:
-                continue
-            converted_path = maybe_convert_heic(path, import_dir)
-            if converted_path and converted_path != path:
-                self._converted_import_paths.add(converted_path)
-                path = converted_path
-            self.image_paths.append(path)
-            meta = get_image_metadata(path)
-            if meta.get("missing"):
-                self._register_missing_exif_path(path)
-            captured_at = None
-            dt = meta.get("datetime")
-            if dt:
-                captured_at = QDateTime(dt)
-            lat = meta.get("latitude")
-            lon = meta.get("longitude")
-            if (lat is None or lon is None) and path:
-                lat2, lon2 = get_gps_coordinates(path)
-                if lat is None:
-                    lat = lat2
-                if lon is None:
-                    lon = lon2
-            preview_path = path
-            has_exif_gps = lat is not None or lon is not None
-            result = ImageImportResult(
+        # Decode the preview of the image that will be selected first while
+        # its metadata is read; the rest are decoded when selected.
+        preview_count = 1 if self.selected_index is None and not self._import_pipeline.is_busy() else 0
+        self._import_pipeline.enqueue(paths, import_dir, preview_count=preview_count)
+
+    def _on_import_item_ready(self, item: PreparedImport) -> None:
+        path = item.filepath or item.source_path
+        if item.converted:
+            self._converted_import_paths.add(path)
+        meta = item.metadata or {}
+        if meta.get("missing"):
+            self._register_missing_exif_path(path)
+        captured_at = None
+        dt = meta.get("datetime")
+        if dt:
+            captured_at = QDateTime(dt)
+        lat = item.latitude
+        lon = item.longitude
+        if item.preview is not None and path not in self._pixmap_cache:
+            self._pixmap_cache[path] = QPixmap.fromImage(item.preview)
+            self._pixmap_cache_is_preview[path] = item.preview_is_scaled
+        self.image_paths.append(path)
+        self.import_results.append(
+            ImageImportResult(
                 filepath=path,
-                preview_path=preview_path or path,
+                preview_path=path,
                 captured_at=captured_at,
                 gps_latitude=lat,
                 gps_longitude=lon,
                 gps_source=False,
-                exif_has_gps=has_exif_gps,
+                exif_has_gps=lat is not None or lon is not None,
                 resize_to_optimal=self.resize_to_optimal_default,
                 store_original=self.store_original_default,
                 original_filepath=path,
+                source_path=item.source_path,
             )
-            self.import_results.append(result)
-            if getattr(self, "import_progress", None) and self.import_progress.isVisible():
-                self.import_progress.setValue(self.import_progress.value() + 1)
-                QCoreApplication.processEvents()
-        if getattr(self, "import_progress", None) and self.import_progress.isVisible():
-            self.import_progress.setVisible(False)
+        )
+        name = Path(item.source_path).name
+        if item.duplicates:
+            self._duplicate_import_names.append(name)
+        elif item.similar or self._is_near_duplicate_of_added(item.dhash):
+            self._similar_import_names.append(name)
+        if item.dhash is not None:
+            self._import_dhashes.append(item.dhash)
+        if self.selected_index is None:
+            self._refresh_after_import()
+        elif not self._import_refresh_timer.isActive():
+            self._import_refresh_timer.start()
+
+    def _on_import_progress(self, done: int, total: int) -> None:
+        if total <= 1:
+            return
+        self.import_progress.setRange(0, total)
+        self.import_progress.setValue(done)
+        self.import_progress.setVisible(True)
+        self.import_cancel_btn.setVisible(True)
+        self.next_btn.setEnabled(False)
+
+    def _on_import_finished(self) -> None:
+        self.import_progress.setVisible(False)
+        self.import_cancel_btn.setVisible(False)
+        self.next_btn.setEnabled(True)
+        self._import_refresh_timer.stop()
+        self._refresh_after_import()
+        self._warn_duplicate_imports()
+
+    def _is_near_duplicate_of_added(self, dhash: int | None) -> bool:
+        if dhash is None:
+            return False
+        return any(
+            hamming_distance(dhash, other) <= NEAR_DUPLICATE_DISTANCE
+            for other in self._import_dhashes
+        )
+
+    def _warn_duplicate_imports(self) -> None:
+        def _names(names: list[str]) -> str:
+            shown = ", ".join(names[:3])
+            return shown + ", ..." if len(names) > 3 else shown
+
+        messages = []
+        if self._duplicate_import_names:
+            messages.append(
+                self.tr("{count} image(s) were imported before: {names}").format(
+                    count=len(self._duplicate_import_names),
+                    names=_names(self._duplicate_import_names),
+                )
+            )
+        if self._similar_import_names:
+            messages.append(
+                self.tr("{count} image(s) look nearly identical to other images: {names}").format(
+                    count=len(self._similar_import_names),
+                    names=_names(self._similar_import_names),
+                )
+            )
+        self._duplicate_import_names = []
+        self._similar_import_names = []
+        if messages:
+            self.set_status(" ".join(messages), timeout_ms=10000, tone="warning")
+
+    def _refresh_after_import(self) -> None:
         self._update_summary()
         self._seed_observation_metadata()
         self._update_observation_source_index()
@@ -1891,12 +1968,6 @@ class ImageImportDialog(QDialog):
                     self._register_missing_exif_path(result.filepath)
                 lat = meta.get("latitude")
                 lon = meta.get("longitude")
-                if (lat is None or lon is None):
-                    lat2, lon2 = get_gps_coordinates(result.filepath)
-                    if lat is None:
-                        lat = lat2
-                    if lon is None:
-                        lon = lon2
                 if result.gps_latitude is None:
                     result.gps_latitude = lat
                 if result.gps_longitude is None:
@@ -2641,7 +2712,7 @@ class ImageImportDialog(QDialog):
     def _update_current_image_exif(self, result: ImageImportResult) -> None:
         path = result.filepath
         self._current_exif_path = path
-        exif = get_exif_data(path) if path else {}
+        exif = get_exif_summary(path) if path else {}
         meta = get_image_metadata(path) if path else {}
         if meta.get("missing"):
             self._register_missing_exif_path(path)
@@ -2678,10 +2749,6 @@ class ImageImportDialog(QDialog):
 
         lat = meta.get("latitude")
         lon = meta.get("longitude")
-        if (lat is None or lon is None) and path:
-            lat2, lon2 = get_gps_coordinates(path)
-            lat = lat if lat is not None else lat2
-            lon = lon if lon is not None else lon2
         self._current_exif_lat = lat
         self._current_exif_lon = lon
         lat_text = f"Lat: {lat:.6f}" if lat is not None else "Lat: --"
@@ -2696,17 +2763,7 @@ class ImageImportDialog(QDialog):
         self._update_resize_info(result)
 
     def _get_image_size(self, path: str | None) -> tuple[int, int] | None:
-        if not path:
-            return None
-        reader = QImageReader(path)
-        size = reader.size()
-        if not size.isValid():
-            return None
-        width = size.width()
-        height = size.height()
-        if width <= 0 or height <= 0:
-            return None
-        return width, height
+        return get_image_size(path)
 
     def _get_objective_scale_mpp(self, objective_key: str | None) -> float | None:
         if not objective_key:
@@ -2894,17 +2951,7 @@ class ImageImportDialog(QDialog):
         return text.rstrip("0").rstrip(".")
 
     def _get_image_megapixels(self, path: str | None) -> float | None:
-        if not path:
-            return None
-        reader = QImageReader(path)
-        size = reader.size()
-        if not size.isValid():
-            return None
-        width = size.width()
-        height = size.height()
-        if width <= 0 or height <= 0:
-            return None
-        return (width * height) / 1_000_000.0
+        return get_image_megapixels(path)
 
     def _estimate_calibration_megapixels(self, cal: dict | None) -> float | None:
         if not cal:
@@ -3079,6 +3126,9 @@ class ImageImportDialog(QDialog):
 
     def _refresh_gallery(self) -> None:
         selected = self.gallery.selected_paths() if hasattr(self, "gallery") else []
+        measured_ids = MeasurementDB.get_image_ids_with_measurements(
+            [result.image_id for result in self.import_results if result.image_id]
+        )
         items = []
         for idx, result in enumerate(self.import_results):
             objective_label = result.objective
@@ -3095,9 +3145,6 @@ class ImageImportDialog(QDialog):
                 needs_scale=bool(result.needs_scale),
                 translate=self.tr,
             )
-            has_measurements = False
-            if result.image_id:
-                has_measurements = bool(MeasurementDB.get_measurements_for_image(result.image_id))
             is_source = self._observation_source_index == idx
             gps_highlight = is_source and result.exif_has_gps
             gps_tag = self.tr("GPS") if gps_highlight else None
@@ -3110,7 +3157,7 @@ class ImageImportDialog(QDialog):
                     "badges": badges,
                     "gps_tag_text": gps_tag,
                     "gps_tag_highlight": gps_highlight,
-                    "has_measurements": has_measurements,
+                    "has_measurements": bool(result.image_id) and result.image_id in measured_ids,
                 }
             )
         self.gallery.set_items(items)
@@ -3275,7 +3322,12 @@ class ImageImportDialog(QDialog):
                 )
             self.calibration_points = []
 
+    def reject(self):
+        self._import_pipeline.cancel()
+        super().reject()
+
     def closeEvent(self, event):
+        self._import_pipeline.cancel()
         if self._ai_thread is not None:
             try:
                 self._ai_thread.quit()
@@ -0,0 +1,185 @@
+"""Background preparation of files added to the image import dialog."""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from PySide6.QtCore import QObject, QRunnable, QThread, QThreadPool, Qt, Signal
+from PySide6.QtGui import QImage
+
+from utils.exif_reader import get_image_metadata
+from utils.heic_converter import maybe_convert_heic
+from utils.image_info import find_duplicate_images
+from utils.perceptual_hash import dhash_file, find_similar_images
+
+
+@dataclass
+class PreparedImport:
+    source_path: str
+    filepath: Optional[str] = None
+    converted: bool = False
+    metadata: dict = field(default_factory=dict)
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    preview: Optional[QImage] = None
+    preview_is_scaled: bool = False
+    duplicates: list[dict] = field(default_factory=list)  # images already imported from this file
+    dhash: Optional[int] = None
+    similar: list[dict] = field(default_factory=list)  # near-identical images in the library
+
+
+def _discard_prepared(item: PreparedImport) -> None:
+    if item.converted and item.filepath:
+        try:
+            Path(item.filepath).unlink(missing_ok=True)
+        except Exception:
+            pass
+
+
+class _PrepareTask(QRunnable):
+    """Convert, read metadata, look for (near) duplicates and optionally decode a preview for one file."""
+
+    def __init__(
+        self,
+        pipeline: "ImageImportPipeline",
+        seq: int,
+        path: str,
+        import_dir: Path,
+        preview_max_dim: int | None,
+    ) -> None:
+        super().__init__()
+        self.setAutoDelete(False)
+        self.pipeline = pipeline
+        self.seq = seq
+        self.path = path
+        self.import_dir = import_dir
+        self.preview_max_dim = preview_max_dim
+        self.cancelled = False
+
+    def _prepare(self) -> PreparedImport:
+        item = PreparedImport(source_path=self.path)
+        converted_path = maybe_convert_heic(self.path, self.import_dir)
+        path = self.path
+        if converted_path and converted_path != self.path:
+            item.converted = True
+            path = converted_path
+        item.filepath = path
+        if self.cancelled:
+            return item
+        item.metadata = get_image_metadata(path)
+        item.latitude = item.metadata.get("latitude")
+        item.longitude = item.metadata.get("longitude")
+        item.duplicates = find_duplicate_images(self.path)
+        item.dhash = dhash_file(path)
+        item.similar = find_similar_images(item.dhash, exclude_ids=[row["id"] for row in item.duplicates])
+        if self.preview_max_dim and not self.cancelled:
+            image = QImage(path)
+            if not image.isNull():
+                max_dim = self.preview_max_dim
+                if max(image.width(), image.height()) > max_dim:
+                    image = image.scaled(max_dim, max_dim, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+                    item.preview_is_scaled = True
+                item.preview = image
+        return item
+
+    def run(self) -> None:
+        if self.cancelled:
+            return
+        try:
+            item = self._prepare()
+        except Exception as e:
+            print(f"Warning: Could not prepare {self.path} for import: {e}")
+            item = PreparedImport(source_path=self.path, filepath=self.path)
+        if self.cancelled:
+            _discard_prepared(item)
+            return
+        try:
+            self.pipeline._prepared.emit(self.seq, item)
+        except RuntimeError:
+            # The dialog (and pipeline) went away while we were working.
+            _discard_prepared(item)
+
+
+class ImageImportPipeline(QObject):
+    """Prepare added files on a bounded worker pool and deliver them in order.
+
+    Each file is HEIC-converted, has its EXIF metadata read, is checked
+    against identical and near-identical images in the library and (when
+    asked) has a preview decoded on a worker thread. Results are emitted on the GUI
+    thread in the order the files were queued, as soon as every earlier
+    file is ready, so the dialog can fill its gallery while the rest load.
+    """
+
+    itemReady = Signal(object)  # PreparedImport
+    progressChanged = Signal(int, int)  # done, total
+    finished = Signal()
+
+    _prepared = Signal(int, object)
+
+    MAX_WORKERS = 4
+
+    def __init__(self, parent: QObject | None = None, preview_max_dim: int = 1600) -> None:
+        super().__init__(parent)
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(max(1, min(self.MAX_WORKERS, QThread.idealThreadCount())))
+        self.preview_max_dim = int(preview_max_dim)
+        self._tasks: dict[int, _PrepareTask] = {}
+        self._ready: dict[int, PreparedImport] = {}
+        self._next_seq = 0
+        self._emit_seq = 0
+        self._done = 0
+        self._total = 0
+        self._prepared.connect(self._on_prepared)
+
+    def is_busy(self) -> bool:
+        return bool(self._tasks)
+
+    def enqueue(self, paths: list[str], import_dir: Path, preview_count: int = 0) -> None:
+        """Queue paths for preparation; the first preview_count also get a preview."""
+        for rank, path in enumerate(paths):
+            if not path:
+                continue
+            preview_dim = self.preview_max_dim if rank < preview_count else None
+            task = _PrepareTask(self, self._next_seq, path, import_dir, preview_dim)
+            self._tasks[self._next_seq] = task
+            self._next_seq += 1
+            self._total += 1
+            # Earlier files first, so in-order delivery is not held up.
+            self._pool.start(task, -task.seq)
+        if self._tasks:
+            self.progressChanged.emit(self._done, self._total)
+
+    def cancel(self) -> None:
+        """Drop every queued file; files being prepared are discarded when done."""
+        if not self._tasks and not self._ready:
+            return
+        for task in self._tasks.values():
+            task.cancelled = True
+            self._pool.tryTake(task)
+        self._tasks.clear()
+        for item in self._ready.values():
+            _discard_prepared(item)
+        self._ready.clear()
+        self._emit_seq = self._next_seq
+        self._finish()
+
+    def _finish(self) -> None:
+        self._done = 0
+        self._total = 0
+        self.finished.emit()
+
+    def _on_prepared(self, seq: int, item: PreparedImport) -> None:
+        task = self._tasks.pop(seq, None)
+        if task is None or task.cancelled:
+            _discard_prepared(item)
+            return
+        self._ready[seq] = item
+        self._done += 1
+        while self._emit_seq in self._ready:
+            ready = self._ready.pop(self._emit_seq)
+            self._emit_seq += 1
+            self.itemReady.emit(ready)
+        self.progressChanged.emit(self._done, self._total)
+        if not self._tasks:
+            self._finish()
@@ -0,0 +1,192 @@
+"""Background image decoding with cancellable requests and prefetching."""
+from __future__ import annotations
+
+import threading
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+from PySide6.QtGui import QImage, QPixmap
+
+
+class _DecodeTask(QRunnable):
+    """Decode one image file to a QImage on a worker thread."""
+
+    def __init__(self, loader: "ImageLoader", request_id: int, path: str) -> None:
+        super().__init__()
+        self.setAutoDelete(False)
+        self.loader = loader
+        self.request_id = request_id
+        self.path = path
+        self.cancelled = False
+        self.image: QImage | None = None
+        self.done = threading.Event()
+
+    def run(self) -> None:
+        image = QImage()
+        if not self.cancelled:
+            try:
+                image = QImage(self.path)
+            except Exception:
+                image = QImage()
+        self.image = image
+        self.done.set()
+        if not self.cancelled:
+            self.loader._decoded.emit(self.request_id, self.path, image)
+
+
+class ImageLoader(QObject):
+    """Decode images in a QThreadPool and deliver QPixmaps on the GUI thread.
+
+    Decoding happens on QImage in worker threads (QPixmap is GUI-thread only).
+    The QImage -> QPixmap conversion happens when the result is delivered.
+    """
+
+    pixmapReady = Signal(str, QPixmap)  # path, pixmap (null pixmap on failure)
+
+    _decoded = Signal(int, str, QImage)
+
+    def __init__(self, parent: QObject | None = None, pool: QThreadPool | None = None) -> None:
+        super().__init__(parent)
+        self._pool = pool or QThreadPool.globalInstance()
+        self._tasks: dict[str, _DecodeTask] = {}
+        self._next_id = 0
+        self._decoded.connect(self._on_decoded)
+
+    def is_pending(self, path: str) -> bool:
+        return bool(path) and path in self._tasks
+
+    def request(self, path: str, priority: int = 0) -> None:
+        """Queue a decode for path unless one is already pending."""
+        if not path or path in self._tasks:
+            return
+        self._next_id += 1
+        task = _DecodeTask(self, self._next_id, path)
+        self._tasks[path] = task
+        self._pool.start(task, priority)
+
+    def cancel(self, path: str) -> None:
+        """Cancel a pending request; running decodes finish but are discarded."""
+        task = self._tasks.pop(path, None)
+        if task is None:
+            return
+        task.cancelled = True
+        self._pool.tryTake(task)
+
+    def cancel_all(self, keep: set[str] | None = None) -> None:
+        """Cancel every pending request whose path is not in keep."""
+        keep = keep or set()
+        for path in list(self._tasks):
+            if path not in keep:
+                self.cancel(path)
+
+    def prefetch(self, paths: list[str], center: int, depth: int = 2, skip: set[str] | None = None) -> None:
+        """Prefetch up to depth images on each side of center, nearest first.
+
+        Pending requests outside the new window are cancelled so fast
+        stepping does not pile up stale decodes.
+        """
+        skip = skip or set()
+        window: list[str] = []
+        for distance in range(1, max(0, int(depth)) + 1):
+            for target in (center + distance, center - distance):
+                if 0 <= target < len(paths):
+                    path = paths[target]
+                    if path and path not in window:
+                        window.append(path)
+        current = paths[center] if 0 <= center < len(paths) else None
+        keep = set(window)
+        if current:
+            keep.add(current)
+        self.cancel_all(keep)
+        for rank, path in enumerate(window):
+            if path in skip:
+                continue
+            self.request(path, priority=len(window) - rank)
+
+    def load_now(self, path: str) -> QPixmap:
+        """Return a pixmap for path, joining a pending decode when there is one."""
+        task = self._tasks.pop(path, None) if path else None
+        if task is not None:
+            if self._pool.tryTake(task):
+                task.cancelled = True
+            else:
+                task.cancelled = True
+                task.done.wait()
+                if task.image is not None and not task.image.isNull():
+                    return QPixmap.fromImage(task.image)
+        return QPixmap(path) if path else QPixmap()
+
+    def _on_decoded(self, request_id: int, path: str, image: QImage) -> None:
+        task = self._tasks.get(path)
+        if task is None or task.request_id != request_id or task.cancelled:
+            return
+        del self._tasks[path]
+        pixmap = QPixmap.fromImage(image) if not image.isNull() else QPixmap()
+        self.pixmapReady.emit(path, pixmap)
+
+
+class _PyramidTask(QRunnable):
+    """Build (or load) the on-disk pyramid for one image on a worker thread."""
+
+    def __init__(self, builder: "PyramidBuilder", path: str, image: QImage | None = None) -> None:
+        super().__init__()
+        self.setAutoDelete(False)
+        self.builder = builder
+        self.path = path
+        self.image = image
+        self.cancelled = False
+
+    def run(self) -> None:
+        from utils.image_pyramid import build_pyramid
+
+        info = None
+        if not self.cancelled:
+            try:
+                info = build_pyramid(self.path, image=self.image, cancel_cb=lambda: self.cancelled)
+            except Exception as e:
+                print(f"Warning: Image pyramid build failed for {self.path}: {e}")
+                info = None
+        self.image = None
+        if not self.cancelled:
+            self.builder._built.emit(self.path, info)
+
+
+class PyramidBuilder(QObject):
+    """Generate image pyramids in the background, one request per path."""
+
+    pyramidReady = Signal(str, object)  # path, PyramidInfo or None
+
+    _built = Signal(str, object)
+
+    def __init__(self, parent: QObject | None = None, pool: QThreadPool | None = None) -> None:
+        super().__init__(parent)
+        self._pool = pool or QThreadPool.globalInstance()
+        self._tasks: dict[str, _PyramidTask] = {}
+        self._built.connect(self._on_built)
+
+    def request(self, path: str, image: QImage | None = None) -> None:
+        """Queue a pyramid build for path.
+
+        image is the already decoded file, so the worker does not decode it
+        a second time.
+        """
+        if not path or path in self._tasks:
+            return
+        task = _PyramidTask(self, path, image)
+        self._tasks[path] = task
+        # Lowest priority: never delay decodes the user is waiting for.
+        self._pool.start(task, -1)
+
+    def cancel_all(self, keep: set[str] | None = None) -> None:
+        keep = keep or set()
+        for path in list(self._tasks):
+            if path in keep:
+                continue
+            task = self._tasks.pop(path)
+            task.cancelled = True
+            self._pool.tryTake(task)
+
+    def _on_built(self, path: str, info) -> None:
+        task = self._tasks.pop(path, None)
+        if task is None or task.cancelled:
+            return
+        self.pyramidReady.emit(path, info)
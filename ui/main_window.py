@@ -13,10 +13,8 @@ from PySide6.QtGui import (
     QAction,
     QColor,
     QImage,
-    QImageReader,
     QPainter,
     QPen,
-    QIcon,
     QKeySequence,
     QShortcut,
     QDesktopServices,
@@ -27,8 +25,8 @@ from PySide6.QtCore import (
     Qt,
     QPointF,
     QRectF,
-    QSize,
     QTimer,
+    QThread,
     Signal,
     QPoint,
     QEvent,
@@ -45,9 +43,9 @@ import math
 import sqlite3
 import time
 import os
+import threading
 from pathlib import Path
 import re
-from PIL import Image, ExifTags
 from database.models import ObservationDB, ImageDB, MeasurementDB, SettingsDB, ReferenceDB, CalibrationDB
 from database.models import SpeciesDataAvailability
 from database.database_tags import DatabaseTerms
@@ -65,9 +63,23 @@ from database.schema import (
     resolve_objective_key,
 )
 from utils.annotation_capture import save_spore_annotation
+from utils.spatial_index import GridIndex, bbox_from_lines, bbox_from_points
+from utils.spore_crop import render_spore_thumbnail
+from utils.spore_crop_cache import cached_spore_thumbnail, invalidate_spore_crops
+from utils.spore_autodetect import (
+    DEFAULT_ANGLE_STEP_DEG,
+    detect_spores,
+    find_edge_radii,
+    min_edge_rays,
+    pick_axes,
+    ring_background,
+)
 from utils.thumbnail_generator import generate_all_sizes
 from utils.image_utils import cleanup_import_temp_file
 from utils.heic_converter import maybe_convert_heic
+from utils.exif_reader import get_exif_summary
+from utils.image_info import backfill_image_file_info, get_image_megapixels
+from utils.perceptual_hash import backfill_perceptual_hashes
 from .delegates import SpeciesItemDelegate
 from utils.vernacular_utils import (
     normalize_vernacular_language,
@@ -77,8 +89,11 @@ from utils.vernacular_utils import (
     list_available_vernacular_languages,
 )
 from .image_gallery_widget import ImageGalleryWidget
+from .measurement_gallery import REVIEW_PENDING, MeasurementGalleryView
 from .calibration_dialog import CalibrationDialog
 from .zoomable_image_widget import ZoomableImageLabel
+from .image_loader import ImageLoader
+from .image_analysis_loader import ImageAnalysisLoader
 from .spore_preview_widget import SporePreviewWidget
 from .observations_tab import ObservationsTab
 from .database_settings_dialog import DatabaseSettingsDialog
@@ -2382,6 +2397,41 @@ class ReferenceAddDialog(QDialog):
                 self.spore_table._update_q_for_row(row)
             self.tabs.setCurrentIndex(1)
 
+class SporeDetectionWorker(QThread):
+    """Detect every spore in an analyzed image off the GUI thread."""
+    resultReady = Signal(int, list)  # image_id, [SporeCandidate]
+    error = Signal(int, str)
+
+    def __init__(self, image_id, analysis, threshold, min_radius_px, max_radius_px, parent=None):
+        super().__init__(parent)
+        self.image_id = image_id
+        self.analysis = analysis
+        self.threshold = threshold
+        self.min_radius_px = min_radius_px
+        self.max_radius_px = max_radius_px
+
+    def run(self):
+        analysis = self.analysis
+        try:
+            # The cached background is only used if its tiles are large enough
+            # for a spore not to dominate one.
+            background = None
+            if analysis.background_block >= 4 * self.max_radius_px:
+                background = analysis.background
+            candidates = detect_spores(
+                analysis.gray,
+                self.threshold,
+                self.min_radius_px,
+                self.max_radius_px,
+                background=background,
+                smoothed=analysis.box_mean(1),
+            )
+        except Exception as exc:
+            self.error.emit(self.image_id, str(exc))
+            return
+        self.resultReady.emit(self.image_id, candidates)
+
+
 class MainWindow(QMainWindow):
     """Main application window with modern UI and measurement table."""
 
@@ -2391,16 +2441,22 @@ class MainWindow(QMainWindow):
         self.setGeometry(100, 100, 1600, 900)
         self.app_version = app_version or ""
         self._update_check_started = False
+        self._image_info_backfill_thread = None
         self._pixmap_cache: dict[str, QPixmap] = {}
         self._pixmap_cache_order: list[str] = []
-        self._pixmap_cache_max = 6
+        self._prefetch_depth = 2
+        self._pixmap_cache_max = 2 * self._prefetch_depth + 2
         self._pixmap_cache_observation_id = None
+        self._image_loader = ImageLoader(self)
+        self._image_loader.pixmapReady.connect(self._on_prefetched_pixmap)
+        self._image_analysis_loader = ImageAnalysisLoader(self)
 
         self.current_image_path = None
         self.current_image_id = None
         self.current_pixmap = None
         self.points = []  # Will store 4 points for two measurements
         self.measurement_lines = {}  # Dict mapping measurement_id -> [line1, line2]
+        self._measurement_index = GridIndex()  # measurement_id -> overlay bounding box
         self.temp_lines = []  # Temporary lines for current measurement in progress
         self.measure_mode = "rectangle"
         self.measurements_cache = []
@@ -2437,9 +2493,8 @@ class MainWindow(QMainWindow):
         self._auto_started_for_microscope = False
         self.auto_threshold = None
         self.auto_threshold_default = 0.12
-        self.auto_gray_cache = None
-        self.auto_gray_cache_id = None
         self.auto_max_radius = None
+        self._spore_detection_worker = None
         self.gallery_filter_mode = None
         self.gallery_filter_value = None
         self.gallery_filter_ids = set()
@@ -2453,9 +2508,6 @@ class MainWindow(QMainWindow):
         self._gallery_thumb_cache = {}
         self._gallery_thumb_cache_observation_id = None
         self._gallery_pixmap_cache = {}
-        self._gallery_render_timer = None
-        self._gallery_render_queue = []
-        self._gallery_render_state = None
         self._gallery_collapsed = False
         self._gallery_hint_controller: HintStatusController | None = None
         self._pending_gallery_hint_widgets: list[tuple[QWidget, str, str]] = []
@@ -2664,6 +2716,30 @@ class MainWindow(QMainWindow):
             lambda: self._handle_atom_reply(reply, current_version)
         )
 
+    def start_image_info_backfill(self):
+        """Record pixel size, file size and hashes of older images in the background."""
+        if self._image_info_backfill_thread is not None:
+            return
+
+        def _run():
+            try:
+                updated = backfill_image_file_info()
+                hashed = backfill_perceptual_hashes()
+            except Exception as e:
+                print(f"Warning: Image info backfill failed: {e}")
+                return
+            if updated:
+                print(f"Stored pixel/file info for {updated} image(s)")
+            if hashed:
+                print(f"Stored perceptual hashes for {hashed} image(s)")
+
+        self._image_info_backfill_thread = threading.Thread(
+            target=_run,
+            name="image-info-backfill",
+            daemon=True,
+        )
+        self._image_info_backfill_thread.start()
+
     def _handle_atom_reply(self, reply: QNetworkReply, current_version: tuple[int, ...]):
         """Handle Atom feed response from GitHub releases."""
         try:
@@ -2823,6 +2899,13 @@ class MainWindow(QMainWindow):
         mode_row.addStretch()
         measure_layout.addLayout(mode_row)
 
+        self.detect_spores_button = QPushButton(self.tr("Detect all spores"))
+        self.detect_spores_button.setToolTip(
+            self.tr("Find every spore in this image and add them for review in the gallery")
+        )
+        self.detect_spores_button.clicked.connect(self.detect_all_spores)
+        measure_layout.addWidget(self.detect_spores_button)
+
         palette_row = QHBoxLayout()
         palette_row.addWidget(QLabel("Color:"))
         self.color_button_group = QButtonGroup(self)
@@ -3007,7 +3090,7 @@ class MainWindow(QMainWindow):
 
     def create_gallery_panel(self):
         """Create the gallery panel showing all measured spores in a grid."""
-        from PySide6.QtWidgets import QScrollArea, QGridLayout, QFormLayout
+        from PySide6.QtWidgets import QFormLayout
 
         panel = QWidget()
         main_layout = QVBoxLayout(panel)
@@ -3181,19 +3264,12 @@ class MainWindow(QMainWindow):
         gallery_toolbar.addStretch()
         gallery_layout.addLayout(gallery_toolbar)
 
-        self.gallery_scroll = QScrollArea()
-        self.gallery_scroll.setWidgetResizable(True)
-        self.gallery_scroll.setHorizontalScrollBarPolicy(Qt.ScrollBarAsNeeded)
-        self.gallery_scroll.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-
-        self.gallery_container = QWidget()
-        self.gallery_container.setSizePolicy(QSizePolicy.Minimum, QSizePolicy.Fixed)
-        self.gallery_grid = QGridLayout(self.gallery_container)
-        self.gallery_grid.setSpacing(10)
-        self.gallery_grid.setAlignment(Qt.AlignTop | Qt.AlignLeft)
-
-        self.gallery_scroll.setWidget(self.gallery_container)
-        gallery_layout.addWidget(self.gallery_scroll)
+        self.gallery_view = MeasurementGalleryView(self._gallery_thumbnail_size())
+        self.gallery_view.linkRequested.connect(self.open_measurement_from_gallery)
+        self.gallery_view.rotateRequested.connect(self.rotate_gallery_thumbnail)
+        self.gallery_view.acceptRequested.connect(self.accept_detected_spore)
+        self.gallery_view.rejectRequested.connect(self.delete_measurement)
+        gallery_layout.addWidget(self.gallery_view)
 
         self.gallery_splitter.addWidget(plot_panel)
         self.gallery_splitter.addWidget(gallery_panel)
@@ -3313,7 +3389,6 @@ class MainWindow(QMainWindow):
     def _on_gallery_collapse_toggled(self, collapsed):
         self._gallery_collapsed = bool(collapsed)
         if collapsed:
-            self._cancel_gallery_render()
             self._gallery_refresh_in_progress = False
         else:
             self._set_gallery_strip_height()
@@ -4896,17 +4971,7 @@ class MainWindow(QMainWindow):
         return (width * height) / 1_000_000.0
 
     def _megapixels_from_path(self, path: str | None) -> float | None:
-        if not path:
-            return None
-        reader = QImageReader(path)
-        size = reader.size()
-        if not size.isValid():
-            return None
-        width = size.width()
-        height = size.height()
-        if width <= 0 or height <= 0:
-            return None
-        return (width * height) / 1_000_000.0
+        return get_image_megapixels(path)
 
     def _estimate_calibration_megapixels(self, cal: dict | None) -> float | None:
         if not cal:
@@ -5113,11 +5178,10 @@ class MainWindow(QMainWindow):
         self.current_image_path = image_data['filepath']
         self.current_image_id = image_data['id']
         self.current_image_type = image_data.get("image_type")
-        self.auto_gray_cache = None
-        self.auto_gray_cache_id = None
 
         self.current_pixmap = self._load_pixmap_cached(self.current_image_path)
-        self.image_label.set_image(self.current_pixmap)
+        self._request_image_analysis()
+        self.image_label.set_image(self.current_pixmap, source_path=self.current_image_path)
         self.update_exif_panel(self.current_image_path)
         QTimer.singleShot(0, self.image_label.reset_view)
 
@@ -5145,6 +5209,7 @@ class MainWindow(QMainWindow):
             self.set_measure_color(self.measure_color or self.default_measure_color)
         self.refresh_observation_images(select_image_id=self.current_image_id)
         self.measurement_lines = {}
+        self._measurement_index.clear()
         self.temp_lines = []
         self.points = []
         self.load_measurement_lines()
@@ -5165,6 +5230,7 @@ class MainWindow(QMainWindow):
             self._pixmap_cache.clear()
             self._pixmap_cache_order.clear()
             self._pixmap_cache_observation_id = None
+            self._image_loader.cancel_all()
             self.update_image_navigation_ui()
             if hasattr(self, "measure_gallery"):
                 self.measure_gallery.clear()
@@ -5174,6 +5240,7 @@ class MainWindow(QMainWindow):
             self._pixmap_cache.clear()
             self._pixmap_cache_order.clear()
             self._pixmap_cache_observation_id = self.active_observation_id
+            self._image_loader.cancel_all()
 
         self.observation_images = ImageDB.get_images_for_observation(self.active_observation_id)
         if hasattr(self, "measure_gallery"):
@@ -5233,10 +5300,20 @@ class MainWindow(QMainWindow):
     def _load_pixmap_cached(self, path: str) -> QPixmap:
         if path in self._pixmap_cache:
             return self._pixmap_cache[path]
-        pixmap = QPixmap(path)
+        pixmap = self._image_loader.load_now(path)
         self._cache_pixmap(path, pixmap)
         return pixmap
 
+    def _on_prefetched_pixmap(self, path: str, pixmap: QPixmap) -> None:
+        if self._pixmap_cache_observation_id != self.active_observation_id:
+            return
+        if not any(image.get("filepath") == path for image in self.observation_images):
+            return
+        self._cache_pixmap(path, pixmap)
+        # Keep the displayed image most recently used so prefetches never evict it.
+        if self.current_image_path in self._pixmap_cache and self.current_image_path != path:
+            self._cache_pixmap(self.current_image_path, self._pixmap_cache[self.current_image_path])
+
     def _prefetch_adjacent_images(self) -> None:
         if not self.observation_images:
             return
@@ -5252,16 +5329,13 @@ class MainWindow(QMainWindow):
         else:
             idx = self.current_image_index
 
-        targets = [idx - 1, idx + 1]
-        for target in targets:
-            if target < 0 or target >= len(self.observation_images):
-                continue
-            path = self.observation_images[target].get("filepath")
-            if not path:
-                continue
-            if path in self._pixmap_cache:
-                continue
-            QTimer.singleShot(0, lambda p=path: self._load_pixmap_cached(p))
+        paths = [image.get("filepath") or "" for image in self.observation_images]
+        self._image_loader.prefetch(
+            paths,
+            idx,
+            depth=self._prefetch_depth,
+            skip=set(self._pixmap_cache),
+        )
 
     def goto_previous_image(self):
         """Navigate to the previous image."""
@@ -5381,10 +5455,10 @@ class MainWindow(QMainWindow):
         self.current_image_path = None
         self.current_pixmap = None
         self.current_image_type = None
-        self.auto_gray_cache = None
-        self.auto_gray_cache_id = None
+        self._image_analysis_loader.cancel_all()
         self.points = []
         self.measurement_lines = {}
+        self._measurement_index.clear()
         self.temp_lines = []
         self.image_label.set_image(None)
         self.image_label.set_objective_text("")
@@ -5777,6 +5851,7 @@ class MainWindow(QMainWindow):
         # Store the lines associated with this measurement
         saved_lines = self.temp_lines.copy()
         self.measurement_lines[measurement_id] = saved_lines
+        self._index_measurement(measurement_id)
         if len(saved_lines) >= 2 and width_microns is not None:
             self.measurement_labels.append(
                 self._build_measurement_label(
@@ -6027,6 +6102,24 @@ class MainWindow(QMainWindow):
             p1 = p2
         return inside
 
+    def _index_measurement(self, measurement_id):
+        """Update the hit-test index entry for one measurement."""
+        lines_list = self.measurement_lines.get(measurement_id)
+        box = None
+        if lines_list:
+            box = bbox_from_lines(lines_list[:2])
+            if len(lines_list) >= 2:
+                corners = self.build_measurement_rectangles_for_lines(lines_list[0], lines_list[1])
+                if corners:
+                    corner_box = bbox_from_points(corners)
+                    box = (
+                        min(box[0], corner_box[0]),
+                        min(box[1], corner_box[1]),
+                        max(box[2], corner_box[2]),
+                        max(box[3], corner_box[3]),
+                    )
+        self._measurement_index.insert(measurement_id, box)
+
     def find_measurement_at_point(self, pos, threshold=6.0):
         """Return measurement_id if click is near a measurement overlay."""
         if not self.measurement_lines:
@@ -6034,7 +6127,8 @@ class MainWindow(QMainWindow):
 
         best_id = None
         best_dist = threshold
-        for measurement_id, lines_list in self.measurement_lines.items():
+        for measurement_id in self._measurement_index.query(pos.x(), pos.y(), threshold):
+            lines_list = self.measurement_lines.get(measurement_id)
             if not lines_list:
                 continue
             line1 = lines_list[0]
@@ -6147,7 +6241,7 @@ class MainWindow(QMainWindow):
         try:
             if isinstance(value, tuple):
                 value = value[0] / value[1] if value[1] else 0
-            return f"f/{value:.1f}".rstrip("0").rstrip(".")
+            return f"f/{float(value):.1f}".rstrip("0").rstrip(".")
         except Exception:
             return "-"
 
@@ -6159,13 +6253,8 @@ class MainWindow(QMainWindow):
         lines = []
         lines.append(f"File: {path.name}")
 
-        try:
-            with Image.open(path) as img:
-                exif = img.getexif()
-                if not exif:
-                    return lines
-                exif_data = {ExifTags.TAGS.get(k, k): v for k, v in exif.items()}
-        except Exception:
+        exif_data = get_exif_summary(str(path))
+        if not exif_data:
             return lines
 
         date = exif_data.get("DateTimeOriginal") or exif_data.get("DateTime")
@@ -6228,23 +6317,31 @@ class MainWindow(QMainWindow):
         )
         self.exif_info_label.setText("<br>".join(html_lines))
 
+    def _image_analysis_key(self):
+        if not self.current_pixmap or not self.current_image_id or self.current_pixmap.isNull():
+            return None
+        return (self.current_image_id, self.current_pixmap.cacheKey())
+
+    def _request_image_analysis(self):
+        """Start computing the analysis maps of the current microscope image."""
+        key = self._image_analysis_key()
+        if key is None:
+            return
+        self._image_analysis_loader.cancel_all(keep={key})
+        if self.current_image_type == "microscope":
+            self._image_analysis_loader.request(key, self.current_pixmap.toImage())
+
+    def _get_image_analysis(self):
+        """Return the cached analysis maps of the current image, computing them if needed."""
+        key = self._image_analysis_key()
+        if key is None:
+            return None
+        return self._image_analysis_loader.get_now(key, self.current_pixmap.toImage)
+
     def _get_gray_image(self):
         """Return a cached grayscale numpy array of the current image."""
-        if not self.current_pixmap or not self.current_image_id:
-            return None
-        if self.auto_gray_cache_id == self.current_image_id and self.auto_gray_cache is not None:
-            return self.auto_gray_cache
-
-        image = self.current_pixmap.toImage().convertToFormat(QImage.Format.Format_Grayscale8)
-        width = image.width()
-        height = image.height()
-        buf = image.constBits() if hasattr(image, "constBits") else image.bits()
-        arr = np.frombuffer(buf, dtype=np.uint8)
-        bytes_per_line = image.bytesPerLine()
-        gray = arr.reshape((height, bytes_per_line))[:, :width].copy()
-        self.auto_gray_cache = gray
-        self.auto_gray_cache_id = self.current_image_id
-        return gray
+        analysis = self._get_image_analysis()
+        return analysis.gray if analysis is not None else None
 
     def _update_auto_threshold_from_points(self, points):
         """Update the auto threshold based on a refined measurement."""
@@ -6277,41 +6374,20 @@ class MainWindow(QMainWindow):
         max_radius = self._update_auto_max_radius_from_points(points)
         max_radius = max_radius or min(h, w) / 2
         ring_radius = int(min(max_radius * 1.2, min(h, w) / 2))
-        ring_samples = []
-        for angle in range(0, 360, 30):
-            rad = math.radians(angle)
-            rx = int(round(cx + math.cos(rad) * ring_radius))
-            ry = int(round(cy + math.sin(rad) * ring_radius))
-            if 0 <= rx < w and 0 <= ry < h:
-                ring_samples.append(float(gray[ry, rx]))
-        bg_mean = float(np.mean(ring_samples)) if ring_samples else center_intensity
+        bg_mean = ring_background(gray, cx, cy, ring_radius)
+        if bg_mean is None:
+            bg_mean = center_intensity
         threshold = abs(bg_mean - edge_mean) / 255.0
         threshold = max(0.02, min(0.6, threshold))
         self.auto_threshold = threshold
         ObservationDB.set_auto_threshold(self.active_observation_id, threshold)
 
     def _auto_find_radii(self, cx, cy, gray, background_mean,
-                         threshold, max_radius, angle_step=10):
-        """Return radii at sampled angles using inward search."""
-        height, width = gray.shape
-        delta = max(2.0, threshold * 255.0)
-        def hit(val):
-            return abs(val - background_mean) >= delta
-
-        radii = {}
-        for angle in range(0, 180, angle_step):
-            rad = math.radians(angle)
-            dx = math.cos(rad)
-            dy = math.sin(rad)
-            for r in range(max_radius, 0, -1):
-                x = int(round(cx + dx * r))
-                y = int(round(cy + dy * r))
-                if x < 0 or y < 0 or x >= width or y >= height:
-                    break
-                if hit(float(gray[y, x])):
-                    radii[angle] = r
-                    break
-        return radii
+                         threshold, max_radius, angle_step=DEFAULT_ANGLE_STEP_DEG):
+        """Return sub-pixel radii at sampled angles using inward search."""
+        return find_edge_radii(
+            gray, cx, cy, background_mean, threshold, max_radius, angle_step=angle_step
+        )
 
     def _update_auto_max_radius_from_points(self, points):
         """Update max recorded spore radius (pixels) from measurement points."""
@@ -6380,18 +6456,13 @@ class MainWindow(QMainWindow):
         max_radius = self.auto_max_radius if self.auto_max_radius else min(width, height) / 2
         max_radius = int(min(max_radius * 1.2, min(width, height) / 2))
         max_radius = max(10, max_radius)
-        ring_samples = []
-        for angle in range(0, 360, 30):
-            rad = math.radians(angle)
-            rx = int(round(cx + math.cos(rad) * max_radius))
-            ry = int(round(cy + math.sin(rad) * max_radius))
-            if 0 <= rx < width and 0 <= ry < height:
-                ring_samples.append(float(gray[ry, rx]))
-        bg_mean = float(np.mean(ring_samples)) if ring_samples else center_intensity
-
-        radii = self._auto_find_radii(cx, cy, gray, bg_mean, threshold, max_radius, angle_step=10)
-
-        if len(radii) < 4:
+        bg_mean = ring_background(gray, cx, cy, max_radius)
+        if bg_mean is None:
+            bg_mean = center_intensity
+
+        radii = self._auto_find_radii(cx, cy, gray, bg_mean, threshold, max_radius)
+
+        if len(radii) < min_edge_rays(DEFAULT_ANGLE_STEP_DEG):
             self.show_auto_debug_dialog(
                 pos, radii, None, None, threshold, center_intensity, bg_mean, max_radius
             )
@@ -6399,18 +6470,7 @@ class MainWindow(QMainWindow):
             self.measure_status_label.setStyleSheet("color: #e67e22; font-weight: bold; font-size: 9pt;")
             return
 
-        major_angle = max(radii, key=lambda a: radii[a])
-        major_radius = radii[major_angle]
-        target_minor = (major_angle + 90) % 180
-        minor_angle = min(
-            radii.keys(),
-            key=lambda a: min(
-                abs(a - target_minor),
-                abs(a - target_minor + 180),
-                abs(a - target_minor - 180)
-            )
-        )
-        minor_radius = radii.get(minor_angle, min(radii.values()))
+        major_angle, major_radius, minor_angle, minor_radius = pick_axes(radii, DEFAULT_ANGLE_STEP_DEG)
 
         major_rad = math.radians(major_angle)
         minor_rad = math.radians(minor_angle)
@@ -6454,11 +6514,22 @@ class MainWindow(QMainWindow):
         bottom = min(self.current_pixmap.height(), int(center.y() + half))
         crop_rect = QRectF(left, top, right - left, bottom - top)
 
-        gray = self._get_gray_image()
+        analysis = self._get_image_analysis()
+        gray = analysis.gray if analysis is not None else None
         gray_crop = None
+        gradient_crop = None
         if gray is not None:
-            gray_crop = gray[int(crop_rect.y()):int(crop_rect.y() + crop_rect.height()),
-                            int(crop_rect.x()):int(crop_rect.x() + crop_rect.width())].copy()
+            crop_slice = (
+                slice(int(crop_rect.y()), int(crop_rect.y() + crop_rect.height())),
+                slice(int(crop_rect.x()), int(crop_rect.x() + crop_rect.width())),
+            )
+            gray_crop = gray[crop_slice].copy()
+            gradient = analysis.gradient[crop_slice]
+            peak = float(gradient.max()) if gradient.size else 0.0
+            gradient_crop = np.ascontiguousarray(
+                np.clip(gradient * (255.0 / peak), 0, 255) if peak > 0 else np.zeros_like(gradient),
+                dtype=np.uint8,
+            )
 
         image_label = QLabel()
         layout.addWidget(image_label)
@@ -6471,10 +6542,12 @@ class MainWindow(QMainWindow):
         threshold_input.setSingleStep(0.01)
         threshold_input.setValue(float(threshold))
         show_gray_checkbox = QCheckBox(self.tr("Show grayscale"))
+        show_gradient_checkbox = QCheckBox(self.tr("Show gradient"))
         controls_row.addWidget(threshold_label)
         controls_row.addWidget(threshold_input)
         controls_row.addStretch()
         controls_row.addWidget(show_gray_checkbox)
+        controls_row.addWidget(show_gradient_checkbox)
         layout.addLayout(controls_row)
 
         stats_label = QLabel()
@@ -6491,8 +6564,7 @@ class MainWindow(QMainWindow):
                 gray,
                 background_mean,
                 current_threshold,
-                max_radius,
-                angle_step=10
+                max_radius
             ) if gray is not None else {}
 
             full_radii = dict(base_radii)
@@ -6501,19 +6573,15 @@ class MainWindow(QMainWindow):
 
             major = None
             minor = None
-            if base_radii:
-                major = max(base_radii, key=lambda a: base_radii[a])
-                target_minor = (major + 90) % 180
-                minor = min(
-                    base_radii.keys(),
-                    key=lambda a: min(
-                        abs(a - target_minor),
-                        abs(a - target_minor + 180),
-                        abs(a - target_minor - 180)
-                    )
-                )
-
-            if show_gray_checkbox.isChecked() and gray_crop is not None:
+            axes = pick_axes(base_radii, DEFAULT_ANGLE_STEP_DEG)
+            if axes is not None:
+                major, _major_radius, minor, _minor_radius = axes
+
+            if show_gradient_checkbox.isChecked() and gradient_crop is not None:
+                h, w = gradient_crop.shape
+                gradient_img = QImage(gradient_crop.data, w, h, w, QImage.Format.Format_Grayscale8)
+                base_pixmap = QPixmap.fromImage(gradient_img.copy())
+            elif show_gray_checkbox.isChecked() and gray_crop is not None:
                 h, w = gray_crop.shape
                 gray_img = QImage(gray_crop.data, w, h, w, QImage.Format.Format_Grayscale8)
                 base_pixmap = QPixmap.fromImage(gray_img.copy())
@@ -6620,7 +6688,10 @@ class MainWindow(QMainWindow):
 
             cx = int(round(center.x()))
             cy = int(round(center.y()))
-            for angle in range(0, 180, 10):
+            # Traces every 10 degrees, plus the chosen axes.
+            trace_angles = set(range(0, 180, 10))
+            trace_angles.update(a for a in (major, minor) if a is not None)
+            for angle in sorted(trace_angles):
                 rad = math.radians(angle)
                 dx = math.cos(rad)
                 dy = math.sin(rad)
@@ -6644,11 +6715,141 @@ class MainWindow(QMainWindow):
 
         threshold_input.valueChanged.connect(lambda value: render_overlay(value))
         show_gray_checkbox.toggled.connect(lambda _: render_overlay(threshold_input.value()))
+        show_gradient_checkbox.toggled.connect(lambda _: render_overlay(threshold_input.value()))
         render_overlay(threshold_input.value())
 
         dialog.setLayout(layout)
         dialog.exec()
 
+    def detect_all_spores(self):
+        """Detect every spore in the current image in the background."""
+        if not self.current_pixmap or not self.current_image_id:
+            return
+        if self._spore_detection_worker is not None:
+            return
+        # Detected spores are stored in microns, so an unscaled image would give zero sizes.
+        microns_per_pixel = self.microns_per_pixel or 0.0
+        if microns_per_pixel <= 0:
+            self.measure_status_label.setText(self.tr("Set the image scale before detecting spores"))
+            self.measure_status_label.setStyleSheet("color: #e67e22; font-weight: bold; font-size: 9pt;")
+            return
+        analysis = self._get_image_analysis()
+        if analysis is None:
+            return
+        height, width = analysis.shape
+        threshold = self.auto_threshold if self.auto_threshold is not None else self.auto_threshold_default
+        min_radius = max(3.0, 1.0 / microns_per_pixel)
+        if self.auto_max_radius:
+            max_radius = self.auto_max_radius * 1.5
+        else:
+            max_radius = 40.0 / microns_per_pixel
+        max_radius = max(min_radius + 1.0, min(max_radius, min(width, height) / 4))
+
+        worker = SporeDetectionWorker(
+            self.current_image_id, analysis, threshold, min_radius, max_radius, parent=self
+        )
+        worker.resultReady.connect(self._on_spores_detected)
+        worker.error.connect(self._on_spore_detection_error)
+        worker.finished.connect(worker.deleteLater)
+        worker.finished.connect(self._on_spore_detection_finished)
+        self._spore_detection_worker = worker
+        self.detect_spores_button.setEnabled(False)
+        self.measure_status_label.setText(self.tr("Detecting spores..."))
+        self.measure_status_label.setStyleSheet("color: #3498db; font-weight: bold; font-size: 9pt;")
+        worker.start()
+
+    def _on_spore_detection_finished(self):
+        self._spore_detection_worker = None
+        self.detect_spores_button.setEnabled(True)
+
+    def closeEvent(self, event):
+        # The detection worker is parented to the window, so it must not outlive it.
+        worker = self._spore_detection_worker
+        if worker is not None:
+            worker.resultReady.disconnect(self._on_spores_detected)
+            worker.error.disconnect(self._on_spore_detection_error)
+            worker.wait()
+        super().closeEvent(event)
+
+    def _on_spore_detection_error(self, image_id, message):
+        print(f"Warning: Spore detection failed: {message}")
+        if image_id != self.current_image_id:
+            return
+        self.measure_status_label.setText(self.tr("Spore detection failed"))
+        self.measure_status_label.setStyleSheet("color: #e74c3c; font-weight: bold; font-size: 9pt;")
+
+    def _on_spores_detected(self, image_id, candidates):
+        """Store detected spores as measurements awaiting review."""
+        if image_id != self.current_image_id or not self.current_pixmap:
+            return
+        if not self.microns_per_pixel or self.microns_per_pixel <= 0:
+            return
+        # Spores already measured on this image are left alone.
+        candidates = [
+            c for c in candidates
+            if not self._measurement_index.query(c.center_x, c.center_y)
+        ]
+        if not candidates:
+            self.measure_status_label.setText(self.tr("No new spores detected"))
+            self.measure_status_label.setStyleSheet("color: #e67e22; font-weight: bold; font-size: 9pt;")
+            return
+
+        image_shape = (self.current_pixmap.height(), self.current_pixmap.width())
+        conn = get_connection()
+        try:
+            for candidate in candidates:
+                points = [QPointF(x, y) for x, y in candidate.points()]
+                length_um = candidate.length_px * self.microns_per_pixel
+                width_um = candidate.width_px * self.microns_per_pixel
+                q_value = length_um / width_um if width_um > 0 else 0
+                measurement_id = MeasurementDB.add_measurement(
+                    image_id,
+                    length=length_um,
+                    width=width_um,
+                    measurement_type="spores",
+                    notes=f"Q={q_value:.1f}",
+                    points=points,
+                    review_status=REVIEW_PENDING,
+                    conn=conn,
+                )
+                save_spore_annotation(
+                    image_id=image_id,
+                    measurement_id=measurement_id,
+                    points=points,
+                    length_um=length_um,
+                    width_um=width_um,
+                    image_shape=image_shape,
+                    annotation_source="auto",
+                    conn=conn,
+                )
+            ImageDB.update_image(
+                image_id,
+                scale=self.microns_per_pixel,
+                objective_name=self.current_objective_name,
+                conn=conn,
+            )
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            print(f"Warning: Could not save detected spores: {e}")
+            self.measure_status_label.setText(self.tr("Could not save detected spores"))
+            self.measure_status_label.setStyleSheet("color: #e74c3c; font-weight: bold; font-size: 9pt;")
+            return
+        finally:
+            conn.close()
+
+        self.load_measurement_lines()
+        self.update_measurements_table()
+        self.measure_status_label.setText(
+            self.tr("Detected {count} spores - review them in the gallery").format(count=len(candidates))
+        )
+        self.measure_status_label.setStyleSheet("color: #27ae60; font-weight: bold; font-size: 9pt;")
+
+    def accept_detected_spore(self, measurement_id):
+        """Mark a detected spore as reviewed."""
+        MeasurementDB.set_review_status(measurement_id, None)
+        self.update_measurements_table()
+
     def select_measurement_in_table(self, measurement_id):
         """Select a measurement row by id."""
         for row in range(self.measurements_table.rowCount()):
@@ -6830,6 +7031,7 @@ class MainWindow(QMainWindow):
         in database.
         """
         self.measurement_lines = {}
+        self._measurement_index.clear()
         self.temp_lines = []
         self.measurement_labels = []
         self.image_label.set_measurement_lines([])
@@ -6856,6 +7058,7 @@ class MainWindow(QMainWindow):
                 ]
                 lines.append(line2)
             self.measurement_lines[measurement['id']] = lines
+            self._index_measurement(measurement['id'])
             length_um = measurement.get('length_um')
             width_um = measurement.get('width_um')
             if len(lines) >= 2 and (length_um is None or width_um is None):
@@ -6906,7 +7109,7 @@ class MainWindow(QMainWindow):
 
         cursor.execute('''
             UPDATE spore_measurements
-            SET length_um = ?, width_um = ?, notes = ?,
+            SET length_um = ?, width_um = ?, notes = ?, review_status = NULL,
                 p1_x = ?, p1_y = ?, p2_x = ?, p2_y = ?,
                 p3_x = ?, p3_y = ?, p4_x = ?, p4_y = ?
             WHERE id = ?
@@ -6921,6 +7124,7 @@ class MainWindow(QMainWindow):
         conn.close()
 
         self._invalidate_gallery_thumbnail_cache(measurement_id)
+        invalidate_spore_crops(measurement_id)
 
         # Update the UI
         self.update_measurements_table()
@@ -6931,6 +7135,7 @@ class MainWindow(QMainWindow):
         line1 = [new_points[0].x(), new_points[0].y(), new_points[1].x(), new_points[1].y()]
         line2 = [new_points[2].x(), new_points[2].y(), new_points[3].x(), new_points[3].y()]
         self.measurement_lines[measurement_id] = [line1, line2]
+        self._index_measurement(measurement_id)
         measurement_type = None
         for cached in self.measurements_cache:
             if cached.get("id") == measurement_id:
@@ -7244,13 +7449,12 @@ class MainWindow(QMainWindow):
         return pixmap_cache[image_path]
 
     def update_gallery(self):
-        """Update the gallery grid with all measured items."""
+        """Update the gallery strip with all measured items."""
         if not self.is_analysis_visible():
             return
         if self._gallery_refresh_in_progress:
             return
 
-        self._cancel_gallery_render()
         self._gallery_refresh_in_progress = True
 
         category = self.gallery_filter_combo.currentData() if hasattr(self, "gallery_filter_combo") else None
@@ -7273,15 +7477,12 @@ class MainWindow(QMainWindow):
             self._complete_gallery_refresh()
             return
 
-        # Clear existing gallery items
-        while self.gallery_grid.count():
-            item = self.gallery_grid.takeAt(0)
-            if item.widget():
-                item.widget().deleteLater()
-        self._update_gallery_container_size(0)
-
-        measurements = self._filter_gallery_measurements(all_measurements)
+        measurements = [
+            m for m in self._filter_gallery_measurements(all_measurements)
+            if all(m.get(f'p{i}_{axis}') is not None for i in range(1, 5) for axis in ['x', 'y'])
+        ]
         if not measurements:
+            self.gallery_view.gallery_model.clear()
             self._complete_gallery_refresh()
             return
 
@@ -7290,8 +7491,6 @@ class MainWindow(QMainWindow):
         orient = hasattr(self, 'orient_checkbox') and self.orient_checkbox.isChecked()
         uniform_scale = hasattr(self, 'uniform_scale_checkbox') and self.uniform_scale_checkbox.isChecked()
         thumbnail_size = self._gallery_thumbnail_size()
-        total = len(measurements)
-        items_per_row = max(1, total)
 
         uniform_length_um = None
         if uniform_scale:
@@ -7303,51 +7502,21 @@ class MainWindow(QMainWindow):
                     uniform_length_um = length_um
 
         render_state = {
-            "items_per_row": items_per_row,
             "thumbnail_size": thumbnail_size,
             "image_labels": image_labels,
             "orient": orient,
             "uniform_scale": uniform_scale,
             "uniform_length_um": uniform_length_um,
             "image_color_cache": {},
-            "display_index": 1,
         }
 
-        immediate_count = min(7, total)
-        for measurement in measurements[:immediate_count]:
-            self._add_gallery_item(measurement, render_state)
-
-        if total > immediate_count:
-            self._gallery_render_queue = list(measurements[immediate_count:])
-            self._gallery_render_state = render_state
-            self._gallery_render_timer = QTimer(self)
-            self._gallery_render_timer.timeout.connect(self._render_gallery_batch)
-            self._gallery_render_timer.start(10)
-        else:
-            self._complete_gallery_refresh()
-
-    def _cancel_gallery_render(self):
-        if self._gallery_render_timer is not None:
-            self._gallery_render_timer.stop()
-            self._gallery_render_timer.deleteLater()
-            self._gallery_render_timer = None
-        self._gallery_render_queue = []
-        self._gallery_render_state = None
-
-    def _render_gallery_batch(self):
-        if not self._gallery_render_queue or not self._gallery_render_state:
-            self._finish_gallery_render()
-            return
-        batch_size = 4
-        for _ in range(min(batch_size, len(self._gallery_render_queue))):
-            measurement = self._gallery_render_queue.pop(0)
-            self._add_gallery_item(measurement, self._gallery_render_state)
-        QApplication.processEvents()
-        if not self._gallery_render_queue:
-            self._finish_gallery_render()
-
-    def _finish_gallery_render(self):
-        self._cancel_gallery_render()
+        # Thumbnails are rendered by the view as cells become visible.
+        self.gallery_view.gallery_model.set_measurements(
+            measurements,
+            thumbnail_provider=lambda m, state=render_state: self._get_gallery_thumbnail(m, state),
+            orient=orient,
+            image_labels=image_labels,
+        )
         self._complete_gallery_refresh()
 
     def _complete_gallery_refresh(self):
@@ -7377,88 +7546,11 @@ class MainWindow(QMainWindow):
             uniform_key = None
         return (measurement_id, orient, uniform_scale, uniform_key, thumbnail_size, extra_rotation, color_key)
 
-    def _add_gallery_item(self, measurement, render_state):
-        from PySide6.QtWidgets import QLabel as QLabel2, QFrame, QVBoxLayout, QToolButton
-        from PySide6.QtCore import QPointF
-
-        if not all(measurement.get(f'p{i}_{axis}') is not None
-                   for i in range(1, 5) for axis in ['x', 'y']):
-            return
-
-        thumbnail = self._get_gallery_thumbnail(measurement, render_state)
-        if thumbnail is None:
-            return
-
-        thumbnail_size = render_state["thumbnail_size"]
-        orient = render_state["orient"]
-        image_labels = render_state["image_labels"]
-        image_id = measurement.get('image_id')
-        measurement_id = measurement.get('id')
-
-        container = QFrame()
-        container.setFixedSize(thumbnail_size, thumbnail_size)
-        container_layout = QVBoxLayout(container)
-        container_layout.setContentsMargins(0, 0, 0, 0)
-        container_layout.setSpacing(0)
-
-        label = QLabel2()
-        label.setPixmap(thumbnail)
-        label.setFixedSize(thumbnail_size, thumbnail_size)
-        label.setStyleSheet("border: 2px solid #3498db; background: white;")
-        label.setAttribute(Qt.WA_TransparentForMouseEvents, True)
-        container_layout.addWidget(label)
-
-        if orient:
-            rotate_btn = QToolButton(container)
-            rotate_btn.setIcon(QIcon(str(Path(__file__).parent.parent / "assets" / "icons" / "rotate.svg")))
-            rotate_btn.setToolTip("Rotate 180")
-            rotate_btn.setProperty("instant_tooltip", True)
-            rotate_btn.installEventFilter(self)
-            rotate_btn.setFixedSize(24, 24)
-            rotate_btn.setIconSize(QSize(22, 22))
-            rotate_btn.setStyleSheet(
-                "QToolButton { background: transparent; border: none; }"
-                "QToolButton:hover { background-color: rgba(0, 0, 0, 0.08); }"
-            )
-            rotate_btn.move(thumbnail_size - 28, thumbnail_size - 28)
-            rotate_btn.show()
-            rotate_btn.clicked.connect(
-                lambda checked, mid=measurement_id: self.rotate_gallery_thumbnail(mid)
-            )
-            rotate_btn.raise_()
-
-        link_btn = QToolButton(container)
-        link_btn.setIcon(QIcon(str(Path(__file__).parent.parent / "assets" / "icons" / "link.svg")))
-        link_label = image_labels.get(image_id, "Image ?")
-        link_btn.setToolTip(link_label)
-        link_btn.setProperty("instant_tooltip", True)
-        link_btn.installEventFilter(self)
-        link_btn.setFixedSize(24, 24)
-        link_btn.setIconSize(QSize(22, 22))
-        link_btn.setStyleSheet(
-            "QToolButton { background: transparent; border: none; }"
-            "QToolButton:hover { background-color: rgba(0, 0, 0, 0.08); }"
-        )
-        link_btn.move(4, 4)
-        link_btn.show()
-        link_btn.clicked.connect(
-            lambda checked, mid=measurement_id: self.open_measurement_from_gallery(mid)
-        )
-        link_btn.raise_()
-
-        display_index = render_state["display_index"]
-        items_per_row = render_state["items_per_row"]
-        row = (display_index - 1) // items_per_row
-        col = (display_index - 1) % items_per_row
-        self.gallery_grid.addWidget(container, row, col)
-        render_state["display_index"] = display_index + 1
-        self._update_gallery_container_size(render_state["display_index"] - 1)
-
     def _get_gallery_thumbnail(self, measurement, render_state):
         from PySide6.QtCore import QPointF
 
-        pixmap = self.get_measurement_pixmap(measurement, self._gallery_pixmap_cache)
-        if not pixmap or pixmap.isNull():
+        image_path = measurement.get('image_filepath') or self.current_image_path
+        if not image_path:
             return None
 
         measurement_id = measurement['id']
@@ -7518,36 +7610,26 @@ class MainWindow(QMainWindow):
             if mpp and mpp > 0:
                 uniform_length_px = float(render_state["uniform_length_um"]) / float(mpp)
 
-        thumbnail = self.create_spore_thumbnail(
-            pixmap,
+        # The source image is only decoded when the crop is not on disk yet.
+        thumbnail_image = cached_spore_thumbnail(
+            lambda: self.get_measurement_pixmap(measurement, self._gallery_pixmap_cache),
+            image_path,
+            measurement_id,
             points,
             measurement['length_um'],
             measurement['width_um'] or 0,
             render_state["thumbnail_size"],
-            0,
             orient=render_state["orient"],
             extra_rotation=extra_rotation,
             uniform_length_px=uniform_length_px,
             color=measure_color
         )
-        if thumbnail:
-            self._gallery_thumb_cache[cache_key] = thumbnail
+        if thumbnail_image is None:
+            return None
+        thumbnail = QPixmap.fromImage(thumbnail_image)
+        self._gallery_thumb_cache[cache_key] = thumbnail
         return thumbnail
 
-    def _update_gallery_container_size(self, count):
-        if not hasattr(self, "gallery_container") or not hasattr(self, "gallery_grid"):
-            return
-        if count <= 0:
-            self.gallery_container.setMinimumWidth(0)
-            return
-        spacing = self.gallery_grid.spacing()
-        margins = self.gallery_grid.contentsMargins()
-        thumb = self._gallery_thumbnail_size()
-        width = count * thumb + max(0, count - 1) * spacing + margins.left() + margins.right()
-        height = thumb + margins.top() + margins.bottom()
-        self.gallery_container.setMinimumWidth(width)
-        self.gallery_container.setMinimumHeight(height)
-
     def _filter_gallery_measurements(self, measurements):
         """Apply gallery selection filter to measurements."""
         if not measurements:
@@ -7599,6 +7681,8 @@ class MainWindow(QMainWindow):
         measurement_ids = []
         measurement_image_ids = []
         for m in measurements or []:
+            if m.get("review_status") == REVIEW_PENDING:
+                continue
             length = m.get("length_um")
             width = m.get("width_um")
             if length is None or width is None or width <= 0:
@@ -8149,7 +8233,9 @@ class MainWindow(QMainWindow):
             else:
                 stats_line = self.tr("All measurements")
 
-        measurements = MeasurementDB.get_measurements_for_observation(self.active_observation_id)
+        measurements = MeasurementDB.get_measurements_for_observation(
+            self.active_observation_id, include_pending=False
+        )
         rows = ["Width\tLength\tQ"]
         for measurement in measurements or []:
             if category and category != "all":
@@ -8344,7 +8430,7 @@ class MainWindow(QMainWindow):
         """Create a thumbnail image of a single measurement.
 
         Args:
-            pixmap: Source image
+            pixmap: Source image (QPixmap or QImage)
             points: List of 4 QPointF measurement points
             length_um: Length in microns
             width_um: Width in microns
@@ -8353,187 +8439,23 @@ class MainWindow(QMainWindow):
             orient: If True, rotate so length axis is vertical
             extra_rotation: Additional rotation in degrees (e.g., 180 for flip)
         """
-        from PySide6.QtGui import QPainter, QColor, QPolygonF, QPen, QTransform
-        from PySide6.QtCore import QPointF, QRectF
-        import math
-
         if not pixmap:
             return None
-
-        # Calculate center and dimensions
-        line1_mid = QPointF((points[0].x() + points[1].x()) / 2, (points[0].y() + points[1].y()) / 2)
-        line2_mid = QPointF((points[2].x() + points[3].x()) / 2, (points[2].y() + points[3].y()) / 2)
-        center = QPointF((line1_mid.x() + line2_mid.x()) / 2, (line1_mid.y() + line2_mid.y()) / 2)
-
-        # Calculate line lengths
-        line1_vec = QPointF(points[1].x() - points[0].x(), points[1].y() - points[0].y())
-        line2_vec = QPointF(points[3].x() - points[2].x(), points[3].y() - points[2].y())
-        line1_len = math.sqrt(line1_vec.x()**2 + line1_vec.y()**2)
-        line2_len = math.sqrt(line2_vec.x()**2 + line2_vec.y()**2)
-
-        # Keep stable orientation based on the first measurement line
-        length_px = line1_len
-        width_px = line2_len
-
-        # Calculate rotation angle if orient is enabled
-        rotation_angle = extra_rotation  # Start with any manual extra rotation
-        if orient and line1_len > 0:
-            # line1_vec IS the length axis (points[0] to points[1] is the center/length line)
-            # We want this axis to be vertical (pointing up or down)
-            # atan2(x, -y) gives angle from negative y-axis (up direction)
-            current_angle = math.atan2(line1_vec.x(), -line1_vec.y())
-            rotation_angle += -math.degrees(current_angle)
-
-        # If we rotate for orient, rotate the crop source and points too
-        if abs(rotation_angle) > 0.1:
-            center_src = QPointF(pixmap.width() / 2, pixmap.height() / 2)
-            transform = QTransform()
-            transform.translate(center_src.x(), center_src.y())
-            transform.rotate(rotation_angle)
-            transform.translate(-center_src.x(), -center_src.y())
-            rotated_pixmap = pixmap.transformed(transform, Qt.SmoothTransformation)
-
-            # Transform points into rotated pixmap space
-            rotated_points = [transform.map(p) for p in points]
-
-            # Offset if the rotated pixmap origin changed
-            src_rect = transform.mapRect(QRectF(0, 0, pixmap.width(), pixmap.height()))
-            offset = QPointF(-src_rect.x(), -src_rect.y())
-            rotated_points = [p + offset for p in rotated_points]
-            pixmap = rotated_pixmap
-            points = rotated_points
-
-            # Recompute vectors/center with rotated points
-            line1_vec = QPointF(points[1].x() - points[0].x(), points[1].y() - points[0].y())
-            line2_vec = QPointF(points[3].x() - points[2].x(), points[3].y() - points[2].y())
-            line1_len = math.sqrt(line1_vec.x()**2 + line1_vec.y()**2)
-            line2_len = math.sqrt(line2_vec.x()**2 + line2_vec.y()**2)
-            line1_mid = QPointF((points[0].x() + points[1].x()) / 2, (points[0].y() + points[1].y()) / 2)
-            line2_mid = QPointF((points[2].x() + points[3].x()) / 2, (points[2].y() + points[3].y()) / 2)
-            center = QPointF((line1_mid.x() + line2_mid.x()) / 2, (line1_mid.y() + line2_mid.y()) / 2)
-            length_px = line1_len
-            width_px = line2_len
-            rotation_angle = 0
-
-        # Crop parameters
-        max_dim = uniform_length_px if uniform_length_px else max(length_px, width_px)
-        padding = max_dim * 0.15
-        crop_size = max_dim + padding * 2
-
-        # Create crop rectangle
-        crop_rect = QRectF(
-            center.x() - crop_size / 2,
-            center.y() - crop_size / 2,
-            crop_size,
-            crop_size
-        )
-
-        # Ensure within bounds
-        crop_rect = crop_rect.intersected(
-            QRectF(0, 0, pixmap.width(), pixmap.height())
-        )
-
-        # Crop and scale
-        cropped = pixmap.copy(crop_rect.toRect())
-        scaled = cropped.scaled(size, size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-
-        # Draw overlay
-        result = QPixmap(size, size)
-        result.fill(QColor(236, 240, 241))
-
-        painter = QPainter(result)
-        painter.setRenderHint(QPainter.Antialiasing)
-        painter.setRenderHint(QPainter.SmoothPixmapTransform)
-
-        # Calculate center position for drawing
-        img_x = (size - scaled.width()) / 2
-        img_y = (size - scaled.height()) / 2
-
-        # Apply rotation if needed (orient mode or extra rotation)
-        if abs(rotation_angle) > 0.1:
-            painter.save()
-            painter.translate(size / 2, size / 2)
-            painter.rotate(rotation_angle)
-            painter.translate(-size / 2, -size / 2)
-            painter.drawPixmap(int(img_x), int(img_y), scaled)
-            painter.restore()
-        else:
-            painter.drawPixmap(int(img_x), int(img_y), scaled)
-
-        # Draw rectangle overlay
-        length_dir = QPointF(line1_vec.x() / line1_len, line1_vec.y() / line1_len)
-        width_dir = QPointF(-length_dir.y(), length_dir.x())
-        half_length = length_px / 2
-        half_width = width_px / 2
-
-        img_scale = min(
-            scaled.width() / cropped.width(),
-            scaled.height() / cropped.height()
-        )
-
-        # Calculate where the measurement center appears on screen
-        # When crop_rect gets clipped by intersected(), the measurement center
-        # is no longer at the center of the cropped image
-        center_in_crop_x = center.x() - crop_rect.x()
-        center_in_crop_y = center.y() - crop_rect.y()
-        screen_center = QPointF(
-            img_x + center_in_crop_x * img_scale,
-            img_y + center_in_crop_y * img_scale
+        image = pixmap if isinstance(pixmap, QImage) else pixmap.toImage()
+        thumbnail = render_spore_thumbnail(
+            image,
+            points,
+            length_um,
+            width_um,
+            size,
+            orient=orient,
+            extra_rotation=extra_rotation,
+            uniform_length_px=uniform_length_px,
+            color=color,
         )
-
-        # Apply rotation to the rectangle overlay as well
-        if abs(rotation_angle) > 0.1:
-            # Rotate the screen_center around the image center
-            rad = math.radians(rotation_angle)
-            cos_a, sin_a = math.cos(rad), math.sin(rad)
-            cx, cy = size / 2, size / 2
-            dx = screen_center.x() - cx
-            dy = screen_center.y() - cy
-            screen_center = QPointF(
-                cx + dx * cos_a - dy * sin_a,
-                cy + dx * sin_a + dy * cos_a
-            )
-            # Also rotate the axis directions
-            new_length_dir = QPointF(
-                length_dir.x() * cos_a - length_dir.y() * sin_a,
-                length_dir.x() * sin_a + length_dir.y() * cos_a
-            )
-            new_width_dir = QPointF(
-                width_dir.x() * cos_a - width_dir.y() * sin_a,
-                width_dir.x() * sin_a + width_dir.y() * cos_a
-            )
-            length_dir = new_length_dir
-            width_dir = new_width_dir
-
-        axis_length = QPointF(-length_dir.x(), -length_dir.y())
-        axis_width = width_dir
-        corners = [
-            screen_center + axis_width * (-half_width * img_scale) + axis_length * (-half_length * img_scale),
-            screen_center + axis_width * (half_width * img_scale) + axis_length * (-half_length * img_scale),
-            screen_center + axis_width * (half_width * img_scale) + axis_length * (half_length * img_scale),
-            screen_center + axis_width * (-half_width * img_scale) + axis_length * (half_length * img_scale),
-        ]
-
-        stroke_color = QColor(color) if color else QColor(52, 152, 219)
-        light_color = QColor(stroke_color)
-        light_color = light_color.lighter(130)
-        light_color.setAlpha(51)
-        light_pen = QPen(light_color, 3)
-        thin_pen = QPen(stroke_color, 1)
-        painter.setPen(light_pen)
-        painter.drawPolygon(QPolygonF(corners))
-        painter.setPen(thin_pen)
-        painter.drawPolygon(QPolygonF(corners))
-
-        # Draw dimensions
-        painter.setPen(stroke_color)
-        font = painter.font()
-        font.setPointSize(max(8, int(size * 0.045)))
-        painter.setFont(font)
-        painter.drawText(5, size - 10, f"{length_um:.2f} x {width_um:.2f}")
-
-        painter.end()
-        return result
+        if thumbnail is None:
+            return None
+        return QPixmap.fromImage(thumbnail)
 
     def export_gallery_composite(self):
         """Export all spore thumbnails as a single composite image."""
@@ -8547,7 +8469,8 @@ class MainWindow(QMainWindow):
 
         valid_measurements = [
             m for m in measurements
-            if all(m.get(f'p{i}_{axis}') is not None for i in range(1, 5) for axis in ['x', 'y'])
+            if m.get("review_status") != REVIEW_PENDING
+            and all(m.get(f'p{i}_{axis}') is not None for i in range(1, 5) for axis in ['x', 'y'])
         ]
 
         if not valid_measurements:
@@ -8606,8 +8529,8 @@ class MainWindow(QMainWindow):
                     uniform_length_um = length_um
 
         for measurement in filtered_measurements:
-            pixmap = self.get_measurement_pixmap(measurement, pixmap_cache)
-            if not pixmap or pixmap.isNull():
+            image_path = measurement.get('image_filepath') or self.current_image_path
+            if not image_path:
                 continue
 
             measurement_id = measurement['id']
@@ -8652,21 +8575,22 @@ class MainWindow(QMainWindow):
                 if mpp and mpp > 0:
                     uniform_length_px = float(uniform_length_um) / float(mpp)
 
-            thumbnail = self.create_spore_thumbnail(
-                pixmap,
+            thumbnail = cached_spore_thumbnail(
+                lambda m=measurement: self.get_measurement_pixmap(m, pixmap_cache),
+                image_path,
+                measurement_id,
                 points,
                 measurement['length_um'],
                 measurement['width_um'] or 0,
                 thumbnail_size,
-                len(thumbnails) + 1,
                 orient=orient,
                 extra_rotation=extra_rotation,
                 uniform_length_px=uniform_length_px,
                 color=measure_color
             )
 
-            if thumbnail:
-                thumbnails.append(thumbnail)
+            if thumbnail is not None:
+                thumbnails.append(QPixmap.fromImage(thumbnail))
 
         if not thumbnails:
             return
@@ -9217,10 +9141,13 @@ class MainWindow(QMainWindow):
     def delete_measurement(self, measurement_id):
         """Delete a measurement and its associated lines."""
         MeasurementDB.delete_measurement(measurement_id)
+        self._invalidate_gallery_thumbnail_cache(measurement_id)
+        invalidate_spore_crops(measurement_id)
 
         # Remove only the lines for this measurement
         if measurement_id in self.measurement_lines:
             del self.measurement_lines[measurement_id]
+        self._measurement_index.remove(measurement_id)
         self.measurement_labels = [
             label for label in self.measurement_labels
             if label.get("id") != measurement_id
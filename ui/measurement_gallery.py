@@ -0,0 +1,238 @@
+"""Virtualized spore thumbnail strip for the Analysis tab."""
+from __future__ import annotations
+
+from pathlib import Path
+
+from PySide6.QtCore import (
+    QAbstractListModel,
+    QModelIndex,
+    QPoint,
+    QRect,
+    QSize,
+    Qt,
+    Signal,
+)
+from PySide6.QtGui import QColor, QIcon, QPen
+from PySide6.QtWidgets import QAbstractItemView, QListView, QStyledItemDelegate, QToolTip
+
+_ICON_DIR = Path(__file__).parent.parent / "assets" / "icons"
+_ICONS: dict[str, QIcon] = {}
+
+MeasurementRole = Qt.UserRole + 1
+ThumbnailRole = Qt.UserRole + 2
+REVIEW_PENDING = "pending"
+
+
+def _icon(name: str) -> QIcon:
+    icon = _ICONS.get(name)
+    if icon is None:
+        icon = QIcon(str(_ICON_DIR / f"{name}.svg"))
+        _ICONS[name] = icon
+    return icon
+
+
+def _is_pending(measurement: dict | None) -> bool:
+    return bool(measurement) and measurement.get("review_status") == REVIEW_PENDING
+
+
+class MeasurementGalleryModel(QAbstractListModel):
+    """Measurements shown in the gallery; thumbnails are created on demand.
+
+    thumbnail_provider(measurement) is only called when a cell is painted,
+    so off-screen items cost nothing beyond their dict.
+    """
+
+    def __init__(self, thumbnail_provider=None, parent=None):
+        super().__init__(parent)
+        self._measurements: list[dict] = []
+        self._thumbnail_provider = thumbnail_provider
+        self.orient = False
+        self.image_labels: dict = {}
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._measurements)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._measurements):
+            return None
+        measurement = self._measurements[index.row()]
+        if role == MeasurementRole:
+            return measurement
+        if role == ThumbnailRole:
+            if self._thumbnail_provider is None:
+                return None
+            return self._thumbnail_provider(measurement)
+        return None
+
+    def set_measurements(self, measurements, thumbnail_provider=None, orient=False, image_labels=None):
+        self.beginResetModel()
+        self._measurements = list(measurements or [])
+        if thumbnail_provider is not None:
+            self._thumbnail_provider = thumbnail_provider
+        self.orient = bool(orient)
+        self.image_labels = dict(image_labels or {})
+        self.endResetModel()
+
+    def clear(self):
+        self.set_measurements([])
+
+    def measurement_at(self, row: int) -> dict | None:
+        if 0 <= row < len(self._measurements):
+            return self._measurements[row]
+        return None
+
+
+class MeasurementGalleryDelegate(QStyledItemDelegate):
+    """Paint a spore thumbnail with its link and rotate actions.
+
+    Detected spores awaiting review get an orange frame and accept and
+    reject actions.
+    """
+
+    BUTTON_SIZE = 24
+    ICON_SIZE = 22
+
+    def __init__(self, thumbnail_size: int, parent=None):
+        super().__init__(parent)
+        self.thumbnail_size = int(thumbnail_size)
+        self.hover_row = -1
+        self.hover_action = None
+
+    def sizeHint(self, option, index):
+        return QSize(self.thumbnail_size, self.thumbnail_size)
+
+    def action_rects(self, cell: QRect, orient: bool, pending: bool = False) -> dict[str, QRect]:
+        size = self.BUTTON_SIZE
+        rects = {"link": QRect(cell.x() + 4, cell.y() + 4, size, size)}
+        if pending:
+            rects["accept"] = QRect(cell.x() + cell.width() - 56, cell.y() + 4, size, size)
+            rects["reject"] = QRect(cell.x() + cell.width() - 28, cell.y() + 4, size, size)
+        if orient:
+            rects["rotate"] = QRect(
+                cell.x() + cell.width() - 28,
+                cell.y() + cell.height() - 28,
+                size,
+                size,
+            )
+        return rects
+
+    def paint(self, painter, option, index):
+        painter.save()
+        cell = QRect(option.rect.topLeft(), QSize(self.thumbnail_size, self.thumbnail_size))
+        painter.fillRect(cell, QColor("white"))
+        thumbnail = index.data(ThumbnailRole)
+        if thumbnail is not None and not thumbnail.isNull():
+            painter.drawPixmap(cell, thumbnail)
+        pending = _is_pending(index.data(MeasurementRole))
+        painter.setPen(QPen(QColor("#e67e22" if pending else "#3498db"), 2))
+        painter.setBrush(Qt.NoBrush)
+        painter.drawRect(cell.adjusted(1, 1, -1, -1))
+
+        orient = bool(getattr(index.model(), "orient", False))
+        for action, rect in self.action_rects(cell, orient, pending).items():
+            if index.row() == self.hover_row and action == self.hover_action:
+                painter.fillRect(rect, QColor(0, 0, 0, 20))
+            offset = (self.BUTTON_SIZE - self.ICON_SIZE) // 2
+            icon_rect = QRect(rect.x() + offset, rect.y() + offset, self.ICON_SIZE, self.ICON_SIZE)
+            _icon(action).paint(painter, icon_rect)
+        painter.restore()
+
+
+class MeasurementGalleryView(QListView):
+    """Single-row icon view that only renders the visible thumbnails."""
+
+    linkRequested = Signal(int)  # measurement_id
+    rotateRequested = Signal(int)  # measurement_id
+    acceptRequested = Signal(int)  # measurement_id
+    rejectRequested = Signal(int)  # measurement_id
+
+    def __init__(self, thumbnail_size: int, parent=None):
+        super().__init__(parent)
+        self.gallery_model = MeasurementGalleryModel(parent=self)
+        self.gallery_delegate = MeasurementGalleryDelegate(thumbnail_size, self)
+        self.setModel(self.gallery_model)
+        self.setItemDelegate(self.gallery_delegate)
+        self.setViewMode(QListView.IconMode)
+        self.setFlow(QListView.LeftToRight)
+        self.setWrapping(False)
+        self.setMovement(QListView.Static)
+        self.setResizeMode(QListView.Adjust)
+        self.setUniformItemSizes(True)
+        self.setSpacing(5)
+        self.setSelectionMode(QAbstractItemView.NoSelection)
+        self.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.setHorizontalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAsNeeded)
+        self.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.setFocusPolicy(Qt.NoFocus)
+        self.setMouseTracking(True)
+
+    def _action_at(self, pos: QPoint):
+        index = self.indexAt(pos)
+        if not index.isValid():
+            return index, None
+        cell = self.visualRect(index)
+        pending = _is_pending(index.data(MeasurementRole))
+        for action, rect in self.gallery_delegate.action_rects(cell, self.gallery_model.orient, pending).items():
+            if rect.contains(pos):
+                return index, action
+        return index, None
+
+    def _tooltip_for(self, index, action) -> str:
+        if action == "rotate":
+            return "Rotate 180"
+        if action == "accept":
+            return "Accept detected spore"
+        if action == "reject":
+            return "Reject detected spore"
+        measurement = index.data(MeasurementRole) or {}
+        return self.gallery_model.image_labels.get(measurement.get("image_id"), "Image ?")
+
+    def _set_hover(self, row: int, action) -> None:
+        delegate = self.gallery_delegate
+        if delegate.hover_row == row and delegate.hover_action == action:
+            return
+        delegate.hover_row = row
+        delegate.hover_action = action
+        self.viewport().update()
+        if action:
+            index = self.gallery_model.index(row, 0)
+            rect = self.gallery_delegate.action_rects(
+                self.visualRect(index),
+                self.gallery_model.orient,
+                _is_pending(index.data(MeasurementRole)),
+            )[action]
+            QToolTip.showText(
+                self.viewport().mapToGlobal(rect.bottomLeft()),
+                self._tooltip_for(index, action),
+                self.viewport(),
+            )
+        else:
+            QToolTip.hideText()
+
+    def mouseMoveEvent(self, event):
+        index, action = self._action_at(event.position().toPoint())
+        self._set_hover(index.row() if action else -1, action)
+        super().mouseMoveEvent(event)
+
+    def leaveEvent(self, event):
+        self._set_hover(-1, None)
+        super().leaveEvent(event)
+
+    def mouseReleaseEvent(self, event):
+        if event.button() == Qt.LeftButton:
+            index, action = self._action_at(event.position().toPoint())
+            measurement = index.data(MeasurementRole) if action else None
+            if measurement and measurement.get("id") is not None:
+                measurement_id = int(measurement["id"])
+                if action == "rotate":
+                    self.rotateRequested.emit(measurement_id)
+                elif action == "accept":
+                    self.acceptRequested.emit(measurement_id)
+                elif action == "reject":
+                    self.rejectRequested.emit(measurement_id)
+                else:
+                    self.linkRequested.emit(measurement_id)
+                event.accept()
+                return
+        super().mouseReleaseEvent(event)
@@ -22,6 +22,10 @@ import tempfile
 import threading
 import time
 import os
+import uuid
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FuturesTimeoutError
 from queue import SimpleQueue, Empty
 from database.models import ObservationDB, ImageDB, MeasurementDB, SettingsDB, CalibrationDB
 from database.database_tags import DatabaseTerms
@@ -34,11 +38,22 @@ from database.schema import (
     objective_sort_value,
     resolve_objective_key,
 )
-from utils.thumbnail_generator import get_thumbnail_path, generate_all_sizes
+from utils.thumbnail_generator import (
+    SIZE_PRESETS as THUMBNAIL_SIZE_PRESETS,
+    THUMBNAIL_DIR,
+    ensure_thumbnail_dir,
+    get_thumbnail_path,
+    save_thumbnail_records,
+    thumbnail_path_for,
+)
 from utils.image_utils import cleanup_import_temp_file
+from utils.import_processing import prepare_import_image, reserve_resample_path
 from utils.exif_reader import get_image_metadata
+from utils.image_info import get_image_size, hash_file, store_file
 from utils.heic_converter import maybe_convert_heic
 from utils.ml_export import export_coco_format, get_export_summary
+from utils.spore_crop_cache import render_image_spore_crops
+from utils.perceptual_hash import find_similar_images, hash_stored_image, record_image_hash
 from datetime import datetime
 import re
 import requests
@@ -55,6 +70,8 @@ from .hint_status import HintStatusController
 from .zoomable_image_widget import ZoomableImageLabel
 from matplotlib.ticker import MaxNLocator
 
+# Worker processes used to resample imported images.
+IMPORT_MAX_WORKERS = 4
 
 def _parse_observation_datetime(value: str | None) -> QDateTime | None:
     if not value:
@@ -89,6 +106,13 @@ def _extract_coords_from_osm_url(text: str) -> tuple[float, float] | None:
     return None
 
 
+def _same_file_path(first: str | None, second: str | None) -> bool:
+    try:
+        return Path(first).resolve() == Path(second).resolve()
+    except Exception:
+        return first == second
+
+
 class UploadCancelledError(Exception):
     """Raised when user cancels an upload task from the progress dialog."""
 
@@ -717,6 +741,7 @@ class ObservationsTab(QWidget):
         )
         self.gallery_widget.imageClicked.connect(self._on_gallery_image_clicked)
         self.gallery_widget.deleteRequested.connect(self._confirm_delete_image)
+        self.gallery_widget.contextMenuRequested.connect(self._on_gallery_context_menu)
 
         detail_layout.addWidget(self.gallery_widget)
 
@@ -1667,6 +1692,40 @@ class ObservationsTab(QWidget):
                 display_name = f"{genus} {species} {obs['date'] or ''}".strip()
                 self.image_selected.emit(image_id, self.selected_observation_id, display_name)
 
+    def _on_gallery_context_menu(self, image_id, _filepath, global_pos):
+        if not image_id:
+            return
+        menu = QMenu(self)
+        similar_action = menu.addAction(self.tr("Find similar images"))
+        if menu.exec(global_pos) == similar_action:
+            self.show_similar_images(image_id)
+
+    def show_similar_images(self, image_id):
+        """Show near-identical images in the library and open the one picked."""
+        image = ImageDB.get_image(image_id)
+        if not image:
+            return
+        value = hash_stored_image(image)
+        if value is None:
+            self.set_status_message(self.tr("Could not read image."), level="warning")
+            return
+        similar = find_similar_images(value, exclude_ids=[image_id])
+        if not similar:
+            self.set_status_message(self.tr("No similar images found."))
+            return
+        dialog = SimilarImagesDialog(similar, self)
+        dialog.imageChosen.connect(self._open_similar_image)
+        dialog.exec()
+
+    def _open_similar_image(self, image_id, observation_id):
+        obs = ObservationDB.get_observation(observation_id) if observation_id else None
+        if not obs:
+            return
+        genus = obs.get('genus') or ''
+        species = obs.get('species') or obs.get('species_guess') or 'sp.'
+        display_name = f"{genus} {species} {obs['date'] or ''}".strip()
+        self.image_selected.emit(image_id, observation_id, display_name)
+
     def on_selection_changed(self):
         """Update detail view when selection changes."""
         selected_rows = self.table.selectionModel().selectedRows()
@@ -1873,7 +1932,7 @@ class ObservationsTab(QWidget):
             mpp = 0.5
 
         unit, divisor = self._measurement_unit_for_image(image_row.get("image_type"))
-        measurements = MeasurementDB.get_measurements_for_image(int(image_id))
+        measurements = MeasurementDB.get_measurements_for_image(int(image_id), include_pending=False)
         single_lines: list[list[float]] = []
         rectangles: list[list[QPointF]] = []
         labels: list[dict] = []
@@ -2151,7 +2210,7 @@ class ObservationsTab(QWidget):
             "q_minmax": bool(settings.get("q_minmax", False)),
         }
 
-        measurements = MeasurementDB.get_measurements_for_observation(observation_id)
+        measurements = MeasurementDB.get_measurements_for_observation(observation_id, include_pending=False)
         measurements = self._filter_publish_measurements(measurements, category)
         lengths: list[float] = []
         widths: list[float] = []
@@ -2268,8 +2327,7 @@ class ObservationsTab(QWidget):
         cancel_cb=None,
     ) -> str | None:
         parent = self.window()
-        create_thumbnail = getattr(parent, "create_spore_thumbnail", None)
-        if not callable(create_thumbnail):
+        if not callable(getattr(parent, "create_spore_thumbnail", None)):
             return None
 
         if cancel_cb:
@@ -2281,7 +2339,7 @@ class ObservationsTab(QWidget):
         category = settings.get("measurement_type", "all")
         orient = bool(settings.get("orient", True))
         uniform_scale = bool(settings.get("uniform_scale", False))
-        measurements = MeasurementDB.get_measurements_for_observation(observation_id)
+        measurements = MeasurementDB.get_measurements_for_observation(observation_id, include_pending=False)
         measurements = self._filter_publish_measurements(measurements, category)
         valid_measurements = [
             m
@@ -2315,25 +2373,11 @@ class ObservationsTab(QWidget):
                 if uniform_length_um is None or length_f > uniform_length_um:
                     uniform_length_um = length_f
 
-        thumbnails: list[QPixmap] = []
-        total_items = len(valid_measurements)
-        if progress_cb:
-            progress_cb(
-                self.tr("Rendering thumbnail gallery {current}/{total}...").format(
-                    current=0,
-                    total=total_items,
-                ),
-                2,
-                3,
-            )
-        for measurement in valid_measurements:
-            if cancel_cb:
-                cancel_cb()
+        # Group crops by source image so each image is decoded at most once
+        # (and not at all when every crop is already in the disk cache).
+        jobs_by_image: dict[str, list[dict]] = {}
+        for index, measurement in enumerate(valid_measurements):
             image_path = measurement.get("image_filepath")
-            pixmap = QPixmap(image_path)
-            if pixmap.isNull():
-                continue
-
             points = [
                 QPointF(float(measurement["p1_x"]), float(measurement["p1_y"])),
                 QPointF(float(measurement["p2_x"]), float(measurement["p2_y"])),
@@ -2356,55 +2400,137 @@ class ObservationsTab(QWidget):
             if custom_color:
                 measure_color = QColor(custom_color)
 
-            thumb = create_thumbnail(
-                pixmap,
-                points,
-                measurement.get("length_um") or 0,
-                measurement.get("width_um") or 0,
-                thumbnail_size,
-                0,
-                orient=orient,
-                extra_rotation=int(measurement.get("gallery_rotation") or 0),
-                uniform_length_px=uniform_length_px,
-                color=measure_color,
+            jobs_by_image.setdefault(image_path, []).append(
+                {
+                    "index": index,
+                    "measurement_id": measurement.get("id"),
+                    "points": points,
+                    "length_um": measurement.get("length_um") or 0,
+                    "width_um": measurement.get("width_um") or 0,
+                    "size": thumbnail_size,
+                    "orient": orient,
+                    "extra_rotation": int(measurement.get("gallery_rotation") or 0),
+                    "uniform_length_px": uniform_length_px,
+                    "color": QColor(measure_color).name(),
+                }
             )
-            if thumb and not thumb.isNull():
-                thumbnails.append(thumb)
-            if progress_cb:
-                progress_cb(
-                    self.tr("Rendering thumbnail gallery {current}/{total}...").format(
-                        current=len(thumbnails),
-                        total=total_items,
-                    ),
-                    2,
-                    3,
-                )
-
-        if not thumbnails:
-            return None
 
         import math
 
-        cols = max(1, int(math.ceil(math.sqrt(len(thumbnails)))))
-        rows = int(math.ceil(len(thumbnails) / cols))
+        total_items = len(valid_measurements)
         spacing = 12
-        canvas_w = cols * thumbnail_size + (cols + 1) * spacing
-        canvas_h = rows * thumbnail_size + (rows + 1) * spacing
 
-        canvas = QPixmap(canvas_w, canvas_h)
-        canvas.fill(QColor("white"))
+        def grid_for(count: int) -> tuple[int, int]:
+            cols = max(1, int(math.ceil(math.sqrt(count))))
+            return cols, int(math.ceil(count / cols))
+
+        def slot_origin(slot: int, cols: int) -> tuple[int, int]:
+            return (
+                spacing + (slot % cols) * (thumbnail_size + spacing),
+                spacing + (slot // cols) * (thumbnail_size + spacing),
+            )
+
+        def new_canvas(cols: int, rows: int) -> QImage:
+            canvas = QImage(
+                cols * thumbnail_size + (cols + 1) * spacing,
+                rows * thumbnail_size + (rows + 1) * spacing,
+                QImage.Format_RGB32,
+            )
+            canvas.fill(QColor("white"))
+            return canvas
+
         if progress_cb:
-            progress_cb(self.tr("Composing thumbnail gallery image..."), 3, 3)
+            progress_cb(
+                self.tr("Rendering thumbnail gallery {current}/{total}...").format(
+                    current=0,
+                    total=total_items,
+                ),
+                2,
+                3,
+            )
+
+        results: SimpleQueue[tuple[int, QImage | None]] = SimpleQueue()
+        stop_event = threading.Event()
+
+        def render_image(image_path: str, jobs: list[dict]) -> None:
+            emitted: set[int] = set()
+            try:
+                for index, thumb in render_image_spore_crops(
+                    image_path, jobs, should_stop=stop_event.is_set
+                ):
+                    emitted.add(index)
+                    results.put((index, thumb))
+            except Exception as exc:
+                print(f"Warning: Could not render gallery thumbnails for {image_path}: {exc}")
+            finally:
+                for job in jobs:
+                    if job["index"] not in emitted:
+                        results.put((job["index"], None))
+
+        # The canvas is laid out for every item and filled in list order as
+        # crops arrive, so finished thumbnails are not all held in memory.
+        cols, rows = grid_for(total_items)
+        canvas = new_canvas(cols, rows)
         painter = QPainter(canvas)
-        for idx, thumb in enumerate(thumbnails):
-            if cancel_cb:
-                cancel_cb()
-            row = idx // cols
-            col = idx % cols
-            x = spacing + col * (thumbnail_size + spacing)
-            y = spacing + row * (thumbnail_size + spacing)
-            painter.drawPixmap(x, y, thumb)
-        painter.end()
+        waiting: dict[int, QImage | None] = {}
+        next_index = 0
+        placed = 0
+        received = 0
+        workers = max(1, min(len(jobs_by_image), os.cpu_count() or 1, 4))
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="publish-mosaic")
+        try:
+            for image_path, jobs in jobs_by_image.items():
+                executor.submit(render_image, image_path, jobs)
+            while received < total_items:
+                if cancel_cb:
+                    cancel_cb()
+                try:
+                    index, thumb = results.get(timeout=0.05)
+                except Empty:
+                    continue
+                received += 1
+                waiting[index] = thumb
+                while next_index in waiting:
+                    thumb = waiting.pop(next_index)
+                    next_index += 1
+                    if thumb is None or thumb.isNull():
+                        continue
+                    x, y = slot_origin(placed, cols)
+                    painter.drawImage(x, y, thumb)
+                    placed += 1
+                if progress_cb:
+                    progress_cb(
+                        self.tr("Rendering thumbnail gallery {current}/{total}...").format(
+                            current=received,
+                            total=total_items,
+                        ),
+                        2,
+                        3,
+                    )
+        finally:
+            painter.end()
+            stop_event.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        if not placed:
+            return None
+
+        if progress_cb:
+            progress_cb(self.tr("Composing thumbnail gallery image..."), 3, 3)
+        if placed < total_items:
+            # Some crops failed: repack the drawn cells into a grid sized for
+            # the thumbnails that actually exist.
+            packed_cols, packed_rows = grid_for(placed)
+            packed = new_canvas(packed_cols, packed_rows)
+            painter = QPainter(packed)
+            for slot in range(placed):
+                if cancel_cb:
+                    cancel_cb()
+                sx, sy = slot_origin(slot, cols)
+                x, y = slot_origin(slot, packed_cols)
+                painter.drawImage(x, y, canvas, sx, sy, thumbnail_size, thumbnail_size)
+            painter.end()
+            canvas = packed
 
         out_path = temp_dir / "gallery_mosaic.png"
         if not canvas.save(str(out_path), "PNG"):
@@ -3089,11 +3215,12 @@ class ObservationsTab(QWidget):
                     allow_nulls=True
                 )
 
-                self._apply_import_results_to_observation(
+                timings = self._apply_import_results_to_observation(
                     obs_id,
                     image_results,
                     existing_images=existing_images
                 )
+                self._report_import_timings(timings)
 
                 self.refresh_observations()
                 for row, obs in enumerate(ObservationDB.get_all_observations()):
@@ -3195,7 +3322,7 @@ class ObservationsTab(QWidget):
                         QApplication.processEvents()
 
                 try:
-                    self._apply_import_results_to_observation(
+                    timings = self._apply_import_results_to_observation(
                         obs_id,
                         image_results,
                         progress_cb=progress_cb,
@@ -3204,6 +3331,7 @@ class ObservationsTab(QWidget):
                     if progress is not None:
                         progress.setValue(total_images)
                         progress.close()
+                self._report_import_timings(timings)
 
                 self.refresh_observations()
                 for row, obs in enumerate(ObservationDB.get_all_observations()):
@@ -3445,66 +3573,36 @@ class ObservationsTab(QWidget):
             return 1.0
         return max(0.01, float(factor))
 
-    def _resample_import_image(
-        self,
-        source_path: str,
-        scale_factor: float,
-        output_dir: Path,
-    ) -> str | None:
-        if not source_path or scale_factor >= 0.999:
-            return source_path
+    def _get_resize_jpeg_quality(self) -> int:
+        quality = SettingsDB.get_setting("resize_jpeg_quality", 80)
         try:
-            with Image.open(source_path) as img:
-                exif_bytes = None
-                try:
-                    exif = img.getexif()
-                    if exif:
-                        exif_bytes = exif.tobytes()
-                except Exception:
-                    exif_bytes = None
-                new_w = max(1, int(round(img.width * scale_factor)))
-                new_h = max(1, int(round(img.height * scale_factor)))
-                resized = img.resize((new_w, new_h), Image.LANCZOS)
-                src_path = Path(source_path)
-                suffix = src_path.suffix or ".jpg"
-                temp_path = output_dir / f"{src_path.stem}_resized{suffix}"
-                counter = 1
-                while temp_path.exists():
-                    temp_path = output_dir / f"{src_path.stem}_resized_{counter}{suffix}"
-                    counter += 1
-                save_kwargs = {}
-                fmt = img.format or None
-                if suffix.lower() in {".jpg", ".jpeg"}:
-                    resized = resized.convert("RGB")
-                    quality = SettingsDB.get_setting("resize_jpeg_quality", 80)
-                    try:
-                        quality = int(quality)
-                    except (TypeError, ValueError):
-                        quality = 80
-                    quality = max(1, min(100, quality))
-                    save_kwargs["quality"] = quality
-                    fmt = "JPEG"
-                    if exif_bytes:
-                        save_kwargs["exif"] = exif_bytes
-                resized.save(temp_path, format=fmt, **save_kwargs)
-                return str(temp_path)
-        except Exception as exc:
-            print(f"Warning: Could not resize image {source_path}: {exc}")
-            return source_path
+            quality = int(quality)
+        except (TypeError, ValueError):
+            quality = 80
+        return max(1, min(100, quality))
+
+    def _create_import_executor(self, job_count: int):
+        """Return a process pool for import jobs, or a thread pool if one cannot be used."""
+        workers = max(1, min(IMPORT_MAX_WORKERS, os.cpu_count() or 1, job_count))
+        if workers > 1:
+            try:
+                return ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            except Exception as exc:
+                print(f"Warning: Could not start import worker processes: {exc}")
+        return ThreadPoolExecutor(max_workers=workers)
 
     def _get_image_size(self, path: str | None) -> tuple[int, int] | None:
-        if not path:
-            return None
-        try:
-            with Image.open(path) as img:
-                return img.width, img.height
-        except Exception:
-            return None
+        return get_image_size(path)
 
-    def _scale_measurement_points(self, image_id: int, scale_factor: float) -> None:
+    def _scale_measurement_points(self, image_id: int, scale_factor: float, conn=None) -> None:
         if not image_id or not scale_factor or scale_factor <= 0:
             return
-        conn = get_connection()
+        own_conn = conn is None
+        if own_conn:
+            conn = get_connection()
         cursor = conn.cursor()
         cursor.execute(
             '''
@@ -3525,14 +3623,16 @@ class ObservationsTab(QWidget):
                 image_id,
             ]
         )
-        conn.commit()
-        conn.close()
+        if own_conn:
+            conn.commit()
+            conn.close()
 
     def _rescale_measurement_lengths(
         self,
         image_id: int,
         old_scale: float | None,
         new_scale: float | None,
+        conn=None,
     ) -> None:
         if (
             not image_id
@@ -3545,7 +3645,9 @@ class ObservationsTab(QWidget):
         ratio = float(new_scale) / float(old_scale)
         if abs(ratio - 1.0) < 1e-6:
             return
-        conn = get_connection()
+        own_conn = conn is None
+        if own_conn:
+            conn = get_connection()
         cursor = conn.cursor()
         cursor.execute(
             '''
@@ -3556,8 +3658,9 @@ class ObservationsTab(QWidget):
             ''',
             (ratio, ratio, image_id)
         )
-        conn.commit()
-        conn.close()
+        if own_conn:
+            conn.commit()
+            conn.close()
 
     def _maybe_remove_image_file(
         self,
@@ -3600,15 +3703,16 @@ class ObservationsTab(QWidget):
         storage_mode: str,
         images_root: Path,
         obs_folder: Path | None,
-    ) -> tuple[str | None, bool]:
+    ) -> tuple[str | None, bool, str | None]:
+        """Copy an original into originals storage; returns (path, stored, content hash)."""
         if storage_mode == "none" or not source_path:
-            return None, False
+            return None, False, None
         try:
             source = Path(source_path).resolve()
         except Exception:
-            return None, False
+            return None, False, None
         if not source.exists():
-            return None, False
+            return None, False, None
         target_dir = None
         if storage_mode == "global":
             base = self._get_originals_base_dir()
@@ -3624,14 +3728,14 @@ class ObservationsTab(QWidget):
             if obs_folder:
                 target_dir = obs_folder / "originals"
         if not target_dir:
-            return None, False
+            return None, False, None
         try:
             target_dir.mkdir(parents=True, exist_ok=True)
         except Exception:
-            return None, False
+            return None, False, None
         try:
             if source.is_relative_to(target_dir.resolve()):
-                return str(source), True
+                return str(source), True, hash_file(source)
         except Exception:
             pass
         dest = target_dir / source.name
@@ -3640,11 +3744,11 @@ class ObservationsTab(QWidget):
             dest = target_dir / f"{source.stem}_{counter}{source.suffix}"
             counter += 1
         try:
-            shutil.copy2(source, dest)
+            content_hash = store_file(source, dest)
         except Exception as exc:
             print(f"Warning: Could not copy original image: {exc}")
-            return None, False
-        return str(dest), True
+            return None, False, None
+        return str(dest), True, content_hash
 
     def _apply_import_results_to_observation(
         self,
@@ -3652,15 +3756,29 @@ class ObservationsTab(QWidget):
         results: list[ImageImportResult],
         existing_images: list[dict] | None = None,
         progress_cb=None,
-    ) -> None:
+    ) -> dict:
+        """Store import results on an observation and return per-stage timings.
+
+        Every image is planned first. Resampling and thumbnails then run in
+        worker processes while a single I/O thread copies finished files
+        into the observation folder, in order, and all rows are written in
+        one transaction at the end.
+        """
+        started = time.perf_counter()
+        timings = dict.fromkeys(
+            ("plan", "process", "resample", "thumbnails", "copy", "database", "cleanup", "total"),
+            0.0,
+        )
         objectives = load_objectives()
         images_root = Path(get_images_dir())
         output_dir = images_root / "imports"
         output_dir.mkdir(parents=True, exist_ok=True)
+        ensure_thumbnail_dir()
         existing_by_id = {
             img.get("id"): img for img in (existing_images or []) if img.get("id")
         }
         storage_mode = self._get_original_storage_mode()
+        jpeg_quality = self._get_resize_jpeg_quality()
         obs_folder = None
         try:
             obs = ObservationDB.get_observation(obs_id)
@@ -3678,9 +3796,8 @@ class ObservationsTab(QWidget):
             ImageDB.delete_image(image_id)
 
         total = len(results)
+        plans = []
         for index, result in enumerate(results, start=1):
-            if progress_cb:
-                progress_cb(index, total, result)
             image_type = result.image_type or "field"
             objective_key = result.objective
             if objective_key and objective_key not in objectives:
@@ -3757,6 +3874,17 @@ class ObservationsTab(QWidget):
                     and resample_factor < 0.999
                     and not already_resized
                 )
+                plan = {
+                    "index": index,
+                    "result": result,
+                    "existing": existing,
+                    "existing_path": existing_path,
+                    "existing_scale": existing_scale,
+                    "apply_resample": apply_resample,
+                    "resample_factor": resample_factor,
+                    "scale": scale,
+                    "update_kwargs": update_kwargs,
+                }
                 if apply_resample and existing_path:
                     resample_dir = None
                     try:
@@ -3768,74 +3896,20 @@ class ObservationsTab(QWidget):
                     if resample_dir is None:
                         resample_dir = output_dir
                     resample_dir.mkdir(parents=True, exist_ok=True)
-                    resampled_path = self._resample_import_image(
-                        existing_path,
-                        resample_factor,
-                        resample_dir,
-                    ) or existing_path
-                    if resampled_path != existing_path:
-                        if scale is not None and resample_factor > 0:
-                            scale = float(scale) / float(resample_factor)
-                            update_kwargs["scale"] = scale
-                        update_kwargs["filepath"] = resampled_path
-                        update_kwargs["resample_scale_factor"] = resample_factor
-
-                        crop_box = result.ai_crop_box
-                        if crop_box:
-                            update_kwargs["ai_crop_box"] = tuple(v * resample_factor for v in crop_box)
-                        source_size = result.ai_crop_source_size
-                        if source_size:
-                            update_kwargs["ai_crop_source_size"] = (
-                                int(round(source_size[0] * resample_factor)),
-                                int(round(source_size[1] * resample_factor)),
-                            )
-                        else:
-                            size = self._get_image_size(existing_path)
-                            if size:
-                                update_kwargs["ai_crop_source_size"] = (
-                                    int(round(size[0] * resample_factor)),
-                                    int(round(size[1] * resample_factor)),
-                                )
-
-                        self._scale_measurement_points(result.image_id, resample_factor)
-
-                        copied_original = False
-                        if storage_mode != "none":
-                            original_source = None
-                            if existing:
-                                original_source = existing.get("original_filepath")
-                            if not original_source:
-                                original_source = existing_path
-                            dest_original, copied_original = self._store_original_for_observation(
-                                obs_id,
-                                original_source,
-                                storage_mode,
-                                images_root,
-                                obs_folder,
-                            )
-                            update_kwargs["original_filepath"] = dest_original or original_source
-                        else:
-                            update_kwargs["original_filepath"] = None
-
-                        try:
-                            generate_all_sizes(resampled_path, result.image_id)
-                        except Exception as e:
-                            print(f"Warning: Could not regenerate thumbnails for {resampled_path}: {e}")
-                        self._maybe_remove_image_file(
-                            existing_path,
-                            resampled_path,
-                            not (storage_mode == "none" or copied_original),
-                            images_root,
-                        )
-
-                if not apply_resample:
-                    self._rescale_measurement_lengths(
-                        result.image_id,
-                        existing_scale,
-                        scale,
-                    )
-
-                ImageDB.update_image(result.image_id, **update_kwargs)
+                    if not result.ai_crop_source_size:
+                        plan["source_size"] = self._get_image_size(existing_path)
+                    pending = uuid.uuid4().hex
+                    plan["job"] = {
+                        "source": existing_path,
+                        "scale_factor": resample_factor,
+                        "resample_path": str(reserve_resample_path(existing_path, resample_dir)),
+                        "jpeg_quality": jpeg_quality,
+                        "thumbnails": [
+                            (preset, size, str(THUMBNAIL_DIR / f"pending_{pending}_{preset}.jpg"))
+                            for preset, size in THUMBNAIL_SIZE_PRESETS.items()
+                        ],
+                    }
+                plans.append(plan)
                 continue
 
             filepath = result.filepath
@@ -3848,13 +3922,13 @@ class ObservationsTab(QWidget):
                 calibration_id = CalibrationDB.get_active_calibration_id(objective_name)
             resample_factor = self._compute_resample_scale_factor(result, scale, objective_entry)
             result.resample_scale_factor = resample_factor
-            resampled_path = final_path
+            resample_path = None
             if (
                 image_type == "microscope"
                 and getattr(result, "resize_to_optimal", True)
                 and resample_factor < 0.999
             ):
-                resampled_path = self._resample_import_image(final_path, resample_factor, output_dir) or final_path
+                resample_path = str(reserve_resample_path(final_path, output_dir))
                 if scale is not None and resample_factor > 0:
                     scale = float(scale) / float(resample_factor)
 
@@ -3865,33 +3939,291 @@ class ObservationsTab(QWidget):
                 and resample_factor < 0.999
             ):
                 original_to_store = result.original_filepath or final_path
-            image_id = ImageDB.add_image(
-                observation_id=obs_id,
-                filepath=resampled_path,
-                image_type=image_type,
-                scale=scale,
-                objective_name=objective_name,
-                contrast=contrast,
-                mount_medium=mount_medium,
-                sample_type=sample_type,
-                calibration_id=calibration_id,
-                ai_crop_box=result.ai_crop_box,
-                ai_crop_source_size=result.ai_crop_source_size,
-                gps_source=result.gps_source,
-                resample_scale_factor=resample_factor,
-                original_filepath=original_to_store,
+            pending = uuid.uuid4().hex
+            plans.append({
+                "index": index,
+                "result": result,
+                "filepath": filepath,
+                "final_path": final_path,
+                "source_path": result.source_path or result.original_filepath or filepath,
+                "original_to_store": original_to_store,
+                "add_kwargs": dict(
+                    observation_id=obs_id,
+                    image_type=image_type,
+                    scale=scale,
+                    objective_name=objective_name,
+                    contrast=contrast,
+                    mount_medium=mount_medium,
+                    sample_type=sample_type,
+                    calibration_id=calibration_id,
+                    ai_crop_box=result.ai_crop_box,
+                    ai_crop_source_size=result.ai_crop_source_size,
+                    gps_source=result.gps_source,
+                    resample_scale_factor=resample_factor,
+                ),
+                "job": {
+                    "source": final_path,
+                    "scale_factor": resample_factor,
+                    "resample_path": resample_path,
+                    "jpeg_quality": jpeg_quality,
+                    "thumbnails": [
+                        (preset, size, str(THUMBNAIL_DIR / f"pending_{pending}_{preset}.jpg"))
+                        for preset, size in THUMBNAIL_SIZE_PRESETS.items()
+                    ],
+                },
+            })
+        timings["plan"] = time.perf_counter() - started
+        timings["images"] = len(plans)
+
+        def store_existing(plan: dict, stored_from: str) -> dict:
+            start = time.perf_counter()
+            copied_original = False
+            original_filepath = None
+            original_hash = None
+            if storage_mode != "none":
+                existing = plan["existing"]
+                original_source = existing.get("original_filepath") if existing else None
+                if not original_source:
+                    original_source = plan["existing_path"]
+                dest_original, copied_original, original_hash = self._store_original_for_observation(
+                    obs_id,
+                    original_source,
+                    storage_mode,
+                    images_root,
+                    obs_folder,
+                )
+                original_filepath = dest_original or original_source
+            # Files created here are removed again if the transaction fails.
+            placed = [stored_from]
+            if copied_original and dest_original and not _same_file_path(dest_original, original_source):
+                placed.append(dest_original)
+            stored = {
+                "filepath": stored_from,
+                "original_filepath": original_filepath,
+                "original_hash": original_hash if copied_original else None,
+                "copied_original": copied_original,
+                "file_info": ImageDB._read_file_info(stored_from),
+                "placed": placed,
+            }
+            stored["seconds"] = time.perf_counter() - start
+            return stored
+
+        def store_new(plan: dict, stored_from: str) -> dict:
+            start = time.perf_counter()
+            placed = ImageDB.store_image_files(
+                obs_id,
+                stored_from,
+                plan["original_to_store"],
             )
+            file_info = ImageDB._read_file_info(placed["filepath"], content_hash=placed["content_hash"])
+            source_path = plan["source_path"]
+            stored = {
+                "filepath": placed["filepath"],
+                "original_filepath": placed["original_filepath"],
+                "original_hash": placed["original_hash"],
+                "file_info": file_info,
+                "source_identity": ImageDB._read_source_identity(
+                    source_path,
+                    source_hash=file_info.get("content_hash") if source_path == stored_from else None,
+                ),
+                # store_image_files() only returns hashes for files it placed.
+                "placed": [
+                    path
+                    for path, content_hash in (
+                        (placed["filepath"], placed["content_hash"]),
+                        (placed["original_filepath"], placed["original_hash"]),
+                    )
+                    if path and content_hash
+                ],
+            }
+            stored["seconds"] = time.perf_counter() - start
+            return stored
+
+        stage_start = time.perf_counter()
+        jobs = [plan for plan in plans if plan.get("job")]
+        executor = self._create_import_executor(len(jobs)) if jobs else None
+        io_executor = ThreadPoolExecutor(max_workers=1)
+        try:
+            for plan in jobs:
+                plan["future"] = executor.submit(prepare_import_image, plan["job"])
+            for plan in plans:
+                if progress_cb:
+                    progress_cb(plan["index"], total, plan["result"])
+                future = plan.get("future")
+                if future is None:
+                    continue
+                outcome = None
+                while outcome is None:
+                    try:
+                        outcome = future.result(timeout=0.1)
+                    except FuturesTimeoutError:
+                        if progress_cb:
+                            progress_cb(plan["index"], total, plan["result"])
+                    except Exception as exc:
+                        # A broken worker pool should not lose the import.
+                        print(f"Warning: Import worker failed, processing {plan['job']['source']} here: {exc}")
+                        outcome = prepare_import_image(plan["job"])
+                plan["outcome"] = outcome
+                timings["resample"] += outcome["timings"]["resample"]
+                timings["thumbnails"] += outcome["timings"]["thumbnails"]
+                if "existing_path" in plan:
+                    if outcome["resampled"]:
+                        plan["stored"] = io_executor.submit(store_existing, plan, outcome["stored_from"])
+                else:
+                    plan["stored"] = io_executor.submit(store_new, plan, outcome["stored_from"])
+            for plan in plans:
+                if plan.get("stored") is not None:
+                    plan["stored"] = plan["stored"].result()
+                    timings["copy"] += plan["stored"]["seconds"]
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True, cancel_futures=True)
+            io_executor.shutdown(wait=True)
+        timings["process"] = time.perf_counter() - stage_start
+
+        stage_start = time.perf_counter()
+        hashed = []
+        # Thumbnails are written to pending paths and only moved into place
+        # once the rows that point at them are committed.
+        thumbnail_moves = []
+        conn = get_connection()
+        try:
+            cursor = conn.cursor()
+            for plan in plans:
+                result = plan["result"]
+                outcome = plan.get("outcome") or {}
+                stored = plan.get("stored")
+                if "existing_path" in plan:
+                    update_kwargs = plan["update_kwargs"]
+                    resample_factor = plan["resample_factor"]
+                    if stored:
+                        scale = plan["scale"]
+                        if scale is not None and resample_factor > 0:
+                            update_kwargs["scale"] = float(scale) / float(resample_factor)
+                        update_kwargs["filepath"] = stored["filepath"]
+                        update_kwargs["file_info"] = stored["file_info"]
+                        update_kwargs["resample_scale_factor"] = resample_factor
+                        update_kwargs["original_filepath"] = stored["original_filepath"]
+                        update_kwargs["original_hash"] = stored["original_hash"]
+
+                        crop_box = result.ai_crop_box
+                        if crop_box:
+                            update_kwargs["ai_crop_box"] = tuple(v * resample_factor for v in crop_box)
+                        source_size = result.ai_crop_source_size or plan.get("source_size")
+                        if source_size:
+                            update_kwargs["ai_crop_source_size"] = (
+                                int(round(source_size[0] * resample_factor)),
+                                int(round(source_size[1] * resample_factor)),
+                            )
+
+                        self._scale_measurement_points(result.image_id, resample_factor, conn=conn)
+                        thumbnails = {}
+                        for preset, pending_path in (outcome.get("thumbnails") or {}).items():
+                            thumbnail_path = thumbnail_path_for(result.image_id, preset)
+                            thumbnail_moves.append((pending_path, thumbnail_path, stored["filepath"]))
+                            thumbnails[preset] = str(thumbnail_path)
+                        save_thumbnail_records(cursor, result.image_id, thumbnails)
+                        ImageDB.set_dhash(result.image_id, outcome.get("dhash"), conn=conn)
+                        hashed.append((result.image_id, outcome.get("dhash")))
+                    if not plan["apply_resample"]:
+                        self._rescale_measurement_lengths(
+                            result.image_id,
+                            plan["existing_scale"],
+                            plan["scale"],
+                            conn=conn,
+                        )
+                    ImageDB.update_image(result.image_id, conn=conn, **update_kwargs)
+                    continue
 
-            stored_path = resampled_path
+                image_id = ImageDB.add_image(
+                    filepath=stored["filepath"],
+                    original_filepath=stored["original_filepath"],
+                    files_stored=True,
+                    file_info=stored["file_info"],
+                    original_hash=stored["original_hash"],
+                    source_identity=stored["source_identity"],
+                    conn=conn,
+                    **plan["add_kwargs"],
+                )
+                thumbnails = {}
+                for preset, pending_path in (outcome.get("thumbnails") or {}).items():
+                    thumbnail_path = thumbnail_path_for(image_id, preset)
+                    thumbnail_moves.append((pending_path, thumbnail_path, stored["filepath"]))
+                    thumbnails[preset] = str(thumbnail_path)
+                save_thumbnail_records(cursor, image_id, thumbnails)
+                ImageDB.set_dhash(image_id, outcome.get("dhash"), conn=conn)
+                hashed.append((image_id, outcome.get("dhash")))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            for plan in plans:
+                outcome = plan.get("outcome") or {}
+                for pending_path in (outcome.get("thumbnails") or {}).values():
+                    Path(pending_path).unlink(missing_ok=True)
+                for path in (plan.get("stored") or {}).get("placed", []):
+                    try:
+                        Path(path).unlink(missing_ok=True)
+                    except OSError as e:
+                        print(f"Warning: Could not remove {path}: {e}")
+                if "existing_path" not in plan and outcome.get("stored_from"):
+                    cleanup_import_temp_file(
+                        plan["filepath"], outcome["stored_from"], plan["final_path"], output_dir
+                    )
+            raise
+        finally:
+            conn.close()
+        moved = set()
+        for pending_path, thumbnail_path, image_path in thumbnail_moves:
             try:
-                image_data = ImageDB.get_image(image_id)
-                stored_path = image_data.get("filepath") if image_data else resampled_path
-                generate_all_sizes(stored_path, image_id)
-            except Exception as e:
-                print(f"Warning: Could not generate thumbnails for {resampled_path}: {e}")
-            cleanup_import_temp_file(filepath, final_path, stored_path, output_dir)
-            if resampled_path and resampled_path != final_path:
-                cleanup_import_temp_file(filepath, resampled_path, stored_path, output_dir)
+                os.replace(pending_path, thumbnail_path)
+                moved.add(pending_path)
+            except OSError as e:
+                print(f"Warning: Could not generate thumbnails for {image_path}: {e}")
+        for plan in plans:
+            # Thumbnails of existing images that ended up not resampled are unused.
+            for pending_path in ((plan.get("outcome") or {}).get("thumbnails") or {}).values():
+                if pending_path not in moved:
+                    Path(pending_path).unlink(missing_ok=True)
+        for image_id, dhash in hashed:
+            record_image_hash(image_id, dhash)
+        timings["database"] = time.perf_counter() - stage_start
+
+        stage_start = time.perf_counter()
+        for plan in plans:
+            stored = plan.get("stored")
+            if not stored:
+                continue
+            if "existing_path" in plan:
+                self._maybe_remove_image_file(
+                    plan["existing_path"],
+                    stored["filepath"],
+                    not (storage_mode == "none" or stored["copied_original"]),
+                    images_root,
+                )
+                continue
+            filepath = plan["filepath"]
+            final_path = plan["final_path"]
+            stored_from = plan["outcome"]["stored_from"]
+            cleanup_import_temp_file(filepath, final_path, stored["filepath"], output_dir)
+            if stored_from != final_path:
+                cleanup_import_temp_file(filepath, stored_from, stored["filepath"], output_dir)
+        timings["cleanup"] = time.perf_counter() - stage_start
+        timings["total"] = time.perf_counter() - started
+        return timings
+
+    @staticmethod
+    def _report_import_timings(timings: dict) -> None:
+        """Print the stage timings returned by _apply_import_results_to_observation."""
+        if not timings.get("images"):
+            return
+        print(
+            f"Imported {timings['images']} image(s) in {timings['total']:.2f}s: "
+            f"plan {timings['plan']:.2f}s, "
+            f"resample/copy {timings['process']:.2f}s "
+            f"(resample {timings['resample']:.2f}s, thumbnails {timings['thumbnails']:.2f}s, "
+            f"copy {timings['copy']:.2f}s), "
+            f"database {timings['database']:.2f}s, cleanup {timings['cleanup']:.2f}s"
+        )
 
 
 class ObservationDetailsDialog(QDialog):
@@ -5305,6 +5637,9 @@ class ObservationDetailsDialog(QDialog):
     def _refresh_image_gallery_summary(self) -> None:
         if not hasattr(self, "image_gallery"):
             return
+        measured_ids = MeasurementDB.get_image_ids_with_measurements(
+            [item.image_id for item in self.image_results if item.image_id]
+        )
         items = []
         for idx, item in enumerate(self.image_results):
             thumb_preview = None
@@ -5335,9 +5670,6 @@ class ObservationDetailsDialog(QDialog):
                 needs_scale=needs_scale,
                 translate=self.tr,
             )
-            has_measurements = False
-            if item.image_id:
-                has_measurements = bool(MeasurementDB.get_measurements_for_image(item.image_id))
             items.append(
                 {
                     "id": item.image_id,
@@ -5349,7 +5681,7 @@ class ObservationDetailsDialog(QDialog):
                     "gps_tag_text": self.tr("GPS") if gps_match else None,
                     "gps_tag_highlight": gps_match,
                     "badges": badges,
-                    "has_measurements": has_measurements,
+                    "has_measurements": bool(item.image_id) and item.image_id in measured_ids,
                 }
             )
         self.image_gallery.set_items(items)
@@ -5911,6 +6243,61 @@ class ObservationDetailsDialog(QDialog):
         self._maybe_set_vernacular_from_taxon()
 
 
+class SimilarImagesDialog(QDialog):
+    """List near-identical images, nearest first; clicking one opens it."""
+
+    imageChosen = Signal(int, int)  # image_id, observation_id
+
+    def __init__(self, images: list[dict], parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(self.tr("Similar Images"))
+        self.setMinimumSize(640, 360)
+        self._observations = {img["id"]: img.get("observation_id") for img in images}
+
+        layout = QVBoxLayout(self)
+        gallery = ImageGalleryWidget(
+            self.tr("Similar images"),
+            self,
+            show_delete=False,
+            show_badges=True,
+            min_height=200,
+            default_height=300,
+        )
+        titles = {}
+        items = []
+        for rank, img in enumerate(images, start=1):
+            obs_id = img.get("observation_id")
+            if obs_id not in titles:
+                obs = ObservationDB.get_observation(obs_id) if obs_id else None
+                if obs:
+                    name = f"{obs.get('genus') or ''} {obs.get('species') or obs.get('species_guess') or ''}"
+                    titles[obs_id] = name.strip() or f"#{obs_id}"
+                else:
+                    titles[obs_id] = self.tr("No observation")
+            items.append(
+                {
+                    "id": img["id"],
+                    "filepath": img["filepath"],
+                    "image_number": rank,
+                    "badges": [titles[obs_id], self.tr("distance {0}").format(img["distance"])],
+                }
+            )
+        gallery.set_items(items)
+        gallery.imageClicked.connect(self._on_image_clicked)
+        layout.addWidget(gallery)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.Close)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+
+    def _on_image_clicked(self, image_id, _filepath):
+        observation_id = self._observations.get(image_id)
+        if not image_id or not observation_id:
+            return
+        self.accept()
+        self.imageChosen.emit(int(image_id), int(observation_id))
+
+
 class RenameObservationDialog(QDialog):
     """Dialog for renaming an observation."""
 
@@ -5,6 +5,10 @@ from PySide6.QtCore import Qt, QPoint, QRect, QPointF, Signal, QRectF, QSize
 from PySide6.QtSvg import QSvgGenerator
 import math
 
+from utils.image_pyramid import load_pyramid, needs_pyramid, oriented_image_size
+from utils.spatial_index import GridIndex, bbox_from_lines, bbox_from_points
+from .image_loader import ImageLoader, PyramidBuilder
+
 
 class ZoomableImageLabel(QLabel):
     """Custom label that supports zoom, pan, and measurement overlays."""
@@ -25,9 +29,29 @@ class ZoomableImageLabel(QLabel):
         self._corner_tag_text = ""
         self._corner_tag_color = QColor(149, 165, 166)
         self._full_loaded = False
+        self._image_loader = ImageLoader(self)
+        self._image_loader.pixmapReady.connect(self._on_full_resolution_ready)
+        # Tiled pyramid for very large images (tiles in full-resolution pixels)
+        self._pyramid_source = None
+        self._pyramid = None
+        self._pyramid_base = None
+        self._tile_cache = {}
+        self._tile_cache_order = []
+        self._tile_cache_max = 96
+        self._pyramid_builder = PyramidBuilder(self)
+        self._pyramid_builder.pyramidReady.connect(self._on_pyramid_ready)
+        self._tile_loader = ImageLoader(self)
+        self._tile_loader.pixmapReady.connect(self._on_tile_loaded)
+        # Cached render layers (see paintEvent)
+        self._image_layer = None
+        self._image_layer_key = None
+        self._overlay_layer = None
+        self._overlay_layer_key = None
         self.measurement_lines = []
         self.debug_line_layers = []
         self.measurement_rectangles = []
+        self._rect_index = GridIndex()
+        self._line_index = GridIndex()
         self.preview_line = None  # Temporary line being drawn
         self.preview_rect = None  # Temporary rectangle preview
         self.objective_text = ""
@@ -75,8 +99,13 @@ class ZoomableImageLabel(QLabel):
 
     def set_image_sources(self, pixmap, full_path=None, preview_scaled=False):
         """Set image with optional full-resolution source."""
+        self._image_loader.cancel_all()
         self.original_pixmap = pixmap
         self._full_image_path = str(full_path) if full_path else None
+        # A resize preview must keep showing the resampled pixels, so tiles
+        # are only used when the preview stands in for the full image.
+        self._set_pyramid_source(self._full_image_path if preview_scaled else None, pixmap, full=False)
+        self._overlay_layer = None
         self._preview_is_scaled = bool(preview_scaled)
         self._preview_tag_text = "Preview" if self._preview_is_scaled else ""
         self._corner_tag_text = ""
@@ -231,10 +260,17 @@ class ZoomableImageLabel(QLabel):
         top_mid = _offset_from_edge(corners[0], corners[1], center)
         return left_mid, top_mid
 
-    def set_image(self, pixmap, preserve_view: bool = False):
-        """Set the image to display, optionally preserving zoom/pan."""
+    def set_image(self, pixmap, preserve_view: bool = False, source_path=None):
+        """Set the image to display, optionally preserving zoom/pan.
+
+        source_path is the file the pixmap was decoded from; large images
+        get a tiled pyramid built from it for faster pan and zoom.
+        """
+        self._image_loader.cancel_all()
         self.original_pixmap = pixmap
         self._full_image_path = None
+        self._set_pyramid_source(str(source_path) if source_path and pixmap else None, pixmap, full=True)
+        self._overlay_layer = None
         self._preview_is_scaled = False
         self._preview_tag_text = ""
         self._corner_tag_text = ""
@@ -253,45 +289,180 @@ class ZoomableImageLabel(QLabel):
             self.zoom_level = max(self.min_zoom, min(self.max_zoom, self.zoom_level))
             self.update()
 
+    def _set_pyramid_source(self, path, pixmap=None, full=True):
+        """Use (or start building) a tiled pyramid for path if it is large.
+
+        With full=True pixmap is the decoded file: its size decides whether
+        tiles are worth it and the tiles are built from it, so they match
+        the displayed pixels and the file is not decoded again. Otherwise
+        pixmap is a scaled preview and the file is read with its EXIF
+        orientation, skipping tiles if the preview was not oriented alike.
+        """
+        if path == self._pyramid_source:
+            return
+        self._pyramid_source = path
+        self._pyramid = None
+        self._pyramid_base = None
+        self._tile_cache.clear()
+        self._tile_cache_order.clear()
+        self._tile_loader.cancel_all()
+        self._pyramid_builder.cancel_all()
+        if not path:
+            return
+        image = None
+        if full and pixmap is not None and not pixmap.isNull():
+            size = (pixmap.width(), pixmap.height())
+            if needs_pyramid(*size):
+                image = pixmap.toImage()
+        else:
+            size = oriented_image_size(path)
+            if size and pixmap is not None and not pixmap.isNull():
+                preview_landscape = pixmap.width() >= pixmap.height()
+                if preview_landscape != (size[0] >= size[1]) and pixmap.width() != pixmap.height():
+                    return
+        if not size or not needs_pyramid(*size):
+            return
+        info = load_pyramid(path)
+        if info and (info.width, info.height) == tuple(size):
+            self._apply_pyramid(info)
+        else:
+            self._pyramid_builder.request(path, image)
+
+    def _on_pyramid_ready(self, path, info):
+        if path != self._pyramid_source or info is None:
+            return
+        self._apply_pyramid(info)
+        self.update()
+
+    def _apply_pyramid(self, info):
+        top = info.levels - 1
+        base = QPixmap(str(info.tile_path(top, 0, 0)))
+        if base.isNull():
+            return
+        self._pyramid = info
+        self._pyramid_base = base
+
+    def _on_tile_loaded(self, path, pixmap):
+        if not self._pyramid or pixmap.isNull():
+            return
+        if path in self._tile_cache_order:
+            self._tile_cache_order.remove(path)
+        self._tile_cache[path] = pixmap
+        self._tile_cache_order.append(path)
+        while len(self._tile_cache_order) > self._tile_cache_max:
+            oldest = self._tile_cache_order.pop(0)
+            self._tile_cache.pop(oldest, None)
+        self._image_layer = None
+        self.update()
+
+    def _draw_pyramid_tiles(self, painter, display_rect):
+        """Draw only the visible tiles of the pyramid level matching the zoom.
+
+        Returns False when the caller should draw original_pixmap instead:
+        when there is no pyramid, or at full resolution (level 0) once the
+        full image is loaded. Level-0 tiles are lossy JPEG, so they only
+        stand in for a preview until the full image arrives.
+        """
+        info = self._pyramid
+        if info is None or self._pyramid_base is None or display_rect.isEmpty():
+            return False
+        sx = display_rect.width() / info.width
+        sy = display_rect.height() / info.height
+        level = info.level_for_scale(max(sx, sy))
+        if level == 0:
+            if self._full_loaded:
+                return False
+            self._request_full_resolution()
+        factor = 1 << level
+        tile = info.tile_size
+        level_w, level_h = info.level_size(level)
+        cols, rows = info.tile_grid(level)
+
+        # Coarsest level as a backdrop until the finer tiles arrive.
+        painter.drawPixmap(display_rect, self._pyramid_base)
+
+        view = self.rect().intersected(display_rect)
+        if view.isEmpty():
+            return True
+        step_x = tile * factor * sx
+        step_y = tile * factor * sy
+        tx0 = max(0, int((view.left() - display_rect.x()) // step_x))
+        tx1 = min(cols - 1, int((view.right() - display_rect.x()) // step_x))
+        ty0 = max(0, int((view.top() - display_rect.y()) // step_y))
+        ty1 = min(rows - 1, int((view.bottom() - display_rect.y()) // step_y))
+
+        def _edge(origin, level_px, scale):
+            return int(round(origin + level_px * factor * scale))
+
+        wanted = []
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing, False)
+        for ty in range(ty0, ty1 + 1):
+            top = _edge(display_rect.y(), ty * tile, sy)
+            bottom = _edge(display_rect.y(), min(level_h, (ty + 1) * tile), sy)
+            for tx in range(tx0, tx1 + 1):
+                path = str(info.tile_path(level, tx, ty))
+                pixmap = self._tile_cache.get(path)
+                if pixmap is None:
+                    wanted.append(path)
+                    continue
+                left = _edge(display_rect.x(), tx * tile, sx)
+                right = _edge(display_rect.x(), min(level_w, (tx + 1) * tile), sx)
+                painter.drawPixmap(QRect(left, top, right - left, bottom - top), pixmap)
+        painter.restore()
+
+        self._tile_loader.cancel_all(keep=set(wanted))
+        for rank, path in enumerate(wanted):
+            self._tile_loader.request(path, priority=len(wanted) - rank)
+        return True
+
     def set_measurement_lines(self, lines):
         """Set the measurement lines to draw."""
         self.measurement_lines = lines
+        self._line_index.sync({
+            idx: bbox_from_lines([line]) for idx, line in enumerate(lines or [])
+        })
         self.hover_line_index = -1
-        self.update()
+        self._invalidate_overlays()
 
     def set_debug_lines(self, layers):
         """Set debug line layers to draw (list of {lines, color, width, show_endcaps})."""
         self.debug_line_layers = layers or []
-        self.update()
+        # Blended layers are drawn into the image layer (see _paint_image_layer).
+        self._image_layer = None
+        self._invalidate_overlays()
 
     def set_measurement_color(self, color):
         """Set the color for measurement overlays."""
         self.measure_color = QColor(color)
-        self.update()
+        self._invalidate_overlays()
 
     def set_show_line_endcaps(self, show_endcaps: bool):
         """Toggle perpendicular end marks for measurement lines."""
         self.show_line_endcaps = bool(show_endcaps)
-        self.update()
+        self._invalidate_overlays()
 
     def set_microns_per_pixel(self, mpp):
         """Set scale for converting microns to pixels."""
         if mpp and mpp > 0:
             self.microns_per_pixel = mpp
-        self.update()
+        self._invalidate_overlays()
 
     def set_scale_bar(self, show, microns):
         """Toggle and set scale bar size in microns."""
         self.show_scale_bar = bool(show)
         if microns and microns > 0:
             self.scale_bar_um = float(microns)
-        self.update()
+        self._invalidate_overlays()
 
     def set_measurement_rectangles(self, rectangles):
         """Set the measurement rectangles to draw."""
         self.measurement_rectangles = rectangles
+        self._rect_index.sync({
+            idx: bbox_from_points(rect) for idx, rect in enumerate(rectangles or [])
+        })
         self.hover_rect_index = -1
-        self.update()
+        self._invalidate_overlays()
 
     def set_selected_rect_index(self, index):
         self.selected_rect_index = index if index is not None else -1
@@ -304,24 +475,26 @@ class ZoomableImageLabel(QLabel):
     def set_measurement_labels(self, labels):
         """Set label positions and values for measurements."""
         self.measurement_labels = labels
-        self.update()
+        self._invalidate_overlays()
 
     def set_show_measure_overlays(self, show_overlays):
         """Toggle measurement overlay visibility."""
         self.show_measure_overlays = bool(show_overlays)
-        self.update()
+        if self.debug_line_layers:
+            self._image_layer = None
+        self._invalidate_overlays()
 
     def set_show_measure_labels(self, show_labels):
         """Toggle measurement label display."""
         self.show_measure_labels = show_labels
-        self.update()
+        self._invalidate_overlays()
 
     def set_corner_tag(self, text, color=None):
         """Set a tag rendered in the lower-right corner."""
         self._corner_tag_text = str(text) if text else ""
         if color is not None:
             self._corner_tag_color = QColor(color)
-        self.update()
+        self._invalidate_overlays()
 
     def set_pan_without_shift(self, enabled):
         """Allow panning with a plain left-drag (no Shift)."""
@@ -368,12 +541,12 @@ class ZoomableImageLabel(QLabel):
     def set_overlay_boxes(self, boxes):
         """Set extra overlay boxes drawn on top of the image."""
         self.overlay_boxes = boxes or []
-        self.update()
+        self._invalidate_overlays()
 
     def clear_overlay_boxes(self):
         """Clear overlay boxes."""
         self.overlay_boxes = []
-        self.update()
+        self._invalidate_overlays()
 
     def set_crop_mode(self, enabled):
         """Enable crop selection mode."""
@@ -445,12 +618,12 @@ class ZoomableImageLabel(QLabel):
     def set_objective_text(self, text):
         """Set the objective tag text."""
         self.objective_text = text
-        self.update()
+        self._invalidate_overlays()
 
     def set_objective_color(self, color):
         """Set the objective tag color."""
         self.objective_color = QColor(color)
-        self.update()
+        self._invalidate_overlays()
 
     def reset_view(self):
         """Reset zoom to fit image within the window."""
@@ -490,8 +663,8 @@ class ZoomableImageLabel(QLabel):
         """Zoom in by 20%."""
         self._auto_fit_pending = False
         self.zoom_level = min(self.zoom_level * 1.2, self.max_zoom)
-        if self.zoom_level > 1.0 and self._preview_is_scaled and not self._full_loaded:
-            self._load_full_resolution()
+        if self.zoom_level > 1.0 and self._preview_is_scaled and not self._full_loaded and self._pyramid is None:
+            self._request_full_resolution()
         self.update()
 
     def zoom_out(self):
@@ -531,8 +704,8 @@ class ZoomableImageLabel(QLabel):
             # Update pan offset to keep point under cursor fixed
             self.pan_offset = cursor_pos - widget_center - new_relative_pos
 
-        if self.zoom_level > 1.0 and self._preview_is_scaled and not self._full_loaded:
-            self._load_full_resolution()
+        if self.zoom_level > 1.0 and self._preview_is_scaled and not self._full_loaded and self._pyramid is None:
+            self._request_full_resolution()
         self.update()
 
     def resizeEvent(self, event):
@@ -542,13 +715,26 @@ class ZoomableImageLabel(QLabel):
                 self.reset_view()
                 self._auto_fit_pending = False
 
+    def _request_full_resolution(self):
+        """Decode the full-resolution source in the background."""
+        if self._full_image_path:
+            self._image_loader.request(self._full_image_path)
+
+    def _on_full_resolution_ready(self, path, full_pixmap):
+        if path != self._full_image_path or self._full_loaded:
+            return
+        self._apply_full_resolution(full_pixmap)
+
     def _load_full_resolution(self):
         if not self._full_image_path:
             return
         try:
-            full_pixmap = QPixmap(self._full_image_path)
+            full_pixmap = self._image_loader.load_now(self._full_image_path)
         except Exception:
             return
+        self._apply_full_resolution(full_pixmap)
+
+    def _apply_full_resolution(self, full_pixmap):
         if full_pixmap.isNull() or not self.original_pixmap:
             return
 
@@ -589,6 +775,7 @@ class ZoomableImageLabel(QLabel):
             )
 
         self.original_pixmap = full_pixmap
+        self._overlay_layer = None
         self.zoom_level = new_zoom
         self._preview_is_scaled = False
         self._preview_tag_text = ""
@@ -817,8 +1004,8 @@ class ZoomableImageLabel(QLabel):
             return
 
         hovered = -1
-        for idx, rect in enumerate(self.measurement_rectangles):
-            if self._point_in_polygon(image_pos, rect):
+        for idx in sorted(self._rect_index.query(image_pos.x(), image_pos.y())):
+            if self._point_in_polygon(image_pos, self.measurement_rectangles[idx]):
                 hovered = idx
                 break
 
@@ -849,7 +1036,8 @@ class ZoomableImageLabel(QLabel):
         threshold = 6.0 / self.zoom_level if self.zoom_level else 6.0
         hovered = -1
         best_dist = threshold
-        for idx, line in enumerate(self.measurement_lines):
+        for idx in sorted(self._line_index.query(image_pos.x(), image_pos.y(), threshold)):
+            line = self.measurement_lines[idx]
             p1 = QPointF(line[0], line[1])
             p2 = QPointF(line[2], line[3])
             dist = self._distance_point_to_segment(image_pos, p1, p2)
@@ -1117,28 +1305,112 @@ class ZoomableImageLabel(QLabel):
             painter.setPen(QColor(0, 0, 0))
             painter.drawText(int(text_x), int(text_y), label)
 
-    def paintEvent(self, event):
-        """Custom paint event to draw image, overlays, and measurements."""
-        painter = QPainter(self)
-        painter.setRenderHint(QPainter.Antialiasing)
-        painter.setRenderHint(QPainter.SmoothPixmapTransform)
+    _DEBUG_COMPOSITION_MODES = {
+        "overlay": QPainter.CompositionMode_Overlay,
+        "screen": QPainter.CompositionMode_Screen,
+        "plus": QPainter.CompositionMode_Plus,
+        "lighten": QPainter.CompositionMode_Lighten,
+    }
 
-        # Fill background
-        painter.fillRect(self.rect(), QColor(236, 240, 241))
+    def _invalidate_overlays(self):
+        """Drop the cached overlay layer and schedule a repaint."""
+        self._overlay_layer = None
+        self.update()
 
-        if not self.original_pixmap:
-            # Draw placeholder text
-            painter.setPen(QColor(127, 140, 141))
-            painter.drawText(self.rect(), Qt.AlignCenter, "Load an image to begin")
-            painter.end()
-            return
+    def _layer_key(self, display_rect):
+        return (
+            self.width(),
+            self.height(),
+            self.devicePixelRatioF(),
+            display_rect.x(),
+            display_rect.y(),
+            display_rect.width(),
+            display_rect.height(),
+            self.zoom_level,
+        )
 
-        # Get display rectangle
-        display_rect = self.get_display_rect()
+    def _new_layer(self):
+        dpr = self.devicePixelRatioF()
+        layer = QPixmap(
+            max(1, int(math.ceil(self.width() * dpr))),
+            max(1, int(math.ceil(self.height() * dpr))),
+        )
+        layer.setDevicePixelRatio(dpr)
+        layer.fill(Qt.transparent)
+        return layer
+
+    def _paint_image_layer(self, painter, display_rect):
+        """Draw background and the image scaled to the current zoom.
+
+        Debug line layers with a composition mode blend against the image,
+        so they are drawn here rather than into the transparent overlay layer.
+        """
+        painter.fillRect(self.rect(), QColor(236, 240, 241))
+        if not self._draw_pyramid_tiles(painter, display_rect):
+            painter.drawPixmap(display_rect, self.original_pixmap)
+        if self.show_measure_overlays and self.debug_line_layers:
+            self._paint_debug_line_layers(painter, display_rect, blended=True)
+
+    def _paint_debug_line_layers(self, painter, display_rect, blended):
+        """Draw the debug line layers with (blended) or without a composition mode."""
+        for layer in self.debug_line_layers:
+            painter.save()
+            lines = layer.get("lines") if isinstance(layer, dict) else None
+            if not lines:
+                painter.restore()
+                continue
+            color = layer.get("color", QColor(52, 152, 219)) if isinstance(layer, dict) else QColor(52, 152, 219)
+            width = layer.get("width", 2) if isinstance(layer, dict) else 2
+            dashed = bool(layer.get("dashed", False)) if isinstance(layer, dict) else False
+            show_endcaps = bool(layer.get("show_endcaps", False)) if isinstance(layer, dict) else False
+            composition = layer.get("composition") if isinstance(layer, dict) else None
+            mode = self._DEBUG_COMPOSITION_MODES.get(composition)
+            if (mode is not None) != blended:
+                painter.restore()
+                continue
+
+            if isinstance(color, tuple):
+                if len(color) == 4:
+                    color = QColor(*color)
+                elif len(color) == 3:
+                    color = QColor(*color)
+            elif isinstance(color, str):
+                color = QColor(color)
+
+            if mode is not None:
+                painter.setCompositionMode(mode)
+
+            pen = QPen(color, width)
+            if dashed:
+                pen.setStyle(Qt.DashLine)
+            painter.setPen(pen)
+            for line in lines:
+                p1_x = display_rect.x() + line[0] * self.zoom_level
+                p1_y = display_rect.y() + line[1] * self.zoom_level
+                p2_x = display_rect.x() + line[2] * self.zoom_level
+                p2_y = display_rect.y() + line[3] * self.zoom_level
+                painter.drawLine(int(p1_x), int(p1_y), int(p2_x), int(p2_y))
 
-        # Draw the image
-        painter.drawPixmap(display_rect, self.original_pixmap)
+                if show_endcaps:
+                    dx = p2_x - p1_x
+                    dy = p2_y - p1_y
+                    length = math.sqrt(dx**2 + dy**2)
+                    if length > 0:
+                        perp_x = -dy / length
+                        perp_y = dx / length
+                        mark_len = 5
+                        painter.drawLine(
+                            int(p1_x - perp_x * mark_len), int(p1_y - perp_y * mark_len),
+                            int(p1_x + perp_x * mark_len), int(p1_y + perp_y * mark_len)
+                        )
+                        painter.drawLine(
+                            int(p2_x - perp_x * mark_len), int(p2_y - perp_y * mark_len),
+                            int(p2_x + perp_x * mark_len), int(p2_y + perp_y * mark_len)
+                        )
+            painter.restore()
 
+    def _paint_overlay_layer(self, painter, display_rect):
+        """Draw overlays that only change with measurements or the view."""
         # Draw overlay boxes (e.g., AI bounding boxes)
         if self.overlay_boxes:
             for item in self.overlay_boxes:
@@ -1160,62 +1432,12 @@ class ZoomableImageLabel(QLabel):
                 painter.setBrush(Qt.NoBrush)
                 painter.drawRect(QRectF(left, top, right - left, bottom - top))
 
-        # Draw crop box (user-defined)
-        crop_box = None
-        if self.crop_preview and self.crop_start:
-            start, end = self.crop_preview
-            crop_box = (start.x(), start.y(), end.x(), end.y())
-        elif self.crop_box:
-            crop_box = self.crop_box
-        if crop_box:
-            x1, y1, x2, y2 = crop_box
-            left = display_rect.x() + min(x1, x2) * self.zoom_level
-            top = display_rect.y() + min(y1, y2) * self.zoom_level
-            right = display_rect.x() + max(x1, x2) * self.zoom_level
-            bottom = display_rect.y() + max(y1, y2) * self.zoom_level
-            crop_color = QColor(243, 156, 18)
-            is_highlighted = bool(self.crop_hovered or self.crop_dragging)
-            if is_highlighted:
-                glow_color = QColor(192, 57, 43, 110)
-                outline_color = QColor(211, 84, 0)
-                painter.setPen(QPen(glow_color, 6))
-                painter.setBrush(QColor(192, 57, 43, 20))
-                painter.drawRect(QRectF(left, top, right - left, bottom - top))
-                crop_pen = QPen(outline_color, 2)
-                crop_pen.setStyle(Qt.SolidLine)
-                painter.setPen(crop_pen)
-                painter.setBrush(Qt.NoBrush)
-            else:
-                crop_pen = QPen(crop_color, 2)
-                crop_pen.setStyle(Qt.DashLine)
-                painter.setPen(crop_pen)
-                painter.setBrush(Qt.NoBrush)
-            painter.drawRect(QRectF(left, top, right - left, bottom - top))
-
-            tag_text = "Crop"
-            metrics = painter.fontMetrics()
-            text_w = metrics.horizontalAdvance(tag_text)
-            text_h = metrics.height()
-            tag_padding = 4
-            tag_w = text_w + tag_padding * 2
-            tag_h = text_h + tag_padding
-            tag_x = max(display_rect.x(), min(left, display_rect.x() + display_rect.width() - tag_w))
-            tag_y = max(0, top - tag_h - 4)
-            painter.setPen(Qt.NoPen)
-            painter.setBrush(crop_color)
-            painter.drawRect(QRectF(tag_x, tag_y, tag_w, tag_h))
-            painter.setPen(QColor(255, 255, 255))
-            text_x = tag_x + tag_padding
-            text_y = tag_y + tag_padding + metrics.ascent()
-            painter.drawText(int(text_x), int(text_y), tag_text)
 
         # Draw measurement rectangles
         if self.show_measure_overlays and self.measurement_rectangles:
             light_pen = QPen(self._light_stroke_color(), 3)
             thin_pen = QPen(self.measure_color, 1)
-            hover_light = QPen(QColor(231, 76, 60, 90), 5)
-            hover_thin = QPen(QColor(231, 76, 60), 2)
-            for idx, rect in enumerate(self.measurement_rectangles):
+            for rect in self.measurement_rectangles:
                 screen_points = []
                 for corner in rect:
                     x = display_rect.x() + corner.x() * self.zoom_level
@@ -1225,20 +1447,14 @@ class ZoomableImageLabel(QLabel):
                 painter.drawPolygon(QPolygonF(screen_points))
                 painter.setPen(thin_pen)
                 painter.drawPolygon(QPolygonF(screen_points))
-                if idx == self.hover_rect_index or (not self.measurement_active and idx == self.selected_rect_index):
-                    painter.setPen(hover_light)
-                    painter.drawPolygon(QPolygonF(screen_points))
-                    painter.setPen(hover_thin)
-                    painter.drawPolygon(QPolygonF(screen_points))
+
 
         # Draw measurement lines with perpendicular end marks
         if self.show_measure_overlays and self.measurement_lines:
             light_pen = QPen(self._light_stroke_color(), 3)
             thin_pen = QPen(self.measure_color, 1)
-            hover_light = QPen(QColor(231, 76, 60, 90), 5)
-            hover_thin = QPen(QColor(231, 76, 60), 2)
 
-            for idx, line in enumerate(self.measurement_lines):
+            for line in self.measurement_lines:
                 # Convert original image coordinates to screen coordinates
                 p1_x = display_rect.x() + line[0] * self.zoom_level
                 p1_y = display_rect.y() + line[1] * self.zoom_level
@@ -1274,133 +1490,10 @@ class ZoomableImageLabel(QLabel):
                             int(p2_x + perp_x * mark_len), int(p2_y + perp_y * mark_len)
                         )
 
-                if idx == self.hover_line_index or (
-                    not self.measurement_active and idx in self.selected_line_indices
-                ):
-                    painter.setPen(hover_light)
-                    painter.drawLine(int(p1_x), int(p1_y), int(p2_x), int(p2_y))
-                    painter.setPen(hover_thin)
-                    painter.drawLine(int(p1_x), int(p1_y), int(p2_x), int(p2_y))
 
         # Draw debug line layers (no hover/selection)
         if self.show_measure_overlays and self.debug_line_layers:
-            for layer in self.debug_line_layers:
-                painter.save()
-                lines = layer.get("lines") if isinstance(layer, dict) else None
-                if not lines:
-                    painter.restore()
-                    continue
-                color = layer.get("color", QColor(52, 152, 219)) if isinstance(layer, dict) else QColor(52, 152, 219)
-                width = layer.get("width", 2) if isinstance(layer, dict) else 2
-                dashed = bool(layer.get("dashed", False)) if isinstance(layer, dict) else False
-                show_endcaps = bool(layer.get("show_endcaps", False)) if isinstance(layer, dict) else False
-                composition = layer.get("composition") if isinstance(layer, dict) else None
-
-                if isinstance(color, tuple):
-                    if len(color) == 4:
-                        color = QColor(*color)
-                    elif len(color) == 3:
-                        color = QColor(*color)
-                elif isinstance(color, str):
-                    color = QColor(color)
-
-                if composition == "overlay":
-                    painter.setCompositionMode(QPainter.CompositionMode_Overlay)
-                elif composition == "screen":
-                    painter.setCompositionMode(QPainter.CompositionMode_Screen)
-                elif composition == "plus":
-                    painter.setCompositionMode(QPainter.CompositionMode_Plus)
-                elif composition == "lighten":
-                    painter.setCompositionMode(QPainter.CompositionMode_Lighten)
-
-                pen = QPen(color, width)
-                if dashed:
-                    pen.setStyle(Qt.DashLine)
-                painter.setPen(pen)
-                for line in lines:
-                    p1_x = display_rect.x() + line[0] * self.zoom_level
-                    p1_y = display_rect.y() + line[1] * self.zoom_level
-                    p2_x = display_rect.x() + line[2] * self.zoom_level
-                    p2_y = display_rect.y() + line[3] * self.zoom_level
-                    painter.drawLine(int(p1_x), int(p1_y), int(p2_x), int(p2_y))
-
-                    if show_endcaps:
-                        dx = p2_x - p1_x
-                        dy = p2_y - p1_y
-                        length = math.sqrt(dx**2 + dy**2)
-                        if length > 0:
-                            perp_x = -dy / length
-                            perp_y = dx / length
-                            mark_len = 5
-                            painter.drawLine(
-                                int(p1_x - perp_x * mark_len), int(p1_y - perp_y * mark_len),
-                                int(p1_x + perp_x * mark_len), int(p1_y + perp_y * mark_len)
-                            )
-                            painter.drawLine(
-                                int(p2_x - perp_x * mark_len), int(p2_y - perp_y * mark_len),
-                                int(p2_x + perp_x * mark_len), int(p2_y + perp_y * mark_len)
-                            )
-                painter.restore()
-        # Draw preview line (from last point to mouse cursor)
-        if self.preview_line is not None and self.current_mouse_pos is not None:
-            light_pen = QPen(self._light_stroke_color(), 3)
-            light_pen.setStyle(Qt.DashLine)
-            thin_pen = QPen(self.measure_color, 1)
-            thin_pen.setStyle(Qt.DashLine)
-
-            # Convert coordinates to screen
-            p1_x = display_rect.x() + self.preview_line.x() * self.zoom_level
-            p1_y = display_rect.y() + self.preview_line.y() * self.zoom_level
-            p2_x = display_rect.x() + self.current_mouse_pos.x() * self.zoom_level
-            p2_y = display_rect.y() + self.current_mouse_pos.y() * self.zoom_level
-
-            painter.setPen(light_pen)
-            painter.drawLine(int(p1_x), int(p1_y), int(p2_x), int(p2_y))
-            painter.setPen(thin_pen)
-            painter.drawLine(int(p1_x), int(p1_y), int(p2_x), int(p2_y))
-
-        # Draw preview rectangle (based on fixed base line and mouse width)
-        if self.preview_rect is not None and self.current_mouse_pos is not None:
-            light_pen = QPen(self._light_stroke_color(), 3)
-            light_pen.setStyle(Qt.DashLine)
-            thin_pen = QPen(self.measure_color, 1)
-            thin_pen.setStyle(Qt.DashLine)
-
-            base_start = self.preview_rect["base_start"]
-            base_end = self.preview_rect["base_end"]
-            width_dir = self.preview_rect["width_dir"]
-            moving_line = self.preview_rect["moving_line"]
-
-            base_mid = QPointF(
-                (base_start.x() + base_end.x()) / 2,
-                (base_start.y() + base_end.y()) / 2
-            )
-            delta = self.current_mouse_pos - base_mid
-            width_distance = delta.x() * width_dir.x() + delta.y() * width_dir.y()
-            offset = width_dir * width_distance
-
-            if moving_line == "line2":
-                line1_start = base_start
-                line1_end = base_end
-                line2_start = base_start + offset
-                line2_end = base_end + offset
-            else:
-                line2_start = base_start
-                line2_end = base_end
-                line1_start = base_start + offset
-                line1_end = base_end + offset
-
-            corners = [line1_start, line1_end, line2_end, line2_start]
-            screen_points = []
-            for corner in corners:
-                x = display_rect.x() + corner.x() * self.zoom_level
-                y = display_rect.y() + corner.y() * self.zoom_level
-                screen_points.append(QPointF(x, y))
-
-            painter.setPen(light_pen)
-            painter.drawPolygon(QPolygonF(screen_points))
-            painter.setPen(thin_pen)
-            painter.drawPolygon(QPolygonF(screen_points))
+            self._paint_debug_line_layers(painter, display_rect, blended=False)
 
         # Draw measurement labels
         if self.show_measure_labels and self.measurement_labels:
@@ -1486,6 +1579,7 @@ class ZoomableImageLabel(QLabel):
                         painter, f"{width_value:.1f} {unit}", width_edge, center_screen, 3
                     )
 
+
         def _draw_tag(text, y_offset, bg_color, font_size=10):
             tag_padding = 10
             tag_margin = 10
@@ -1569,10 +1663,6 @@ class ZoomableImageLabel(QLabel):
         painter.setFont(font)
         painter.drawText(zoom_rect, Qt.AlignCenter, zoom_text)
 
-        if self.measurement_active:
-            painter.setPen(QPen(QColor("#e74c3c"), 3))
-            painter.setBrush(Qt.NoBrush)
-            painter.drawRect(self.rect().adjusted(1, 1, -2, -2))
 
         # Draw scale bar in lower right corner
         scale_bar_box = None
@@ -1621,4 +1711,210 @@ class ZoomableImageLabel(QLabel):
                 bottom_limit = min(bottom_limit, int(scale_bar_box.top()) - 10)
             _draw_corner_tag(self._corner_tag_text, self._corner_tag_color, 9, bottom_limit=bottom_limit)
 
+
+    def _paint_dynamic_overlays(self, painter, display_rect):
+        """Draw hover, selection, crop and preview elements (every frame)."""
+        # Draw crop box (user-defined)
+        crop_box = None
+        if self.crop_preview and self.crop_start:
+            start, end = self.crop_preview
+            crop_box = (start.x(), start.y(), end.x(), end.y())
+        elif self.crop_box:
+            crop_box = self.crop_box
+        if crop_box:
+            x1, y1, x2, y2 = crop_box
+            left = display_rect.x() + min(x1, x2) * self.zoom_level
+            top = display_rect.y() + min(y1, y2) * self.zoom_level
+            right = display_rect.x() + max(x1, x2) * self.zoom_level
+            bottom = display_rect.y() + max(y1, y2) * self.zoom_level
+            crop_color = QColor(243, 156, 18)
+            is_highlighted = bool(self.crop_hovered or self.crop_dragging)
+            if is_highlighted:
+                glow_color = QColor(192, 57, 43, 110)
+                outline_color = QColor(211, 84, 0)
+                painter.setPen(QPen(glow_color, 6))
+                painter.setBrush(QColor(192, 57, 43, 20))
+                painter.drawRect(QRectF(left, top, right - left, bottom - top))
+                crop_pen = QPen(outline_color, 2)
+                crop_pen.setStyle(Qt.SolidLine)
+                painter.setPen(crop_pen)
+                painter.setBrush(Qt.NoBrush)
+            else:
+                crop_pen = QPen(crop_color, 2)
+                crop_pen.setStyle(Qt.DashLine)
+                painter.setPen(crop_pen)
+                painter.setBrush(Qt.NoBrush)
+            painter.drawRect(QRectF(left, top, right - left, bottom - top))
+
+            tag_text = "Crop"
+            metrics = painter.fontMetrics()
+            text_w = metrics.horizontalAdvance(tag_text)
+            text_h = metrics.height()
+            tag_padding = 4
+            tag_w = text_w + tag_padding * 2
+            tag_h = text_h + tag_padding
+            tag_x = max(display_rect.x(), min(left, display_rect.x() + display_rect.width() - tag_w))
+            tag_y = max(0, top - tag_h - 4)
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(crop_color)
+            painter.drawRect(QRectF(tag_x, tag_y, tag_w, tag_h))
+            painter.setPen(QColor(255, 255, 255))
+            text_x = tag_x + tag_padding
+            text_y = tag_y + tag_padding + metrics.ascent()
+            painter.drawText(int(text_x), int(text_y), tag_text)
+
+
+        # Highlight hovered/selected measurement rectangles
+        if self.show_measure_overlays and self.measurement_rectangles:
+            hover_light = QPen(QColor(231, 76, 60, 90), 5)
+            hover_thin = QPen(QColor(231, 76, 60), 2)
+            highlighted = {self.hover_rect_index}
+            if not self.measurement_active:
+                highlighted.add(self.selected_rect_index)
+            for idx in sorted(highlighted):
+                if idx < 0 or idx >= len(self.measurement_rectangles):
+                    continue
+                screen_points = []
+                for corner in self.measurement_rectangles[idx]:
+                    x = display_rect.x() + corner.x() * self.zoom_level
+                    y = display_rect.y() + corner.y() * self.zoom_level
+                    screen_points.append(QPointF(x, y))
+                painter.setPen(hover_light)
+                painter.drawPolygon(QPolygonF(screen_points))
+                painter.setPen(hover_thin)
+                painter.drawPolygon(QPolygonF(screen_points))
+
+        # Highlight hovered/selected measurement lines
+        if self.show_measure_overlays and self.measurement_lines:
+            hover_light = QPen(QColor(231, 76, 60, 90), 5)
+            hover_thin = QPen(QColor(231, 76, 60), 2)
+            highlighted = {self.hover_line_index}
+            if not self.measurement_active:
+                highlighted.update(self.selected_line_indices)
+            for idx in sorted(highlighted):
+                if idx < 0 or idx >= len(self.measurement_lines):
+                    continue
+                line = self.measurement_lines[idx]
+                p1_x = display_rect.x() + line[0] * self.zoom_level
+                p1_y = display_rect.y() + line[1] * self.zoom_level
+                p2_x = display_rect.x() + line[2] * self.zoom_level
+                p2_y = display_rect.y() + line[3] * self.zoom_level
+                painter.setPen(hover_light)
+                painter.drawLine(int(p1_x), int(p1_y), int(p2_x), int(p2_y))
+                painter.setPen(hover_thin)
+                painter.drawLine(int(p1_x), int(p1_y), int(p2_x), int(p2_y))
+
+        # Draw preview line (from last point to mouse cursor)
+        if self.preview_line is not None and self.current_mouse_pos is not None:
+            light_pen = QPen(self._light_stroke_color(), 3)
+            light_pen.setStyle(Qt.DashLine)
+            thin_pen = QPen(self.measure_color, 1)
+            thin_pen.setStyle(Qt.DashLine)
+
+            # Convert coordinates to screen
+            p1_x = display_rect.x() + self.preview_line.x() * self.zoom_level
+            p1_y = display_rect.y() + self.preview_line.y() * self.zoom_level
+            p2_x = display_rect.x() + self.current_mouse_pos.x() * self.zoom_level
+            p2_y = display_rect.y() + self.current_mouse_pos.y() * self.zoom_level
+
+            painter.setPen(light_pen)
+            painter.drawLine(int(p1_x), int(p1_y), int(p2_x), int(p2_y))
+            painter.setPen(thin_pen)
+            painter.drawLine(int(p1_x), int(p1_y), int(p2_x), int(p2_y))
+
+
+        # Draw preview rectangle (based on fixed base line and mouse width)
+        if self.preview_rect is not None and self.current_mouse_pos is not None:
+            light_pen = QPen(self._light_stroke_color(), 3)
+            light_pen.setStyle(Qt.DashLine)
+            thin_pen = QPen(self.measure_color, 1)
+            thin_pen.setStyle(Qt.DashLine)
+
+            base_start = self.preview_rect["base_start"]
+            base_end = self.preview_rect["base_end"]
+            width_dir = self.preview_rect["width_dir"]
+            moving_line = self.preview_rect["moving_line"]
+
+            base_mid = QPointF(
+                (base_start.x() + base_end.x()) / 2,
+                (base_start.y() + base_end.y()) / 2
+            )
+            delta = self.current_mouse_pos - base_mid
+            width_distance = delta.x() * width_dir.x() + delta.y() * width_dir.y()
+            offset = width_dir * width_distance
+
+            if moving_line == "line2":
+                line1_start = base_start
+                line1_end = base_end
+                line2_start = base_start + offset
+                line2_end = base_end + offset
+            else:
+                line2_start = base_start
+                line2_end = base_end
+                line1_start = base_start + offset
+                line1_end = base_end + offset
+
+            corners = [line1_start, line1_end, line2_end, line2_start]
+            screen_points = []
+            for corner in corners:
+                x = display_rect.x() + corner.x() * self.zoom_level
+                y = display_rect.y() + corner.y() * self.zoom_level
+                screen_points.append(QPointF(x, y))
+
+            painter.setPen(light_pen)
+            painter.drawPolygon(QPolygonF(screen_points))
+            painter.setPen(thin_pen)
+            painter.drawPolygon(QPolygonF(screen_points))
+
+
+        if self.measurement_active:
+            painter.setPen(QPen(QColor("#e74c3c"), 3))
+            painter.setBrush(Qt.NoBrush)
+            painter.drawRect(self.rect().adjusted(1, 1, -2, -2))
+
+
+    def paintEvent(self, event):
+        """Custom paint event to draw image, overlays, and measurements.
+
+        The scaled image and the static overlays are cached as widget-sized
+        layers and only re-rendered when the view or the overlay data change;
+        mouse moves only redraw the hover/preview elements on top.
+        """
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setRenderHint(QPainter.SmoothPixmapTransform)
+
+        if not self.original_pixmap:
+            painter.fillRect(self.rect(), QColor(236, 240, 241))
+            # Draw placeholder text
+            painter.setPen(QColor(127, 140, 141))
+            painter.drawText(self.rect(), Qt.AlignCenter, "Load an image to begin")
+            painter.end()
+            return
+
+        display_rect = self.get_display_rect()
+        view_key = self._layer_key(display_rect)
+
+        image_key = view_key + (self.original_pixmap.cacheKey(), id(self._pyramid))
+        if self._image_layer is None or self._image_layer_key != image_key:
+            self._image_layer = self._new_layer()
+            self._image_layer_key = image_key
+            layer_painter = QPainter(self._image_layer)
+            layer_painter.setRenderHint(QPainter.Antialiasing)
+            layer_painter.setRenderHint(QPainter.SmoothPixmapTransform)
+            self._paint_image_layer(layer_painter, display_rect)
+            layer_painter.end()
+
+        if self._overlay_layer is None or self._overlay_layer_key != view_key:
+            self._overlay_layer = self._new_layer()
+            self._overlay_layer_key = view_key
+            layer_painter = QPainter(self._overlay_layer)
+            layer_painter.setRenderHint(QPainter.Antialiasing)
+            layer_painter.setRenderHint(QPainter.SmoothPixmapTransform)
+            self._paint_overlay_layer(layer_painter, display_rect)
+            layer_painter.end()
+
+        painter.drawPixmap(0, 0, self._image_layer)
+        painter.drawPixmap(0, 0, self._overlay_layer)
+        self._paint_dynamic_overlays(painter, display_rect)
         painter.end()
@@ -13,7 +13,8 @@ def save_spore_annotation(
     width_um: float,
     image_shape: Tuple[int, int],  # (height, width)
     padding: int = 50,
-    annotation_source: str = 'manual'
+    annotation_source: str = 'manual',
+    conn: Optional[sqlite3.Connection] = None
 ) -> int:
     """Save a spore measurement as an ML annotation with bounding box.
 
@@ -30,6 +31,7 @@ def save_spore_annotation(
         image_shape: Tuple of (height, width) of the image
         padding: Padding around the bounding box in pixels
         annotation_source: Source of annotation ('manual', 'auto', etc.)
+        conn: Open connection to write with; the caller commits
 
     Returns:
         annotation_id from database
@@ -78,10 +80,12 @@ def save_spore_annotation(
     rotation_degrees = math.degrees(rotation_angle)
 
     # Get next spore number for this image
-    spore_number = _get_next_spore_number(image_id)
+    spore_number = _get_next_spore_number(image_id, conn=conn)
 
     # Save to database
-    conn = get_connection()
+    own_conn = conn is None
+    if own_conn:
+        conn = get_connection()
     cursor = conn.cursor()
 
     cursor.execute('''
@@ -93,15 +97,18 @@ def save_spore_annotation(
           center_x, center_y, length_um, width_um, rotation_degrees, annotation_source))
 
     annotation_id = cursor.lastrowid
-    conn.commit()
-    conn.close()
+    if own_conn:
+        conn.commit()
+        conn.close()
 
     return annotation_id
 
 
-def _get_next_spore_number(image_id: int) -> int:
+def _get_next_spore_number(image_id: int, conn: Optional[sqlite3.Connection] = None) -> int:
     """Get the next spore number for an image."""
-    conn = get_connection()
+    own_conn = conn is None
+    if own_conn:
+        conn = get_connection()
     cursor = conn.cursor()
 
     cursor.execute('''
@@ -111,7 +118,8 @@ def _get_next_spore_number(image_id: int) -> int:
     ''', (image_id,))
 
     result = cursor.fetchone()[0]
-    conn.close()
+    if own_conn:
+        conn.close()
     return result
 
 
@@ -0,0 +1,109 @@
+"""Memo of automatic slide calibration results.
+
+Results are keyed by the content hash of the image file, its crop box and
+the calibration parameters, so calibrating an unchanged image again (or
+the copy stored with a saved calibration) reuses the earlier result.
+Keys are JSON strings and entries plain values, so saved calibrations
+carry them in measurements_json and seed the memo when viewed again.
+"""
+from __future__ import annotations
+
+import dataclasses
+import json
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+from utils.image_info import hash_file
+from utils.slide_calibration import CalibrationResult
+
+CACHE_MAX_ENTRIES = 64
+
+_results: OrderedDict[str, dict] = OrderedDict()
+_results_lock = threading.Lock()
+_hash_memo: dict[tuple[str, int, int], str] = {}
+
+
+def _content_hash(path: str | Path) -> Optional[str]:
+    try:
+        stat = Path(path).stat()
+    except (OSError, TypeError, ValueError):
+        return None
+    memo_key = (str(path), int(stat.st_size), int(stat.st_mtime_ns))
+    with _results_lock:
+        digest = _hash_memo.get(memo_key)
+    if digest is None:
+        digest = hash_file(path)
+        if digest is not None:
+            with _results_lock:
+                _hash_memo[memo_key] = digest
+    return digest
+
+
+def calibration_cache_key(
+    path: str | Path,
+    division_um: float,
+    crop_box=None,
+    axis_override: Optional[str] = None,
+    band_frac: tuple[float, float] = (0.25, 0.75),
+    smooth_sigma: float = 3.2,
+    min_distance_px: Optional[int] = None,
+    use_large_angles: bool = False,
+) -> Optional[str]:
+    """Return the memo key of calibrating path with these parameters.
+
+    Defaults match calibrate_image(). Returns None if the file cannot be read.
+    """
+    digest = _content_hash(path)
+    if digest is None:
+        return None
+    return json.dumps(
+        {
+            "content_hash": digest,
+            "crop_box": [float(v) for v in crop_box] if crop_box else None,
+            "division_um": float(division_um),
+            "axis_override": axis_override,
+            "band_frac": [float(v) for v in band_frac],
+            "smooth_sigma": float(smooth_sigma),
+            "min_distance_px": min_distance_px,
+            "use_large_angles": bool(use_large_angles),
+        },
+        sort_keys=True,
+    )
+
+
+def get_cached_result(key: Optional[str]) -> Optional[dict]:
+    """Return {result, crop_offset, crop_size} stored under key, or None.
+
+    The result is a copy, so callers may rescale it in place.
+    """
+    if not key:
+        return None
+    with _results_lock:
+        entry = _results.get(key)
+        if entry is None:
+            return None
+        _results.move_to_end(key)
+    return {**entry, "result": dataclasses.replace(entry["result"])}
+
+
+def remember_result(
+    key: Optional[str],
+    result: CalibrationResult,
+    crop_offset: tuple[float, float] = (0.0, 0.0),
+    crop_size: Optional[tuple[int, int]] = None,
+) -> None:
+    """Store a calibration result under key, evicting the least recently used."""
+    if not key or result is None:
+        return
+    entry = {
+        "result": dataclasses.replace(result),
+        "crop_offset": tuple(crop_offset),
+        "crop_size": tuple(crop_size) if crop_size else None,
+    }
+    with _results_lock:
+        _results[key] = entry
+        _results.move_to_end(key)
+        while len(_results) > CACHE_MAX_ENTRIES:
+            _results.popitem(last=False)
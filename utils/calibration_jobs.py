@@ -0,0 +1,142 @@
+"""Automatic slide calibration of several images in worker processes.
+
+Jobs and results are plain picklable values and nothing here imports Qt,
+so the calibration dialog can hand each image to a process pool. Worker
+processes report progress through a queue and watch a shared event so a
+batch that went stale can be abandoned between steps.
+"""
+from __future__ import annotations
+
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Optional
+
+from PIL import Image
+
+from utils.slide_calibration import CalibrationCancelled, calibrate_image
+
+BATCH_MAX_WORKERS = 4
+
+# (progress queue, cancel event) of the batch a worker process serves.
+_batch_channel = None
+
+
+def _init_batch_worker(progress_queue, cancel_event) -> None:
+    global _batch_channel
+    _batch_channel = (progress_queue, cancel_event)
+
+
+class CalibrationBatch:
+    """Executor, progress queue and cancel event of one batch of jobs.
+
+    Several jobs get a spawn process pool; a single job, or a machine with
+    one core, runs on a thread with a plain queue and event.
+    """
+
+    def __init__(self, job_count: int) -> None:
+        self._channel = None
+        workers = max(1, min(BATCH_MAX_WORKERS, os.cpu_count() or 1, job_count))
+        self.executor: Executor | None = None
+        if workers > 1:
+            try:
+                context = multiprocessing.get_context("spawn")
+                self.progress_queue = context.Queue()
+                self.cancel_event = context.Event()
+                self.executor = ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=context,
+                    initializer=_init_batch_worker,
+                    initargs=(self.progress_queue, self.cancel_event),
+                )
+            except Exception as exc:
+                print(f"Warning: Could not start calibration worker processes: {exc}")
+        if self.executor is None:
+            self.progress_queue = queue.SimpleQueue()
+            self.cancel_event = threading.Event()
+            self._channel = (self.progress_queue, self.cancel_event)
+            self.executor = ThreadPoolExecutor(max_workers=1)
+
+    def submit(self, job: dict) -> Future:
+        if self._channel is None:
+            return self.executor.submit(calibrate_batch_job, job)
+        return self.executor.submit(calibrate_batch_job, job, self._channel)
+
+    def drain_progress(self) -> list[tuple[str, str, float]]:
+        """Return the (key, step, fraction) reports received so far."""
+        reports = []
+        while True:
+            try:
+                reports.append(self.progress_queue.get_nowait())
+            except (queue.Empty, OSError, ValueError):
+                return reports
+
+    def cancel(self) -> None:
+        """Drop queued jobs and make running ones stop at their next step."""
+        self.cancel_event.set()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _load_job_image(path: str, crop_box) -> tuple[Image.Image, tuple[float, float], Optional[tuple[int, int]]]:
+    """Open the image of a job, cropped to its normalised crop box if it has one."""
+    with Image.open(path) as img:
+        pil_img = img.convert("L")
+    if not crop_box:
+        return pil_img, (0.0, 0.0), None
+    w, h = pil_img.size
+    x1 = max(0, min(w, int(crop_box[0] * w)))
+    y1 = max(0, min(h, int(crop_box[1] * h)))
+    x2 = max(0, min(w, int(crop_box[2] * w)))
+    y2 = max(0, min(h, int(crop_box[3] * h)))
+    if x2 - x1 < 2 or y2 - y1 < 2:
+        return pil_img, (0.0, 0.0), None
+    return pil_img.crop((x1, y1, x2, y2)), (float(x1), float(y1)), (int(x2 - x1), int(y2 - y1))
+
+
+def run_calibration_job(job: dict, progress_cb: Callable[[str, float], None] | None = None) -> dict:
+    """Calibrate one image of a batch.
+
+    job holds key, path, crop_box (normalised, or None), spacing_um,
+    axis_hint, use_edges and use_large_angles. Returns key with either
+    result, crop_offset and crop_size, or error; cancelled is set when
+    progress_cb abandoned the run.
+    """
+    outcome = {"key": job["key"]}
+    try:
+        pil_img, crop_offset, crop_size = _load_job_image(job["path"], job.get("crop_box"))
+        outcome["result"] = calibrate_image(
+            pil_img,
+            spacing_um=job["spacing_um"],
+            axis_hint=job.get("axis_hint"),
+            use_edges=job.get("use_edges", True),
+            use_large_angles=job.get("use_large_angles", True),
+            progress_cb=progress_cb,
+        )
+        outcome["crop_offset"] = crop_offset
+        outcome["crop_size"] = crop_size
+    except CalibrationCancelled:
+        outcome["cancelled"] = True
+    except Exception as exc:
+        outcome["error"] = str(exc)
+    return outcome
+
+
+def calibrate_batch_job(job: dict, channel=None) -> dict:
+    """run_calibration_job() reporting to channel, or the batch this worker process serves."""
+    progress_queue, cancel_event = channel or _batch_channel or (None, None)
+    key = job["key"]
+
+    def progress(step: str, frac: float) -> None:
+        if cancel_event is not None and cancel_event.is_set():
+            raise CalibrationCancelled()
+        if progress_queue is not None:
+            progress_queue.put((key, step, frac))
+
+    if cancel_event is not None and cancel_event.is_set():
+        return {"key": key, "cancelled": True}
+    return run_calibration_job(job, progress)
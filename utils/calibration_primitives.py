@@ -9,15 +9,30 @@ calibration pipeline:
     gauss_smooth()      ← scipy.ndimage.gaussian_filter1d
     find_peaks()        ← scipy.signal.find_peaks
     rotate_image()      ← cv2.getRotationMatrix2D + cv2.warpAffine
+    rotate_region()     ← the same, rendering only a crop of the result
     rotation_matrix()   ← cv2.getRotationMatrix2D  (for back-projection)
+
+plus *_rows variants that smooth, detect peaks and refine them on a
+whole stack of scanlines (one profile per row) in a single pass, and
+half_max_edges_batch() for the edge crossings of every line at once.
 """
 
+import math
+
 import numpy as np
 from PIL import Image
 
 
 # ─── Gaussian smoothing ──────────────────────────────────────────────────────
 
+def _gauss_kernel(sigma: float) -> np.ndarray:
+    r      = int(np.ceil(3 * sigma))          # 3-σ truncation
+    k      = np.arange(-r, r + 1, dtype=np.float64)
+    kernel = np.exp(-0.5 * (k / sigma) ** 2)
+    kernel /= kernel.sum()
+    return kernel
+
+
 def gauss_smooth(arr: np.ndarray, sigma: float) -> np.ndarray:
     """1-D Gaussian convolution with reflect-padding (matches scipy default).
 
@@ -26,63 +41,174 @@ def gauss_smooth(arr: np.ndarray, sigma: float) -> np.ndarray:
       mean ~0.002
     Completely irrelevant for intensity profiles in the 0–255 range.
     """
-    r      = int(np.ceil(3 * sigma))          # 3-σ truncation
-    k      = np.arange(-r, r + 1, dtype=np.float64)
-    kernel = np.exp(-0.5 * (k / sigma) ** 2)
-    kernel /= kernel.sum()
-    padded = np.pad(arr, r, mode='reflect')
+    kernel = _gauss_kernel(sigma)
+    padded = np.pad(arr, len(kernel) // 2, mode='reflect')
     return np.convolve(padded, kernel, mode='valid')
 
 
+def gauss_smooth_rows(arr: np.ndarray, sigma: float) -> np.ndarray:
+    """gauss_smooth() of every row of a 2-D array, as one convolution along axis 1."""
+    kernel = _gauss_kernel(sigma)
+    r      = len(kernel) // 2
+    n      = arr.shape[1]
+    padded = np.pad(arr, ((0, 0), (r, r)), mode='reflect')
+    out    = kernel[0] * padded[:, :n]
+    for i in range(1, len(kernel)):
+        out += kernel[i] * padded[:, i:i + n]
+    return out
+
+
 # ─── Peak finding ────────────────────────────────────────────────────────────
 
-def _prominence(data: np.ndarray, peak_idx: int) -> float:
-    """Prominence of a single peak — same definition as scipy."""
-    # walk left until a higher point or edge
-    left_min = data[peak_idx]
-    for i in range(peak_idx - 1, -1, -1):
-        if data[i] < left_min:
-            left_min = data[i]
-        if data[i] > data[peak_idx]:
-            break
-    # walk right
-    right_min = data[peak_idx]
-    for i in range(peak_idx + 1, len(data)):
-        if data[i] < right_min:
-            right_min = data[i]
-        if data[i] > data[peak_idx]:
+def _sparse_tables(values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Range-max and range-min tables: [k, i] holds the extreme of values[i:i+2**k].
+
+    Entries past the end are padded with +inf (max) and -inf (min) so a
+    block running off the array never looks "not higher" in a search.
+    """
+    n = len(values)
+    levels = max(1, int(n).bit_length())
+    tmax = np.full((levels, n), np.inf)
+    tmin = np.full((levels, n), -np.inf)
+    tmax[0] = values
+    tmin[0] = values
+    for k in range(1, levels):
+        half = 1 << (k - 1)
+        span = n - (1 << k) + 1
+        if span <= 0:
             break
-    return data[peak_idx] - max(left_min, right_min)
+        tmax[k, :span] = np.maximum(tmax[k - 1, :span], tmax[k - 1, half:half + span])
+        tmin[k, :span] = np.minimum(tmin[k - 1, :span], tmin[k - 1, half:half + span])
+    return tmax, tmin
 
 
-def find_peaks(data: np.ndarray,
-               min_height: float | None   = None,
-               min_distance: int         = 1,
-               min_prominence: float | None = None) -> np.ndarray:
-    """Peak indices in 1-D array, filtered by height / distance / prominence.
+def _range_min(tmin: np.ndarray, lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+    """min(values[lo:hi+1]) for each pair of inclusive bounds."""
+    k = np.frexp((hi - lo + 1).astype(np.float64))[1] - 1   # floor(log2(length))
+    return np.minimum(tmin[k, lo], tmin[k, hi - (1 << k) + 1])
 
-    Greedy distance enforcement: among candidates closer than min_distance,
-    the taller peak wins (same as scipy).
+
+def _prominences(data: np.ndarray, maxima: np.ndarray, peaks: np.ndarray) -> np.ndarray:
+    """Prominence of each peak of a 2-D stack — same definition as scipy.
+
+    maxima and peaks are flat indices into data: every local maximum, and
+    the peaks (a subset) to measure. Each peak's base on either side is
+    the lowest point before the profile first rises above the peak (or
+    the row edge). That rise always runs up to a local maximum higher
+    than the peak, or to the row edge, so only local maxima are searched:
+    binary lifting over a range-max table of their heights finds the
+    nearest higher one, and a range-min table of the minima between
+    consecutive maxima gives the base.
+    """
+    n_rows, n = data.shape
+    flat = data.ravel()
+    starts = np.arange(n_rows, dtype=np.intp) * n
+    bounds = np.sort(np.concatenate([starts, starts + n - 1, maxima]))
+    heights = flat[bounds]
+    col = bounds % n
+    heights[(col == 0) | (col == n - 1)] = np.inf   # row edges stop every walk
+    # gaps[i] = min(flat[bounds[i]:bounds[i+1]+1])
+    gaps = np.minimum(np.minimum.reduceat(flat, bounds)[:-1], flat[bounds[1:]])
+
+    tmax, _ = _sparse_tables(heights)
+    _, tmin = _sparse_tables(gaps)
+    levels = tmax.shape[0]
+    j = np.searchsorted(bounds, peaks)
+    h = flat[peaks]
+
+    # left: lowest index such that heights[left:j] are all <= the peak
+    left = j.copy()
+    for k in range(levels - 1, -1, -1):
+        step = 1 << k
+        start = left - step
+        ok = start >= 0
+        ok[ok] = tmax[k, start[ok]] <= h[ok]
+        left[ok] -= step
+    # right: highest index such that heights[j+1:right+1] are all <= the peak
+    right = j.copy()
+    for k in range(levels - 1, -1, -1):
+        step = 1 << k
+        start = right + 1
+        ok = start + step <= len(heights)
+        ok[ok] = tmax[k, start[ok]] <= h[ok]
+        right[ok] += step
+
+    left_min = _range_min(tmin, left - 1, j - 1)
+    right_min = _range_min(tmin, j, right)
+    return h - np.maximum(left_min, right_min)
+
+
+def _per_row(value, rows: np.ndarray, n_rows: int) -> np.ndarray:
+    """Scalar or per-row threshold, looked up for each candidate's row."""
+    return np.broadcast_to(np.asarray(value, dtype=np.float64), (n_rows,))[rows]
+
+
+def find_peaks_rows(data: np.ndarray,
+                    min_height=None,
+                    min_distance: int = 1,
+                    min_prominence=None) -> tuple[np.ndarray, np.ndarray]:
+    """find_peaks() on every row of a 2-D array at once.
+
+    min_height and min_prominence may be scalars or one value per row.
+    Returns (rows, peaks) index arrays, ordered by row and then position;
+    the peaks of each row are exactly what find_peaks() returns for it.
     """
+    data = np.asarray(data, dtype=np.float64)
+    n_rows, n = data.shape
+    if n < 3 or n_rows == 0:
+        empty = np.array([], dtype=np.intp)
+        return empty, empty
+
     # strict local maxima
-    candidates = [i for i in range(1, len(data) - 1)
-                  if data[i] > data[i-1] and data[i] >= data[i+1]]
+    mid = data[:, 1:-1]
+    rows, peaks = np.nonzero((mid > data[:, :-2]) & (mid >= data[:, 2:]))
+    peaks = peaks + 1
+    maxima = rows * n + peaks
 
     if min_height is not None:
-        candidates = [i for i in candidates if data[i] >= min_height]
+        keep = data[rows, peaks] >= _per_row(min_height, rows, n_rows)
+        rows, peaks = rows[keep], peaks[keep]
+
+    # distance filter — greedy by descending height. Rows are laid end to
+    # end with a gap wider than min_distance, so one sorted pass covers all
+    # of them; each kept peak masks the candidates within min_distance of
+    # it. Only candidates with a neighbour that close need visiting.
+    if len(peaks) > 1:
+        stride = n + int(np.ceil(min_distance)) + 1
+        keys = rows.astype(np.int64) * stride + peaks
+        close = np.diff(keys) < min_distance
+        if close.any():
+            crowded = np.flatnonzero(np.r_[close, False] | np.r_[False, close])
+            lo = np.searchsorted(keys, keys[crowded] - min_distance, side='right')
+            hi = np.searchsorted(keys, keys[crowded] + min_distance, side='left')
+            keep = np.ones(len(peaks), dtype=bool)
+            for j in np.argsort(-data[rows[crowded], peaks[crowded]], kind='stable'):
+                c = crowded[j]
+                if keep[c]:
+                    keep[lo[j]:hi[j]] = False
+                    keep[c] = True
+            rows, peaks = rows[keep], peaks[keep]
+
+    if min_prominence is not None and len(peaks):
+        prom = _prominences(data, maxima, rows * n + peaks)
+        keep = prom >= _per_row(min_prominence, rows, n_rows)
+        rows, peaks = rows[keep], peaks[keep]
+
+    return rows.astype(np.intp), peaks.astype(np.intp)
 
-    # distance filter — greedy by descending height
-    candidates.sort(key=lambda i: -data[i])
-    kept: list[int] = []
-    for c in candidates:
-        if all(abs(c - k) >= min_distance for k in kept):
-            kept.append(c)
-    kept.sort()
 
-    if min_prominence is not None:
-        kept = [i for i in kept if _prominence(data, i) >= min_prominence]
+def find_peaks(data: np.ndarray,
+               min_height: float | None   = None,
+               min_distance: int         = 1,
+               min_prominence: float | None = None) -> np.ndarray:
+    """Peak indices in 1-D array, filtered by height / distance / prominence.
 
-    return np.array(kept, dtype=np.intp)
+    Greedy distance enforcement: among candidates closer than min_distance,
+    the taller peak wins (same as scipy); equal heights favour the left one.
+    """
+    data = np.asarray(data, dtype=np.float64)
+    _, peaks = find_peaks_rows(data[np.newaxis, :], min_height, min_distance, min_prominence)
+    return peaks
 
 
 # ─── Image rotation ─────────────────────────────────────────────────────────
@@ -96,6 +222,31 @@ def rotate_image(pil_img: Image.Image, angle_deg: float) -> Image.Image:
     return pil_img.rotate(angle_deg, resample=Image.BILINEAR, expand=False)
 
 
+def rotate_region(pil_img: Image.Image, angle_deg: float,
+                  box: tuple[int, int, int, int]) -> Image.Image:
+    """rotate_image(pil_img, angle_deg).crop(box), rendering only the box.
+
+    Uses the same reverse mapping as PIL's rotate, shifted to the box
+    origin, so a band of the rotated frame can be taken from a large image
+    without rotating (and holding) all of it.
+    """
+    angle = angle_deg % 360.0
+    if angle in (0.0, 90.0, 180.0, 270.0):
+        return rotate_image(pil_img, angle_deg).crop(box)
+    left, top, right, bottom = box
+    w, h = pil_img.size
+    cx, cy = w / 2, h / 2
+    a   = -math.radians(angle)
+    cos = round(math.cos(a), 15)
+    sin = round(math.sin(a), 15)
+    c   = cos * -cx + sin * -cy + cx
+    f   = -sin * -cx + cos * -cy + cy
+    matrix = (cos, sin, c + cos * left + sin * top,
+              -sin, cos, f - sin * left + cos * top)
+    return pil_img.transform((right - left, bottom - top), Image.AFFINE, matrix,
+                             resample=Image.BILINEAR)
+
+
 def rotation_matrix(angle_deg: float, center: tuple[float, float]) -> np.ndarray:
     """2×3 affine rotation matrix — identical to cv2.getRotationMatrix2D.
 
@@ -117,56 +268,145 @@ def load_gray(path: str) -> np.ndarray:
     return np.array(Image.open(path).convert('L'), dtype=np.float64)
 
 
-def half_max_edges(profile: np.ndarray, peak_y: float,
-                   search: int = 30) -> tuple[float | None, float | None]:
-    """Find the two 50%-intensity crossings around a trough (dark line).
+def _sorted_percentile(sorted_vals: np.ndarray, counts: np.ndarray, q: float) -> np.ndarray:
+    """np.percentile(row[:count], q) of every row of an ascending-sorted stack.
 
-    Returns (top_edge, bottom_edge) with sub-pixel linear interpolation,
-    or (None, None) if a crossing is not found within *search* pixels.
+    Follows numpy's default (linear) method step by step, so the results
+    are bit-identical; rows with count 0 give NaN.
     """
-    p = int(round(peak_y))
-    lo = max(0, p - search)
-    hi = min(len(profile), p + search)
-    center = float(profile[p])
-
-    left = profile[lo:p]
-    right = profile[p + 1:hi]
-
-    def _bg(seg: np.ndarray) -> float | None:
-        if seg is None or len(seg) == 0:
-            return None
-        # Use a high percentile to approximate local background on each side.
-        return float(np.percentile(seg, 95))
+    q       = q / 100
+    m       = counts.astype(np.float64)
+    virtual = (m - 1) * q
+    prev    = np.floor(virtual)
+    gamma   = virtual - prev
+    last    = np.maximum(counts - 1, 0)
+    i0      = np.clip(prev.astype(np.intp), 0, last)
+    i1      = np.minimum(i0 + 1, last)
+    rows    = np.arange(len(counts))
+    a, b    = sorted_vals[rows, i0], sorted_vals[rows, i1]
+    with np.errstate(invalid='ignore'):
+        diff = b - a
+        out  = np.where(gamma >= 0.5, b - diff * (1 - gamma), a + diff * gamma)
+    out     = np.where(virtual >= m - 1, sorted_vals[rows, last], out)
+    return np.where(counts > 0, out, np.nan)
+
+
+def half_max_edges_batch(profile: np.ndarray, peaks_y: np.ndarray,
+                         search: int = 30) -> tuple[np.ndarray, np.ndarray]:
+    """half_max_edges() for many troughs of one profile in a single pass.
+
+    Returns (top_edges, bottom_edges) as arrays, NaN where a crossing is
+    not found within *search* pixels or the trough rounds to a position
+    outside the profile. Line widths are bottom - top.
+    """
+    profile = np.asarray(profile, dtype=np.float64)
+    peaks_y = np.asarray(peaks_y, dtype=np.float64)
+    n       = len(profile)
+    tops    = np.full(len(peaks_y), np.nan)
+    bots    = np.full(len(peaks_y), np.nan)
+    inside  = np.rint(peaks_y) >= 0
+    inside &= np.rint(peaks_y) < n
+    if not inside.all():
+        tops[inside], bots[inside] = half_max_edges_batch(profile, peaks_y[inside], search)
+        return tops, bots
+    p       = np.rint(peaks_y).astype(np.intp)
+    if len(p) == 0 or search <= 0:
+        return tops, bots
+    lo      = np.maximum(0, p - search)
+    hi      = np.minimum(n, p + search)
+    center  = profile[p]
+    offs    = np.arange(search)
+
+    # Left side: i in [lo, p); right side: i in (p, hi).
+    left_i   = p[:, None] - search + offs
+    left_ok  = left_i >= lo[:, None]
+    right_i  = p[:, None] + 1 + offs
+    right_ok = right_i < hi[:, None]
+    left_v   = np.where(left_ok, profile[np.clip(left_i, 0, n - 1)], np.inf)
+    right_v  = np.where(right_ok, profile[np.clip(right_i, 0, n - 1)], np.inf)
+    # A high percentile approximates the local background on each side.
+    bg_left  = _sorted_percentile(np.sort(left_v, axis=1), left_ok.sum(axis=1), 95)
+    bg_right = _sorted_percentile(np.sort(right_v, axis=1), right_ok.sum(axis=1), 95)
+    bg_left  = np.where(np.isnan(bg_left), profile[lo], bg_left)
+    bg_right = np.where(np.isnan(bg_right), profile[hi - 1], bg_right)
+    half_left  = (bg_left + center) / 2.0
+    half_right = (bg_right + center) / 2.0
 
-    bg_left = _bg(left)
-    bg_right = _bg(right)
+    # Falling crossing: the last i in [lo, p) with v[i] >= half > v[i+1].
+    i_next = np.clip(left_i + 1, 0, n - 1)
+    v0, v1 = profile[np.clip(left_i, 0, n - 1)], profile[i_next]
+    hl     = half_left[:, None]
+    cross  = left_ok & (v0 >= hl) & (v1 < hl)
+    found  = cross.any(axis=1)
+    j      = search - 1 - np.argmax(cross[:, ::-1], axis=1)
+    k      = np.nonzero(found)[0]
+    i      = left_i[k, j[k]]
+    tops[k] = i + (half_left[k] - profile[i]) / (profile[i + 1] - profile[i])
+
+    # Rising crossing: the first i in [p, hi - 1) with v[i] < half <= v[i+1].
+    bot_i  = p[:, None] + offs
+    bot_ok = bot_i + 1 < hi[:, None]
+    v0     = profile[np.clip(bot_i, 0, n - 1)]
+    v1     = profile[np.clip(bot_i + 1, 0, n - 1)]
+    hr     = half_right[:, None]
+    cross  = bot_ok & (v0 < hr) & (v1 >= hr)
+    found  = cross.any(axis=1)
+    j      = np.argmax(cross, axis=1)
+    k      = np.nonzero(found)[0]
+    i      = bot_i[k, j[k]]
+    bots[k] = i + (half_right[k] - profile[i]) / (profile[i + 1] - profile[i])
+    return tops, bots
 
-    if bg_left is None:
-        bg_left = float(profile[lo])
-    if bg_right is None:
-        bg_right = float(profile[hi - 1])
 
-    half_left = (bg_left + center) / 2.0
-    half_right = (bg_right + center) / 2.0
+def half_max_edges(profile: np.ndarray, peak_y: float,
+                   search: int = 30) -> tuple[float | None, float | None]:
+    """Find the two 50%-intensity crossings around a trough (dark line).
 
-    top = bot = None
-    for i in range(lo, p):
-        if profile[i] >= half_left and profile[i + 1] < half_left:
-            top = i + (half_left - profile[i]) / (profile[i + 1] - profile[i])
-    for i in range(p, hi - 1):
-        if profile[i] < half_right and profile[i + 1] >= half_right:
-            bot = i + (half_right - profile[i]) / (profile[i + 1] - profile[i])
-            break
+    Returns (top_edge, bottom_edge) with sub-pixel linear interpolation,
+    None for a crossing not found within *search* pixels, and (None, None)
+    if peak_y rounds to a position outside the profile.
+    """
+    tops, bots = half_max_edges_batch(profile, np.array([peak_y]), search)
+    top = None if np.isnan(tops[0]) else float(tops[0])
+    bot = None if np.isnan(bots[0]) else float(bots[0])
     return top, bot
 
 
 def parabola_refine(profile: np.ndarray, peak: int, half_width: int = 3) -> float:
     """Sub-pixel minimum via quadratic fit around *peak*."""
-    lo = max(0, peak - half_width)
-    hi = min(len(profile), peak + half_width + 1)
-    xs = np.arange(lo, hi, dtype=np.float64)
-    c  = np.polyfit(xs, profile[lo:hi], 2)
-    return -c[1] / (2 * c[0]) if c[0] > 0 else float(peak)
+    profile = np.asarray(profile, dtype=np.float64)
+    return float(parabola_refine_rows(profile[None, :], np.zeros(1, dtype=np.intp),
+                                      np.array([int(peak)]), half_width)[0])
+
+
+def parabola_refine_rows(profiles: np.ndarray, rows: np.ndarray, peaks: np.ndarray,
+                         half_width: int = 3) -> np.ndarray:
+    """parabola_refine() for many (row, peak) pairs of a 2-D stack of profiles.
+
+    Solves every quadratic least-squares fit at once in closed form
+    (Cramer's rule on the normal equations), with x centred on the peak.
+    """
+    n       = profiles.shape[1]
+    offsets = np.arange(-half_width, half_width + 1, dtype=np.float64)
+    idx     = peaks[:, None] + np.arange(-half_width, half_width + 1)
+    valid   = (idx >= 0) & (idx < n)
+    y       = np.where(valid, profiles[rows[:, None], np.clip(idx, 0, n - 1)], 0.0)
+    w       = valid.astype(np.float64)
+    s0, s1, s2, s3, s4 = [(w * offsets ** k).sum(axis=1) for k in range(5)]
+    t0, t1, t2         = [(y * offsets ** k).sum(axis=1) for k in range(3)]
+    # | s4 s3 s2 | |a|   |t2|
+    # | s3 s2 s1 | |b| = |t1|
+    # | s2 s1 s0 | |c|   |t0|
+    m00 = s2 * s0 - s1 * s1
+    m01 = s3 * s0 - s1 * s2
+    m02 = s3 * s1 - s2 * s2
+    det = s4 * m00 - s3 * m01 + s2 * m02
+    with np.errstate(divide='ignore', invalid='ignore'):
+        a = (t2 * m00 - s3 * (t1 * s0 - s1 * t0) + s2 * (t1 * s1 - s2 * t0)) / det
+        b = (s4 * (t1 * s0 - s1 * t0) - t2 * m01 + s2 * (s3 * t0 - t1 * s2)) / det
+        peaks_f = peaks.astype(np.float64)
+        vertex  = peaks_f - b / (2 * a)
+    return np.where(a > 0, vertex, peaks_f)
 
 
 def filter_consistent_peaks(centers: np.ndarray, tol: float = 0.30) -> np.ndarray:
@@ -1,16 +1,123 @@
-"""EXIF metadata reader for extracting date/time and GPS from images."""
+"""EXIF metadata reader for extracting date/time and GPS from images.
+
+Files are read header-only: Pillow parses the EXIF block without decoding
+pixels, and HEIC/HEIF EXIF comes straight from the container metadata.
+The fields the app displays are kept in a small SQLite cache keyed by
+(path, size, mtime), so reselecting or reimporting a file does not touch
+it again.
+"""
+import json
+import sqlite3
+import threading
 from pathlib import Path
 from datetime import datetime
 from typing import Optional, Tuple, Dict, Any
 from PIL import Image
 from PIL import ExifTags
+from PIL.TiffImagePlugin import IFDRational
+
+from database.schema import get_cache_dir
+
+# Tags kept in the summary cache; everything the UI shows or parses.
+SUMMARY_TAGS = (
+    'DateTimeOriginal',
+    'DateTimeDigitized',
+    'DateTime',
+    'Make',
+    'Model',
+    'ISOSpeedRatings',
+    'PhotographicSensitivity',
+    'ExposureTime',
+    'ShutterSpeedValue',
+    'FNumber',
+    'ApertureValue',
+    'FocalLength',
+)
+# Bump when the summary layout changes so stale rows are re-read.
+SUMMARY_VERSION = 1
+
+_cache_local = threading.local()
+
+
+def _decode_exif(exif) -> Dict[str, Any]:
+    """Flatten a PIL Exif object (base, EXIF and GPS IFDs) into tag names."""
+    decoded = {}
+    for tag_id, value in exif.items():
+        tag = ExifTags.TAGS.get(tag_id, tag_id)
+        decoded[tag] = value
+
+    # Handle EXIF IFD separately (camera settings like ISO, shutter, f-stop)
+    try:
+        exif_ifd = exif.get_ifd(0x8769)  # EXIF IFD tag
+        if exif_ifd:
+            for tag_id, value in exif_ifd.items():
+                tag = ExifTags.TAGS.get(tag_id, tag_id)
+                decoded[tag] = value
+    except (KeyError, AttributeError):
+        pass
 
-"""EXIF metadata reader for extracting date/time and GPS from images."""
-from pathlib import Path
-from datetime import datetime
-from typing import Optional, Tuple, Dict, Any
-from PIL import Image
-from PIL import ExifTags
+    # Handle GPS IFD separately
+    try:
+        gps_ifd = exif.get_ifd(0x8825)  # GPSInfo tag
+        if gps_ifd:
+            decoded['GPSInfo'] = dict(gps_ifd)
+    except (KeyError, AttributeError):
+        pass
+
+    return decoded
+
+
+def _read_exif(image_path: str) -> Dict[str, Any]:
+    """Decode the EXIF tags of an image, raising if the file cannot be read.
+
+    A readable file without EXIF gives an empty dict.
+    """
+    if not image_path or not Path(image_path).exists():
+        return {}
+    suffix = Path(image_path).suffix.lower()
+
+    # Handle HEIC/HEIF files with pillow_heif
+    if suffix in ('.heic', '.heif'):
+        import pillow_heif
+        heif_file = pillow_heif.open_heif(image_path)
+
+        # EXIF comes from the container metadata; no pixel decode.
+        exif_data = heif_file.info.get('exif')
+        if exif_data:
+            exif = Image.Exif()
+            exif.load(exif_data)
+            if exif:
+                return _decode_exif(exif)
+        return {}
+
+    # Standard image formats
+    with Image.open(image_path) as img:
+        exif = img.getexif()
+        if not exif:
+            # Try legacy method for older PIL versions
+            exif_data = getattr(img, '_getexif', lambda: None)()
+            if not exif_data:
+                return {}
+            decoded = {}
+            for tag_id, value in exif_data.items():
+                tag = ExifTags.TAGS.get(tag_id, tag_id)
+                decoded[tag] = value
+            # Check for GPS info in legacy exif data
+            gps_tag_id = 34853  # GPSInfo tag ID
+            if gps_tag_id in exif_data:
+                decoded['GPSInfo'] = exif_data[gps_tag_id]
+            return decoded
+
+        return _decode_exif(exif)
+
+
+def _report_exif_error(image_path: str, error: Exception) -> None:
+    if isinstance(error, ImportError):
+        print("pillow-heif not installed, cannot read HEIC files")
+    elif Path(image_path).suffix.lower() in ('.heic', '.heif'):
+        print(f"Error reading HEIC EXIF from {image_path}: {error}")
+    else:
+        print(f"Error reading EXIF from {image_path}: {error}")
 
 
 def get_exif_data(image_path: str) -> Dict[str, Any]:
@@ -24,99 +131,9 @@ def get_exif_data(image_path: str) -> Dict[str, Any]:
         Dictionary with decoded EXIF tags
     """
     try:
-        if not image_path or not Path(image_path).exists():
-            return {}
-        suffix = Path(image_path).suffix.lower()
-
-        # Handle HEIC/HEIF files with pillow_heif
-        if suffix in ('.heic', '.heif'):
-            try:
-                import pillow_heif
-                heif_file = pillow_heif.open_heif(image_path)
-
-                # Get EXIF from pillow_heif metadata
-                exif_data = heif_file.info.get('exif')
-                if exif_data:
-                    # Create a temporary image to parse EXIF
-                    img = heif_file.to_pillow()
-                    exif = img.getexif()
-                    if exif:
-                        decoded = {}
-                        for tag_id, value in exif.items():
-                            tag = ExifTags.TAGS.get(tag_id, tag_id)
-                            decoded[tag] = value
-
-                        # Handle EXIF IFD separately (camera settings)
-                        try:
-                            exif_ifd = exif.get_ifd(0x8769)  # EXIF IFD tag
-                            if exif_ifd:
-                                for tag_id, value in exif_ifd.items():
-                                    tag = ExifTags.TAGS.get(tag_id, tag_id)
-                                    decoded[tag] = value
-                        except (KeyError, AttributeError):
-                            pass
-
-                        # Handle GPS IFD separately
-                        try:
-                            gps_ifd = exif.get_ifd(0x8825)  # GPSInfo tag
-                            if gps_ifd:
-                                decoded['GPSInfo'] = dict(gps_ifd)
-                        except (KeyError, AttributeError):
-                            pass
-
-                        return decoded
-                return {}
-            except ImportError:
-                print("pillow-heif not installed, cannot read HEIC files")
-                return {}
-            except Exception as e:
-                print(f"Error reading HEIC EXIF from {image_path}: {e}")
-                return {}
-
-        # Standard image formats
-        with Image.open(image_path) as img:
-            exif = img.getexif()
-            if not exif:
-                # Try legacy method for older PIL versions
-                exif_data = getattr(img, '_getexif', lambda: None)()
-                if not exif_data:
-                    return {}
-                decoded = {}
-                for tag_id, value in exif_data.items():
-                    tag = ExifTags.TAGS.get(tag_id, tag_id)
-                    decoded[tag] = value
-                # Check for GPS info in legacy exif data
-                gps_tag_id = 34853  # GPSInfo tag ID
-                if gps_tag_id in exif_data:
-                    decoded['GPSInfo'] = exif_data[gps_tag_id]
-                return decoded
-
-            decoded = {}
-            for tag_id, value in exif.items():
-                tag = ExifTags.TAGS.get(tag_id, tag_id)
-                decoded[tag] = value
-
-            # Handle EXIF IFD separately (camera settings like ISO, shutter, f-stop)
-            try:
-                exif_ifd = exif.get_ifd(0x8769)  # EXIF IFD tag
-                if exif_ifd:
-                    for tag_id, value in exif_ifd.items():
-                        tag = ExifTags.TAGS.get(tag_id, tag_id)
-                        decoded[tag] = value
-            except (KeyError, AttributeError):
-                pass
-
-            # Handle GPS IFD separately
-            try:
-                gps_ifd = exif.get_ifd(0x8825)  # GPSInfo tag
-                if gps_ifd:
-                    decoded['GPSInfo'] = dict(gps_ifd)
-            except (KeyError, AttributeError):
-                pass
-
-            return decoded
+        return _read_exif(image_path)
     except Exception as e:
-        print(f"Error reading EXIF from {image_path}: {e}")
+        _report_exif_error(image_path, e)
         return {}
 
 
@@ -130,7 +147,7 @@ def get_camera_settings(image_path: str) -> Dict[str, Any]:
     Returns:
         Dictionary with 'iso', 'shutter_speed', 'f_number', 'focal_length'
     """
-    exif = get_exif_data(image_path)
+    exif = get_exif_summary(image_path)
     
     # ISO - try multiple tag names
     iso = (exif.get('ISOSpeedRatings') or 
@@ -181,8 +198,10 @@ def get_image_datetime(image_path: str) -> Optional[datetime]:
     Returns:
         datetime object or None if not available
     """
-    exif = get_exif_data(image_path)
+    return _datetime_from_tags(get_exif_summary(image_path))
 
+
+def _datetime_from_tags(exif: Dict[str, Any]) -> Optional[datetime]:
     # Try different date fields in order of preference
     date_fields = ['DateTimeOriginal', 'DateTimeDigitized', 'DateTime']
 
@@ -219,20 +238,25 @@ def get_gps_coordinates(image_path: str) -> Tuple[Optional[float], Optional[floa
     Returns:
         Tuple of (latitude, longitude) or (None, None) if not available
     """
-    exif = get_exif_data(image_path)
+    summary = read_image_summary(image_path)
+    if not summary:
+        return None, None
+    return summary['latitude'], summary['longitude']
 
+
+def _gps_from_exif(exif: Dict[str, Any]) -> Tuple[Optional[float], Optional[float]]:
     if 'GPSInfo' not in exif:
         return None, None
 
     gps_info = exif['GPSInfo']
 
-    # Decode GPS tags
-    gps_data = {}
-    for tag_id, value in gps_info.items():
-        tag = ExifTags.GPSTAGS.get(tag_id, tag_id)
-        gps_data[tag] = value
-
     try:
+        # Decode GPS tags
+        gps_data = {}
+        for tag_id, value in gps_info.items():
+            tag = ExifTags.GPSTAGS.get(tag_id, tag_id)
+            gps_data[tag] = value
+
         lat = _convert_to_degrees(gps_data.get('GPSLatitude', []))
         lat_ref = gps_data.get('GPSLatitudeRef', 'N')
         if lat_ref == 'S':
@@ -251,6 +275,131 @@ def get_gps_coordinates(image_path: str) -> Tuple[Optional[float], Optional[floa
         return None, None
 
 
+def _encode_value(value):
+    """Make an EXIF value JSON-safe, keeping rationals exact."""
+    if isinstance(value, IFDRational):
+        return {'r': [value.numerator, value.denominator]}
+    if isinstance(value, (tuple, list)):
+        return [_encode_value(item) for item in value]
+    if isinstance(value, bytes):
+        return value.decode('latin-1')
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)
+
+
+def _decode_value(value):
+    if isinstance(value, dict) and 'r' in value:
+        return IFDRational(*value['r'])
+    if isinstance(value, list):
+        return tuple(_decode_value(item) for item in value)
+    return value
+
+
+def _summary_connection() -> sqlite3.Connection:
+    """Return this thread's connection to the EXIF summary cache."""
+    db_path = get_cache_dir() / "exif_cache.sqlite3"
+    cached = getattr(_cache_local, 'conn', None)
+    if cached is not None and cached[0] == db_path:
+        return cached[1]
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=10)
+    conn.execute("PRAGMA busy_timeout = 5000")
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS exif_summary (
+            path TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            version INTEGER NOT NULL,
+            data TEXT NOT NULL
+        )
+        """
+    )
+    conn.commit()
+    _cache_local.conn = (db_path, conn)
+    return conn
+
+
+def read_image_summary(image_path: str) -> Optional[Dict[str, Any]]:
+    """
+    Return the cached EXIF summary of an image, reading the file on a miss.
+
+    Args:
+        image_path: Path to the image file
+
+    Returns:
+        Dictionary with 'tags' (SUMMARY_TAGS present in the file, same value
+        types as get_exif_data), 'latitude' and 'longitude', or None if the
+        file does not exist
+    """
+    if not image_path:
+        return None
+    try:
+        path = Path(image_path).resolve()
+        stat = path.stat()
+    except (OSError, ValueError):
+        return None
+    key = str(path)
+
+    data = None
+    conn = None
+    try:
+        conn = _summary_connection()
+        row = conn.execute(
+            "SELECT size, mtime_ns, version, data FROM exif_summary WHERE path = ?",
+            (key,),
+        ).fetchone()
+        if row and row[0] == stat.st_size and row[1] == stat.st_mtime_ns and row[2] == SUMMARY_VERSION:
+            data = json.loads(row[3])
+    except (sqlite3.Error, ValueError) as e:
+        print(f"Warning: EXIF cache lookup failed: {e}")
+
+    if data is None:
+        try:
+            exif = _read_exif(key)
+            read_ok = True
+        except Exception as e:
+            # Not cached: the next call reads the file again.
+            _report_exif_error(key, e)
+            exif = {}
+            read_ok = False
+        lat, lon = _gps_from_exif(exif)
+        data = {
+            'tags': {tag: _encode_value(exif[tag]) for tag in SUMMARY_TAGS if tag in exif},
+            'latitude': lat,
+            'longitude': lon,
+        }
+        if conn is not None and read_ok:
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO exif_summary (path, size, mtime_ns, version, data) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, stat.st_size, stat.st_mtime_ns, SUMMARY_VERSION, json.dumps(data)),
+                )
+                conn.commit()
+            except sqlite3.Error as e:
+                print(f"Warning: Could not store EXIF cache entry: {e}")
+
+    return {
+        'tags': {tag: _decode_value(value) for tag, value in data['tags'].items()},
+        'latitude': data['latitude'],
+        'longitude': data['longitude'],
+    }
+
+
+def get_exif_summary(image_path: str) -> Dict[str, Any]:
+    """
+    Return the SUMMARY_TAGS of an image from the cache.
+
+    Use this instead of get_exif_data when only dates and camera fields are
+    needed; values have the same types as get_exif_data returns.
+    """
+    summary = read_image_summary(image_path)
+    return summary['tags'] if summary else {}
+
+
 def get_image_metadata(image_path: str) -> Dict[str, Any]:
     """
     Get all relevant metadata from an image.
@@ -272,8 +421,9 @@ def get_image_metadata(image_path: str) -> Dict[str, Any]:
             'filepath': image_path,
         }
 
-    dt = get_image_datetime(image_path)
-    lat, lon = get_gps_coordinates(image_path)
+    summary = read_image_summary(image_path) or {'tags': {}, 'latitude': None, 'longitude': None}
+    dt = _datetime_from_tags(summary['tags'])
+    lat, lon = summary['latitude'], summary['longitude']
 
     return {
         'missing': False,
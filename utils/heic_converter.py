@@ -1,6 +1,11 @@
 """HEIC/HEIF conversion helper."""
+import threading
 from pathlib import Path
 
+# Output names are picked by probing for free files; serialize that so
+# parallel imports of same-named photos do not pick the same name.
+_output_name_lock = threading.Lock()
+
 
 def convert_heic_to_jpeg(filepath, output_dir):
     """Convert a HEIC/HEIF image to JPEG in output_dir.
@@ -40,13 +45,19 @@ def convert_heic_to_jpeg(filepath, output_dir):
         base_name = Path(filepath).stem
         output_path = output_dir / f"{base_name}.jpg"
         counter = 1
-        while output_path.exists():
-            output_path = output_dir / f"{base_name}_{counter}.jpg"
-            counter += 1
-        if exif_bytes:
-            image.save(output_path, "JPEG", quality=95, exif=exif_bytes)
-        else:
-            image.save(output_path, "JPEG", quality=95)
+        with _output_name_lock:
+            while output_path.exists():
+                output_path = output_dir / f"{base_name}_{counter}.jpg"
+                counter += 1
+            output_path.touch()
+        try:
+            if exif_bytes:
+                image.save(output_path, "JPEG", quality=95, exif=exif_bytes)
+            else:
+                image.save(output_path, "JPEG", quality=95)
+        except Exception:
+            output_path.unlink(missing_ok=True)
+            raise
         return str(output_path)
     except Exception:
         return None
@@ -0,0 +1,206 @@
+"""Per-image analysis maps shared by auto measure and spore detection.
+
+When a microscope image is shown, its greyscale pixels, a low-pass
+background estimate, a gradient magnitude map and an integral image are
+computed once and kept in a small LRU cache, so click-to-measure,
+threshold estimation and batch detection all start from the same maps
+instead of converting the image again each time.
+
+The integral image is summed in uint32 and may wrap around on large
+images; window sums are still exact, since they are differences taken
+modulo 2**32 and no window of under 16.8 MP can reach that total.
+
+Everything here takes plain numpy greyscale arrays and imports nothing
+from Qt.
+"""
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Hashable, Optional
+
+import numpy as np
+
+from utils.spore_autodetect import BACKGROUND_BLOCK_MIN, estimate_background
+
+ANALYSIS_CACHE_MAX_BYTES = 512 * 1024 * 1024
+ANALYSIS_CACHE_MAX_ENTRIES = 8
+BACKGROUND_BLOCK_DIVISOR = 16  # background tiles are this fraction of the short side
+
+
+@dataclass
+class ImageAnalysis:
+    """Analysis maps of one greyscale image."""
+
+    gray: np.ndarray  # uint8
+    background: np.ndarray  # float32, block-median low-pass estimate
+    background_block: int  # tile size of the background estimate, in pixels
+    gradient: np.ndarray  # float32, Sobel gradient magnitude
+    integral: np.ndarray  # uint32, (height + 1) x (width + 1), wraps around
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return self.gray.shape
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in (self.gray, self.background, self.gradient, self.integral))
+
+    def window_sum(self, x0, y0, x1, y1):
+        """Sum of gray over [x0, x1) x [y0, y1); arguments may be arrays.
+
+        Windows are clipped to the image.
+        """
+        height, width = self.gray.shape
+        x0 = np.clip(x0, 0, width)
+        x1 = np.clip(x1, 0, width)
+        y0 = np.clip(y0, 0, height)
+        y1 = np.clip(y1, 0, height)
+        table = self.integral
+        with np.errstate(over="ignore"):
+            total = table[y1, x1] - table[y0, x1] - table[y1, x0] + table[y0, x0]
+        return np.asarray(total).astype(np.int64)
+
+    def local_mean(self, x, y, radius: int):
+        """Mean of gray over the (2 * radius + 1) square around pixel (x, y), clipped to the image."""
+        x = np.asarray(x, dtype=np.intp)
+        y = np.asarray(y, dtype=np.intp)
+        height, width = self.gray.shape
+        x0 = np.clip(x - radius, 0, width)
+        x1 = np.clip(x + radius + 1, 0, width)
+        y0 = np.clip(y - radius, 0, height)
+        y1 = np.clip(y + radius + 1, 0, height)
+        area = np.maximum((x1 - x0) * (y1 - y0), 1)
+        return self.window_sum(x0, y0, x1, y1) / area
+
+    def box_mean(self, radius: int) -> np.ndarray:
+        """local_mean() of every pixel, as float32."""
+        height, width = self.gray.shape
+        if radius < 1:
+            return self.gray.astype(np.float32)
+        y0 = np.clip(np.arange(height) - radius, 0, height)
+        y1 = np.clip(np.arange(height) + radius + 1, 0, height)
+        x0 = np.clip(np.arange(width) - radius, 0, width)
+        x1 = np.clip(np.arange(width) + radius + 1, 0, width)
+        table = self.integral
+        # uint32 differences wrap back to the exact window sums.
+        sums = table[np.ix_(y1, x1)]
+        sums -= table[np.ix_(y0, x1)]
+        sums -= table[np.ix_(y1, x0)]
+        sums += table[np.ix_(y0, x0)]
+        means = sums.astype(np.float32)
+        del sums
+        means /= (y1 - y0)[:, None].astype(np.float32)
+        means /= (x1 - x0)[None, :].astype(np.float32)
+        return means
+
+
+def integral_image(gray: np.ndarray) -> np.ndarray:
+    """Summed-area table of gray with a leading row and column of zeros, in wrapping uint32."""
+    height, width = gray.shape
+    table = np.zeros((height + 1, width + 1), dtype=np.uint32)
+    np.cumsum(gray, axis=0, dtype=np.uint32, out=table[1:, 1:])
+    np.cumsum(table[1:, 1:], axis=1, dtype=np.uint32, out=table[1:, 1:])
+    return table
+
+
+def gradient_magnitude(gray: np.ndarray) -> np.ndarray:
+    """Sobel gradient magnitude of gray, as float32; zero on the border."""
+    height, width = gray.shape
+    magnitude = np.zeros((height, width), dtype=np.float32)
+    if height < 3 or width < 3:
+        return magnitude
+    g = gray.astype(np.float32)
+    # Smooth across, then difference along, each axis.
+    across = g[:-2] + 2 * g[1:-1] + g[2:]
+    gx = across[:, 2:] - across[:, :-2]
+    del across
+    along = g[:, :-2] + 2 * g[:, 1:-1] + g[:, 2:]
+    gy = along[2:] - along[:-2]
+    del along, g
+    np.hypot(gx, gy, out=magnitude[1:-1, 1:-1])
+    return magnitude
+
+
+def analyze_image(gray: np.ndarray, background_block: Optional[int] = None) -> ImageAnalysis:
+    """Compute every analysis map of a greyscale image.
+
+    background_block defaults to the short side over BACKGROUND_BLOCK_DIVISOR.
+    """
+    gray = np.ascontiguousarray(gray, dtype=np.uint8)
+    if background_block is None:
+        background_block = min(gray.shape) // BACKGROUND_BLOCK_DIVISOR
+    background_block = max(BACKGROUND_BLOCK_MIN, int(background_block))
+    return ImageAnalysis(
+        gray=gray,
+        background=estimate_background(gray, background_block),
+        background_block=background_block,
+        gradient=gradient_magnitude(gray),
+        integral=integral_image(gray),
+    )
+
+
+class ImageAnalysisCache:
+    """Thread-safe LRU of ImageAnalysis, bounded by entries and bytes.
+
+    The most recently stored entry is always kept, even if it alone is
+    over the byte budget.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = ANALYSIS_CACHE_MAX_ENTRIES,
+        max_bytes: int = ANALYSIS_CACHE_MAX_BYTES,
+    ) -> None:
+        self.max_entries = max(1, int(max_entries))
+        self.max_bytes = int(max_bytes)
+        self._entries: OrderedDict[Hashable, ImageAnalysis] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    @property
+    def nbytes(self) -> int:
+        with self._lock:
+            return self._bytes
+
+    def get(self, key: Hashable) -> Optional[ImageAnalysis]:
+        """Return the analysis stored under key and mark it recently used, or None."""
+        with self._lock:
+            analysis = self._entries.get(key)
+            if analysis is not None:
+                self._entries.move_to_end(key)
+            return analysis
+
+    def put(self, key: Hashable, analysis: ImageAnalysis) -> None:
+        """Store analysis under key, evicting the least recently used entries."""
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.nbytes
+            self._entries[key] = analysis
+            self._bytes += analysis.nbytes
+            while len(self._entries) > 1 and (
+                len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+            ):
+                _key, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.nbytes
+
+    def discard(self, key: Hashable) -> None:
+        with self._lock:
+            analysis = self._entries.pop(key, None)
+            if analysis is not None:
+                self._bytes -= analysis.nbytes
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
@@ -0,0 +1,273 @@
+"""Pixel size, file size, mtime and content hash of image files.
+
+These facts are stored on the images table at import time so callers do
+not have to open files to learn an image's size. Stored values carry the
+file size and mtime they were read at; when the file has changed since,
+or the image is not in the database, the header is read once and the
+result memoized for the rest of the session.
+
+The size, prefix hash and SHA-256 of the file each image was imported
+from are stored too, so re-imports can be detected with an indexed
+lookup, and identical files are hardlinked instead of copied again.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Callable, Optional
+
+from PIL import Image
+
+HASH_CHUNK_BYTES = 1024 * 1024
+PREFIX_HASH_BYTES = 64 * 1024
+BACKFILL_BATCH_SIZE = 50
+
+_size_memo: dict[tuple[str, int, int], tuple[int, int]] = {}
+_size_memo_lock = threading.Lock()
+
+
+def hash_file(path: str | Path) -> Optional[str]:
+    """Return the SHA-256 hex digest of a file, or None if it cannot be read."""
+    digest = hashlib.sha256()
+    try:
+        with open(path, "rb") as handle:
+            for chunk in iter(lambda: handle.read(HASH_CHUNK_BYTES), b""):
+                digest.update(chunk)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+def hash_file_prefix(path: str | Path) -> Optional[str]:
+    """Return the SHA-256 hex digest of the first PREFIX_HASH_BYTES of a file."""
+    try:
+        with open(path, "rb") as handle:
+            return hashlib.sha256(handle.read(PREFIX_HASH_BYTES)).hexdigest()
+    except OSError:
+        return None
+
+
+def read_pixel_size(path: str | Path) -> Optional[tuple[int, int]]:
+    """Return (width, height) from the file header without decoding pixels."""
+    path = Path(path)
+    try:
+        if path.suffix.lower() in (".heic", ".heif"):
+            import pillow_heif
+
+            width, height = pillow_heif.open_heif(str(path)).size
+        else:
+            with Image.open(path) as img:
+                width, height = img.size
+    except Exception:
+        return None
+    if width <= 0 or height <= 0:
+        return None
+    return int(width), int(height)
+
+
+def read_image_file_info(
+    path: str | Path,
+    with_hash: bool = True,
+    content_hash: str | None = None,
+) -> Optional[dict]:
+    """Read the values stored on the images table for one file.
+
+    Returns a dict with pixel_width, pixel_height, megapixels, file_size,
+    file_mtime_ns and content_hash, or None if the file does not exist.
+    Pass content_hash when it is already known to skip hashing the file.
+    """
+    try:
+        stat = Path(path).stat()
+    except (OSError, TypeError, ValueError):
+        return None
+    size = _memoized_size(str(path), stat.st_size, stat.st_mtime_ns)
+    width, height = size if size else (None, None)
+    return {
+        "pixel_width": width,
+        "pixel_height": height,
+        "megapixels": (width * height) / 1_000_000.0 if size else None,
+        "file_size": int(stat.st_size),
+        "file_mtime_ns": int(stat.st_mtime_ns),
+        "content_hash": content_hash or (hash_file(path) if with_hash else None),
+    }
+
+
+def read_source_identity(
+    path: str | Path,
+    with_hash: bool = True,
+    source_hash: str | None = None,
+) -> Optional[dict]:
+    """Return source_size, source_prefix_hash and source_hash of a file being imported.
+
+    Returns None if the file does not exist.
+    """
+    try:
+        size = Path(path).stat().st_size
+    except (OSError, TypeError, ValueError):
+        return None
+    return {
+        "source_size": int(size),
+        "source_prefix_hash": hash_file_prefix(path),
+        "source_hash": source_hash or (hash_file(path) if with_hash else None),
+    }
+
+
+def find_duplicate_images(path: str | Path) -> list[dict]:
+    """Return images already imported from a file with the same content as path.
+
+    Size and prefix hash are matched against the index first; the file is
+    only hashed in full when some image shares them. Images imported before
+    source hashes were recorded are matched by stored file size and hash.
+    """
+    identity = read_source_identity(path, with_hash=False)
+    if not identity or not identity["source_prefix_hash"]:
+        return []
+    from database.models import ImageDB
+
+    candidates = ImageDB.find_import_candidates(identity["source_size"], identity["source_prefix_hash"])
+    if not candidates:
+        return []
+    digest = hash_file(path)
+    if not digest:
+        return []
+    return [
+        row
+        for row in candidates
+        if row.get("source_hash") == digest
+        or (not row.get("source_hash") and row.get("content_hash") == digest)
+    ]
+
+
+def store_file(source: str | Path, dest: str | Path) -> Optional[str]:
+    """Copy source to dest, hardlinking an identical stored file when possible.
+
+    Stored images and originals with the same content hash are linked
+    instead of copied, so re-imports do not duplicate data on disk.
+    Returns the content hash of source (None if it could not be read);
+    raises OSError if the file could not be stored.
+    """
+    digest = hash_file(source)
+    if digest:
+        from database.models import ImageDB
+
+        try:
+            size = Path(source).stat().st_size
+        except OSError:
+            size = None
+        for existing in ImageDB.find_stored_files_by_hash(digest):
+            try:
+                if Path(existing).stat().st_size != size:
+                    continue
+                os.link(existing, dest)
+                return digest
+            except OSError:
+                # Missing, on another volume or no hardlink support.
+                continue
+    shutil.copy2(source, dest)
+    return digest
+
+
+def _memoized_size(path: str, file_size: int, mtime_ns: int) -> Optional[tuple[int, int]]:
+    key = (path, int(file_size), int(mtime_ns))
+    with _size_memo_lock:
+        size = _size_memo.get(key)
+    if size is not None:
+        return size
+    size = read_pixel_size(path)
+    if size is not None:
+        with _size_memo_lock:
+            _size_memo[key] = size
+    return size
+
+
+def stored_info_is_current(stored: dict | None, path: str | Path | None = None) -> bool:
+    """Return True if stored pixel/file values still describe the file on disk."""
+    if not stored or not stored.get("pixel_width") or not stored.get("pixel_height"):
+        return False
+    path = path or stored.get("filepath")
+    try:
+        stat = Path(path).stat()
+    except (OSError, TypeError, ValueError):
+        return False
+    return stored.get("file_size") == stat.st_size and stored.get("file_mtime_ns") == stat.st_mtime_ns
+
+
+def get_image_size(path: str | Path | None, stored: dict | None = None) -> Optional[tuple[int, int]]:
+    """Return (width, height) of an image, preferring stored values.
+
+    stored may be an images row; without it the row is looked up by path.
+    Images whose row is missing or stale are read from the file header and
+    their row is refreshed.
+    """
+    if not path:
+        return None
+    path = str(path)
+    try:
+        stat = Path(path).stat()
+    except (OSError, ValueError):
+        return None
+    key = (path, int(stat.st_size), int(stat.st_mtime_ns))
+    with _size_memo_lock:
+        size = _size_memo.get(key)
+    if size is not None:
+        return size
+
+    if stored is None:
+        from database.models import ImageDB
+
+        stored = ImageDB.get_file_info_by_path(path)
+    if stored and stored_info_is_current(stored, path):
+        size = (int(stored["pixel_width"]), int(stored["pixel_height"]))
+        with _size_memo_lock:
+            _size_memo[key] = size
+        return size
+
+    size = _memoized_size(path, stat.st_size, stat.st_mtime_ns)
+    if size is not None and stored and stored.get("id"):
+        from database.models import ImageDB
+
+        ImageDB.set_file_info(stored["id"], read_image_file_info(path, with_hash=False))
+    return size
+
+
+def get_image_megapixels(path: str | Path | None, stored: dict | None = None) -> Optional[float]:
+    size = get_image_size(path, stored=stored)
+    if not size:
+        return None
+    return (size[0] * size[1]) / 1_000_000.0
+
+
+def backfill_image_file_info(
+    batch_size: int = BACKFILL_BATCH_SIZE,
+    should_stop: Callable[[], bool] | None = None,
+) -> int:
+    """Fill in stored file info for images imported before it was recorded.
+
+    Works in batches so it can run on a background thread and stop between
+    files. Returns the number of images updated.
+    """
+    from database.models import ImageDB
+
+    updated = 0
+    skipped: set[int] = set()
+    while True:
+        rows = [
+            row
+            for row in ImageDB.get_images_missing_file_info(limit=batch_size + len(skipped))
+            if row["id"] not in skipped
+        ][:batch_size]
+        if not rows:
+            return updated
+        for row in rows:
+            if should_stop and should_stop():
+                return updated
+            info = read_image_file_info(row["filepath"])
+            if not info or not info["pixel_width"]:
+                # Missing or unreadable; leave it for relinking and move on.
+                skipped.add(row["id"])
+                continue
+            ImageDB.set_file_info(row["id"], info)
+            updated += 1
@@ -0,0 +1,284 @@
+"""Tiled multi-resolution image pyramids cached on disk.
+
+Level 0 is the full-resolution image; each following level halves both
+dimensions until the whole image fits in a single tile. Tiles are JPEG
+files so they can be decoded by any QImage reader, and a manifest is
+written last to mark a pyramid as complete. Images are read with their
+EXIF orientation applied.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import shutil
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Optional
+
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QImage, QImageIOHandler, QImageReader
+
+from database.schema import get_cache_dir
+
+TILE_SIZE = 512
+# Below this size a single scaled pixmap is cheap enough to draw directly.
+PYRAMID_MIN_PIXELS = 16_000_000
+PYRAMID_CACHE_MAX_ENTRIES = 40
+PYRAMID_CACHE_MAX_BYTES = 2 * 1024 ** 3
+# Bumped when the tile layout changes so stale caches are not reused.
+PYRAMID_FORMAT_VERSION = 2
+LEVEL0_JPEG_QUALITY = 95
+LEVEL_JPEG_QUALITY = 92
+MANIFEST_NAME = "manifest.json"
+
+
+@dataclass
+class PyramidInfo:
+    """Layout of a generated pyramid."""
+
+    root: Path
+    width: int
+    height: int
+    tile_size: int
+    levels: int
+
+    def level_size(self, level: int) -> tuple[int, int]:
+        scale = 1 << level
+        return (
+            max(1, int(math.ceil(self.width / scale))),
+            max(1, int(math.ceil(self.height / scale))),
+        )
+
+    def tile_grid(self, level: int) -> tuple[int, int]:
+        w, h = self.level_size(level)
+        return (
+            max(1, int(math.ceil(w / self.tile_size))),
+            max(1, int(math.ceil(h / self.tile_size))),
+        )
+
+    def tile_path(self, level: int, tx: int, ty: int) -> Path:
+        return self.root / str(level) / f"{tx}_{ty}.jpg"
+
+    def level_for_scale(self, screen_per_full_px: float) -> int:
+        """Pick the coarsest level that still has at least one texel per screen pixel."""
+        if screen_per_full_px <= 0:
+            return self.levels - 1
+        level = int(math.floor(math.log2(1.0 / screen_per_full_px))) if screen_per_full_px < 1.0 else 0
+        return max(0, min(self.levels - 1, level))
+
+
+def pyramid_cache_root() -> Path:
+    return get_cache_dir() / "pyramids"
+
+
+def needs_pyramid(width: int, height: int) -> bool:
+    return int(width) * int(height) >= PYRAMID_MIN_PIXELS
+
+
+def oriented_image_size(image_path: str) -> Optional[tuple[int, int]]:
+    """Return (width, height) of image_path after its EXIF orientation."""
+    reader = QImageReader(str(image_path))
+    reader.setAutoTransform(True)
+    size = reader.size()
+    if not size.isValid():
+        return None
+    width, height = size.width(), size.height()
+    if reader.transformation() & QImageIOHandler.TransformationRotate90:
+        width, height = height, width
+    return width, height
+
+
+def read_oriented_image(image_path: str) -> QImage:
+    """Decode image_path with its EXIF orientation applied."""
+    reader = QImageReader(str(image_path))
+    reader.setAutoTransform(True)
+    return reader.read()
+
+
+def pyramid_key(image_path: str) -> Optional[str]:
+    """Return a cache key for the file identity (path, size, mtime)."""
+    try:
+        path = Path(image_path).resolve()
+        stat = path.stat()
+    except OSError:
+        return None
+    raw = f"{PYRAMID_FORMAT_VERSION}|{path}|{stat.st_size}|{stat.st_mtime_ns}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def level_count(width: int, height: int, tile_size: int = TILE_SIZE) -> int:
+    longest = max(1, int(width), int(height))
+    levels = 1
+    while longest > tile_size:
+        longest = int(math.ceil(longest / 2))
+        levels += 1
+    return levels
+
+
+def load_pyramid(image_path: str, cache_root: Path | None = None) -> Optional[PyramidInfo]:
+    """Return the cached pyramid for image_path, or None if it is not built."""
+    key = pyramid_key(image_path)
+    if not key:
+        return None
+    root = (cache_root or pyramid_cache_root()) / key
+    manifest = root / MANIFEST_NAME
+    if not manifest.exists():
+        return None
+    try:
+        with open(manifest, "r", encoding="utf-8") as handle:
+            data = json.load(handle)
+        info = PyramidInfo(
+            root=root,
+            width=int(data["width"]),
+            height=int(data["height"]),
+            tile_size=int(data["tile_size"]),
+            levels=int(data["levels"]),
+        )
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    try:
+        manifest.touch()
+    except OSError:
+        pass
+    return info
+
+
+def build_pyramid(
+    image_path: str,
+    cache_root: Path | None = None,
+    tile_size: int = TILE_SIZE,
+    image: QImage | None = None,
+    cancel_cb: Callable[[], bool] | None = None,
+) -> Optional[PyramidInfo]:
+    """Generate and cache a pyramid for image_path.
+
+    image is the already decoded image, if the caller has one; otherwise
+    the file is read with its orientation applied. A cached pyramid whose
+    size does not match image is rebuilt. Works on QImage only, so it is
+    safe to call from a worker thread. Returns None if the image cannot be
+    read or the build is cancelled.
+    """
+    existing = load_pyramid(image_path, cache_root)
+    if existing and (
+        image is None or (existing.width, existing.height) == (image.width(), image.height())
+    ):
+        return existing
+    key = pyramid_key(image_path)
+    if not key:
+        return None
+    if image is None:
+        image = read_oriented_image(image_path)
+    if image.isNull():
+        return None
+
+    cache_root = cache_root or pyramid_cache_root()
+    root = cache_root / key
+    tmp_root = cache_root / f"{key}.partial"
+    shutil.rmtree(tmp_root, ignore_errors=True)
+    levels = level_count(image.width(), image.height(), tile_size)
+    info = PyramidInfo(
+        root=tmp_root,
+        width=image.width(),
+        height=image.height(),
+        tile_size=tile_size,
+        levels=levels,
+    )
+
+    total_bytes = 0
+    try:
+        level_image = image
+        for level in range(levels):
+            if level > 0:
+                target_w, target_h = info.level_size(level)
+                level_image = level_image.scaled(
+                    target_w, target_h, Qt.IgnoreAspectRatio, Qt.SmoothTransformation
+                )
+            level_dir = tmp_root / str(level)
+            level_dir.mkdir(parents=True, exist_ok=True)
+            cols, rows = info.tile_grid(level)
+            for ty in range(rows):
+                for tx in range(cols):
+                    if cancel_cb and cancel_cb():
+                        shutil.rmtree(tmp_root, ignore_errors=True)
+                        return None
+                    tile_w = min(tile_size, level_image.width() - tx * tile_size)
+                    tile_h = min(tile_size, level_image.height() - ty * tile_size)
+                    tile = level_image.copy(tx * tile_size, ty * tile_size, tile_w, tile_h)
+                    path = info.tile_path(level, tx, ty)
+                    quality = LEVEL0_JPEG_QUALITY if level == 0 else LEVEL_JPEG_QUALITY
+                    if not tile.save(str(path), "JPG", quality):
+                        raise OSError(f"could not write {path}")
+                    total_bytes += path.stat().st_size
+        with open(tmp_root / MANIFEST_NAME, "w", encoding="utf-8") as handle:
+            json.dump(
+                {
+                    "source": str(image_path),
+                    "width": info.width,
+                    "height": info.height,
+                    "tile_size": info.tile_size,
+                    "levels": info.levels,
+                    "bytes": total_bytes,
+                },
+                handle,
+                indent=2,
+            )
+        shutil.rmtree(root, ignore_errors=True)
+        tmp_root.rename(root)
+    except OSError as e:
+        print(f"Warning: Could not build image pyramid for {image_path}: {e}")
+        shutil.rmtree(tmp_root, ignore_errors=True)
+        return None
+
+    info.root = root
+    prune_pyramid_cache(cache_root)
+    return info
+
+
+def _pyramid_bytes(root: Path, manifest: Path) -> int:
+    """Return the size of a pyramid on disk, from its manifest when recorded."""
+    try:
+        with open(manifest, "r", encoding="utf-8") as handle:
+            return int(json.load(handle)["bytes"])
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    total = 0
+    for path in root.rglob("*"):
+        try:
+            if path.is_file():
+                total += path.stat().st_size
+        except OSError:
+            continue
+    return total
+
+
+def prune_pyramid_cache(
+    cache_root: Path | None = None,
+    max_entries: int = PYRAMID_CACHE_MAX_ENTRIES,
+    max_bytes: int = PYRAMID_CACHE_MAX_BYTES,
+) -> None:
+    """Remove the least recently used pyramids beyond max_entries or max_bytes.
+
+    The most recently used pyramid is always kept, even if it alone is
+    larger than max_bytes.
+    """
+    cache_root = cache_root or pyramid_cache_root()
+    if not cache_root.exists():
+        return
+    entries = []
+    for child in cache_root.iterdir():
+        manifest = child / MANIFEST_NAME
+        if child.is_dir() and manifest.exists():
+            try:
+                mtime = manifest.stat().st_mtime
+            except OSError:
+                continue
+            entries.append((mtime, child, _pyramid_bytes(child, manifest)))
+    entries.sort(key=lambda entry: entry[0], reverse=True)
+    kept_bytes = 0
+    for index, (_mtime, child, size) in enumerate(entries):
+        kept_bytes += size
+        if index > 0 and (index >= max_entries or kept_bytes > max_bytes):
+            for _older_mtime, older, _older_size in entries[index:]:
+                shutil.rmtree(older, ignore_errors=True)
+            return
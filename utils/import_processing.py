@@ -0,0 +1,115 @@
+"""CPU-bound steps of storing imported images.
+
+The functions here take and return plain picklable values and import
+nothing from Qt, so observation import can run them in worker processes:
+each job resamples one image (decode, LANCZOS, re-encode), renders its
+thumbnails from the file it will be stored as and hashes the thumbnail.
+"""
+from __future__ import annotations
+
+import time
+from pathlib import Path
+
+from PIL import Image
+
+from utils.perceptual_hash import dhash_from_thumbnails
+from utils.thumbnail_generator import generate_thumbnail
+
+DEFAULT_RESIZE_JPEG_QUALITY = 80
+
+
+def reserve_resample_path(source_path: str | Path, output_dir: Path) -> Path:
+    """Pick and create the "<stem>_resized" file a resampled copy is written to.
+
+    The empty file is created right away so jobs planned together (and
+    running in parallel) never pick the same name.
+    """
+    src_path = Path(source_path)
+    suffix = src_path.suffix or ".jpg"
+    dest = output_dir / f"{src_path.stem}_resized{suffix}"
+    counter = 1
+    while True:
+        try:
+            dest.touch(exist_ok=False)
+            return dest
+        except FileExistsError:
+            dest = output_dir / f"{src_path.stem}_resized_{counter}{suffix}"
+            counter += 1
+
+
+def resample_image_file(
+    source_path: str,
+    scale_factor: float,
+    dest_path: str | Path,
+    jpeg_quality: int = DEFAULT_RESIZE_JPEG_QUALITY,
+) -> None:
+    """Write source_path scaled by scale_factor to dest_path, keeping EXIF for JPEGs."""
+    dest_path = Path(dest_path)
+    with Image.open(source_path) as img:
+        exif_bytes = None
+        try:
+            exif = img.getexif()
+            if exif:
+                exif_bytes = exif.tobytes()
+        except Exception:
+            exif_bytes = None
+        new_w = max(1, int(round(img.width * scale_factor)))
+        new_h = max(1, int(round(img.height * scale_factor)))
+        resized = img.resize((new_w, new_h), Image.LANCZOS)
+        save_kwargs = {}
+        fmt = img.format or None
+        if dest_path.suffix.lower() in {".jpg", ".jpeg"}:
+            resized = resized.convert("RGB")
+            save_kwargs["quality"] = max(1, min(100, int(jpeg_quality)))
+            fmt = "JPEG"
+            if exif_bytes:
+                save_kwargs["exif"] = exif_bytes
+        resized.save(dest_path, format=fmt, **save_kwargs)
+
+
+def prepare_import_image(job: dict) -> dict:
+    """Resample one image (when job["resample_path"] is set) and render its thumbnails.
+
+    job holds source, scale_factor, resample_path, jpeg_quality and
+    thumbnails, a list of (preset, (width, height), output_path). Returns
+    the path the image is stored from, the thumbnails written, their
+    perceptual hash and the seconds spent per stage. A failed resample
+    falls back to the source.
+    """
+    source = job["source"]
+    stored_from = source
+    resampled = False
+    timings = {"resample": 0.0, "thumbnails": 0.0}
+
+    resample_path = job.get("resample_path")
+    if resample_path:
+        start = time.perf_counter()
+        try:
+            resample_image_file(
+                source,
+                job["scale_factor"],
+                resample_path,
+                job.get("jpeg_quality", DEFAULT_RESIZE_JPEG_QUALITY),
+            )
+            stored_from = str(resample_path)
+            resampled = True
+        except Exception as exc:
+            print(f"Warning: Could not resize image {source}: {exc}")
+            Path(resample_path).unlink(missing_ok=True)
+        timings["resample"] = time.perf_counter() - start
+
+    thumbnails = {}
+    start = time.perf_counter()
+    for preset, size, output_path in job.get("thumbnails") or ():
+        if generate_thumbnail(stored_from, tuple(size), Path(output_path)):
+            thumbnails[preset] = str(output_path)
+    dhash = dhash_from_thumbnails(thumbnails)
+    timings["thumbnails"] = time.perf_counter() - start
+
+    return {
+        "stored_from": stored_from,
+        "resampled": resampled,
+        "thumbnails": thumbnails,
+        "dhash": dhash,
+        "timings": timings,
+    }
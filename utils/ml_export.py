@@ -5,8 +5,8 @@ import sqlite3
 from pathlib import Path
 from datetime import datetime
 from typing import Optional
-from PIL import Image
 from database.schema import get_connection
+from utils.image_info import get_image_size
 
 
 def export_coco_format(
@@ -14,7 +14,7 @@ def export_coco_format(
     include_thumbnails: bool = False,
     thumbnail_size: str = '512x512'
 ) -> dict:
-    """Export annotations in COCO format for ML training.
+    """Export reviewed annotations in COCO format for ML training.
 
     Args:
         output_dir: Directory to save the exported dataset
@@ -39,9 +39,12 @@ def export_coco_format(
     # Get unique images that have annotations
     cursor.execute('''
         SELECT DISTINCT i.id, i.filepath, i.observation_id, i.image_type,
-               i.scale_microns_per_pixel
+               i.scale_microns_per_pixel, i.pixel_width, i.pixel_height,
+               i.file_size, i.file_mtime_ns
         FROM images i
         INNER JOIN spore_annotations sa ON i.id = sa.image_id
+        LEFT JOIN spore_measurements m ON sa.measurement_id = m.id
+        WHERE COALESCE(m.review_status, '') != 'pending'
         ORDER BY i.id
     ''')
     images_data = cursor.fetchall()
@@ -51,6 +54,8 @@ def export_coco_format(
         SELECT sa.*, i.filepath, i.scale_microns_per_pixel
         FROM spore_annotations sa
         INNER JOIN images i ON sa.image_id = i.id
+        LEFT JOIN spore_measurements m ON sa.measurement_id = m.id
+        WHERE COALESCE(m.review_status, '') != 'pending'
         ORDER BY sa.image_id, sa.spore_number
     ''')
     annotations_data = cursor.fetchall()
@@ -115,14 +120,13 @@ def export_coco_format(
             stats["errors"].append(f"Image not found: {source_path}")
             continue
 
-        # Get image dimensions
-        try:
-            with Image.open(source_path) as img:
-                width, height = img.size
-        except Exception as e:
+        # Get image dimensions (stored values only describe the full image)
+        size = get_image_size(source_path, stored=dict(img_row) if str(source_path) == filepath else None)
+        if not size:
             stats["images_skipped"] += 1
-            stats["errors"].append(f"Could not read image {source_path}: {e}")
+            stats["errors"].append(f"Could not read image {source_path}")
             continue
+        width, height = size
 
         # Copy image to output directory
         new_filename = f"image_{new_image_id:05d}{source_path.suffix}"
@@ -250,9 +254,12 @@ def export_yolo_format(output_dir: str) -> dict:
 
     # Get images with annotations
     cursor.execute('''
-        SELECT DISTINCT i.id, i.filepath
+        SELECT DISTINCT i.id, i.filepath, i.pixel_width, i.pixel_height,
+               i.file_size, i.file_mtime_ns
         FROM images i
         INNER JOIN spore_annotations sa ON i.id = sa.image_id
+        LEFT JOIN spore_measurements m ON sa.measurement_id = m.id
+        WHERE COALESCE(m.review_status, '') != 'pending'
     ''')
     images_data = cursor.fetchall()
 
@@ -271,12 +278,11 @@ def export_yolo_format(output_dir: str) -> dict:
             continue
 
         # Get image dimensions
-        try:
-            with Image.open(filepath) as img:
-                img_width, img_height = img.size
-        except Exception as e:
-            stats["errors"].append(f"Could not read image: {e}")
+        size = get_image_size(filepath, stored=dict(img_row))
+        if not size:
+            stats["errors"].append(f"Could not read image: {filepath}")
             continue
+        img_width, img_height = size
 
         # Copy image
         new_filename = f"image_{img_id:05d}{filepath.suffix}"
@@ -284,9 +290,10 @@ def export_yolo_format(output_dir: str) -> dict:
 
         # Get annotations for this image
         cursor.execute('''
-            SELECT bbox_x, bbox_y, bbox_width, bbox_height
-            FROM spore_annotations
-            WHERE image_id = ?
+            SELECT sa.bbox_x, sa.bbox_y, sa.bbox_width, sa.bbox_height
+            FROM spore_annotations sa
+            LEFT JOIN spore_measurements m ON sa.measurement_id = m.id
+            WHERE sa.image_id = ? AND COALESCE(m.review_status, '') != 'pending'
         ''', (img_id,))
         annotations = cursor.fetchall()
 
@@ -336,15 +343,14 @@ def get_export_summary() -> dict:
     conn = get_connection()
     cursor = conn.cursor()
 
-    # Count images with annotations
+    # Count reviewed annotations and the images they are on
     cursor.execute('''
-        SELECT COUNT(DISTINCT image_id) FROM spore_annotations
+        SELECT COUNT(DISTINCT sa.image_id), COUNT(*)
+        FROM spore_annotations sa
+        LEFT JOIN spore_measurements m ON sa.measurement_id = m.id
+        WHERE COALESCE(m.review_status, '') != 'pending'
     ''')
-    images_with_annotations = cursor.fetchone()[0]
-
-    # Count total annotations
-    cursor.execute('SELECT COUNT(*) FROM spore_annotations')
-    total_annotations = cursor.fetchone()[0]
+    images_with_annotations, total_annotations = cursor.fetchone()
 
     # Count total images
     cursor.execute('SELECT COUNT(*) FROM images')
@@ -0,0 +1,251 @@
+"""Perceptual hashes for finding near-identical images.
+
+Each image gets a 64-bit difference hash (dHash) of the centre square of
+the picture: shrunk to 9x8 grey pixels, one bit per horizontal neighbour
+pair. Stored images are hashed from their 224x224 thumbnail (which is that
+centre square already); files being imported are hashed from a reduced
+decode of the same square, so both kinds of hash are comparable.
+
+Lookups go through a multi-index hash table: the hash is split into four
+16-bit chunks and two hashes within Hamming distance r share at least one
+chunk that differs in at most r // 4 bits, so only the buckets of those
+few chunk variants are compared instead of the whole library.
+"""
+from __future__ import annotations
+
+import threading
+from itertools import combinations
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+import numpy as np
+from PIL import Image
+
+HASH_BITS = 64
+CHUNK_BITS = 16
+CHUNK_COUNT = HASH_BITS // CHUNK_BITS
+CHUNK_MASK = (1 << CHUNK_BITS) - 1
+# Burst shots and re-photographed slides typically land within a few bits.
+NEAR_DUPLICATE_DISTANCE = 6
+HASH_SOURCE_SIZE = 224
+BACKFILL_BATCH_SIZE = 100
+
+
+def dhash_image(image: Image.Image) -> int:
+    """Return the 64-bit difference hash of the centre square of image."""
+    gray = image.convert("L")
+    width, height = gray.size
+    side = min(width, height)
+    left = (width - side) // 2
+    top = (height - side) // 2
+    if side != width or side != height:
+        gray = gray.crop((left, top, left + side, top + side))
+    pixels = np.asarray(gray.resize((9, 8), Image.Resampling.BOX), dtype=np.int16)
+    bits = pixels[:, 1:] > pixels[:, :-1]
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def dhash_file(path: str | Path) -> Optional[int]:
+    """Return the difference hash of an image file, or None if it cannot be read.
+
+    JPEGs are decoded at reduced size; the hash only needs a few pixels.
+    """
+    path = Path(path)
+    try:
+        if path.suffix.lower() in (".heic", ".heif"):
+            import pillow_heif
+
+            pillow_heif.register_heif_opener()
+        with Image.open(path) as img:
+            img.draft("RGB", (HASH_SOURCE_SIZE, HASH_SOURCE_SIZE))
+            return dhash_image(img)
+    except Exception:
+        return None
+
+
+def dhash_from_thumbnails(thumbnails: dict) -> Optional[int]:
+    """Return the hash of the 224x224 thumbnail among size preset -> path."""
+    path = thumbnails.get(f"{HASH_SOURCE_SIZE}x{HASH_SOURCE_SIZE}")
+    return dhash_file(path) if path else None
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+def _chunk_variants(chunk: int, max_flips: int):
+    yield chunk
+    for flips in range(1, max_flips + 1):
+        for positions in combinations(range(CHUNK_BITS), flips):
+            variant = chunk
+            for position in positions:
+                variant ^= 1 << position
+            yield variant
+
+
+class HashIndex:
+    """Multi-index hash table of 64-bit hashes for Hamming-radius search."""
+
+    def __init__(self) -> None:
+        self._hashes: dict[int, int] = {}
+        self._tables: list[dict[int, set[int]]] = [{} for _ in range(CHUNK_COUNT)]
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+    def get(self, key: int) -> Optional[int]:
+        return self._hashes.get(key)
+
+    @staticmethod
+    def _chunks(value: int) -> list[int]:
+        return [(value >> (CHUNK_BITS * i)) & CHUNK_MASK for i in range(CHUNK_COUNT)]
+
+    def add(self, key: int, value: int) -> None:
+        with self._lock:
+            self._discard(key)
+            self._hashes[key] = value
+            for table, chunk in zip(self._tables, self._chunks(value)):
+                table.setdefault(chunk, set()).add(key)
+
+    def discard(self, key: int) -> None:
+        with self._lock:
+            self._discard(key)
+
+    def _discard(self, key: int) -> None:
+        value = self._hashes.pop(key, None)
+        if value is None:
+            return
+        for table, chunk in zip(self._tables, self._chunks(value)):
+            bucket = table.get(chunk)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del table[chunk]
+
+    def search(self, value: int, max_distance: int = NEAR_DUPLICATE_DISTANCE) -> list[tuple[int, int]]:
+        """Return (distance, key) of every hash within max_distance, nearest first."""
+        max_flips = max(0, int(max_distance)) // CHUNK_COUNT
+        matches: dict[int, int] = {}
+        with self._lock:
+            for table, chunk in zip(self._tables, self._chunks(value)):
+                for variant in _chunk_variants(chunk, max_flips):
+                    for key in table.get(variant, ()):
+                        if key in matches:
+                            continue
+                        distance = hamming_distance(value, self._hashes[key])
+                        if distance <= max_distance:
+                            matches[key] = distance
+        return sorted((distance, key) for key, distance in matches.items())
+
+
+_index: HashIndex | None = None
+_index_lock = threading.Lock()
+
+
+def get_hash_index() -> HashIndex:
+    """Return the library-wide index, loading it from the database on first use."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            from database.models import ImageDB
+
+            index = HashIndex()
+            for image_id, value in ImageDB.get_dhashes():
+                index.add(image_id, value)
+            _index = index
+        return _index
+
+
+def record_image_hash(image_id: int, value: int | None) -> None:
+    """Add a newly stored hash to the index if it has been loaded."""
+    if _index is not None and image_id and value is not None:
+        _index.add(int(image_id), int(value))
+
+
+def find_similar_images(
+    value: int | None,
+    max_distance: int = NEAR_DUPLICATE_DISTANCE,
+    exclude_ids: Iterable[int] = (),
+) -> list[dict]:
+    """Return images whose hash is within max_distance of value, nearest first.
+
+    Each image dict gets a "distance" key. Images deleted or re-hashed
+    since the index was loaded are dropped from the index.
+    """
+    if value is None:
+        return []
+    from database.models import ImageDB
+
+    index = get_hash_index()
+    excluded = set(exclude_ids)
+    hits = [(distance, key) for distance, key in index.search(value, max_distance) if key not in excluded]
+    if not hits:
+        return []
+    rows = {row["id"]: row for row in ImageDB.get_images_by_ids([key for _distance, key in hits])}
+    similar = []
+    for distance, key in hits:
+        row = rows.get(key)
+        if row is None or row.get("dhash") is None:
+            index.discard(key)
+            continue
+        stored = ImageDB.dhash_from_db(row["dhash"])
+        if index.get(key) != stored:
+            index.add(key, stored)
+        distance = hamming_distance(value, stored)
+        if distance <= max_distance:
+            similar.append({**row, "distance": distance})
+    similar.sort(key=lambda row: (row["distance"], row["id"]))
+    return similar
+
+
+def hash_stored_image(image: dict) -> Optional[int]:
+    """Return the hash of a stored image, computing and saving it if missing.
+
+    image is an images row. Uses the thumbnail when there is one, else the
+    image file; returns None if neither can be read.
+    """
+    from database.models import ImageDB
+    from utils.thumbnail_generator import get_thumbnail_path
+
+    if image.get("dhash") is not None:
+        return ImageDB.dhash_from_db(image["dhash"])
+    thumbnail = get_thumbnail_path(image["id"], "224x224")
+    value = dhash_file(thumbnail) if thumbnail and Path(thumbnail).exists() else None
+    if value is None:
+        value = dhash_file(image["filepath"])
+    if value is None:
+        return None
+    ImageDB.set_dhash(image["id"], value)
+    record_image_hash(image["id"], value)
+    return value
+
+
+def backfill_perceptual_hashes(
+    batch_size: int = BACKFILL_BATCH_SIZE,
+    should_stop: Callable[[], bool] | None = None,
+) -> int:
+    """Hash images stored before perceptual hashes were recorded.
+
+    Uses the thumbnail when there is one, else the image file. Returns the
+    number of images hashed.
+    """
+    from database.models import ImageDB
+
+    updated = 0
+    skipped: set[int] = set()
+    while True:
+        rows = [
+            row
+            for row in ImageDB.get_images_missing_dhash(limit=batch_size + len(skipped))
+            if row["id"] not in skipped
+        ][:batch_size]
+        if not rows:
+            return updated
+        for row in rows:
+            if should_stop and should_stop():
+                return updated
+            if hash_stored_image(row) is None:
+                skipped.add(row["id"])
+                continue
+            updated += 1
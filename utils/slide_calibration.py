@@ -18,8 +18,9 @@ from PIL import Image
 # Assumes it's in the same directory or utils/
 try:
     from .calibration_primitives import (
-        gauss_smooth, find_peaks, rotate_image, rotation_matrix,
-        load_gray, half_max_edges, parabola_refine, filter_consistent_peaks
+        gauss_smooth, find_peaks, rotate_image, rotate_region, rotation_matrix,
+        filter_consistent_peaks,
+        gauss_smooth_rows, find_peaks_rows, parabola_refine_rows, half_max_edges_batch
     )
 except ImportError:
     # Fallback if running standalone - copy primitives inline
@@ -28,12 +29,25 @@ except ImportError:
 
 Axis = Literal["horizontal", "vertical"]
 
+# Coarse-to-fine: images at least this large get band and angle estimated
+# on a reduced pyramid level; only the final band is measured at full size.
+COARSE_MIN_PIXELS = 12_000_000
+# Line spacing the reduced level must keep (peaks need min_distance=15).
+COARSE_MIN_SPACING_PX = 20
+COARSE_MAX_FACTOR = 8
+
+
+class CalibrationCancelled(Exception):
+    """Raised by a progress callback to abandon a calibration run."""
+
 
 def _call_progress(progress_cb: Optional[Callable[[str, float], None]], step: str, frac: float) -> None:
     if progress_cb is None:
         return
     try:
         progress_cb(step, frac)
+    except CalibrationCancelled:
+        raise
     except Exception:
         pass
 
@@ -60,6 +74,33 @@ def detect_orientation(gray: np.ndarray) -> Axis:
     return "vertical" if n_vert_lines >= n_horiz_lines else "horizontal"
 
 
+def _line_spacing(gray: np.ndarray, axis: Axis) -> Optional[float]:
+    """Median line spacing in the central cross-section (as detect_orientation sees it)."""
+    h, w = gray.shape
+    if axis == 'vertical':
+        prof = gray[int(h*0.4):int(h*0.6), :].mean(axis=0)
+    else:
+        prof = gray[:, int(w*0.4):int(w*0.6)].mean(axis=1)
+    peaks = find_peaks(gauss_smooth(prof.max() - prof, 2.5),
+                       min_height=10, min_distance=15, min_prominence=5)
+    if len(peaks) < 3:
+        return None
+    return float(np.median(np.diff(peaks)))
+
+
+def _coarse_factor(gray: np.ndarray, axis: Axis) -> int:
+    """Pyramid reduction (power of 2) for band and angle search; 1 = full size."""
+    h, w = gray.shape
+    if h * w < COARSE_MIN_PIXELS:
+        return 1
+    spacing = _line_spacing(gray, axis)
+    factor = 1
+    while (spacing and factor * 2 <= COARSE_MAX_FACTOR
+           and spacing / (factor * 2) >= COARSE_MIN_SPACING_PX):
+        factor *= 2
+    return factor
+
+
 # ══════════════════════════════════════════════════════════════════════════════
 # TARGET COUNT HELPER (mode among counts ≥ max/2)
 # ══════════════════════════════════════════════════════════════════════════════
@@ -79,25 +120,49 @@ def _find_target_count(counts: dict) -> int:
 # MEASUREMENT BAND DETECTION (on unrotated image)
 # ══════════════════════════════════════════════════════════════════════════════
 
+# Scanlines analysed per batch in _scan_peaks (bounds the stack's memory).
+SCAN_BATCH_LINES = 128
+
+
+def _scan_profiles(gray: np.ndarray, axis: Axis, positions: np.ndarray) -> np.ndarray:
+    """Stack of cross-sections at *positions*: rows for vertical lines, columns otherwise."""
+    if axis == 'vertical':
+        return gray[positions, :]
+    return np.ascontiguousarray(gray[:, positions].T)
+
+
+def _detect_lines(profiles: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """(row, index) of every dark line in a stack of profiles, in one pass."""
+    inv = profiles.max(axis=1, keepdims=True) - profiles
+    inv_sm = gauss_smooth_rows(inv, 2.5)
+    top = inv_sm.max(axis=1)
+    return find_peaks_rows(inv_sm, min_height=top*0.25,
+                           min_distance=15, min_prominence=top*0.15)
+
+
 def _scan_peaks(gray: np.ndarray, axis: Axis, step: int = 8):
     """Return dict position → (n_peaks, spacing_std) along the scan axis."""
     h, w = gray.shape
-    positions = range(0, h if axis == 'vertical' else w, step)
+    positions = np.arange(0, h if axis == 'vertical' else w, step)
     result = {}
     
-    for pos in positions:
-        prof = gray[pos, :] if axis == 'vertical' else gray[:, pos]
-        inv = prof.max() - prof
-        inv_sm = gauss_smooth(inv, 2.5)
+    for start in range(0, len(positions), SCAN_BATCH_LINES):
+        batch = positions[start:start + SCAN_BATCH_LINES]
+        rows, peaks = _detect_lines(_scan_profiles(gray, axis, batch))
+        counts = np.bincount(rows, minlength=len(batch))
         
-        peaks = find_peaks(inv_sm, min_height=inv_sm.max()*0.25,
-                          min_distance=15, min_prominence=inv_sm.max()*0.15)
+        # Spacing std per line from sums over consecutive peaks in a row
+        same = rows[1:] == rows[:-1]
+        gap_rows = rows[1:][same]
+        gaps = np.diff(peaks.astype(np.float64))[same]
+        n_gaps = np.bincount(gap_rows, minlength=len(batch))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = np.bincount(gap_rows, gaps, minlength=len(batch)) / n_gaps
+            sq = (gaps - mean[gap_rows]) ** 2
+            std = np.sqrt(np.bincount(gap_rows, sq, minlength=len(batch)) / n_gaps)
         
-        if len(peaks) < 2:
-            result[pos] = (len(peaks), 0.0)
-        else:
-            spacings = np.diff(peaks.astype(np.float64))
-            result[pos] = (len(peaks), float(np.std(spacings)))
+        for pos, n, s in zip(batch, counts, std):
+            result[int(pos)] = (int(n), float(s) if n >= 2 else 0.0)
     
     return result
 
@@ -139,20 +204,6 @@ def find_measurement_band(gray: np.ndarray, axis: Axis) -> tuple[int, int]:
 # ANGLE REFINEMENT (multi-band tracking within good band on unrotated image)
 # ══════════════════════════════════════════════════════════════════════════════
 
-def _get_subpix_centers(prof: np.ndarray, expected_n: int) -> Optional[np.ndarray]:
-    """Get sub-pixel centers, return None if count doesn't match."""
-    inv = prof.max() - prof
-    inv_sm = gauss_smooth(inv, 2.5)
-    
-    peaks = find_peaks(inv_sm, min_height=inv_sm.max()*0.25,
-                      min_distance=15, min_prominence=inv_sm.max()*0.15)
-    
-    if len(peaks) != expected_n:
-        return None
-    
-    return np.array([parabola_refine(prof, int(p)) for p in peaks])
-
-
 def refine_angle(gray: np.ndarray, axis: Axis, band: tuple[int, int]) -> float:
     """Refine rotation angle via multi-band sub-pixel line tracking.
     
@@ -170,40 +221,28 @@ def refine_angle(gray: np.ndarray, axis: Axis, band: tuple[int, int]) -> float:
     if len(sample_pos) < 3:
         return 0.0
     
-    # First pass: find target count
-    counts = {}
-    for pos in sample_pos:
-        prof = gray[pos, :] if axis == 'vertical' else gray[:, pos]
-        inv = prof.max() - prof
-        inv_sm = gauss_smooth(inv, 2.5)
-        peaks = find_peaks(inv_sm, min_height=inv_sm.max()*0.25,
-                          min_distance=15, min_prominence=inv_sm.max()*0.15)
-        counts[int(pos)] = len(peaks)
+    # Detect lines on every sampled cross-section at once
+    profiles = _scan_profiles(gray, axis, sample_pos)
+    rows, peaks = _detect_lines(profiles)
+    n_peaks = np.bincount(rows, minlength=len(sample_pos))
+    counts = {int(pos): int(n) for pos, n in zip(sample_pos, n_peaks)}
     
     target_n = _find_target_count(counts)
     
-    # Second pass: get centers at qualifying positions
-    band_data = {}
-    for pos in sample_pos:
-        prof = gray[pos, :] if axis == 'vertical' else gray[:, pos]
-        centers = _get_subpix_centers(prof, target_n)
-        if centers is not None:
-            band_data[int(pos)] = centers
-    
-    if len(band_data) < 3:
+    # Sub-pixel centers at positions with the target count
+    qualifying = n_peaks == target_n
+    if qualifying.sum() < 3 or target_n == 0:
         return 0.0
+    sel = qualifying[rows]
+    all_centers = parabola_refine_rows(profiles, rows[sel], peaks[sel]).reshape(-1, target_n)
+    positions = sample_pos[qualifying].astype(np.float64)
     
-    # Fit slopes
-    positions = np.array(sorted(band_data.keys()), dtype=np.float64)
-    all_centers = np.array([band_data[int(p)] for p in positions])
-    
-    slopes = []
-    for i in range(target_n):
-        s = np.polyfit(positions, all_centers[:, i], 1)[0]
-        if abs(s) < 1.0:  # Reject mismatched peaks
-            slopes.append(s)
+    # Fit every line's position vs. band in one least-squares solve
+    design = np.column_stack([positions, np.ones_like(positions)])
+    line_slopes = np.linalg.lstsq(design, all_centers, rcond=None)[0][0]
+    slopes = line_slopes[np.abs(line_slopes) < 1.0]  # Reject mismatched peaks
     
-    if not slopes:
+    if not len(slopes):
         return 0.0
     
     med_slope = np.median(slopes)
@@ -234,9 +273,9 @@ def measure(rot_gray: np.ndarray, axis: Axis, band: tuple[int, int]) -> dict:
     hi_m = band[1] - int((band[1] - band[0]) * 0.2)
     
     if axis == 'horizontal':
-        prof = rot_gray[:, lo_m:hi_m].mean(axis=1)
+        prof = rot_gray[:, lo_m:hi_m].mean(axis=1, dtype=np.float64)
     else:
-        prof = rot_gray[lo_m:hi_m, :].mean(axis=0)
+        prof = rot_gray[lo_m:hi_m, :].mean(axis=0, dtype=np.float64)
     
     # Parabola detection
     inv_sm = gauss_smooth(prof.max() - prof, 2.5)
@@ -255,7 +294,7 @@ def measure(rot_gray: np.ndarray, axis: Axis, band: tuple[int, int]) -> dict:
         if limit > 0:
             edge_search = min(edge_search, limit)
     
-    centers_raw = np.array([parabola_refine(prof, int(p)) for p in peaks])
+    centers_raw = parabola_refine_rows(prof[None, :], np.zeros(len(peaks), dtype=np.intp), peaks)
     
     # Filter outliers
     kept = filter_consistent_peaks(centers_raw, tol=0.30)
@@ -264,28 +303,17 @@ def measure(rot_gray: np.ndarray, axis: Axis, band: tuple[int, int]) -> dict:
     if len(centers) < 2:
         raise ValueError(f"Only {len(centers)} lines detected after filtering")
     
-    # Edge-midpoint detection (using parabola as guide)
-    edge_mids = []
-    edges = []
-    for cx in centers:
-        top, bot = half_max_edges(prof, cx, search=edge_search)
-        if top is not None and bot is not None:
-            edge_mids.append((top + bot) / 2.0)
-            edges.append((float(top), float(bot)))
-        else:
-            edge_mids.append(cx)  # Fallback to parabola
-            edges.append((float(cx), float(cx)))
-    
-    edge_mids = np.array(edge_mids)
+    # Edge-midpoint detection (using parabola as guide); widths come
+    # from the same crossings.
+    tops, bots = half_max_edges_batch(prof, centers, search=edge_search)
+    found = ~(np.isnan(tops) | np.isnan(bots))
+    edge_mids = np.where(found, (tops + bots) / 2.0, centers)  # Fallback to parabola
+    edges = np.where(found[:, None], np.stack([tops, bots], axis=1), centers[:, None])
     
     # Line widths
-    widths = []
-    for cx in centers:
-        top, bot = half_max_edges(prof, cx, search=edge_search)
-        if top is not None and bot is not None:
-            widths.append(abs(bot - top))
-    
-    widths = np.array(widths) if widths else np.array([0.0])
+    widths = np.abs(bots - tops)[found]
+    if not widths.size:
+        widths = np.array([0.0])
     
     # Spacings
     diffs_parab = np.diff(centers)
@@ -297,7 +325,7 @@ def measure(rot_gray: np.ndarray, axis: Axis, band: tuple[int, int]) -> dict:
         'diffs_parab': diffs_parab,
         'diffs_edges': diffs_edges,
         'widths': widths,
-        'edges': np.array(edges, dtype=np.float64),
+        'edges': edges,
         'profile': prof,
         'smoothed': inv_sm,
         'band_inner': (lo_m, hi_m),
@@ -373,6 +401,54 @@ class CalibrationResult:
     def residual_tilt_deg(self) -> float:
         return self.residual_slope_deg
 
+    def to_dict(self) -> dict:
+        """Return the result as JSON-serializable values."""
+        return {
+            "axis": self.axis,
+            "angle_deg": float(self.angle_deg),
+            "centers_px": np.asarray(self.centers_px, dtype=np.float64).tolist(),
+            "centers_edges_px": np.asarray(self.centers_edges_px, dtype=np.float64).tolist(),
+            "edges_px": np.asarray(self.edges_px, dtype=np.float64).tolist(),
+            "spacing_median_px": float(self.spacing_median_px),
+            "spacing_median_edges_px": float(self.spacing_median_edges_px),
+            "nm_per_px": float(self.nm_per_px),
+            "nm_per_px_edges": float(self.nm_per_px_edges),
+            "agreement_pct": float(self.agreement_pct),
+            "rel_scatter_mad_pct": float(self.rel_scatter_mad_pct),
+            "rel_scatter_iqr_pct": float(self.rel_scatter_iqr_pct),
+            "drift_slope": float(self.drift_slope),
+            "residual_slope_deg": float(self.residual_slope_deg),
+            "tilt_deg": float(self.tilt_deg),
+            "n_lines": int(self.n_lines),
+            "band": [int(v) for v in self.band] if self.band is not None else None,
+            "warning": self.warning,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "CalibrationResult":
+        """Rebuild a result from to_dict() values; missing fields get defaults."""
+        band = data.get("band")
+        return cls(
+            axis=data.get("axis", "horizontal"),
+            angle_deg=float(data.get("angle_deg", 0.0)),
+            centers_px=np.array(data.get("centers_px", []), dtype=np.float64),
+            centers_edges_px=np.array(data.get("centers_edges_px", []), dtype=np.float64),
+            edges_px=np.array(data.get("edges_px", []), dtype=np.float64),
+            spacing_median_px=float(data.get("spacing_median_px", float("nan"))),
+            spacing_median_edges_px=float(data.get("spacing_median_edges_px", float("nan"))),
+            nm_per_px=float(data.get("nm_per_px", float("nan"))),
+            nm_per_px_edges=float(data.get("nm_per_px_edges", float("nan"))),
+            agreement_pct=float(data.get("agreement_pct", float("nan"))),
+            rel_scatter_mad_pct=float(data.get("rel_scatter_mad_pct", float("nan"))),
+            rel_scatter_iqr_pct=float(data.get("rel_scatter_iqr_pct", float("nan"))),
+            drift_slope=float(data.get("drift_slope", float("nan"))),
+            residual_slope_deg=float(data.get("residual_slope_deg", float("nan"))),
+            tilt_deg=float(data.get("tilt_deg", 0.0)),
+            n_lines=int(data.get("n_lines", 0)),
+            band=(int(band[0]), int(band[1])) if band else None,
+            warning=data.get("warning"),
+        )
+
 
 def _drift_slope_from_centers(centers: np.ndarray) -> float:
     centers = np.sort(centers.astype(np.float64, copy=False))
@@ -393,6 +469,7 @@ def calibrate_from_image(
     use_large_angles: bool = False,
     use_edges: bool = True,
     progress_cb: Optional[Callable[[str, float], None]] = None,
+    coarse_to_fine: bool = True,
 ) -> CalibrationResult:
     """
     Calibrate from a microscope calibration slide image.
@@ -401,6 +478,11 @@ def calibrate_from_image(
         image_path: Path to calibration slide image
         division_um: Physical spacing between divisions (e.g., 10.0 for 0.01 mm)
         axis_override: Force 'horizontal' or 'vertical', or None for auto-detect
+        coarse_to_fine: On large images, find band and angle on a reduced
+            pyramid level and rotate/measure only the band at full size
+    
+    The image is decoded once and kept as 8-bit grey; working arrays are
+    float32.
     
     Returns:
         CalibrationResult with measurements and quality metrics
@@ -413,15 +495,20 @@ def calibrate_from_image(
     _call_progress(progress_cb, "Loading image", 0.05)
     if isinstance(image_or_path, Image.Image):
         pil_src = image_or_path.convert("L")
-        gray = np.array(pil_src, dtype=np.float64)
     else:
-        pil_src = Image.open(image_or_path).convert("L")
-        gray = load_gray(image_or_path)
-    h, w = gray.shape
+        with Image.open(image_or_path) as img:
+            pil_src = img.convert("L")
+    full = np.asarray(pil_src)
+    h, w = full.shape
     
-    # 1) Orientation
+    # 1) Orientation (projections only, cheap at full size)
     _call_progress(progress_cb, "Detecting orientation", 0.15)
-    axis = axis_override if axis_override else detect_orientation(gray)
+    axis = axis_override if axis_override else detect_orientation(full)
+    
+    # Pyramid level for the search steps
+    factor = _coarse_factor(full, axis) if coarse_to_fine else 1
+    pil_level = pil_src.reduce(factor) if factor > 1 else pil_src
+    gray = np.asarray(pil_level, dtype=np.float32)
     
     # 2) Find measurement band on unrotated image
     _call_progress(progress_cb, "Finding measurement band", 0.30)
@@ -438,20 +525,30 @@ def calibrate_from_image(
     
     # 4) Rotate
     _call_progress(progress_cb, "Rotating image", 0.60)
-    rot_pil = rotate_image(pil_src, rot_angle)
-    rot_gray = np.array(rot_pil, dtype=np.float64)
+    rot_gray = np.asarray(rotate_image(pil_level, rot_angle), dtype=np.float32)
     
     # 5) Find final band on rotated image
     _call_progress(progress_cb, "Finding rotated band", 0.70)
     band_rot = find_measurement_band(rot_gray, axis)
+    band_meas = band_rot
+    if factor > 1:
+        # Rotate just the band at full resolution and measure within it
+        band_rot = (band_rot[0] * factor, band_rot[1] * factor)
+        lo, hi = band_rot
+        if axis == 'vertical':
+            box = (0, lo, w, min(hi, h))
+        else:
+            box = (lo, 0, min(hi, w), h)
+        rot_gray = np.asarray(rotate_region(pil_src, rot_angle, box), dtype=np.float32)
+        band_meas = (0, hi - lo)
     
     # 6) Measure with both methods
     _call_progress(progress_cb, "Measuring lines", 0.80)
-    res = measure(rot_gray, axis, band_rot)
+    res = measure(rot_gray, axis, band_meas)
     
     # 7) Residual validation
     _call_progress(progress_cb, "Checking residual tilt", 0.88)
-    residual_deg = measure_residual_slope(rot_gray, axis, band_rot)
+    residual_deg = measure_residual_slope(rot_gray, axis, band_meas)
     
     # 8) Statistics
     diffs_p = res['diffs_parab']
@@ -518,6 +615,7 @@ def calibrate_image(
     smooth_sigma: float = 3.2,
     min_distance_px: Optional[int] = None,
     progress_cb: Optional[Callable[[str, float], None]] = None,
+    coarse_to_fine: bool = True,
 ) -> CalibrationResult:
     """UI-compatible wrapper (extra args are accepted but ignored)."""
     _ = band_frac
@@ -530,6 +628,7 @@ def calibrate_image(
         use_large_angles=use_large_angles,
         use_edges=use_edges,
         progress_cb=progress_cb,
+        coarse_to_fine=coarse_to_fine,
     )
 
 
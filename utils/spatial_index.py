@@ -0,0 +1,131 @@
+"""Uniform-grid spatial index for measurement overlay hit-testing."""
+from __future__ import annotations
+
+import math
+from typing import Hashable, Iterable
+
+
+def bbox_from_points(points: Iterable) -> tuple[float, float, float, float] | None:
+    """Return (x1, y1, x2, y2) for QPointF-like points or (x, y) tuples."""
+    xs = []
+    ys = []
+    for point in points:
+        if hasattr(point, "x"):
+            xs.append(float(point.x()))
+            ys.append(float(point.y()))
+        else:
+            xs.append(float(point[0]))
+            ys.append(float(point[1]))
+    if not xs:
+        return None
+    return (min(xs), min(ys), max(xs), max(ys))
+
+
+def bbox_from_lines(lines: Iterable) -> tuple[float, float, float, float] | None:
+    """Return the bounding box of [x1, y1, x2, y2] line segments."""
+    points = []
+    for line in lines:
+        points.append((line[0], line[1]))
+        points.append((line[2], line[3]))
+    return bbox_from_points(points)
+
+
+class GridIndex:
+    """Bucket bounding boxes into square grid cells.
+
+    Items are keyed so they can be added, moved or removed one at a time.
+    Queries return candidate keys in insertion order; callers still run
+    the exact geometric test on the (few) candidates.
+    """
+
+    def __init__(self, cell_size: float = 64.0) -> None:
+        self.cell_size = float(cell_size)
+        self._cells: dict[tuple[int, int], set] = {}
+        self._boxes: dict[Hashable, tuple[float, float, float, float]] = {}
+        self._order: dict[Hashable, int] = {}
+        self._next_order = 0
+
+    def __len__(self) -> int:
+        return len(self._boxes)
+
+    def __contains__(self, key) -> bool:
+        return key in self._boxes
+
+    def clear(self) -> None:
+        self._cells.clear()
+        self._boxes.clear()
+        self._order.clear()
+        self._next_order = 0
+
+    def _cell_range(self, box):
+        size = self.cell_size
+        x1, y1, x2, y2 = box
+        return (
+            int(math.floor(x1 / size)),
+            int(math.floor(y1 / size)),
+            int(math.floor(x2 / size)),
+            int(math.floor(y2 / size)),
+        )
+
+    def insert(self, key, box) -> None:
+        """Add or move an item."""
+        if box is None:
+            self.remove(key)
+            return
+        box = (float(box[0]), float(box[1]), float(box[2]), float(box[3]))
+        old = self._boxes.get(key)
+        if old == box:
+            return
+        if old is not None:
+            self._unlink(key, old)
+        else:
+            self._order[key] = self._next_order
+            self._next_order += 1
+        self._boxes[key] = box
+        cx1, cy1, cx2, cy2 = self._cell_range(box)
+        for cx in range(cx1, cx2 + 1):
+            for cy in range(cy1, cy2 + 1):
+                self._cells.setdefault((cx, cy), set()).add(key)
+
+    def remove(self, key) -> None:
+        old = self._boxes.pop(key, None)
+        if old is None:
+            return
+        self._order.pop(key, None)
+        self._unlink(key, old)
+
+    def _unlink(self, key, box) -> None:
+        cx1, cy1, cx2, cy2 = self._cell_range(box)
+        for cx in range(cx1, cx2 + 1):
+            for cy in range(cy1, cy2 + 1):
+                bucket = self._cells.get((cx, cy))
+                if bucket is None:
+                    continue
+                bucket.discard(key)
+                if not bucket:
+                    del self._cells[(cx, cy)]
+
+    def sync(self, boxes: dict) -> None:
+        """Make the index match boxes, touching only changed entries."""
+        for key in [key for key in self._boxes if key not in boxes]:
+            self.remove(key)
+        for key, box in boxes.items():
+            self.insert(key, box)
+
+    def query(self, x: float, y: float, radius: float = 0.0) -> list:
+        """Return keys whose boxes, grown by radius, contain (x, y)."""
+        radius = max(0.0, float(radius))
+        cx1, cy1, cx2, cy2 = self._cell_range((x - radius, y - radius, x + radius, y + radius))
+        found = set()
+        for cx in range(cx1, cx2 + 1):
+            for cy in range(cy1, cy2 + 1):
+                bucket = self._cells.get((cx, cy))
+                if bucket:
+                    found.update(bucket)
+        hits = []
+        for key in found:
+            x1, y1, x2, y2 = self._boxes[key]
+            if x1 - radius <= x <= x2 + radius and y1 - radius <= y <= y2 + radius:
+                hits.append(key)
+        hits.sort(key=self._order.__getitem__)
+        return hits
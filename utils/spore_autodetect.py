@@ -0,0 +1,410 @@
+"""Spore detection for click-to-measure and batch measurement.
+
+Click-to-measure casts rays from the clicked centre at a fixed angle step
+over half a turn; along each ray the image is sampled inward from the
+search radius and the spore edge is the first sample that differs from
+the background by the threshold. All rays are sampled at once with
+bilinear gathers, and edges are refined to sub-pixel radius between the
+last background sample and the first edge sample. The axes are picked
+from a running median of the radii over neighbouring rays.
+
+Batch detection finds every spore in an image at once: a block-median
+background is subtracted, the difference is thresholded, holes are
+filled, and connected components are labelled from run lengths. Each
+component's length, width and angle come from its second moments, as
+for a filled ellipse.
+
+Everything here takes plain numpy greyscale arrays and imports nothing
+from Qt.
+"""
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+DEFAULT_ANGLE_STEP_DEG = 2.0
+RING_ANGLE_STEP_DEG = 30
+# Share of rays that must find the edge: the 4 of 18 required when rays
+# were cast every 10 degrees.
+MIN_EDGE_RAY_FRACTION = 4 / 18
+# Rays on each side in the radius median used to pick the axes.
+AXIS_MEDIAN_RAYS = 2
+MIN_DELTA = 2.0
+BACKGROUND_BLOCK_MIN = 16
+MIN_FILL_RATIO = 0.92  # two touching spores score about 0.89
+MAX_FILL_RATIO = 1.1
+
+
+def sample_bilinear(gray: np.ndarray, xs: np.ndarray, ys: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Bilinearly interpolated values of gray at (xs, ys), and which points lie inside.
+
+    Points outside the image get 0.
+    """
+    height, width = gray.shape
+    inside = (xs >= 0) & (ys >= 0) & (xs <= width - 1) & (ys <= height - 1)
+    xs = np.clip(xs, 0, width - 1)
+    ys = np.clip(ys, 0, height - 1)
+    x0 = np.minimum(np.floor(xs).astype(np.intp), width - 2) if width > 1 else np.zeros(xs.shape, np.intp)
+    y0 = np.minimum(np.floor(ys).astype(np.intp), height - 2) if height > 1 else np.zeros(ys.shape, np.intp)
+    x1 = np.minimum(x0 + 1, width - 1)
+    y1 = np.minimum(y0 + 1, height - 1)
+    fx = xs - x0
+    fy = ys - y0
+    # Gather before converting, so a large image is never copied.
+    top = gray[y0, x0] * (1 - fx) + gray[y0, x1] * fx
+    bottom = gray[y1, x0] * (1 - fx) + gray[y1, x1] * fx
+    values = top * (1 - fy) + bottom * fy
+    return np.where(inside, values, 0.0), inside
+
+
+def _sample_nearest(gray: np.ndarray, xs: np.ndarray, ys: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    height, width = gray.shape
+    xi = np.rint(xs).astype(np.intp)
+    yi = np.rint(ys).astype(np.intp)
+    inside = (xi >= 0) & (yi >= 0) & (xi < width) & (yi < height)
+    values = gray[np.clip(yi, 0, height - 1), np.clip(xi, 0, width - 1)].astype(np.float64)
+    return np.where(inside, values, 0.0), inside
+
+
+def ring_background(
+    gray: np.ndarray,
+    cx: float,
+    cy: float,
+    radius: float,
+    angle_step: float = RING_ANGLE_STEP_DEG,
+) -> float | None:
+    """Mean intensity of the pixels on a ring around (cx, cy), or None if all fall outside."""
+    rad = np.radians(np.arange(0, 360, angle_step, dtype=np.float64))
+    values, inside = _sample_nearest(gray, cx + np.cos(rad) * radius, cy + np.sin(rad) * radius)
+    if not inside.any():
+        return None
+    return float(values[inside].mean())
+
+
+def find_edge_radii(
+    gray: np.ndarray,
+    cx: float,
+    cy: float,
+    background_mean: float,
+    threshold: float,
+    max_radius: int,
+    angle_step: float = DEFAULT_ANGLE_STEP_DEG,
+    subpixel: bool = True,
+) -> dict:
+    """Return {angle: radius} of the spore edge along rays over [0, 180) degrees.
+
+    Each ray is sampled at whole radii from max_radius inward; the edge is
+    the first sample whose intensity differs from background_mean by at
+    least threshold * 255. Rays that start outside the image or never hit
+    the threshold are left out. With subpixel the samples are bilinear and
+    the radius is interpolated where the difference crosses the
+    threshold; otherwise samples are the nearest pixels and radii whole.
+    Angles are ints when angle_step is whole.
+    """
+    max_radius = int(max_radius)
+    angles = np.arange(0, 180, angle_step, dtype=np.float64)
+    if max_radius < 1 or not len(angles):
+        return {}
+    delta = max(MIN_DELTA, threshold * 255.0)
+    rad = np.radians(angles)
+    radius_steps = np.arange(max_radius, 0, -1, dtype=np.float64)  # outside in
+    xs = cx + np.cos(rad)[:, None] * radius_steps[None, :]
+    ys = cy + np.sin(rad)[:, None] * radius_steps[None, :]
+    sample = sample_bilinear if subpixel else _sample_nearest
+    values, inside = sample(gray, xs, ys)
+
+    # A ray enters the image once and stays in it; rays whose outer end
+    # is outside are skipped, as in a stepwise search that stops there.
+    diff = np.abs(values - background_mean)
+    hits = (diff >= delta) & inside[:, :1]
+    found = hits.any(axis=1)
+    first = np.argmax(hits, axis=1)
+    radii = radius_steps[first]
+    if subpixel:
+        rows = np.nonzero(found & (first > 0))[0]
+        d_in = diff[rows, first[rows]]
+        d_out = diff[rows, first[rows] - 1]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            frac = np.clip((d_in - delta) / (d_in - d_out), 0.0, 1.0)
+        radii[rows] += np.nan_to_num(frac)
+
+    whole = float(angle_step).is_integer()
+    return {
+        (int(angle) if whole else float(angle)): (float(radius) if subpixel else int(radius))
+        for angle, radius, ok in zip(angles, radii, found)
+        if ok
+    }
+
+
+def min_edge_rays(angle_step: float = DEFAULT_ANGLE_STEP_DEG) -> int:
+    """Return how many rays must find the edge for a click measurement."""
+    ray_count = len(np.arange(0, 180, angle_step))
+    return max(4, int(math.ceil(ray_count * MIN_EDGE_RAY_FRACTION)))
+
+
+def pick_axes(
+    radii: dict,
+    angle_step: float = DEFAULT_ANGLE_STEP_DEG,
+    median_rays: int = AXIS_MEDIAN_RAYS,
+) -> Optional[tuple[float, float, float, float]]:
+    """Return (major_angle, major_radius, minor_angle, minor_radius) from edge radii.
+
+    Each radius is first replaced by the median of the rays within
+    median_rays steps of it (wrapping at 180 degrees, as the axes are
+    symmetric), so a single ray leaking through a gap in the edge cannot
+    become the major axis. The major axis is the longest smoothed ray and
+    the minor axis the found ray closest to perpendicular to it.
+    """
+    if not radii:
+        return None
+    angles = sorted(radii)
+    window = (median_rays + 0.5) * angle_step
+    smoothed = {}
+    for angle in angles:
+        near = [
+            radii[other]
+            for other in angles
+            if min(abs(other - angle), 180 - abs(other - angle)) <= window
+        ]
+        smoothed[angle] = float(np.median(near))
+    major_angle = max(angles, key=lambda a: smoothed[a])
+    target_minor = (major_angle + 90) % 180
+    minor_angle = min(
+        angles,
+        key=lambda a: min(abs(a - target_minor), abs(a - target_minor + 180), abs(a - target_minor - 180)),
+    )
+    return major_angle, smoothed[major_angle], minor_angle, smoothed[minor_angle]
+
+
+@dataclass
+class SporeCandidate:
+    """One detected spore, in image pixels."""
+
+    center_x: float
+    center_y: float
+    length_px: float
+    width_px: float
+    angle_deg: float  # of the length axis, clockwise from +x
+    area_px: int
+    fill_ratio: float  # area over that of the ellipse with the same moments
+
+    def points(self) -> list[tuple[float, float]]:
+        """Return the endpoints of the length line, then of the width line."""
+        rad = math.radians(self.angle_deg)
+        dx, dy = math.cos(rad), math.sin(rad)
+        half_length = self.length_px / 2.0
+        half_width = self.width_px / 2.0
+        return [
+            (self.center_x - dx * half_length, self.center_y - dy * half_length),
+            (self.center_x + dx * half_length, self.center_y + dy * half_length),
+            (self.center_x + dy * half_width, self.center_y - dx * half_width),
+            (self.center_x - dy * half_width, self.center_y + dx * half_width),
+        ]
+
+
+def _box_sum(image: np.ndarray, radius: int, axis: int) -> np.ndarray:
+    """Sum over a window of 2 * radius + 1 along one axis, clipped at the border."""
+    image = np.moveaxis(image, axis, 0)
+    total = image.astype(np.float32)
+    for shift in range(1, radius + 1):
+        total[shift:] += image[:-shift]
+        total[:-shift] += image[shift:]
+    return np.moveaxis(total, 0, axis)
+
+
+def box_mean(image: np.ndarray, radius: int) -> np.ndarray:
+    """Mean over a (2 * radius + 1) square window, clipped at the image border, as float32."""
+    height, width = image.shape
+    sums = _box_sum(_box_sum(image, radius, 0), radius, 1)
+    if radius < 1:
+        return sums
+    index_y = np.arange(height)
+    index_x = np.arange(width)
+    rows = np.minimum(index_y + radius + 1, height) - np.maximum(index_y - radius, 0)
+    cols = np.minimum(index_x + radius + 1, width) - np.maximum(index_x - radius, 0)
+    sums /= rows[:, None].astype(np.float32)
+    sums /= cols[None, :].astype(np.float32)
+    return sums
+
+
+def _lerp_indices(size: int, tiles: int, tile: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # Tile centres sit at (i + 0.5) * tile.
+    position = np.clip((np.arange(size, dtype=np.float32) + 0.5) / tile - 0.5, 0, tiles - 1)
+    lower = np.floor(position).astype(np.intp)
+    upper = np.minimum(lower + 1, tiles - 1)
+    return lower, upper, position - lower.astype(np.float32)
+
+
+def estimate_background(gray: np.ndarray, block: int) -> np.ndarray:
+    """Slowly varying background: medians of block x block tiles, bilinearly upsampled.
+
+    The median ignores spores covering up to half of a tile.
+    """
+    height, width = gray.shape
+    block = max(BACKGROUND_BLOCK_MIN, int(block))
+    rows = max(1, height // block)
+    cols = max(1, width // block)
+    tile_h = height // rows
+    tile_w = width // cols
+    tiles = gray[:rows * tile_h, :cols * tile_w].reshape(rows, tile_h, cols, tile_w)
+    pixels = tiles.transpose(0, 2, 1, 3).reshape(rows, cols, -1)
+    middle = pixels.shape[2] // 2
+    medians = np.partition(pixels, middle, axis=2)[:, :, middle].astype(np.float32)
+    x0, x1, fx = _lerp_indices(width, cols, tile_w)
+    y0, y1, fy = _lerp_indices(height, rows, tile_h)
+    along_x = medians[:, x0] * (1 - fx) + medians[:, x1] * fx
+    background = along_x[y0]
+    background *= (1 - fy)[:, None]
+    upper = along_x[y1]
+    upper *= fy[:, None]
+    background += upper
+    return background
+
+
+def _runs(mask: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return (row, start, end) of every horizontal run of True, end exclusive."""
+    height, width = mask.shape
+    padded = np.zeros((height, width + 2), dtype=np.int8)
+    padded[:, 1:-1] = mask
+    change = np.diff(padded, axis=1)
+    start_rows, starts = np.nonzero(change == 1)
+    _end_rows, ends = np.nonzero(change == -1)
+    return start_rows, starts, ends
+
+
+def _label_runs(rows, starts, ends, width: int, eight_connected: bool) -> np.ndarray:
+    """Return a component label 0..n-1 for every run."""
+    count = len(rows)
+    if not count:
+        return np.zeros(0, dtype=np.intp)
+    # Runs are ordered by row, then start, so both keys are sorted.
+    stride = width + 2
+    start_keys = rows * stride + starts
+    end_keys = rows * stride + ends
+    reach = 1 if eight_connected else 0
+    below = (rows + 1) * stride
+    first = np.searchsorted(end_keys, below + starts + 1 - reach, side="left")
+    last = np.searchsorted(start_keys, below + ends - 1 + reach, side="right")
+    links = np.maximum(last - first, 0)
+    upper = np.repeat(np.arange(count), links)
+    offsets = np.arange(links.sum()) - np.repeat(np.cumsum(links) - links, links)
+    lower = np.repeat(first, links) + offsets
+
+    parent = np.arange(count)
+    while len(upper):
+        root_a = parent[upper]
+        root_b = parent[lower]
+        differ = root_a != root_b
+        if not differ.any():
+            break
+        np.minimum.at(parent, np.maximum(root_a, root_b)[differ], np.minimum(root_a, root_b)[differ])
+        while True:
+            grand = parent[parent]
+            if np.array_equal(grand, parent):
+                break
+            parent = grand
+    return np.unique(parent, return_inverse=True)[1]
+
+
+def fill_holes(mask: np.ndarray) -> np.ndarray:
+    """Return mask with every region of False not connected to the border set."""
+    height, width = mask.shape
+    rows, starts, ends = _runs(~mask)
+    labels = _label_runs(rows, starts, ends, width, eight_connected=False)
+    if not len(labels):
+        return mask.copy()
+    border = (rows == 0) | (rows == height - 1) | (starts == 0) | (ends == width)
+    open_labels = np.zeros(labels.max() + 1, dtype=bool)
+    open_labels[labels[border]] = True
+    holes = ~open_labels[labels]
+    filled = mask.copy()
+    lengths = (ends - starts)[holes]
+    if lengths.size:
+        flat_starts = (rows * width + starts)[holes]
+        offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        filled.reshape(-1)[np.repeat(flat_starts, lengths) + offsets] = True
+    return filled
+
+
+def detect_spores(
+    gray: np.ndarray,
+    threshold: float,
+    min_radius_px: float,
+    max_radius_px: float,
+    background: Optional[np.ndarray] = None,
+    smooth_radius: int = 1,
+    smoothed: Optional[np.ndarray] = None,
+) -> list[SporeCandidate]:
+    """Find every isolated spore in a greyscale image.
+
+    Pixels differing from the background by at least threshold * 255 (as
+    for click-to-measure) form the spores. Components touching the image
+    border, outside the radius limits, or whose shape is far from an
+    ellipse (such as clumps of touching spores) are left out. The
+    background defaults to estimate_background() with blocks of four
+    times max_radius_px. smoothed is box_mean(gray, smooth_radius) if
+    already at hand, as float32; it is overwritten.
+    """
+    gray = np.asarray(gray)
+    height, width = gray.shape
+    delta = max(MIN_DELTA, threshold * 255.0)
+    difference = box_mean(gray, smooth_radius) if smoothed is None else smoothed
+    difference -= estimate_background(gray, 4 * max_radius_px) if background is None else background
+    np.abs(difference, out=difference)
+    mask = fill_holes(difference >= delta)
+    del difference
+
+    rows, starts, ends = _runs(mask)
+    labels = _label_runs(rows, starts, ends, width, eight_connected=True)
+    if not len(labels):
+        return []
+    n_labels = int(labels.max()) + 1
+
+    # Pixel sums of each run in closed form; x is the column index.
+    rows_f = rows.astype(np.float64)
+    lengths = (ends - starts).astype(np.float64)
+    sum_x = (starts + ends - 1) * lengths / 2.0
+    last = ends - 1.0
+    first = starts - 1.0
+    sum_xx = (last * (last + 1) * (2 * last + 1) - first * (first + 1) * (2 * first + 1)) / 6.0
+    area = np.bincount(labels, lengths, n_labels)
+    m_x = np.bincount(labels, sum_x, n_labels) / area
+    m_y = np.bincount(labels, rows_f * lengths, n_labels) / area
+    mu20 = np.bincount(labels, sum_xx, n_labels) / area - m_x ** 2
+    mu02 = np.bincount(labels, rows_f ** 2 * lengths, n_labels) / area - m_y ** 2
+    mu11 = np.bincount(labels, rows_f * sum_x, n_labels) / area - m_x * m_y
+
+    touches = np.zeros(n_labels, dtype=bool)
+    edge_runs = (rows == 0) | (rows == height - 1) | (starts == 0) | (ends == width)
+    touches[labels[edge_runs]] = True
+
+    # A filled ellipse with semi-axes a, b has variances a^2 / 4 and b^2 / 4.
+    spread = np.sqrt(((mu20 - mu02) / 2.0) ** 2 + mu11 ** 2)
+    mean_var = (mu20 + mu02) / 2.0
+    semi_major = 2.0 * np.sqrt(np.maximum(mean_var + spread, 0.0))
+    semi_minor = 2.0 * np.sqrt(np.maximum(mean_var - spread, 0.0))
+    angles = np.degrees(0.5 * np.arctan2(2.0 * mu11, mu20 - mu02))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fill = area / (np.pi * semi_major * semi_minor)
+    keep = (
+        ~touches
+        & (semi_minor >= min_radius_px)
+        & (semi_major <= max_radius_px)
+        & (fill >= MIN_FILL_RATIO)
+        & (fill <= MAX_FILL_RATIO)
+    )
+    return [
+        SporeCandidate(
+            center_x=float(m_x[i]),
+            center_y=float(m_y[i]),
+            length_px=float(2.0 * semi_major[i]),
+            width_px=float(2.0 * semi_minor[i]),
+            angle_deg=float(angles[i] % 180.0),
+            area_px=int(area[i]),
+            fill_ratio=float(fill[i]),
+        )
+        for i in np.nonzero(keep)[0]
+    ]
@@ -0,0 +1,198 @@
+"""Render single-spore thumbnails from a measurement's four points.
+
+Everything here works on QImage, so crops can be rendered from worker
+threads. Rotation (orient mode / manual flips) is applied to a padded
+region around the measurement only, never to the whole source image.
+Quarter turns match a full-image rotation exactly; other angles differ
+from it by a few grey levels, as Qt's smooth sampling rounds depending
+on where each scanline starts.
+"""
+from __future__ import annotations
+
+import math
+from typing import Sequence
+
+from PySide6.QtCore import QPointF, QRect, QRectF, Qt
+from PySide6.QtGui import QColor, QImage, QPainter, QPen, QPolygonF, QTransform
+
+# Extra source pixels around the region of interest so smooth sampling at
+# the crop edges sees the same neighbours as a full-image rotation would.
+ROI_PADDING_PX = 4
+BACKGROUND_COLOR = QColor(236, 240, 241)
+DEFAULT_STROKE_COLOR = QColor(52, 152, 219)
+
+
+def _rotation_transform(width: int, height: int, angle: float) -> QTransform:
+    transform = QTransform()
+    transform.translate(width / 2, height / 2)
+    transform.rotate(angle)
+    transform.translate(-width / 2, -height / 2)
+    return transform
+
+
+def _transformed_bounds(image: QImage, transform: QTransform) -> QRectF:
+    """Return the rect of image.transformed(transform), at the origin."""
+    mapped = QImage.trueMatrix(transform, image.width(), image.height()).map(
+        QPolygonF(QRectF(image.rect()))
+    )
+    size = mapped.boundingRect().toAlignedRect().size()
+    return QRectF(0, 0, size.width(), size.height())
+
+
+def _rotated_region(image: QImage, transform: QTransform, rect: QRect) -> QImage:
+    """Return rect of image.transformed(transform, Qt.SmoothTransformation).
+
+    Only the source pixels that land in rect (plus padding) are rotated.
+    The ROI transform maps ROI pixels to the same place the full-image
+    transform would, so the sampling grid lines up pixel for pixel.
+    """
+    origin = transform.mapRect(QRectF(image.rect())).toAlignedRect().topLeft()
+    inverse, invertible = transform.inverted()
+    if not invertible:
+        return image.transformed(transform, Qt.SmoothTransformation).copy(rect)
+    target = QRectF(rect.translated(origin))
+    source_rect = inverse.mapRect(target).toAlignedRect().adjusted(
+        -ROI_PADDING_PX, -ROI_PADDING_PX, ROI_PADDING_PX, ROI_PADDING_PX
+    ).intersected(image.rect())
+    if source_rect.isEmpty():
+        empty = QImage(rect.size(), QImage.Format_ARGB32_Premultiplied)
+        empty.fill(0)
+        return empty
+    roi = image.copy(source_rect)
+    roi_transform = QTransform.fromTranslate(source_rect.x(), source_rect.y()) * transform
+    rotated = roi.transformed(roi_transform, Qt.SmoothTransformation)
+    roi_origin = roi_transform.mapRect(QRectF(roi.rect())).toAlignedRect().topLeft()
+    return rotated.copy(rect.translated(origin - roi_origin))
+
+
+def render_spore_thumbnail(
+    image: QImage,
+    points: Sequence[QPointF],
+    length_um: float,
+    width_um: float,
+    size: int,
+    orient: bool = False,
+    extra_rotation: float = 0,
+    uniform_length_px: float | None = None,
+    color: QColor | str | None = None,
+) -> QImage | None:
+    """Render a square thumbnail of one measurement with its outline and size label.
+
+    Args:
+        image: Source image
+        points: List of 4 QPointF measurement points
+        length_um: Length in microns
+        width_um: Width in microns
+        size: Output thumbnail size (square)
+        orient: If True, rotate so length axis is vertical
+        extra_rotation: Additional rotation in degrees (e.g., 180 for flip)
+        uniform_length_px: Crop span in source pixels shared by all thumbnails
+        color: Outline and label colour
+    """
+    if image is None or image.isNull() or len(points) < 4:
+        return None
+
+    points = [QPointF(p) for p in points[:4]]
+    line1_vec = QPointF(points[1].x() - points[0].x(), points[1].y() - points[0].y())
+    line1_len = math.sqrt(line1_vec.x() ** 2 + line1_vec.y() ** 2)
+
+    # Keep stable orientation based on the first measurement line
+    rotation_angle = extra_rotation
+    if orient and line1_len > 0:
+        # atan2(x, -y) gives the angle of the length axis from "up"
+        current_angle = math.atan2(line1_vec.x(), -line1_vec.y())
+        rotation_angle += -math.degrees(current_angle)
+
+    transform = None
+    bounds = QRectF(0, 0, image.width(), image.height())
+    if abs(rotation_angle) > 0.1:
+        transform = _rotation_transform(image.width(), image.height(), rotation_angle)
+        src_rect = transform.mapRect(bounds)
+        offset = QPointF(-src_rect.x(), -src_rect.y())
+        points = [transform.map(p) + offset for p in points]
+        bounds = _transformed_bounds(image, transform)
+
+    line1_vec = QPointF(points[1].x() - points[0].x(), points[1].y() - points[0].y())
+    line2_vec = QPointF(points[3].x() - points[2].x(), points[3].y() - points[2].y())
+    length_px = math.sqrt(line1_vec.x() ** 2 + line1_vec.y() ** 2)
+    width_px = math.sqrt(line2_vec.x() ** 2 + line2_vec.y() ** 2)
+    line1_mid = QPointF((points[0].x() + points[1].x()) / 2, (points[0].y() + points[1].y()) / 2)
+    line2_mid = QPointF((points[2].x() + points[3].x()) / 2, (points[2].y() + points[3].y()) / 2)
+    center = QPointF((line1_mid.x() + line2_mid.x()) / 2, (line1_mid.y() + line2_mid.y()) / 2)
+
+    # Crop parameters
+    max_dim = uniform_length_px if uniform_length_px else max(length_px, width_px)
+    padding = max_dim * 0.15
+    crop_size = max_dim + padding * 2
+    crop_rect = QRectF(
+        center.x() - crop_size / 2,
+        center.y() - crop_size / 2,
+        crop_size,
+        crop_size,
+    ).intersected(bounds)
+
+    crop = crop_rect.toRect()
+    if crop.isEmpty():
+        # Matches QPixmap.copy(), which the thumbnails were first cut with:
+        # a crop outside the image falls back to the whole image.
+        crop = bounds.toRect()
+    if transform is not None:
+        cropped = _rotated_region(image, transform, crop)
+    else:
+        cropped = image.copy(crop)
+    if cropped.isNull() or cropped.width() <= 0 or cropped.height() <= 0:
+        return None
+    scaled = cropped.scaled(size, size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+
+    result = QImage(size, size, QImage.Format_RGB32)
+    result.fill(BACKGROUND_COLOR)
+    painter = QPainter(result)
+    painter.setRenderHint(QPainter.Antialiasing)
+    painter.setRenderHint(QPainter.SmoothPixmapTransform)
+
+    img_x = (size - scaled.width()) / 2
+    img_y = (size - scaled.height()) / 2
+    painter.drawImage(int(img_x), int(img_y), scaled)
+
+    # Rectangle overlay
+    length_dir = QPointF(line1_vec.x() / length_px, line1_vec.y() / length_px) if length_px > 0 else QPointF(0, -1)
+    width_dir = QPointF(-length_dir.y(), length_dir.x())
+    half_length = length_px / 2
+    half_width = width_px / 2
+    img_scale = min(
+        scaled.width() / cropped.width(),
+        scaled.height() / cropped.height(),
+    )
+
+    # When crop_rect was clipped by the image bounds the measurement centre
+    # is no longer the centre of the crop.
+    screen_center = QPointF(
+        img_x + (center.x() - crop_rect.x()) * img_scale,
+        img_y + (center.y() - crop_rect.y()) * img_scale,
+    )
+    axis_length = QPointF(-length_dir.x(), -length_dir.y())
+    axis_width = width_dir
+    corners = [
+        screen_center + axis_width * (-half_width * img_scale) + axis_length * (-half_length * img_scale),
+        screen_center + axis_width * (half_width * img_scale) + axis_length * (-half_length * img_scale),
+        screen_center + axis_width * (half_width * img_scale) + axis_length * (half_length * img_scale),
+        screen_center + axis_width * (-half_width * img_scale) + axis_length * (half_length * img_scale),
+    ]
+
+    stroke_color = QColor(color) if color else QColor(DEFAULT_STROKE_COLOR)
+    light_color = QColor(stroke_color).lighter(130)
+    light_color.setAlpha(51)
+    painter.setPen(QPen(light_color, 3))
+    painter.drawPolygon(QPolygonF(corners))
+    painter.setPen(QPen(stroke_color, 1))
+    painter.drawPolygon(QPolygonF(corners))
+
+    # Dimensions label
+    painter.setPen(stroke_color)
+    font = painter.font()
+    font.setPointSize(max(8, int(size * 0.045)))
+    painter.setFont(font)
+    painter.drawText(5, size - 10, f"{length_um:.2f} x {width_um:.2f}")
+
+    painter.end()
+    return result
@@ -0,0 +1,385 @@
+"""Persistent on-disk cache for rendered spore thumbnails.
+
+Entries are PNG files stored per measurement under the app cache dir,
+named by a hash of everything that affects the rendered pixels: the
+source file identity (path, size, mtime), the four measurement points,
+the label values, thumbnail size, orientation/rotation, uniform scale
+and colour. Reads touch the file so pruning can drop the least recently
+used entries once the cache grows beyond its byte budget.
+"""
+from __future__ import annotations
+
+import hashlib
+import math
+import os
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from typing import Callable, Optional, Sequence, Union
+
+from PySide6.QtCore import QPointF, QSize, Qt
+from PySide6.QtGui import QColor, QImage, QImageReader, QPixmap
+
+from database.schema import get_cache_dir
+from utils.spore_crop import render_spore_thumbnail
+
+# Bump when render_spore_thumbnail output changes so old entries miss.
+RENDER_VERSION = 3
+SPORE_CROP_CACHE_MAX_BYTES = 256 * 1024 * 1024
+# render_image_spore_crops decodes a reduced image only when every crop
+# would be downsampled at least this much; closer to 1 the full decode is
+# kept so crops stay identical to the gallery's.
+SCALED_DECODE_MAX = 0.75
+# Crop span relative to the measurement (render_spore_thumbnail pads 15% per side).
+_CROP_SPAN_FACTOR = 1.3
+
+_size_lock = threading.Lock()
+_cache_bytes: dict[Path, int] = {}
+
+ImageSource = Union[QImage, QPixmap, Callable[[], Union[QImage, QPixmap, None]], None]
+
+
+def spore_crop_cache_root() -> Path:
+    return get_cache_dir() / "spore_crops"
+
+
+def _file_identity(image_path: str) -> Optional[str]:
+    try:
+        path = Path(image_path).resolve()
+        stat = path.stat()
+    except (OSError, TypeError, ValueError):
+        return None
+    return f"{path}|{stat.st_size}|{stat.st_mtime_ns}"
+
+
+def spore_crop_key(
+    image_path: str,
+    points: Sequence,
+    length_um: float,
+    width_um: float,
+    size: int,
+    orient: bool = False,
+    extra_rotation: float = 0,
+    uniform_length_px: float | None = None,
+    color: QColor | str | None = None,
+    source_scale: float = 1.0,
+) -> Optional[str]:
+    """Return the cache key for one rendered thumbnail, or None if the source is missing.
+
+    source_scale is the factor the source was decoded at (points are then
+    in scaled pixels), so reduced renders never stand in for full ones.
+    """
+    identity = _file_identity(image_path)
+    if not identity or len(points) < 4:
+        return None
+    coords = ",".join(f"{float(p.x()):.4f},{float(p.y()):.4f}" for p in points[:4])
+    color_key = QColor(color).name() if color else ""
+    uniform_key = f"{float(uniform_length_px):.4f}" if uniform_length_px else ""
+    raw = "|".join(
+        [
+            f"v{RENDER_VERSION}",
+            identity,
+            coords,
+            f"{float(length_um or 0):.2f}x{float(width_um or 0):.2f}",
+            str(int(size)),
+            "1" if orient else "0",
+            f"{float(extra_rotation or 0):.3f}",
+            uniform_key,
+            color_key,
+            f"s{float(source_scale):.6f}" if source_scale != 1.0 else "",
+        ]
+    )
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _entry_path(cache_root: Path, measurement_id, key: str) -> Path:
+    folder = str(measurement_id) if measurement_id is not None else "_"
+    return cache_root / folder / f"{key}.png"
+
+
+def load_spore_crop(measurement_id, key: str, cache_root: Path | None = None) -> Optional[QImage]:
+    """Return the cached thumbnail for key, or None on a miss."""
+    if not key:
+        return None
+    path = _entry_path(cache_root or spore_crop_cache_root(), measurement_id, key)
+    if not path.exists():
+        return None
+    image = QImage(str(path))
+    if image.isNull():
+        return None
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+    return image
+
+
+def _iter_entries(cache_root: Path):
+    """Yield (mtime, size, path) of every cache file.
+
+    Folders may be removed concurrently (invalidate_spore_crops, another
+    prune), so vanished ones are skipped.
+    """
+    try:
+        folders = list(os.scandir(cache_root))
+    except OSError:
+        return
+    for folder in folders:
+        try:
+            if not folder.is_dir():
+                continue
+            entries = list(os.scandir(folder.path))
+        except OSError:
+            continue
+        for entry in entries:
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            yield stat.st_mtime, stat.st_size, entry.path
+
+
+def _scan_bytes(cache_root: Path) -> int:
+    return sum(size for _mtime, size, _path in _iter_entries(cache_root))
+
+
+def store_spore_crop(
+    measurement_id,
+    key: str,
+    image: QImage,
+    cache_root: Path | None = None,
+    max_bytes: int = SPORE_CROP_CACHE_MAX_BYTES,
+) -> None:
+    """Write a rendered thumbnail to the cache and prune if over budget."""
+    if not key or image is None or image.isNull():
+        return
+    cache_root = cache_root or spore_crop_cache_root()
+    path = _entry_path(cache_root, measurement_id, key)
+    tmp_path = None
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # A unique temp file per writer: two threads rendering the same
+        # key must not write into each other's file.
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f"{key}.", suffix=".tmp")
+        os.close(fd)
+        if not image.save(tmp_path, "PNG"):
+            os.remove(tmp_path)
+            return
+        try:
+            replaced = path.stat().st_size
+        except OSError:
+            replaced = 0
+        os.replace(tmp_path, path)
+        tmp_path = None
+        written = path.stat().st_size
+    except OSError as e:
+        print(f"Warning: Could not write spore crop cache entry: {e}")
+        if tmp_path:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+        return
+    with _size_lock:
+        if cache_root not in _cache_bytes:
+            _cache_bytes[cache_root] = _scan_bytes(cache_root)
+        else:
+            _cache_bytes[cache_root] += written - replaced
+        over_budget = _cache_bytes[cache_root] > max_bytes
+    if over_budget:
+        prune_spore_crop_cache(cache_root, max_bytes)
+
+
+def invalidate_spore_crops(measurement_id, cache_root: Path | None = None) -> None:
+    """Drop every cached thumbnail of a measurement (edited or deleted)."""
+    if measurement_id is None:
+        return
+    cache_root = cache_root or spore_crop_cache_root()
+    shutil.rmtree(cache_root / str(measurement_id), ignore_errors=True)
+    with _size_lock:
+        _cache_bytes.pop(cache_root, None)
+
+
+def prune_spore_crop_cache(cache_root: Path | None = None, max_bytes: int = SPORE_CROP_CACHE_MAX_BYTES) -> None:
+    """Remove the least recently used entries until the cache is at 90% of max_bytes."""
+    cache_root = cache_root or spore_crop_cache_root()
+    if not cache_root.exists():
+        return
+    entries = list(_iter_entries(cache_root))
+    total = sum(size for _mtime, size, _path in entries)
+    target = int(max_bytes * 0.9)
+    if total > max_bytes:
+        entries.sort()
+        for _mtime, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                continue
+    with _size_lock:
+        _cache_bytes[cache_root] = total
+
+
+def cached_spore_thumbnail(
+    source: ImageSource,
+    image_path: str,
+    measurement_id,
+    points: Sequence,
+    length_um: float,
+    width_um: float,
+    size: int,
+    orient: bool = False,
+    extra_rotation: float = 0,
+    uniform_length_px: float | None = None,
+    color: QColor | str | None = None,
+    source_scale: float = 1.0,
+) -> Optional[QImage]:
+    """Return a spore thumbnail from the disk cache, rendering it on a miss.
+
+    source may be a callable so the (expensive) source image is only
+    decoded when the thumbnail is not cached yet. QImage-only, so it can
+    run on worker threads when source is a QImage or returns one.
+    """
+    key = spore_crop_key(
+        image_path,
+        points,
+        length_um,
+        width_um,
+        size,
+        orient=orient,
+        extra_rotation=extra_rotation,
+        uniform_length_px=uniform_length_px,
+        color=color,
+        source_scale=source_scale,
+    )
+    if key:
+        cached = load_spore_crop(measurement_id, key)
+        if cached is not None:
+            return cached
+    if callable(source):
+        source = source()
+    if source is None or source.isNull():
+        return None
+    image = source if isinstance(source, QImage) else source.toImage()
+    thumbnail = render_spore_thumbnail(
+        image,
+        points,
+        length_um,
+        width_um,
+        size,
+        orient=orient,
+        extra_rotation=extra_rotation,
+        uniform_length_px=uniform_length_px,
+        color=color,
+    )
+    if thumbnail is not None and key:
+        store_spore_crop(measurement_id, key, thumbnail)
+    return thumbnail
+
+
+def _crop_span_px(job: dict) -> float:
+    """Source pixels across the crop render_spore_thumbnail takes for job."""
+    if job.get("uniform_length_px"):
+        return float(job["uniform_length_px"]) * _CROP_SPAN_FACTOR
+    points = job["points"]
+    if len(points) < 4:
+        return 0.0
+    length = math.hypot(points[1].x() - points[0].x(), points[1].y() - points[0].y())
+    width = math.hypot(points[3].x() - points[2].x(), points[3].y() - points[2].y())
+    return max(length, width) * _CROP_SPAN_FACTOR
+
+
+def source_decode_scale(jobs: Sequence[dict]) -> float:
+    """Return the factor a source can be decoded at without losing crop detail.
+
+    Each crop is resampled to job["size"] pixels; when every crop of the
+    image spans more source pixels than that, the source can be decoded
+    that much smaller. Returns 1.0 when the saving is not worth the
+    deviation from full-resolution crops.
+    """
+    scale = 1.0
+    for job in jobs:
+        span = _crop_span_px(job)
+        if span <= 0:
+            return 1.0
+        scale = min(scale, float(job["size"]) / span)
+    return scale if scale <= SCALED_DECODE_MAX else 1.0
+
+
+def _read_source(image_path: str, size: QSize | None = None) -> QImage:
+    """Decode image_path, at size if given.
+
+    EXIF orientation is not applied: measurement points are in the
+    pixel orientation the app displays (QPixmap(path)).
+    """
+    reader = QImageReader(image_path)
+    reader.setAutoTransform(False)
+    if size is not None:
+        reader.setScaledSize(size)
+    return reader.read()
+
+
+def render_image_spore_crops(
+    image_path: str,
+    jobs: Sequence[dict],
+    should_stop: Callable[[], bool] | None = None,
+):
+    """Yield (job["index"], thumbnail) for several measurements on one image.
+
+    Each job holds the cached_spore_thumbnail arguments (measurement_id,
+    points, length_um, width_um, size, orient, extra_rotation,
+    uniform_length_px, color). Cached crops are returned without touching
+    the source; otherwise the image is decoded once and shared by the
+    remaining jobs, at the reduced size from source_decode_scale when
+    every crop is downsampled anyway. QImage-only, so it can run on a
+    worker thread.
+    """
+    scale = source_decode_scale(jobs)
+    scaled_size = None
+    sx = sy = 1.0
+    if scale < 1.0:
+        full = QImageReader(image_path).size()
+        if full.isValid():
+            scaled_size = QSize(max(1, round(full.width() * scale)), max(1, round(full.height() * scale)))
+            # Whole-pixel sizes: map points with the exact per-axis factors.
+            sx = scaled_size.width() / full.width()
+            sy = scaled_size.height() / full.height()
+        else:
+            scale = 1.0
+    decoded: list[QImage] = []
+
+    def load_source() -> QImage:
+        if not decoded:
+            image = _read_source(image_path, scaled_size)
+            if scaled_size is not None and not image.isNull() and image.size() != scaled_size:
+                # The points and cache keys assume the reduced size.
+                image = image.scaled(scaled_size, Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+            decoded.append(image)
+        return decoded[0]
+
+    for job in jobs:
+        if should_stop and should_stop():
+            return
+        points = job["points"]
+        uniform_length_px = job.get("uniform_length_px")
+        if scale < 1.0:
+            points = [QPointF(p.x() * sx, p.y() * sy) for p in points]
+            if uniform_length_px:
+                uniform_length_px = float(uniform_length_px) * sx
+        yield job["index"], cached_spore_thumbnail(
+            load_source,
+            image_path,
+            job.get("measurement_id"),
+            points,
+            job.get("length_um") or 0,
+            job.get("width_um") or 0,
+            job["size"],
+            orient=job.get("orient", False),
+            extra_rotation=job.get("extra_rotation", 0),
+            uniform_length_px=uniform_length_px,
+            color=job.get("color"),
+            source_scale=scale,
+        )
@@ -3,6 +3,7 @@ from pathlib import Path
 from PIL import Image
 import sqlite3
 from database.schema import get_connection, DATABASE_PATH
+from utils.perceptual_hash import dhash_from_thumbnails, record_image_hash
 
 # Thumbnail output directory
 THUMBNAIL_DIR = DATABASE_PATH.parent / "thumbnails"
@@ -85,6 +86,35 @@ def generate_thumbnail(image_path: str, size: tuple, output_path: Path) -> bool:
         return False
 
 
+def thumbnail_path_for(image_id: int, size_preset: str) -> Path:
+    """Return the file a thumbnail of image_id at size_preset is stored as."""
+    return THUMBNAIL_DIR / f"img_{image_id}_{size_preset}.jpg"
+
+
+def save_thumbnail_records(cursor, image_id: int, paths: dict) -> dict:
+    """Record generated thumbnails on an open cursor; the caller commits.
+
+    Args:
+        cursor: Cursor of the connection the records are written with
+        image_id: Database ID of the image
+        paths: Dictionary mapping size_preset names to thumbnail filepaths
+
+    Returns:
+        Dictionary of the thumbnails that were recorded
+    """
+    recorded = {}
+    for preset_name, filepath in paths.items():
+        try:
+            cursor.execute('''
+                INSERT OR REPLACE INTO thumbnails (image_id, size_preset, filepath)
+                VALUES (?, ?, ?)
+            ''', (image_id, preset_name, str(filepath)))
+            recorded[preset_name] = str(filepath)
+        except sqlite3.Error as e:
+            print(f"Database error saving thumbnail record: {e}")
+    return recorded
+
+
 def generate_all_sizes(image_path: str, image_id: int) -> dict:
     """Generate thumbnails at all preset sizes for an image.
 
@@ -108,24 +138,21 @@ def generate_all_sizes(image_path: str, image_id: int) -> dict:
     cursor = conn.cursor()
 
     for preset_name, size in SIZE_PRESETS.items():
-        # Generate unique filename using image_id and preset
-        thumbnail_filename = f"img_{image_id}_{preset_name}.jpg"
-        thumbnail_path = THUMBNAIL_DIR / thumbnail_filename
+        thumbnail_path = thumbnail_path_for(image_id, preset_name)
 
         # Generate the thumbnail
         if generate_thumbnail(image_path, size, thumbnail_path):
-            # Save to database
-            try:
-                cursor.execute('''
-                    INSERT OR REPLACE INTO thumbnails (image_id, size_preset, filepath)
-                    VALUES (?, ?, ?)
-                ''', (image_id, preset_name, str(thumbnail_path)))
-                results[preset_name] = str(thumbnail_path)
-            except sqlite3.Error as e:
-                print(f"Database error saving thumbnail record: {e}")
+            results[preset_name] = str(thumbnail_path)
+
+    results = save_thumbnail_records(cursor, image_id, results)
+    dhash = dhash_from_thumbnails(results)
+    if dhash is not None:
+        from database.models import ImageDB
 
+        ImageDB.set_dhash(image_id, dhash, conn=conn)
     conn.commit()
     conn.close()
+    record_image_hash(image_id, dhash)
 
     return results
 